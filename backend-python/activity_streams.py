@@ -0,0 +1,275 @@
+"""
+Activity Stream Storage and Analysis
+Compact columnar encoding, LTTB downsampling and derived metrics for Intervals.icu activity streams
+"""
+
+import json
+import struct
+import zlib
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+# Blob layout: MAGIC | version (u8) | flags (u8) | body
+# body (zlib-compressed when FLAG_ZLIB is set): header length (u32) | JSON header | channel buffers
+MAGIC = b'ISTR'
+FORMAT_VERSION = 1
+FLAG_ZLIB = 0x01
+
+# Fixed-point scale per channel; values are stored as round(value * scale)
+CHANNEL_SCALES = {
+    'time': 1,
+    'watts': 1,
+    'heartrate': 1,
+    'cadence': 1,
+    'altitude': 10,  # decimetres
+}
+
+# HR zone upper bounds as a fraction of max HR (Z1..Z5, Z5 is open ended)
+HR_ZONE_BOUNDS = (0.60, 0.70, 0.80, 0.90)
+
+NORMALIZED_POWER_WINDOW_SECONDS = 30
+
+
+def _smallest_int_dtype(values: np.ndarray) -> np.dtype:
+    """Pick the narrowest signed integer dtype that can hold every value"""
+    if values.size == 0:
+        return np.dtype(np.int8)
+    low, high = int(values.min()), int(values.max())
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def encode_streams(streams: Dict[str, List[Any]], compress: bool = True) -> bytes:
+    """
+    Encode activity streams into a compact binary columnar blob
+
+    Each channel is quantised to integers, delta encoded and stored with the
+    narrowest dtype that fits the deltas. Missing samples (None) are recorded
+    in a packed bitmap so they survive the round trip.
+
+    Args:
+        streams: Mapping of channel name to list of samples (as returned by
+            IntervalsICUClient.get_activity_streams)
+        compress: Whether to zlib-compress the body
+
+    Returns:
+        Encoded bytes
+    """
+    header = {'channels': []}
+    buffers = []
+
+    for name, samples in streams.items():
+        if not samples:
+            continue
+        values = np.array([np.nan if v is None else v for v in samples], dtype=np.float64)
+        missing = np.isnan(values)
+        scale = CHANNEL_SCALES.get(name, 100)
+
+        quantised = np.round(np.where(missing, 0, values) * scale).astype(np.int64)
+        deltas = np.diff(quantised, prepend=0)
+        dtype = _smallest_int_dtype(deltas)
+        data = deltas.astype(dtype).tobytes()
+
+        channel = {
+            'name': name,
+            'length': int(values.size),
+            'scale': scale,
+            'dtype': dtype.str,
+            'bytes': len(data),
+            'maskBytes': 0,
+        }
+        buffers.append(data)
+
+        if missing.any():
+            mask = np.packbits(missing).tobytes()
+            channel['maskBytes'] = len(mask)
+            buffers.append(mask)
+
+        header['channels'].append(channel)
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    body = struct.pack('<I', len(header_bytes)) + header_bytes + b''.join(buffers)
+
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 6)
+        flags |= FLAG_ZLIB
+
+    return MAGIC + struct.pack('<BB', FORMAT_VERSION, flags) + body
+
+
+def decode_streams(blob: bytes) -> Dict[str, np.ndarray]:
+    """
+    Decode a blob produced by encode_streams
+
+    Args:
+        blob: Encoded bytes
+
+    Returns:
+        Mapping of channel name to float64 array (missing samples are NaN)
+    """
+    if blob[:4] != MAGIC:
+        raise ValueError('Not an encoded activity stream')
+    version, flags = struct.unpack('<BB', blob[4:6])
+    if version != FORMAT_VERSION:
+        raise ValueError(f'Unsupported stream format version {version}')
+
+    body = blob[6:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    header_len = struct.unpack('<I', body[:4])[0]
+    header = json.loads(body[4:4 + header_len].decode('utf-8'))
+    offset = 4 + header_len
+
+    streams = {}
+    for channel in header['channels']:
+        deltas = np.frombuffer(body, dtype=np.dtype(channel['dtype']), count=channel['length'], offset=offset)
+        offset += channel['bytes']
+        values = np.cumsum(deltas, dtype=np.int64).astype(np.float64) / channel['scale']
+
+        if channel['maskBytes']:
+            mask_bits = np.frombuffer(body, dtype=np.uint8, count=channel['maskBytes'], offset=offset)
+            offset += channel['maskBytes']
+            missing = np.unpackbits(mask_bits, count=channel['length']).astype(bool)
+            values[missing] = np.nan
+
+        streams[channel['name']] = values
+
+    return streams
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Args:
+        x: Sample positions (e.g. the time stream), monotonically increasing
+        y: Sample values used to pick the visually significant points
+        threshold: Number of points to keep (at least 3: first, last and one per bucket)
+
+    Returns:
+        Sorted array of selected indices (always includes first and last)
+    """
+    n = x.size
+    threshold = max(threshold, 3)
+    if threshold >= n:
+        return np.arange(n)
+
+    y = np.nan_to_num(y, nan=0.0)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    # Bucket averages are independent of the selection, so compute them up front
+    counts = np.diff(edges)
+    x_sums = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    y_sums = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    avg_x = np.append(x_sums / counts, x[n - 1])
+    avg_y = np.append(y_sums / counts, y[n - 1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        bx, by = x[start:end], y[start:end]
+        areas = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_streams(streams: Dict[str, np.ndarray], points: int, key_channel: Optional[str] = None) -> Dict[str, List[Optional[float]]]:
+    """
+    Downsample all channels to a shared set of LTTB-selected samples
+
+    Args:
+        streams: Decoded streams (see decode_streams)
+        points: Target number of points
+        key_channel: Channel whose shape drives point selection; defaults to
+            watts, then heartrate, then the first available channel
+
+    Returns:
+        JSON-ready mapping of channel name to list (NaN becomes None)
+    """
+    if not streams:
+        return {}
+
+    length = max(values.size for values in streams.values())
+    x = streams.get('time')
+    if x is None or x.size != length or np.isnan(x).any():
+        x = np.arange(length, dtype=np.float64)
+
+    if key_channel not in streams:
+        key_channel = next((c for c in ('watts', 'heartrate') if c in streams), next(iter(streams)))
+    y = streams[key_channel]
+    if y.size != length:
+        y = np.resize(y, length)
+
+    indices = lttb_indices(x, y, points) if points else np.arange(length)
+
+    result = {}
+    for name, values in streams.items():
+        picked = values[indices[indices < values.size]]
+        result[name] = [None if np.isnan(v) else float(v) for v in picked]
+    return result
+
+
+def compute_derived_metrics(streams: Dict[str, np.ndarray], max_hr: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Compute summary metrics for an activity from its decoded streams
+
+    Args:
+        streams: Decoded streams (see decode_streams)
+        max_hr: Athlete max HR used for zone bounds; falls back to the
+            activity's own peak HR when not provided
+
+    Returns:
+        Dictionary with power and heart-rate metrics and time in each HR zone
+    """
+    metrics: Dict[str, Any] = {}
+
+    time = streams.get('time')
+    if time is not None and time.size > 1:
+        dt = np.clip(np.diff(time, append=time[-1] + 1), 0, None)
+        dt[~np.isfinite(dt)] = 0.0  # Gaps in the time stream count as no elapsed time
+    else:
+        size = max((values.size for values in streams.values()), default=0)
+        dt = np.ones(size)
+
+    watts = streams.get('watts')
+    if watts is not None and watts.size and not np.isnan(watts).all():
+        power = np.nan_to_num(watts, nan=0.0)
+        metrics['avgPower'] = round(float(power.mean()), 1)
+        metrics['maxPower'] = round(float(power.max()), 1)
+
+        window = NORMALIZED_POWER_WINDOW_SECONDS
+        if power.size >= window:
+            cumulative = np.cumsum(np.insert(power, 0, 0.0))
+            rolling = (cumulative[window:] - cumulative[:-window]) / window
+            metrics['normalizedPower'] = round(float(np.mean(rolling ** 4) ** 0.25), 1)
+        else:
+            metrics['normalizedPower'] = metrics['avgPower']
+
+    heartrate = streams.get('heartrate')
+    if heartrate is not None and heartrate.size and not np.isnan(heartrate).all():
+        valid = ~np.isnan(heartrate)
+        metrics['avgHr'] = round(float(heartrate[valid].mean()), 1)
+        metrics['maxHr'] = round(float(heartrate[valid].max()), 1)
+
+        zone_max_hr = max_hr or metrics['maxHr']
+        bounds = np.array(HR_ZONE_BOUNDS) * zone_max_hr
+        zones = np.digitize(heartrate[valid], bounds)
+        weights = dt[:heartrate.size][valid]
+        seconds = np.bincount(zones, weights=weights, minlength=len(HR_ZONE_BOUNDS) + 1)
+
+        metrics['hrZoneMaxHr'] = round(float(zone_max_hr), 1)
+        metrics['hrZoneBounds'] = [round(float(b), 1) for b in bounds]
+        metrics['timeInHrZones'] = {f'z{i + 1}': int(round(s)) for i, s in enumerate(seconds)}
+
+    return metrics
@@ -1,11 +1,16 @@
-from flask import Flask, request, jsonify, redirect, session, url_for
+from flask import Flask, request, jsonify, redirect, session, url_for, g
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt, set_access_cookies, unset_jwt_cookies, verify_jwt_in_request
 from datetime import datetime, timedelta
+from collections import OrderedDict, namedtuple
+from bisect import bisect_left
 import os
+import threading
+import time
+import atexit
 import uuid
 from functools import wraps
 import json
@@ -20,6 +25,37 @@ import secrets
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import logging
+
+# Load environment variables
+load_dotenv()
+
+# Structured logging: records are queued and written by a background thread, so
+# request handlers never wait on stdout. LOG_FORMAT is json (default in production)
+# or text; LOG_LEVEL sets the app.* loggers, and LOG_LEVELS / LOG_SAMPLE take
+# per-logger overrides such as "app.games=WARNING" and "app.socket=0.1"
+from structured_logging import configure_logging, get_logger, parse_settings, render_prometheus as render_log_metrics
+
+configure_logging(
+    level=os.environ.get('LOG_LEVEL', 'INFO'),
+    levels=parse_settings(os.environ.get('LOG_LEVELS')),
+    sample_rates={name: float(rate) for name, rate in parse_settings(
+        os.environ.get('LOG_SAMPLE', 'app.socket=0.1,app.games=0.1')).items()},
+    json_output=os.environ.get('LOG_FORMAT', 'json' if os.environ.get('FLASK_ENV') == 'production' else 'text') == 'json',
+)
+startup_log = get_logger('startup')
+db_log = get_logger('db')
+http_log = get_logger('http')
+auth_log = get_logger('auth')
+admin_log = get_logger('admin')
+tasks_log = get_logger('tasks')
+creative_log = get_logger('creative')
+content_log = get_logger('content')
+billing_log = get_logger('billing')
+integrations_log = get_logger('integrations')
+analytics_log = get_logger('analytics')
+socket_log = get_logger('socket')
+games_log = get_logger('games')
 
 # Import Werkzeug exceptions for error handling
 try:
@@ -41,7 +77,7 @@ try:
     WEBPUSH_AVAILABLE = True
 except ImportError:
     WEBPUSH_AVAILABLE = False
-    print("Warning: pywebpush not available. Push notifications will be disabled.")
+    startup_log.warning("pywebpush not available. Push notifications will be disabled.")
 
 # Try to import web3.py for ENS (Ethereum Name Service) integration
 try:
@@ -52,7 +88,7 @@ except ImportError:
     WEB3_AVAILABLE = False
     Web3 = None
     ENS = None
-    print("Warning: web3.py not available. Web3 features will be disabled.")
+    startup_log.warning("web3.py not available. Web3 features will be disabled.")
 
 # Google OAuth imports
 try:
@@ -60,10 +96,10 @@ try:
     from google.auth.transport import requests as google_requests
     from google_auth_oauthlib.flow import Flow
     GOOGLE_AUTH_AVAILABLE = True
-    print("✓ Google OAuth libraries loaded successfully")
+    startup_log.info("✓ Google OAuth libraries loaded successfully")
 except ImportError:
     GOOGLE_AUTH_AVAILABLE = False
-    print("Warning: google-auth not available. Google OAuth will be disabled.")
+    startup_log.warning("google-auth not available. Google OAuth will be disabled.")
 
 # Import our new helper modules
 try:
@@ -80,48 +116,39 @@ try:
         upgrade_tier, get_upgrade_options, PRICING
     )
     WALLET_AUTH_HELPERS_AVAILABLE = True
-    print("✓ Wallet auth and user access control modules loaded")
+    startup_log.info("✓ Wallet auth and user access control modules loaded")
 except ImportError as e:
     WALLET_AUTH_HELPERS_AVAILABLE = False
-    print(f"Warning: Helper modules not available: {e}")
-    print("Wallet authentication features will be limited.")
-
-# Load environment variables
-load_dotenv()
+    startup_log.warning(f"Helper modules not available: {e}. Wallet authentication features will be limited.")
 
 # Configure Gemini API
 GOOGLE_AI_API_KEY = os.environ.get('GOOGLE_AI_API_KEY')
 
 # Validate Gemini API key configuration at startup
 if not GOOGLE_AI_API_KEY:
-    print("=" * 80)
-    print("WARNING: GOOGLE_AI_API_KEY is not set in environment variables!")
-    print("Gemini chat functionality will be disabled.")
-    print("To enable Gemini chat, set GOOGLE_AI_API_KEY in your environment variables.")
-    print("=" * 80)
+    startup_log.warning("GOOGLE_AI_API_KEY is not set; Gemini chat is disabled until it is set in the environment")
 else:
     # Validate API key format (basic check - should start with AIza)
     if not GOOGLE_AI_API_KEY.startswith('AIza'):
-        print("=" * 80)
-        print("WARNING: GOOGLE_AI_API_KEY format may be incorrect!")
-        print("Google AI API keys typically start with 'AIza'.")
-        print("Please verify your API key is correct.")
-        print("=" * 80)
+        startup_log.warning("GOOGLE_AI_API_KEY format may be incorrect: Google AI API keys typically start with 'AIza'")
     else:
-        print("✓ Gemini API key loaded successfully")
+        startup_log.info("✓ Gemini API key loaded successfully")
 
 # Initialize Flask app
 app = Flask(__name__)
+# app.logger is named after the module ("__main__" under `python app.py`), so give it the app.* level
+app.logger.setLevel(logging.getLogger('app').level)
+
+# orjson-backed JSON (stdlib fallback): datetime, Decimal and UUID values are encoded natively
+from json_provider import FastJSONProvider, SocketJSON, RowSerializer, dumps as fast_dumps, loads_list
+app.json = FastJSONProvider(app)
 
 # Session configuration
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
 
 # Validate SECRET_KEY at startup
 if app.config['SECRET_KEY'] == 'dev-secret-key-change-in-production':
-    print("=" * 80)
-    print("WARNING: Using default SECRET_KEY! This is a CRITICAL SECURITY VULNERABILITY!")
-    print("Set FLASK_SECRET_KEY environment variable immediately!")
-    print("=" * 80)
+    startup_log.critical("Using the default SECRET_KEY; set the FLASK_SECRET_KEY environment variable immediately")
 
 # Session cookie configuration - REMOVED: Using JWT-only authentication
 # Session-based auth removed to eliminate conflicts and errors
@@ -131,11 +158,7 @@ if app.config['SECRET_KEY'] == 'dev-secret-key-change-in-production':
 # Convert postgresql:// to postgresql+psycopg:// for psycopg3 support
 database_url = os.environ.get('DATABASE_URL')
 if not database_url:
-    print("=" * 80)
-    print("ERROR: DATABASE_URL environment variable is not set!")
-    print("The database is hosted on Render (PostgreSQL).")
-    print("Please set DATABASE_URL before starting the application.")
-    print("=" * 80)
+    startup_log.critical("DATABASE_URL is not set; the database is hosted on Render (PostgreSQL) and must be configured before starting")
     raise ValueError("DATABASE_URL environment variable is required")
 if database_url.startswith('postgresql://'):
     database_url = database_url.replace('postgresql://', 'postgresql+psycopg://', 1)
@@ -143,10 +166,11 @@ app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # Use engine options for PostgreSQL (Render)
-# Database is on Render (PostgreSQL), so we always use PostgreSQL connection options
+# Database is on Render (PostgreSQL); SQLite is only used by local benchmark/CI runs,
+# whose driver has no connect_timeout
 engine_options = {
     'pool_pre_ping': True,
-    'connect_args': {'connect_timeout': 5}
+    'connect_args': {'connect_timeout': 5} if not database_url.startswith('sqlite') else {}
 }
 
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
@@ -154,21 +178,16 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
 try:
     db = SQLAlchemy(app)
     migrate = Migrate(app, db)
-    print(f"✓ SQLAlchemy initialized")
-    print(f"  DATABASE_URL: {'Set' if os.environ.get('DATABASE_URL') else 'Not set'}")
     
     # Set DB_AVAILABLE to True - database is configured and ready
     DB_AVAILABLE = True
-    print(f"✓ Database configured and ready")
+    db_log.info("✓ SQLAlchemy initialized; database configured and ready")
 except Exception as e:
-    print(f"✗ Warning: Database initialization failed: {e}")
-    print("Database features will be disabled. This may be due to:")
-    print("1. Missing psycopg package or Python 3.13 compatibility issue")
-    print("2. Invalid DATABASE_URL")
-    print("3. Database server not accessible")
-    print(f"  DATABASE_URL: {'Set' if os.environ.get('DATABASE_URL') else 'Not set'}")
-    if os.environ.get('DATABASE_URL'):
-        print(f"  DATABASE_URL value: {os.environ.get('DATABASE_URL')[:50]}...")
+    db_log.error(
+        f"Database initialization failed: {e}. Database features will be disabled. Likely causes: "
+        "missing psycopg package or Python 3.13 compatibility issue, invalid DATABASE_URL, database server not accessible",
+        extra={'databaseUrlSet': bool(os.environ.get('DATABASE_URL'))}
+    )
     # Create a dummy db object to prevent crashes
     db = None
     DB_AVAILABLE = False
@@ -182,12 +201,37 @@ if os.environ.get('FLASK_ENV') != 'production':
 
 # Initialize Socket.IO with same CORS origins as Flask-CORS
 # When using withCredentials: true on client, cannot use "*" - must specify exact origins
+# SOCKETIO_MESSAGE_QUEUE (e.g. redis://...) relays emits between processes, so several
+# workers/instances - or scripts using SocketIO(message_queue=...) - reach every client.
+def socketio_async_mode():
+    """
+    SOCKETIO_ASYNC_MODE, else gevent only when gevent has monkey-patched the process
+    
+    Flask-SocketIO would pick gevent whenever it is installed, and unpatched gevent
+    lets any blocking call (database, requests, time.sleep) stall every connection,
+    so `python app.py` runs threaded and only gunicorn's gevent worker gets gevent.
+    """
+    configured = os.environ.get('SOCKETIO_ASYNC_MODE')
+    if configured:
+        return configured
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('socket'):
+            return 'gevent'
+    except ImportError:
+        pass
+    return 'threading'
+
+
 socketio = SocketIO(
     app, 
+    async_mode=socketio_async_mode(),
+    message_queue=os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None,
     cors_allowed_origins=allowed_origins,
     cors_credentials=True,
     allow_upgrades=True,
-    transports=['websocket', 'polling']
+    transports=['websocket', 'polling'],
+    json=SocketJSON  # Same encoder as HTTP responses, so emitted to_dict() payloads can carry datetimes
 )
 
 CORS(app, 
@@ -199,6 +243,69 @@ CORS(app,
 # Note: Flask-CORS handles all CORS headers automatically, including OPTIONS preflight
 # and error responses. No need for manual header setting which causes duplicate headers.
 
+# Per-route query counts, DB time, N+1 patterns and latency histograms, served at /metrics.
+# Registered before the response cache so its early 304s are measured too.
+from request_metrics import RequestMetrics
+request_metrics = RequestMetrics(
+    n_plus_one_threshold=int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', '10')),
+    server_timing=os.environ.get('SERVER_TIMING', 'false' if os.environ.get('FLASK_ENV') == 'production' else 'true').lower() == 'true',
+)
+request_metrics.init_app(app)
+
+# Statements slower than SLOW_QUERY_MS are logged with route, call site and parameter shapes;
+# the first occurrence of each SELECT gets an EXPLAIN plan (see /api/admin/slow-queries).
+# Plans are off in production unless SLOW_QUERY_EXPLAIN=true, and SLOW_QUERY_EXPLAIN_ANALYZE=true
+# opts into EXPLAIN ANALYZE, which re-runs the slow statement.
+from slow_query_log import SlowQueryLog
+slow_query_log = SlowQueryLog(
+    threshold_ms=float(os.environ.get('SLOW_QUERY_MS', '200')),
+    explain=os.environ.get('SLOW_QUERY_EXPLAIN', 'false' if os.environ.get('FLASK_ENV') == 'production' else 'true').lower() == 'true',
+    explain_analyze=os.environ.get('SLOW_QUERY_EXPLAIN_ANALYZE', 'false').lower() == 'true',
+)
+slow_query_log.install()
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Prometheus scrape endpoint; set METRICS_TOKEN to require 'Authorization: Bearer <token>'
+
+    Without a token it is only open outside production (FLASK_ENV=production answers 403).
+    """
+    token = os.environ.get('METRICS_TOKEN')
+    if not token:
+        if os.environ.get('FLASK_ENV') == 'production':
+            return jsonify({'error': 'Metrics disabled: set METRICS_TOKEN'}), 403
+    elif not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    body = request_metrics.render_prometheus() + render_log_metrics()
+    if WALLET_AUTH_HELPERS_AVAILABLE:
+        from wallet_auth_helpers import eth_price_feed
+        body += eth_price_feed.render_prometheus()
+    return app.response_class(body, mimetype='text/plain; version=0.0.4')
+
+# Compress large JSON responses and answer conditional GETs for the heavy list endpoints.
+# Routes listed with tables get ETags from per-table change counters, so an unchanged
+# list is answered with 304 before the view runs; None means hash the rendered body.
+# Counters are per process, so they are only used with a single worker (WEB_CONCURRENCY=1)
+# unless HTTP_CACHE_TABLE_ETAGS says otherwise.
+from http_cache import ResponseOptimizer, BROTLI_AVAILABLE
+HTTP_CACHE_ROUTES = {
+    '/api/ventures': ['support_requests', 'task', 'clients', 'client_employee_assignments', 'users'],
+    '/api/tasks': ['task', 'support_requests', 'clients', 'client_employee_assignments', 'users'],
+    '/api/creative/clients': ['clients', 'client_employee_assignments', 'client_dashboard_connections', 'users'],
+    '/api/admin/users': ['users', 'user_profiles'],
+    '/api/shopify/analytics': None,  # Built from the Shopify API, not our tables
+}
+_table_etags_default = 'true' if os.environ.get('WEB_CONCURRENCY', '1') == '1' else 'false'
+response_optimizer = ResponseOptimizer(
+    HTTP_CACHE_ROUTES,
+    min_size=int(os.environ.get('HTTP_COMPRESS_MIN_BYTES', '1024')),
+    table_etags=os.environ.get('HTTP_CACHE_TABLE_ETAGS', _table_etags_default).lower() == 'true',
+)
+response_optimizer.init_app(app)
+if not BROTLI_AVAILABLE:
+    startup_log.warning("brotli not available. Responses will be gzip-compressed only.")
+
 # Initialize JWT Manager (flask-jwt-extended)
 jwt = JWTManager(app)
 
@@ -291,7 +398,7 @@ def load_executed_scripts():
                 return set(data.get('executed_scripts', []))
         except (json.JSONDecodeError, IOError) as e:
             db.session.rollback()  # Rollback failed transaction
-            print(f"Warning: Could not load script tracking file: {e}")
+            db_log.error(f"Could not load script tracking file: {e}")
             return set()
     return set()
 
@@ -306,7 +413,7 @@ def save_executed_script(script_path):
             json.dump({'executed_scripts': list(executed)}, f, indent=2)
     except IOError as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Warning: Could not save script tracking file: {e}")
+        db_log.error(f"Could not save script tracking file: {e}")
 
 def find_runnable_scripts():
     """Find all Python scripts in the backend directory that should be auto-run"""
@@ -355,7 +462,7 @@ def is_script_runnable(script_path):
             return has_main_block or has_shebang or (has_executable_content and imports_app)
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Warning: Could not read script {script_path}: {e}")
+        db_log.error(f"Could not read script {script_path}: {e}")
         return False
     
     return False
@@ -363,9 +470,7 @@ def is_script_runnable(script_path):
 def run_script_safely(script_path):
     """Run a script safely with error handling"""
     script_name = script_path.name
-    print(f"\n{'='*80}")
-    print(f"Running new script: {script_name}")
-    print(f"{'='*80}")
+    db_log.info(f"Running new script: {script_name}")
     
     try:
         # Run the script using subprocess
@@ -379,35 +484,33 @@ def run_script_safely(script_path):
         )
         
         if result.returncode == 0:
-            print(f"✓ Script {script_name} executed successfully")
+            db_log.info(f"✓ Script {script_name} executed successfully")
             if result.stdout:
-                print(f"Output:\n{result.stdout}")
+                db_log.info(f"Output:\n{result.stdout}")
             return True
         else:
-            print(f"✗ Script {script_name} failed with return code {result.returncode}")
+            db_log.error(f"✗ Script {script_name} failed with return code {result.returncode}")
             if result.stderr:
-                print(f"Error output:\n{result.stderr}")
+                db_log.error(f"Error output:\n{result.stderr}")
             if result.stdout:
-                print(f"Standard output:\n{result.stdout}")
+                db_log.info(f"Standard output:\n{result.stdout}")
             return False
             
     except subprocess.TimeoutExpired:
-        print(f"✗ Script {script_name} timed out after 5 minutes")
+        db_log.error(f"✗ Script {script_name} timed out after 5 minutes")
         return False
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"✗ Error running script {script_name}: {e}")
+        db_log.error(f"✗ Error running script {script_name}: {e}")
         return False
 
 def run_new_scripts_at_startup():
     """Scan for new scripts and run them automatically"""
-    print("\n" + "="*80)
-    print("AUTOMATIC SCRIPT RUNNER - Checking for new scripts...")
-    print("="*80)
+    db_log.info("Automatic script runner: checking for new scripts")
     
     # Check if auto-run is disabled via environment variable
     if os.environ.get('DISABLE_AUTO_SCRIPT_RUN', '').lower() in ('true', '1', 'yes'):
-        print("Auto-script execution is disabled (DISABLE_AUTO_SCRIPT_RUN is set)")
+        db_log.info("Auto-script execution is disabled (DISABLE_AUTO_SCRIPT_RUN is set)")
         return
     
     executed_scripts = load_executed_scripts()
@@ -421,12 +524,10 @@ def run_new_scripts_at_startup():
                 new_scripts.append(script)
     
     if not new_scripts:
-        print("No new scripts found to execute.")
+        db_log.info("No new scripts found to execute.")
         return
     
-    print(f"Found {len(new_scripts)} new script(s) to execute:")
-    for script in new_scripts:
-        print(f"  - {script.name}")
+    db_log.info(f"Found {len(new_scripts)} new script(s) to execute: {', '.join(script.name for script in new_scripts)}")
     
     # Run each new script
     for script in new_scripts:
@@ -438,10 +539,7 @@ def run_new_scripts_at_startup():
         save_executed_script(script_path)
         
         if not success:
-            print(f"Warning: Script {script.name} failed, but marked as executed.")
-            print("  To retry, remove it from .executed_scripts.json")
-    
-    print("="*80 + "\n")
+            db_log.warning(f"Script {script.name} failed, but marked as executed. To retry, remove it from .executed_scripts.json")
 
 # Web3/ENS Configuration - UPDATED TO USE ALCHEMY
 ENS_DOMAIN = 'isharehow.eth'  # Your ENS domain
@@ -473,15 +571,14 @@ if WEB3_AVAILABLE:
         if w3.is_connected():
             ens = ENS.from_web3(w3)
             provider_name = "Alchemy" if ALCHEMY_API_KEY else "Infura"
-            print(f"✓ Web3 connected to Ethereum mainnet via {provider_name}")
-            print(f"✓ ENS module initialized for domain: {ENS_DOMAIN}")
-            print(f"✓ isharehow.eth address: {ISHAREHOW_ETH_ADDRESS}")
+            integrations_log.info(f"✓ Web3 connected to Ethereum mainnet via {provider_name}")
+            integrations_log.info(f"✓ ENS module initialized for domain: {ENS_DOMAIN}")
+            integrations_log.info(f"✓ isharehow.eth address: {ISHAREHOW_ETH_ADDRESS}")
         else:
-            print("Warning: Web3 connection failed. ENS features will be limited.")
+            integrations_log.warning("Web3 connection failed. ENS features will be limited.")
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Warning: Failed to initialize Web3/ENS: {e}")
-        print("ENS features will be disabled.")
+        integrations_log.warning(f"Failed to initialize Web3/ENS: {e}. ENS features will be disabled.")
 
 
 # ENS Helper Functions
@@ -504,7 +601,7 @@ def resolve_ens_to_address(ens_name: str) -> str:
         return None
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error resolving ENS name {ens_name}: {e}")
+        integrations_log.error(f"Error resolving ENS name {ens_name}: {e}")
         return None
 
 def get_ens_content_hash(ens_name: str) -> str:
@@ -521,7 +618,7 @@ def get_ens_content_hash(ens_name: str) -> str:
         return None
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting content hash for {ens_name}: {e}")
+        integrations_log.error(f"Error getting content hash for {ens_name}: {e}")
         return None
 
 def set_ens_content_hash(ens_name: str, ipfs_hash: str, private_key: str = None) -> bool:
@@ -531,17 +628,17 @@ def set_ens_content_hash(ens_name: str, ipfs_hash: str, private_key: str = None)
     if not private_key:
         private_key = ENS_PRIVATE_KEY
     if not private_key:
-        print("Warning: No private key provided for setting ENS content hash")
+        integrations_log.warning("No private key provided for setting ENS content hash")
         return False
     try:
         # This requires the account to own the ENS name
         # Implementation would use web3.py to set the contenthash record
         # For now, return False as this requires wallet integration
-        print(f"Setting content hash for {ens_name} requires wallet integration")
+        integrations_log.info(f"Setting content hash for {ens_name} requires wallet integration")
         return False
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error setting content hash for {ens_name}: {e}")
+        integrations_log.error(f"Error setting content hash for {ens_name}: {e}")
         return False
 
 def resolve_or_create_ens(user_id: int, username: str) -> dict:
@@ -568,6 +665,8 @@ def resolve_or_create_ens(user_id: int, username: str) -> dict:
 # Task model - only define if database is available
 if DB_AVAILABLE:
     class Task(db.Model):
+        __table_args__ = (db.Index('ix_task_linked_entity_created', 'linked_entity_type', 'linked_entity_id', 'created_at'),)
+        
         id = db.Column(db.String(36), primary_key=True)
         title = db.Column(db.String(200), nullable=False)
         description = db.Column(db.Text)
@@ -590,65 +689,27 @@ if DB_AVAILABLE:
         updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
         def to_dict(self):
-            # Safely access new columns that might not exist yet
-            # Use SQLAlchemy instance state to check if attributes are loaded
-            # without triggering lazy loads for missing columns
-            from sqlalchemy import inspect as sa_inspect
-            from sqlalchemy.exc import ProgrammingError
-            
-            instance_state = sa_inspect(self, raiseerr=False)
-            if instance_state is None:
-                # Fallback if inspection fails
-                category = 'work'
-                linked_entity_type = None
-                linked_entity_id = None
-            else:
-                # Check if attributes are in the unloaded set (means they exist but weren't loaded)
-                # or if they're not in attrs at all (means they don't exist in the model/DB)
-                unloaded = getattr(instance_state, 'unloaded', set())
-                attrs = getattr(instance_state, 'attrs', {})
-                
-                # For category
-                if 'category' in unloaded or 'category' not in attrs:
-                    # Column either wasn't loaded or doesn't exist - use default
-                    category = 'work'
-                else:
-                    # Column is available, try to access it
-                    try:
-                        category = self.category or 'work'
-                    except (ProgrammingError, AttributeError, Exception):
-                        category = 'work'
-                
-                # For linked_entity_type
-                if 'linked_entity_type' in unloaded or 'linked_entity_type' not in attrs:
-                    linked_entity_type = None
-                else:
-                    try:
-                        linked_entity_type = self.linked_entity_type
-                    except (ProgrammingError, AttributeError, Exception):
-                        linked_entity_type = None
-                
-                # For linked_entity_id
-                if 'linked_entity_id' in unloaded or 'linked_entity_id' not in attrs:
-                    linked_entity_id = None
-                else:
-                    try:
-                        linked_entity_id = self.linked_entity_id
-                    except (ProgrammingError, AttributeError, Exception):
-                        linked_entity_id = None
+            # Columns left out by load_only (older schemas without category/linked_entity_*)
+            # are simply absent from __dict__; reading them there avoids a lazy load per row.
+            # self.id is read first so an expired instance refreshes before __dict__ is checked.
+            task_id = self.id
+            loaded = self.__dict__
+            linked_entity_type = loaded.get('linked_entity_type')
+            linked_entity_id = loaded.get('linked_entity_id')
             
             # If new polymorphic fields are not set but support_request_id is, use that for backward compatibility
             if not linked_entity_type and not linked_entity_id and self.support_request_id:
                 linked_entity_type = 'support_request'
                 linked_entity_id = self.support_request_id
             
+            # Datetimes are encoded by the app's JSON provider (and SocketJSON for emits)
             return {
-                'id': self.id,
+                'id': task_id,
                 'title': self.title,
                 'description': self.description,
-                'hyperlinks': json.loads(self.hyperlinks) if self.hyperlinks else [],
+                'hyperlinks': loads_list(self.hyperlinks),
                 'status': self.status,
-                'category': category,
+                'category': loaded.get('category') or 'work',
                 'supportRequestId': self.support_request_id,  # Keep for backward compatibility
                 'linkedEntityType': linked_entity_type,
                 'linkedEntityId': linked_entity_id,
@@ -657,10 +718,42 @@ if DB_AVAILABLE:
                 'assignedTo': self.assigned_to,
                 'assignedToName': self.assigned_to_name,
                 'notes': self.notes or '',
-                'createdAt': self.created_at.isoformat() if self.created_at else None,
-                'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+                'createdAt': self.created_at,
+                'updatedAt': self.updated_at
             }
 
+    class DeletionLog(db.Model):
+        """Tombstones for deleted rows, served to ?since= delta sync clients"""
+        __tablename__ = 'deletion_log'
+        __table_args__ = (db.Index('ix_deletion_log_entity_seq', 'entity_type', 'id'),)
+        
+        id = db.Column(db.Integer, primary_key=True, autoincrement=True)  # Monotonic sequence used in sync cursors
+        entity_type = db.Column(db.String(50), nullable=False)  # task, client, support_request
+        entity_id = db.Column(db.String(100), nullable=False)
+        deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    class EthPayment(db.Model):
+        """ETH transfers to ISHAREHOW_ETH_ADDRESS, recorded by the payment indexer"""
+        __tablename__ = 'eth_payments'
+        
+        id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+        tx_hash = db.Column(db.String(66), unique=True, nullable=False)
+        from_address = db.Column(db.String(42), nullable=False, index=True)  # Lowercase sender
+        to_address = db.Column(db.String(42), nullable=False)
+        amount_wei = db.Column(db.Numeric(38, 0), nullable=False)
+        amount_usd = db.Column(db.Numeric(18, 2), nullable=True)  # Valued when indexed; NULL for backfilled payments
+        block_number = db.Column(db.BigInteger, nullable=False, index=True)
+        block_time = db.Column(db.DateTime, nullable=False)
+        created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    class IndexerCheckpoint(db.Model):
+        """Last block processed by each chain indexer"""
+        __tablename__ = 'indexer_checkpoints'
+        
+        name = db.Column(db.String(50), primary_key=True)
+        last_block = db.Column(db.BigInteger, nullable=False)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
     # Authentication User Model
     class User(db.Model):
         __tablename__ = 'users'
@@ -1032,6 +1125,71 @@ if DB_AVAILABLE:
                 'syncedAt': self.synced_at.isoformat() if self.synced_at else None
             }
 
+    class IntervalsActivityStream(db.Model):
+        __tablename__ = 'intervals_activity_streams'
+        __table_args__ = (db.UniqueConstraint('user_id', 'activity_id', name='unique_user_activity_stream'),)
+        
+        id = db.Column(db.String(36), primary_key=True)
+        user_id = db.Column(db.String(36), db.ForeignKey('user_profiles.id'), nullable=False)
+        activity_id = db.Column(db.String(100), nullable=False)
+        channels = db.Column(db.String(200))  # Comma-separated channel names present in data
+        point_count = db.Column(db.Integer)
+        data = db.Column(db.LargeBinary, nullable=False)  # activity_streams.encode_streams output
+        raw_size = db.Column(db.Integer)  # Size of the upstream JSON payload in bytes
+        derived_metrics = db.Column(db.JSON)  # Computed once at ingest (NP, HR zones, time in zone)
+        created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+        def to_dict(self):
+            return {
+                'id': self.id,
+                'activityId': self.activity_id,
+                'channels': self.channels.split(',') if self.channels else [],
+                'pointCount': self.point_count,
+                'storedSize': len(self.data) if self.data else 0,
+                'rawSize': self.raw_size,
+                'derivedMetrics': self.derived_metrics or {},
+                'createdAt': self.created_at.isoformat() if self.created_at else None
+            }
+
+    class IntervalsSyncState(db.Model):
+        __tablename__ = 'intervals_sync_state'
+        
+        user_id = db.Column(db.String(36), db.ForeignKey('user_profiles.id'), primary_key=True)
+        last_synced_date = db.Column(db.Date, nullable=True)  # Newest day covered by the last successful sync (watermark)
+        last_synced_at = db.Column(db.DateTime, nullable=True)
+
+        def to_dict(self):
+            return {
+                'userId': self.user_id,
+                'lastSyncedDate': self.last_synced_date.isoformat() if self.last_synced_date else None,
+                'lastSyncedAt': self.last_synced_at.isoformat() if self.last_synced_at else None
+            }
+
+    class WellnessDailyRollup(db.Model):
+        __tablename__ = 'wellness_daily_rollups'
+        __table_args__ = (db.UniqueConstraint('user_id', 'day', name='unique_user_rollup_day'),)
+        
+        id = db.Column(db.String(36), primary_key=True)
+        user_id = db.Column(db.String(36), db.ForeignKey('user_profiles.id'), nullable=False)
+        day = db.Column(db.Date, nullable=False)
+        hrv = db.Column(db.Float)
+        hrv_7d = db.Column(db.Float)  # 7-day rolling average
+        hrv_baseline = db.Column(db.Float)  # 28-day mean excluding the day itself
+        hrv_z = db.Column(db.Float)  # z-score against the baseline
+        resting_hr = db.Column(db.Float)
+        resting_hr_7d = db.Column(db.Float)
+        resting_hr_baseline = db.Column(db.Float)
+        resting_hr_z = db.Column(db.Float)
+        sleep_hours = db.Column(db.Float)
+        sleep_hours_7d = db.Column(db.Float)
+        sleep_hours_baseline = db.Column(db.Float)
+        sleep_hours_z = db.Column(db.Float)
+        load = db.Column(db.Float)  # Session RPE load (minutes x RPE)
+        atl = db.Column(db.Float)  # Acute training load (7-day EWMA)
+        ctl = db.Column(db.Float)  # Chronic training load (42-day EWMA)
+        tsb = db.Column(db.Float)  # Training stress balance (form)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 else:
     # Dummy Task class when database is unavailable
     class Task:
@@ -1043,25 +1201,19 @@ if DB_AVAILABLE:
         try:
             # Test database connection
             db.engine.connect()
-            print("✓ Database connection successful")
+            db_log.info("✓ Database connection successful")
             db.create_all()
-            print("✓ Database tables created/verified successfully")
+            db_log.info("✓ Database tables created/verified successfully")
         except Exception as e:
             db.session.rollback()  # Rollback failed transaction
-            print(f"✗ Database connection failed: {e}")
-            print(f"  DATABASE_URL: {'Set' if os.environ.get('DATABASE_URL') else 'Not set'}")
-            print("  Tables will be created when database is available")
+            db_log.error(f"Database connection failed: {e}. Tables will be created when database is available")
             DB_AVAILABLE = False
 else:
-    print("✗ Database not available - skipping table creation")
-    print(f"  DATABASE_URL: {'Set' if os.environ.get('DATABASE_URL') else 'Not set'}")
     if os.environ.get('DATABASE_URL'):
-        print("  Warning: DATABASE_URL is set but database initialization failed")
-        print("  This may be due to:")
-        print("  1. Invalid connection string format")
-        print("  2. Database server not accessible")
-        print("  3. Missing psycopg package")
-        print("  4. Network/firewall issues")
+        db_log.error("Database not available - skipping table creation. DATABASE_URL is set but initialization failed; "
+                     "check the connection string format, that the server is reachable (network/firewall) and that psycopg is installed")
+    else:
+        db_log.error("Database not available - skipping table creation (DATABASE_URL not set)")
 
 # Shopify configuration
 SHOPIFY_STORE_URL = os.environ.get('SHOPIFY_STORE_URL')
@@ -1408,9 +1560,7 @@ def api_shopify_customers():
             'pageInfo': data['customers']['pageInfo']
         })
     except Exception as e:
-        print(f"Error fetching Shopify customers: {e}")
-        import traceback
-        traceback.print_exc()
+        billing_log.exception(f"Error fetching Shopify customers: {e}")
         return jsonify({'error': 'Failed to fetch customers', 'message': str(e), 'customers': []}), 200
 
 @app.route('/api/shopify/store-url', methods=['GET'])
@@ -1436,7 +1586,7 @@ def get_shopify_store_url():
         
         return jsonify({'storeUrl': store_url}), 200
     except Exception as e:
-        print(f"Error getting Shopify store URL: {e}")
+        billing_log.error(f"Error getting Shopify store URL: {e}")
         return jsonify({'error': 'Failed to get store URL'}), 500
 
 @app.route('/api/shopify/analytics', methods=['GET'])
@@ -1536,9 +1686,7 @@ def api_shopify_analytics():
             }
         })
     except Exception as e:
-        print(f"Error fetching Shopify analytics: {e}")
-        import traceback
-        traceback.print_exc()
+        billing_log.exception(f"Error fetching Shopify analytics: {e}")
         return jsonify({
             'error': 'Failed to fetch analytics',
             'message': str(e),
@@ -1808,7 +1956,7 @@ def safe_get_user(user_id):
         error_str = str(query_error).lower()
         # Check if error is due to missing columns
         if 'column' in error_str and ('has_subscription_update' in error_str or 'is_employee' in error_str or 'google_id' in error_str):
-            print(f"Warning: Missing column when querying user {user_id}, attempting to add missing columns...")
+            auth_log.warning(f"Missing column when querying user {user_id}, attempting to add missing columns...")
             
             # Try to add missing columns immediately
             try:
@@ -1859,14 +2007,14 @@ def safe_get_user(user_id):
                                         db.session.rollback()  # Rollback failed transaction
                                         pass  # Index might already exist
                                 
-                                print(f"  ✓ Added missing column: {col_name}")
+                                auth_log.info(f"✓ Added missing column: {col_name}")
                             except Exception as col_error:
                                 db.session.rollback()  # Rollback failed transaction
                                 error_msg = str(col_error).lower()
                                 if 'already exists' in error_msg or 'duplicate' in error_msg:
-                                    print(f"  ✓ Column {col_name} already exists")
+                                    auth_log.info(f"✓ Column {col_name} already exists")
                                 else:
-                                    print(f"  ✗ Could not add {col_name}: {col_error}")
+                                    auth_log.error(f"✗ Could not add {col_name}: {col_error}")
                 
                 # Retry the query after adding columns
                 if str(user_id).isdigit():
@@ -1883,7 +2031,7 @@ def safe_get_user(user_id):
                 return user
             except Exception as add_error:
                 db.session.rollback()  # Rollback failed transaction
-                print(f"Error adding missing columns: {add_error}")
+                auth_log.error(f"Error adding missing columns: {add_error}")
                 # Fall through to raw SQL fallback
         
         # Fallback to raw SQL if columns still missing
@@ -1921,7 +2069,7 @@ def safe_get_user(user_id):
                     return user
         except Exception as raw_error:
             db.session.rollback()  # Rollback failed transaction
-            print(f"Error in raw SQL fallback: {raw_error}")
+            auth_log.error(f"Error in raw SQL fallback: {raw_error}")
             return None
         
         # If all else fails, re-raise the original error
@@ -1936,7 +2084,7 @@ def get_current_user():
         return safe_get_user(user_id)
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error in get_current_user: {e}")
+        auth_log.error(f"Error in get_current_user: {e}")
         return None
 
 # Authentication decorator - DEPRECATED: Use @jwt_required() instead
@@ -2065,7 +2213,7 @@ def check_is_employee_column_exists(force_check=False):
         return _IS_EMPLOYEE_COLUMN_EXISTS
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error checking is_employee column: {e}")
+        db_log.error(f"Error checking is_employee column: {e}")
         app.logger.warning(f"Error checking is_employee column: {e}")
         # If we can't check, assume it doesn't exist (safer fallback)
         # Don't cache the error - allow retry on next call
@@ -2083,8 +2231,7 @@ def safe_query_user(query_func):
         # Check if error is due to missing is_employee column
         if 'is_employee' in error_str.lower() and 'column' in error_str.lower():
             # Column doesn't exist - need to run migration
-            print(f"Warning: is_employee column missing. Error: {e}")
-            print("Please run: flask db upgrade")
+            auth_log.warning(f"is_employee column missing ({e}); run: flask db upgrade")
             # Try to work around by using raw SQL or excluding the column
             # For now, re-raise with a helpful message
             raise Exception(
@@ -2134,6 +2281,7 @@ def require_employee(f):
             return jsonify({'error': 'Authentication required'}), 401
         if not safe_get_is_employee(user):
             return jsonify({'error': 'Employee access required'}), 403
+        g.current_user = user
         return f(*args, **kwargs)
     return decorated_function
 
@@ -2245,7 +2393,7 @@ def figma_component_like():
             sync_like_to_figma(file_id, component_id, liked, user_id)
         except Exception as e:
             db.session.rollback()  # Rollback failed transaction
-            print(f'Error syncing like to Figma: {e}')
+            integrations_log.error(f'Error syncing like to Figma: {e}')
             # Don't fail the request if sync fails
     
     return jsonify(result)
@@ -2267,7 +2415,7 @@ def figma_component_save():
             sync_save_to_figma(file_id, component_id, saved, user_id)
         except Exception as e:
             db.session.rollback()  # Rollback failed transaction
-            print(f'Error syncing save to Figma: {e}')
+            integrations_log.error(f'Error syncing save to Figma: {e}')
             # Don't fail the request if sync fails
     
     return jsonify(result)
@@ -2411,7 +2559,7 @@ def sync_like_to_figma(file_id, component_id, liked, user_id):
                         pass  # Silent fail for sync
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'Error syncing like to Figma: {e}')
+        integrations_log.error(f'Error syncing like to Figma: {e}')
 
 def sync_save_to_figma(file_id, component_id, saved, user_id):
     """Sync save status to Figma using Comments API"""
@@ -2477,7 +2625,7 @@ def sync_save_to_figma(file_id, component_id, saved, user_id):
                         pass  # Silent fail for sync
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'Error syncing save to Figma: {e}')
+        integrations_log.error(f'Error syncing save to Figma: {e}')
 
 @app.route('/api/figma/teams', methods=['GET'])
 def figma_teams():
@@ -2507,7 +2655,7 @@ def figma_files():
                 projects = projects_data.get('projects', []) if isinstance(projects_data, dict) else []
             except (ValueError, AttributeError) as e:
                 db.session.rollback()  # Rollback failed transaction
-                print(f'Error parsing projects JSON: {e}')
+                integrations_log.error(f'Error parsing projects JSON: {e}')
                 projects = []
             
             for project in projects:
@@ -2521,7 +2669,7 @@ def figma_files():
                             files = files_data.get('files', []) if isinstance(files_data, dict) else []
                         except (ValueError, AttributeError) as e:
                             db.session.rollback()  # Rollback failed transaction
-                            print(f'Error parsing files JSON for project {project.get("id")}: {e}')
+                            integrations_log.error(f'Error parsing files JSON for project {project.get("id")}: {e}')
                             files = []
                         
                         for file in files:
@@ -2553,15 +2701,15 @@ def figma_files():
                                     seen_file_keys.add(file_key)
                             except Exception as e:
                                 db.session.rollback()  # Rollback failed transaction
-                                print(f'Error processing file: {e}')
+                                integrations_log.error(f'Error processing file: {e}')
                                 continue
                 except Exception as e:
                     db.session.rollback()  # Rollback failed transaction
-                    print(f'Error fetching files for project {project.get("id")}: {e}')
+                    integrations_log.error(f'Error fetching files for project {project.get("id")}: {e}')
                     continue
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'Error fetching projects: {e}')
+        integrations_log.error(f'Error fetching projects: {e}')
         # Return empty list on error instead of failing
     
     # Sort files: libraries first, then by project name (with safe defaults)
@@ -2573,7 +2721,7 @@ def figma_files():
         ))
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'Error sorting files: {e}')
+        integrations_log.error(f'Error sorting files: {e}')
         # Continue without sorting if it fails
     
     # Ensure we always return a valid JSON response
@@ -2641,7 +2789,7 @@ def handle_404_error(e):
 @app.errorhandler(405)
 def handle_405_error(e):
     """Handle 405 Method Not Allowed errors and return JSON error response"""
-    print(f"405 error handler triggered for {request.path} with method {request.method}")
+    http_log.warning(f"405 error handler triggered for {request.path} with method {request.method}")
     # Only return JSON for API routes
     if request.path.startswith('/api/'):
         response = jsonify({
@@ -2656,9 +2804,7 @@ def handle_405_error(e):
 @app.errorhandler(500)
 def handle_500_error(e):
     """Handle 500 errors and return JSON error response"""
-    print(f"500 error occurred: {e}")
-    import traceback
-    traceback.print_exc()
+    http_log.exception(f"500 error occurred: {e}")
     # Always return JSON for API routes
     if request.path.startswith('/api/'):
         return jsonify({
@@ -2677,7 +2823,7 @@ def handle_general_exception(e):
         if request.path.startswith('/api/'):
             # Special handling for 405 Method Not Allowed
             if (MethodNotAllowed and isinstance(e, MethodNotAllowed)) or (hasattr(e, 'code') and e.code == 405):
-                print(f"MethodNotAllowed caught in general handler: {request.method} for {request.path}")
+                http_log.warning(f"MethodNotAllowed caught in general handler: {request.method} for {request.path}")
                 return jsonify({
                     'error': 'method_not_allowed',
                     'message': f'The method {request.method} is not allowed for {request.path}.',
@@ -2692,9 +2838,7 @@ def handle_general_exception(e):
             }), e.code
         return e
     
-    print(f"Unhandled exception: {e}")
-    import traceback
-    traceback.print_exc()
+    http_log.exception(f"Unhandled exception: {e}")
     
     # If it's a database error, return 503
     error_str = str(e).lower()
@@ -2723,18 +2867,16 @@ def register():
         # Try to reinitialize database connection if db object exists
         if db is not None:
             try:
-                db_uri = os.environ.get('DATABASE_URL', 'postgresql://localhost/ventures')
-                print(f"Attempting to reconnect to database: {db_uri[:50]}...")
+                auth_log.info("Attempting to reconnect to database")
                 with app.app_context():
                     db.engine.connect()
                     DB_AVAILABLE = True
-                    print("✓ Database reconnection successful")
+                    auth_log.info("✓ Database reconnection successful")
             except Exception as reconnect_error:
                 db.session.rollback()  # Rollback failed transaction
                 error_msg = 'Database not available. Please check your DATABASE_URL environment variable and ensure the database is accessible.'
-                print(f"Registration failed: {error_msg}")
-                print(f"  DATABASE_URL is set: {bool(os.environ.get('DATABASE_URL'))}")
-                print(f"  Reconnection error: {reconnect_error}")
+                auth_log.error(f"Registration failed: {error_msg} Reconnection error: {reconnect_error}",
+                               extra={'databaseUrlSet': bool(os.environ.get('DATABASE_URL'))})
                 return jsonify({
                     'error': 'Database not available',
                     'message': error_msg,
@@ -2742,8 +2884,7 @@ def register():
                 }), 500
         else:
             error_msg = 'Database not available. DATABASE_URL environment variable may not be set or database connection failed during initialization.'
-            print(f"Registration failed: {error_msg}")
-            print(f"  DATABASE_URL is set: {bool(os.environ.get('DATABASE_URL'))}")
+            auth_log.error(f"Registration failed: {error_msg}", extra={'databaseUrlSet': bool(os.environ.get('DATABASE_URL'))})
             return jsonify({
                 'error': 'Database not available',
                 'message': error_msg,
@@ -2861,9 +3002,8 @@ def register():
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error in registration: {e}")
+        auth_log.exception(f"Error in registration: {e}")
         import traceback
-        traceback.print_exc()
         app.logger.error(f"Error in registration: {e}")
         app.logger.error(traceback.format_exc())
         if db and hasattr(db, 'session'):
@@ -2892,7 +3032,7 @@ def login():
                 with app.app_context():
                     db.engine.connect()
                     DB_AVAILABLE = True
-                    print("✓ Database reconnection successful")
+                    auth_log.info("✓ Database reconnection successful")
             except Exception as reconnect_error:
                 db.session.rollback()  # Rollback failed transaction
                 return jsonify({
@@ -2926,7 +3066,7 @@ def login():
             error_str = str(query_error).lower()
             if 'is_employee' in error_str and 'column' in error_str:
                 # Column doesn't exist - try raw SQL fallback
-                print(f"Warning: is_employee column missing, using raw SQL fallback for login")
+                auth_log.warning(f"is_employee column missing, using raw SQL fallback for login")
                 try:
                     with db.engine.connect() as conn:
                         result = conn.execute(db.text("""
@@ -2978,7 +3118,7 @@ def login():
                             user = None
                 except Exception as raw_error:
                     db.session.rollback()  # Rollback failed transaction
-                    print(f"Error in raw SQL fallback for login: {raw_error}")
+                    auth_log.error(f"Error in raw SQL fallback for login: {raw_error}")
                     return jsonify({
                         'error': 'Database migration required',
                         'message': 'The is_employee column is missing from the users table. Please run the database migration.',
@@ -2990,7 +3130,7 @@ def login():
                 raise
         
         if not user:
-            print(f"Login attempt failed: User not found for {username_or_email}")
+            auth_log.warning(f"Login attempt failed: User not found for {username_or_email}")
             app.logger.warning(f"Login failed: User '{username_or_email}' not found in database")
             return jsonify({
                 'error': 'Invalid username/email or password',
@@ -2999,7 +3139,7 @@ def login():
         
         # Check if user has a password set (users created via Patreon OAuth might not have passwords)
         if not user.password_hash:
-            print(f"Login attempt failed: User {username_or_email} (ID: {user.id}) has no password set (Patreon-only account)")
+            auth_log.warning(f"Login attempt failed: User {username_or_email} (ID: {user.id}) has no password set (Patreon-only account)")
             app.logger.warning(f"Login failed: User '{username_or_email}' has no password_hash - Patreon-only account")
             return jsonify({
                 'error': 'This account was created via Patreon. Please use Patreon login instead.',
@@ -3010,14 +3150,14 @@ def login():
         # Check password
         password_valid = user.check_password(password)
         if not password_valid:
-            print(f"Login attempt failed: Invalid password for user {username_or_email} (ID: {user.id})")
+            auth_log.warning(f"Login attempt failed: Invalid password for user {username_or_email} (ID: {user.id})")
             app.logger.warning(f"Login failed: Invalid password for user '{username_or_email}'")
             return jsonify({
                 'error': 'Invalid username/email or password',
                 'message': 'The password you entered is incorrect'
             }), 401
         
-        print(f"Login successful for user {username_or_email} (ID: {user.id})")
+        auth_log.info(f"Login successful for user {username_or_email} (ID: {user.id})")
         app.logger.info(f"Login successful for user '{username_or_email}' (ID: {user.id})")
         
         # Generate JWT token using flask-jwt-extended
@@ -3037,9 +3177,7 @@ def login():
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error in login: {e}")
-        import traceback
-        traceback.print_exc()
+        auth_log.exception(f"Error in login: {e}")
         app.logger.error(f"Error in login: {e}")
         error_message = str(e)
         # Provide more specific error messages
@@ -3062,6 +3200,58 @@ def login():
 # --- REMOVED: Patreon verification endpoint ---
 # Replaced with Shopify subscription verification
 
+# ETH transfers to ISHAREHOW_ETH_ADDRESS are indexed into eth_payments by a background
+# thread that resumes from a checkpoint, so payment checks are a table lookup rather than
+# a chain scan. A brand-new checkpoint begins at the current head unless
+# PAYMENT_INDEXER_START_BLOCK asks for a backfill: payments mined before the first deploy are
+# only seen (and credited) if it is set to a block before them. The thread starts with the first request,
+# so importing the app for CLI commands such as `flask db upgrade` never scans.
+payment_indexer = None
+PAYMENT_INDEXER_INTERVAL = float(os.environ.get('PAYMENT_INDEXER_INTERVAL', '30'))
+if (DB_AVAILABLE and WALLET_AUTH_HELPERS_AVAILABLE and w3 is not None
+        and os.environ.get('PAYMENT_INDEXER_ENABLED', 'true').lower() == 'true'):
+    try:
+        if not Web3.is_address(ISHAREHOW_ETH_ADDRESS) or not int(ISHAREHOW_ETH_ADDRESS, 16):
+            # An ENS name or the zero placeholder can't be matched against transaction recipients
+            billing_log.warning(f"ISHAREHOW_ETH_ADDRESS {ISHAREHOW_ETH_ADDRESS!r} is not a payment address; "
+                                "ETH payment indexer not started")
+        elif w3.is_connected():
+            from payment_indexer import PaymentIndexer
+            payment_indexer = PaymentIndexer(
+                w3, db, EthPayment, IndexerCheckpoint, ISHAREHOW_ETH_ADDRESS,
+                batch_blocks=int(os.environ.get('PAYMENT_INDEXER_BATCH_BLOCKS', '200')),
+                confirmations=int(os.environ.get('PAYMENT_INDEXER_CONFIRMATIONS', '12')),
+                start_block=int(os.environ['PAYMENT_INDEXER_START_BLOCK']) if os.environ.get('PAYMENT_INDEXER_START_BLOCK') else None,
+                price_usd=get_eth_price_usd,
+            )
+            billing_log.info("✓ ETH payment indexer configured")
+    except Exception as e:
+        billing_log.warning(f"ETH payment indexer not started: {e}")
+
+
+@app.before_request
+def ensure_payment_indexer():
+    if payment_indexer is not None:
+        payment_indexer.start(app, interval=PAYMENT_INDEXER_INTERVAL)
+
+
+@app.route('/api/admin/payments/indexer', methods=['GET', 'POST'])
+@require_admin
+def admin_payment_indexer():
+    """Payment indexer checkpoint and lag (admin only); POST indexes the next batch now"""
+    if payment_indexer is None:
+        return jsonify({'error': 'Payment indexer not running'}), 503
+    try:
+        scanned = payment_indexer.run_once() if request.method == 'POST' else None
+        status = payment_indexer.status()
+        if scanned is not None:
+            status['scannedBlocks'] = scanned
+        return jsonify(status)
+    except Exception as e:
+        db.session.rollback()
+        billing_log.error(f"Error running payment indexer: {e}")
+        return jsonify({'error': 'Payment indexer failed', 'details': str(e)}), 500
+
 @app.route('/api/subscriptions/verify', methods=['POST'])
 @jwt_required()
 def verify_subscription():
@@ -3094,6 +3284,18 @@ def verify_subscription():
             user.membership_paid
         )
         
+        # ETH access lasts as long as the lookback window holds enough payments, so re-check it on every
+        # verify; an undecided check (lookup error, no price for unpriced payments) keeps the stored status
+        if payment_indexer is not None and user.crypto_address:
+            has_paid, _ = check_eth_payment_to_isharehow(user.crypto_address, payment_indexer)
+            if has_paid is not None:
+                user.eth_payment_verified = has_paid
+            if has_paid:
+                latest = payment_indexer.payments_from(user.crypto_address)[0]
+                user.eth_payment_amount = payment_indexer.total_paid_eth(user.crypto_address, 30)
+                user.eth_payment_tx_hash = latest.tx_hash
+                user.eth_payment_date = latest.block_time
+        
         # Check ETH payment ($20 minimum to isharehow.eth)
         has_eth_payment = False
         eth_payment_amount = 0
@@ -3135,7 +3337,7 @@ def verify_subscription():
         })
         
     except Exception as e:
-        print(f"Error verifying subscription: {e}")
+        billing_log.error(f"Error verifying subscription: {e}")
         app.logger.error(f"Error in verify_subscription: {e}")
         db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
@@ -3259,7 +3461,7 @@ def auth_me():
             column_exists = check_is_employee_column_exists()
         except Exception as check_error:
             db.session.rollback()  # Rollback failed transaction
-            print(f"Error in check_is_employee_column_exists: {check_error}")
+            auth_log.error(f"Error in check_is_employee_column_exists: {check_error}")
             column_exists = False  # Default to False (use fallback)
         
         # Try normal query first (faster), fallback to raw SQL only if needed
@@ -3277,14 +3479,14 @@ def auth_me():
                 db.session.rollback()  # Rollback failed transaction
                 error_str = str(query_error).lower()
                 if 'is_employee' in error_str and 'column' in error_str:
-                    print(f"Unexpected: is_employee error despite check, using raw SQL fallback")
+                    auth_log.error(f"Unexpected: is_employee error despite check, using raw SQL fallback")
                     column_exists = False  # Force fallback
                 else:
                     raise
         
         if not column_exists and not user:
             # Column doesn't exist - use raw SQL directly
-            print(f"Warning: is_employee column missing in auth/me, using raw SQL fallback")
+            auth_log.warning(f"is_employee column missing in auth/me, using raw SQL fallback")
             try:
                 with db.engine.connect() as conn:
                     # Try to convert user_id to integer for id comparison, but keep as string for username/patreon_id
@@ -3339,7 +3541,7 @@ def auth_me():
             except Exception as raw_error:
                 db.session.rollback()  # Rollback failed transaction
                 error_str = str(raw_error).lower()
-                print(f"Error in raw SQL fallback for auth/me: {raw_error}")
+                auth_log.error(f"Error in raw SQL fallback for auth/me: {raw_error}")
                 app.logger.error(f"Error fetching user from database: {raw_error}")
                 
                 # If user not found, return 404 instead of 500
@@ -3366,7 +3568,7 @@ def auth_me():
                 profile_data = profile.to_dict()
         except Exception as e:
             db.session.rollback()  # Rollback failed transaction
-            print(f"Warning: Failed to fetch profile: {e}")
+            auth_log.error(f"Failed to fetch profile: {e}")
         
         # Return combined user data - handle both regular User objects and SimpleNamespace fallback
         try:
@@ -3394,11 +3596,11 @@ def auth_me():
                 'authenticated': True  # Explicitly mark as authenticated
             })
             
-            print(f"✓ User authenticated via JWT: {user_id}")
+            auth_log.info(f"✓ User authenticated via JWT: {user_id}")
             return jsonify(user_data)
         except Exception as dict_error:
             db.session.rollback()  # Rollback failed transaction
-            print(f"Error creating user dict: {dict_error}")
+            auth_log.error(f"Error creating user dict: {dict_error}")
             app.logger.error(f"Error creating user dict: {dict_error}")
             # Return minimal user data
             return jsonify({
@@ -3411,7 +3613,7 @@ def auth_me():
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
         error_str = str(e).lower()
-        print(f"Error fetching user from database: {e}")
+        auth_log.error(f"Error fetching user from database: {e}")
         app.logger.error(f"Error fetching user from database: {e}")
         
         # Check if it's the is_employee column error (should have been caught above, but just in case)
@@ -3469,7 +3671,7 @@ def wallet_nonce():
     
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error generating wallet nonce: {e}")
+        auth_log.error(f"Error generating wallet nonce: {e}")
         return jsonify({'error': 'Failed to generate nonce', 'details': str(e)}), 500
 
 
@@ -3503,8 +3705,9 @@ def wallet_login():
         if not verify_wallet_signature(address, message, signature, w3):
             return jsonify({'error': 'Invalid signature'}), 401
         
-        # Consume nonce (one-time use)
-        consume_nonce(address)
+        # Consume nonce (one-time use); atomic, so a replayed request racing this one fails here
+        if not consume_nonce(address, nonce):
+            return jsonify({'error': 'Invalid or expired nonce'}), 401
         
         # Find user by crypto_address
         user = User.query.filter_by(crypto_address=address).first()
@@ -3533,7 +3736,7 @@ def wallet_login():
     
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error in wallet login: {e}")
+        auth_log.error(f"Error in wallet login: {e}")
         return jsonify({'error': 'Wallet login failed', 'details': str(e)}), 500
 
 
@@ -3572,8 +3775,9 @@ def wallet_register():
         if not verify_wallet_signature(address, message, signature, w3):
             return jsonify({'error': 'Invalid signature'}), 401
         
-        # Consume nonce
-        consume_nonce(address)
+        # Consume nonce (one-time use); atomic, so a replayed request racing this one fails here
+        if not consume_nonce(address, nonce):
+            return jsonify({'error': 'Invalid or expired nonce'}), 401
         
         # Check if address already registered
         existing_user = User.query.filter_by(crypto_address=address).first()
@@ -3644,7 +3848,7 @@ def wallet_register():
     
     except Exception as e:
         db.session.rollback()
-        print(f"Error in wallet registration: {e}")
+        auth_log.error(f"Error in wallet registration: {e}")
         return jsonify({'error': 'Registration failed', 'details': str(e)}), 500
 
 
@@ -3683,8 +3887,9 @@ def wallet_link():
         if not verify_wallet_signature(address, message, signature, w3):
             return jsonify({'error': 'Invalid signature'}), 401
         
-        # Consume nonce
-        consume_nonce(address)
+        # Consume nonce (one-time use); atomic, so a replayed request racing this one fails here
+        if not consume_nonce(address, nonce):
+            return jsonify({'error': 'Invalid or expired nonce'}), 401
         
         # Get current user
         user = User.query.get(int(user_id))
@@ -3729,7 +3934,7 @@ def wallet_link():
     
     except Exception as e:
         db.session.rollback()
-        print(f"Error linking wallet: {e}")
+        auth_log.error(f"Error linking wallet: {e}")
         return jsonify({'error': 'Failed to link wallet', 'details': str(e)}), 500
 
 
@@ -3784,7 +3989,7 @@ def google_login():
     
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error initiating Google OAuth: {e}")
+        auth_log.error(f"Error initiating Google OAuth: {e}")
         return jsonify({'error': 'Failed to initiate Google login', 'details': str(e)}), 500
 
 
@@ -3857,7 +4062,7 @@ def google_callback():
             db.session.rollback()  # Rollback failed transaction
             error_str = str(query_error).lower()
             if 'column' in error_str and 'google_id' in error_str:
-                print(f"Warning: google_id column missing, attempting to add it...")
+                auth_log.warning(f"google_id column missing, attempting to add it...")
                 # Try to add the column
                 try:
                     with db.engine.connect() as conn:
@@ -3868,14 +4073,14 @@ def google_callback():
                             except Exception:
                                 db.session.rollback()  # Rollback failed transaction
                                 pass  # Index might already exist
-                            print("  ✓ Added google_id column")
+                            auth_log.info("✓ Added google_id column")
                 except Exception as add_error:
                     db.session.rollback()  # Rollback failed transaction
                     error_msg = str(add_error).lower()
                     if 'already exists' in error_msg:
-                        print("  ✓ google_id column already exists")
+                        auth_log.info("✓ google_id column already exists")
                     else:
-                        print(f"  ✗ Could not add google_id column: {add_error}")
+                        auth_log.error(f"✗ Could not add google_id column: {add_error}")
                         # Continue with email lookup as fallback
                 # Retry the query
                 try:
@@ -3902,7 +4107,7 @@ def google_callback():
                     # If google_id column doesn't exist, add it first
                     error_str = str(attr_error).lower()
                     if 'google_id' in error_str or 'no property' in error_str:
-                        print("Warning: google_id column missing, adding it now...")
+                        auth_log.warning("google_id column missing, adding it now...")
                         try:
                             with db.engine.connect() as conn:
                                 with conn.begin():
@@ -3912,14 +4117,14 @@ def google_callback():
                                     except Exception:
                                         db.session.rollback()  # Rollback failed transaction
                                         pass
-                                    print("  ✓ Added google_id column")
+                                    auth_log.info("✓ Added google_id column")
                             # Refresh the user object
                             db.session.refresh(user)
                             user.google_id = google_id
                             user.auth_provider = 'google'
                         except Exception as add_error:
                             db.session.rollback()  # Rollback failed transaction
-                            print(f"  ✗ Could not add google_id: {add_error}")
+                            auth_log.error(f"✗ Could not add google_id: {add_error}")
                             # Continue without google_id for now
                     else:
                         raise
@@ -3944,10 +4149,10 @@ def google_callback():
                                 except Exception:
                                     db.session.rollback()  # Rollback failed transaction
                                     pass
-                                print("  ✓ Added google_id column before creating user")
+                                auth_log.info("✓ Added google_id column before creating user")
                 except Exception as check_error:
                     db.session.rollback()  # Rollback failed transaction
-                    print(f"  ⚠ Could not check/add google_id: {check_error}")
+                    auth_log.error(f"⚠ Could not check/add google_id: {check_error}")
                 
                 try:
                     user = User(
@@ -3965,7 +4170,7 @@ def google_callback():
                     # If google_id still causes issues, create without it
                     error_str = str(create_error).lower()
                     if 'google_id' in error_str:
-                        print("  ⚠ Creating user without google_id (will update after column is added)")
+                        auth_log.warning("⚠ Creating user without google_id (will update after column is added)")
                         user = User(
                             username=username,
                             email=email,
@@ -4025,7 +4230,7 @@ def google_callback():
     
     except Exception as e:
         db.session.rollback()
-        print(f"Error in Google OAuth callback: {e}")
+        auth_log.error(f"Error in Google OAuth callback: {e}")
         return jsonify({'error': 'Google authentication failed', 'details': str(e)}), 500
 
 
@@ -4057,7 +4262,7 @@ def get_user_access():
     
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting user access: {e}")
+        auth_log.error(f"Error getting user access: {e}")
         return jsonify({'error': 'Failed to get access info', 'details': str(e)}), 500
 
 
@@ -4085,7 +4290,7 @@ def get_user_upgrade_options():
     
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting upgrade options: {e}")
+        auth_log.error(f"Error getting upgrade options: {e}")
         return jsonify({'error': 'Failed to get upgrade options', 'details': str(e)}), 500
 
 
@@ -4171,7 +4376,7 @@ def start_user_trial():
     
     except Exception as e:
         db.session.rollback()
-        print(f"Error starting trial: {e}")
+        auth_log.error(f"Error starting trial: {e}")
         return jsonify({'error': 'Failed to start trial', 'details': str(e)}), 500
 
 
@@ -4202,7 +4407,7 @@ def refresh_patreon_token(refresh_token):
             return response.json()
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error refreshing Patreon token: {e}")
+        auth_log.error(f"Error refreshing Patreon token: {e}")
     return None
 
 @app.route('/api/auth/refresh', methods=['POST', 'OPTIONS'])
@@ -4259,7 +4464,7 @@ def refresh_token():
         set_access_cookies(response, new_jwt)
         return response
     except Exception as e:
-        print(f"Error in token refresh: {e}")
+        auth_log.error(f"Error in token refresh: {e}")
         app.logger.error(f"Error in token refresh: {e}")
         db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
@@ -4438,7 +4643,7 @@ def verify_and_create_user():
             expires_in = 3600  # Default, actual expiration should come from token response
             user.token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
             db.session.add(user)
-            print(f"✓ Created new user: {api_user_id}")
+            auth_log.info(f"✓ Created new user: {api_user_id}")
         else:
             user.email = user_email or user.email
             user.access_token = access_token
@@ -4454,7 +4659,7 @@ def verify_and_create_user():
                 user.content_hash = ens_data.get('content_hash')
             expires_in = 3600
             user.token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
-            print(f"✓ Updated existing user: {api_user_id}")
+            auth_log.info(f"✓ Updated existing user: {api_user_id}")
         
         # Also sync with UserProfile - use ENS name as ID if available
         profile_id = ens_data.get('ens_name') or api_user_id
@@ -4513,10 +4718,10 @@ def verify_and_create_user():
         })
         
     except requests.exceptions.RequestException as e:
-        print(f"Error verifying user with Patreon API: {e}")
+        auth_log.error(f"Error verifying user with Patreon API: {e}")
         return jsonify({'error': f'Failed to verify with Patreon: {str(e)}'}), 500
     except Exception as e:
-        print(f"Error in verify_and_create_user: {e}")
+        auth_log.error(f"Error in verify_and_create_user: {e}")
         app.logger.error(f"Error in verify_and_create_user: {e}")
         db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
@@ -4549,12 +4754,12 @@ def get_profile():
             column_exists = check_is_employee_column_exists()
         except Exception as check_error:
             db.session.rollback()  # Rollback failed transaction
-            print(f"Error in check_is_employee_column_exists for profile: {check_error}")
+            auth_log.error(f"Error in check_is_employee_column_exists for profile: {check_error}")
             column_exists = False  # Default to False (use fallback)
         
         if not column_exists:
             # Column doesn't exist - use raw SQL directly
-            print(f"Warning: is_employee column missing in profile endpoint, using raw SQL fallback")
+            auth_log.warning(f"is_employee column missing in profile endpoint, using raw SQL fallback")
             try:
                 with db.engine.connect() as conn:
                     # Try to convert user_id to integer for id comparison, but keep as string for username/patreon_id
@@ -4611,7 +4816,7 @@ def get_profile():
             except Exception as raw_error:
                 db.session.rollback()  # Rollback failed transaction
                 error_str = str(raw_error).lower()
-                print(f"Error in raw SQL fallback for profile: {raw_error}")
+                auth_log.error(f"Error in raw SQL fallback for profile: {raw_error}")
                 app.logger.error(f"Error fetching user from database: {raw_error}")
                 
                 # If user not found, return 404 instead of 500
@@ -4643,7 +4848,7 @@ def get_profile():
                     app.logger.error(f"Profile endpoint: Error looking up by integer ID: {e}")
                     # If we still get an is_employee error (shouldn't happen if check worked), use fallback
                     if 'is_employee' in error_str and 'column' in error_str:
-                        print(f"Unexpected: is_employee error despite check, using raw SQL fallback")
+                        auth_log.error(f"Unexpected: is_employee error despite check, using raw SQL fallback")
                         # Use the same raw SQL fallback as above
                         try:
                             with db.engine.connect() as conn:
@@ -4688,7 +4893,7 @@ def get_profile():
                                     user.to_dict = to_dict
                         except Exception as raw_error2:
                             db.session.rollback()  # Rollback failed transaction
-                            print(f"Error in secondary raw SQL fallback: {raw_error2}")
+                            auth_log.error(f"Error in secondary raw SQL fallback: {raw_error2}")
                             raise e  # Re-raise original error
                     else:
                         raise
@@ -4751,7 +4956,7 @@ def get_profile():
                 profile_data = profile.to_dict()
         except Exception as e:
             db.session.rollback()  # Rollback failed transaction
-            print(f"Warning: Failed to fetch profile: {e}")
+            auth_log.error(f"Failed to fetch profile: {e}")
         
         # Return combined user data (accessible regardless of payment status)
         # Handle both regular User objects and SimpleNamespace fallback
@@ -4775,7 +4980,7 @@ def get_profile():
                 }
         except Exception as dict_error:
             db.session.rollback()  # Rollback failed transaction
-            print(f"Error creating user dict in profile: {dict_error}")
+            auth_log.error(f"Error creating user dict in profile: {dict_error}")
             # Fallback for minimal user data if to_dict fails
             user_data = {
                 'id': getattr(user, 'patreon_id', None) or getattr(user, 'username', None) or str(getattr(user, 'id', '')),
@@ -4835,7 +5040,7 @@ def get_profile():
         return jsonify(user_data)
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching profile: {e}")
+        auth_log.error(f"Error fetching profile: {e}")
         app.logger.error(f"Error fetching profile: {e}")
         return jsonify({'error': 'Database error'}), 500
 
@@ -4904,7 +5109,7 @@ def verify_ens():
             'ensData': ens_data
         })
     except Exception as e:
-        print(f"Error verifying ENS: {e}")
+        integrations_log.error(f"Error verifying ENS: {e}")
         app.logger.error(f"Error verifying ENS: {e}")
         db.session.rollback()
         return jsonify({'error': 'Failed to verify ENS data'}), 500
@@ -5022,9 +5227,7 @@ def update_profile():
         return jsonify(user_data)
     except Exception as e:
         db.session.rollback()
-        app.logger.error(f"Error updating profile: {e}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f"Error updating profile: {e}")
         return jsonify({'error': 'Failed to update profile', 'message': str(e)}), 500
 
 # Notification Management Endpoints
@@ -5087,9 +5290,7 @@ def get_notifications():
     except Exception as e:
         # Rollback failed transaction
         db.session.rollback()
-        app.logger.error(f"Error fetching notifications: {e}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f"Error fetching notifications: {e}")
         
         # Check if it's a database connection error
         error_info = get_database_error_message(e)
@@ -5155,9 +5356,7 @@ def create_notification():
         return jsonify(notification.to_dict()), 201
     except Exception as e:
         db.session.rollback()
-        app.logger.error(f"Error creating notification: {e}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f"Error creating notification: {e}")
         return jsonify({'error': 'Failed to create notification', 'message': str(e)}), 500
 
 @app.route('/api/notifications/<int:notification_id>/read', methods=['PUT'])
@@ -5364,9 +5563,7 @@ def broadcast_notification():
         }), 201
     except Exception as e:
         db.session.rollback()
-        app.logger.error(f"Error broadcasting notification: {e}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f"Error broadcasting notification: {e}")
         return jsonify({'error': 'Failed to broadcast notification', 'message': str(e)}), 500
 
 # Push Notification Endpoints
@@ -5470,6 +5667,67 @@ def unsubscribe_push():
         return jsonify({'error': 'Failed to unsubscribe', 'message': str(e)}), 500
 
 
+TASK_PAGE_MAX = 500
+TASK_LIST_COLUMNS = [
+    'id', 'title', 'description', 'hyperlinks', 'status', 'support_request_id',
+    'created_by', 'created_by_name', 'assigned_to', 'assigned_to_name', 'notes',
+    'created_at', 'updated_at'
+]
+_task_list_serializers = {}
+
+
+def task_list_serializer(has_category_column, has_linked_entity_columns):
+    """
+    Row serializer producing Task.to_dict()'s shape straight from selected columns
+    
+    Compiled once per schema variant (category / linked_entity_* columns may be missing
+    on databases that haven't been migrated).
+    """
+    key = (has_category_column, has_linked_entity_columns)
+    serializer = _task_list_serializers.get(key)
+    if serializer is not None:
+        return serializer
+    
+    columns = list(TASK_LIST_COLUMNS)
+    if has_category_column:
+        columns.append('category')
+    if has_linked_entity_columns:
+        columns += ['linked_entity_type', 'linked_entity_id']
+        # Fall back to support_request_id when the polymorphic link isn't set, like Task.to_dict()
+        def linked_type(row):
+            if row.linked_entity_type or row.linked_entity_id:
+                return row.linked_entity_type
+            return 'support_request' if row.support_request_id else None
+        def linked_id(row):
+            if row.linked_entity_type or row.linked_entity_id:
+                return row.linked_entity_id
+            return row.support_request_id
+    else:
+        linked_type = lambda row: 'support_request' if row.support_request_id else None
+        linked_id = 'support_request_id'
+    
+    serializer = RowSerializer(columns, [
+        ('id', 'id'),
+        ('title', 'title'),
+        ('description', 'description'),
+        ('hyperlinks', lambda row: loads_list(row.hyperlinks)),
+        ('status', 'status'),
+        ('category', (lambda row: row.category or 'work') if has_category_column else (lambda row: 'work')),
+        ('supportRequestId', 'support_request_id'),
+        ('linkedEntityType', linked_type),
+        ('linkedEntityId', linked_id),
+        ('createdBy', 'created_by'),
+        ('createdByName', 'created_by_name'),
+        ('assignedTo', 'assigned_to'),
+        ('assignedToName', 'assigned_to_name'),
+        ('notes', lambda row: row.notes or ''),
+        ('createdAt', 'created_at'),
+        ('updatedAt', 'updated_at'),
+    ])
+    _task_list_serializers[key] = serializer
+    return serializer
+
+
 @app.route('/api/tasks', methods=['GET'])
 @jwt_required(optional=True)  # Allow unauthenticated access to see all tasks
 def get_tasks():
@@ -5481,131 +5739,99 @@ def get_tasks():
         client_id = request.args.get('client_id')
         linked_entity_type = request.args.get('linkedEntityType') or request.args.get('linked_entity_type')
         linked_entity_id = request.args.get('linkedEntityId') or request.args.get('linked_entity_id')
+        statuses = [s for s in (request.args.get('status') or '').split(',') if s]
+        category = request.args.get('category')
+        assigned_to = request.args.get('assignedTo') or request.args.get('assigned_to')
         
-        # Build query
-        query = Task.query
+        # Check if new columns exist before using them (table name is 'task' not 'tasks')
+        columns = get_table_columns('task') or frozenset()
+        has_category_column = 'category' in columns
+        has_linked_entity_columns = 'linked_entity_type' in columns and 'linked_entity_id' in columns
         
-        # Check if new columns exist before using them
-        from sqlalchemy import inspect
-        inspector = inspect(db.engine)
-        has_category_column = False
-        has_linked_entity_columns = False
-        try:
-            # Table name is 'task' not 'tasks'
-            table_name = 'task'
-            table_names = [t.lower() if isinstance(t, str) else t for t in inspector.get_table_names()]
-            if table_name in table_names or table_name in inspector.get_table_names():
-                columns = [col['name'] for col in inspector.get_columns(table_name)]
-                has_category_column = 'category' in columns
-                has_linked_entity_columns = 'linked_entity_type' in columns and 'linked_entity_id' in columns
-        except Exception as inspect_error:
-            print(f"Warning: Could not inspect task table columns: {inspect_error}")
-            pass
+        query = Task.query
+        # Rows are selected as plain columns and serialized without building Task instances
+        serializer = task_list_serializer(has_category_column, has_linked_entity_columns)
+        row_columns = [getattr(Task, column) for column in serializer.columns]
+        
+        # Delta sync is unscoped: a task relinked, reassigned or moved to another status has no
+        # tombstone, so every changed task is sent and the replica filters locally
+        since = request.args.get('since')
+        if since:
+            sync_cursor = snapshot_sync_cursor()
+            delta = read_delta_since('task', since)
+            if delta is None:
+                return delta_sync_expired_response('tasks')
+            changed_after, deleted = delta
+            rows = query.filter(Task.updated_at > changed_after).with_entities(*row_columns).order_by(Task.updated_at).all()
+            return jsonify({
+                'tasks': with_buffered_notes(serializer.many(rows)),
+                'deleted': deleted,
+                'syncCursor': sync_cursor
+            })
+        sync_cursor = snapshot_sync_cursor()
         
         # Filter by polymorphic entity linking (new method) - only if columns exist
-        if linked_entity_type and linked_entity_id and has_linked_entity_columns:
-            try:
-                query = query.filter(
-                    Task.linked_entity_type == linked_entity_type,
-                    Task.linked_entity_id == linked_entity_id
-                )
-            except Exception:
-                # If filter fails (columns might not exist), fall back
-                query = Task.query
-        # Filter by client_id if provided (through support requests - backward compatibility)
+        if has_linked_entity_columns and (linked_entity_type or linked_entity_id):
+            if linked_entity_type:
+                query = query.filter(Task.linked_entity_type == linked_entity_type)
+            if linked_entity_id:
+                query = query.filter(Task.linked_entity_id == linked_entity_id)
+        # Filter by client_id: linked directly, or through support requests (backward compatibility)
         elif client_id:
-            try:
-                # Try new polymorphic method first (only if columns exist)
-                if has_linked_entity_columns:
-                    try:
-                        query = query.filter(
-                            Task.linked_entity_type == 'client',
-                            Task.linked_entity_id == client_id
-                        )
-                    except Exception:
-                        query = Task.query
-                # Also check old method through support requests
-                try:
-                    old_query = Task.query.join(SupportRequest, Task.support_request_id == SupportRequest.id).filter(
-                        SupportRequest.client_id == client_id
-                    )
-                    # Combine both queries using union if new method worked
-                    if has_linked_entity_columns and query != Task.query:
-                        from sqlalchemy import or_
-                        query = query.union(old_query)
-                    else:
-                        query = old_query
-                except Exception:
-                    pass  # If join fails, just use what we have
-            except Exception as filter_error:
-                # If new method fails, try old method
-                try:
-                    query = query.join(SupportRequest, Task.support_request_id == SupportRequest.id).filter(
-                        SupportRequest.client_id == client_id
-                    )
-                except Exception as join_error:
-                    # If join fails (e.g., column doesn't exist), fall back to all tasks
-                    print(f"Warning: Could not filter by client_id: {join_error}")
-                    query = Task.query
-        
-        # Get all tasks, ordered by most recent first
-        # Use load_only to exclude missing columns if they don't exist
-        # Also use defer() to prevent lazy loading of missing columns
-        from sqlalchemy.orm import load_only, defer
-        
-        if not has_category_column or not has_linked_entity_columns:
-            # Exclude missing columns from the query
-            columns_to_load = [
-                Task.id, Task.title, Task.description, Task.hyperlinks, 
-                Task.status, Task.support_request_id,
-                Task.created_by, Task.created_by_name, 
-                Task.assigned_to, Task.assigned_to_name, Task.notes,
-                Task.created_at, Task.updated_at
-            ]
-            # Only add new columns if they exist
-            if has_category_column:
-                columns_to_load.append(Task.category)
-            else:
-                # Explicitly defer the column to prevent lazy loading
-                query = query.options(defer(Task.category))
-            
+            via_support_request = Task.support_request_id.in_(
+                db.session.query(SupportRequest.id).filter(SupportRequest.client_id == client_id).scalar_subquery()
+            )
             if has_linked_entity_columns:
-                columns_to_load.extend([Task.linked_entity_type, Task.linked_entity_id])
+                query = query.filter(db.or_(
+                    db.and_(Task.linked_entity_type == 'client', Task.linked_entity_id == client_id),
+                    via_support_request
+                ))
             else:
-                # Explicitly defer these columns to prevent lazy loading
-                query = query.options(defer(Task.linked_entity_type), defer(Task.linked_entity_id))
-            
-            query = query.options(load_only(*columns_to_load))
-        
-        tasks = query.order_by(Task.created_at.desc()).all()
-        total_count = len(tasks)
-        print(f"Fetched {total_count} tasks from database" + (f" for client_id: {client_id}" if client_id else ""))
-        
-        # Log task status breakdown for debugging
-        if total_count > 0:
-            status_counts = {}
-            for task in tasks:
-                status = task.status or 'unknown'
-                status_counts[status] = status_counts.get(status, 0) + 1
-            print(f"Task status breakdown: {status_counts}")
+                query = query.filter(via_support_request)
+        
+        if category and has_category_column:
+            query = query.filter(Task.category == category)
+        if assigned_to:
+            query = query.filter(Task.assigned_to == assigned_to)
+        
+        # Status counts for every status (so board columns can show totals) in one GROUP BY,
+        # computed before the status filter is applied
+        status_counts = {
+            (status or 'unknown'): count
+            for status, count in query.with_entities(Task.status, db.func.count(Task.id)).group_by(Task.status).all()
+        }
+        if statuses:
+            query = query.filter(Task.status.in_(statuses))
+            total_count = sum(count for status, count in status_counts.items() if status in statuses)
         else:
-            print("WARNING: No tasks found in database. This could indicate:")
-            print("  1. Tasks were deleted")
-            print("  2. Database was reset")
-            print("  3. Tasks table is empty")
-            if client_id:
-                print(f"  4. No tasks found for client_id: {client_id}")
+            total_count = sum(status_counts.values())
+        
+        # Only columns known to exist are selected, so missing ones never reach the SQL
+        # Cursor pagination is opt-in (limit or cursor) so existing callers still receive every task
+        query = query.with_entities(*row_columns).order_by(Task.created_at.desc(), Task.id.desc())
+        if 'limit' in request.args or 'cursor' in request.args:
+            limit = max(1, min(request.args.get('limit', 100, type=int) or 100, TASK_PAGE_MAX))
+            cursor = decode_cursor(request.args.get('cursor'))
+            if cursor:
+                query = query.filter(db.tuple_(Task.created_at, Task.id) < cursor)
+            rows = query.limit(limit + 1).all()
+            next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+            rows = rows[:limit]
+        else:
+            rows = query.all()
+            next_cursor = None
         
         return jsonify({
-            'tasks': [task.to_dict() for task in tasks],
-            'totalCount': total_count
+            'tasks': with_buffered_notes(serializer.many(rows)),
+            'totalCount': total_count,
+            'statusCounts': status_counts,
+            'nextCursor': next_cursor,
+            'syncCursor': sync_cursor
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
         error_str = str(e).lower()
-        print(f"Error fetching tasks: {e}")
-        import traceback
-        traceback.print_exc()
+        tasks_log.exception(f"Error fetching tasks: {e}")
         
         # Check if it's a database connection error
         if 'connection' in error_str or 'operational' in error_str or 'database' in error_str:
@@ -5672,7 +5898,7 @@ def create_task():
                 has_category_column = 'category' in columns
                 has_linked_entity_columns = 'linked_entity_type' in columns and 'linked_entity_id' in columns
         except Exception as inspect_error:
-            print(f"Warning: Could not inspect table columns: {inspect_error}")
+            tasks_log.error(f"Could not inspect table columns: {inspect_error}")
             pass
         
         # Create task - use raw SQL if columns don't exist to avoid ORM trying to insert missing columns
@@ -5760,7 +5986,7 @@ def create_task():
                 else:
                     # Fallback: create minimal task object
                     task = Task.query.get(task_id)
-                print(f"✓ Task created successfully (raw SQL): {task_id}")
+                tasks_log.info(f"✓ Task created successfully (raw SQL): {task_id}")
             except Exception as raw_sql_error:
                 db.session.rollback()
                 raise raw_sql_error
@@ -5789,7 +6015,7 @@ def create_task():
             try:
                 db.session.add(task)
                 db.session.commit()
-                print(f"✓ Task created successfully: {task.id}")
+                tasks_log.info(f"✓ Task created successfully: {task.id}")
             except Exception as orm_error:
                 db.session.rollback()
                 raise orm_error
@@ -5843,10 +6069,7 @@ def create_task():
                     db.session.rollback()
                 except:
                     pass  # Ignore rollback errors if session is broken
-            print(f"✗ Database error creating task: {db_error}")
-            print(f"  Error type: {type(db_error).__name__}")
-            import traceback
-            traceback.print_exc()
+            tasks_log.exception(f"✗ Database error creating task ({type(db_error).__name__}): {db_error}")
             # Check if it's a connection error
             error_str = str(db_error).lower()
             error_type_str = str(type(db_error).__name__).lower()
@@ -5864,13 +6087,11 @@ def create_task():
             }), 500
     except KeyError as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Missing required field: {e}")
+        tasks_log.warning(f"Missing required field: {e}")
         return jsonify({'error': 'Validation error', 'message': f'Missing required field: {str(e)}'}), 400
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error creating task: {e}")
-        import traceback
-        traceback.print_exc()
+        tasks_log.exception(f"Error creating task: {e}")
         return jsonify({'error': 'Failed to create task', 'message': str(e)}), 500
 
 # @require_session  # Tasks work without authentication
@@ -5941,6 +6162,8 @@ def update_task(task_id):
                 task.linked_entity_type = 'support_request'
                 task.linked_entity_id = support_request_id
         db.session.commit()
+        if 'notes' in data:
+            task_notes_buffer.discard(task_id)  # REST write wins over buffered live edits
         user_info = get_user_info()
         task_data = task.to_dict()
         task_data['userId'] = user_info['id'] if user_info else 'anonymous'
@@ -5958,9 +6181,7 @@ def update_task(task_id):
         return jsonify({'task': task.to_dict()})
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error updating task: {e}")
-        import traceback
-        traceback.print_exc()
+        tasks_log.exception(f"Error updating task: {e}")
         return jsonify({'error': 'Failed to update task', 'message': str(e)}), 500
 
 # @require_session  # Tasks work without authentication
@@ -5979,7 +6200,7 @@ def delete_task(task_id):
             user_info = get_user_info()
         except Exception as user_err:
             # If get_user_info fails, continue with anonymous user
-            print(f"Warning: Could not get user info for task deletion: {user_err}")
+            tasks_log.error(f"Could not get user info for task deletion: {user_err}")
         
         # Check if task exists and delete using raw SQL to avoid column mismatch issues
         # This handles cases where the model has columns that don't exist in the database yet
@@ -6015,6 +6236,7 @@ def delete_task(task_id):
                 text('DELETE FROM task WHERE id = :task_id'),
                 {'task_id': task_id}
             )
+            record_deletion('task', task_id)
             db.session.commit()
         except Exception as db_err:
             db.session.rollback()
@@ -6050,11 +6272,12 @@ def delete_task(task_id):
                         text('DELETE FROM task WHERE id = :task_id'),
                         {'task_id': task_id}
                     )
+                    record_deletion('task', task_id)
                     db.session.commit()
                 except Exception as retry_err:
                     db.session.rollback()
                     error_str_retry = str(retry_err).lower()
-                    print(f"Error deleting task after foreign key handling: {retry_err}")
+                    tasks_log.error(f"Error deleting task after foreign key handling: {retry_err}")
                     
                     # If it's still a constraint error, provide a more helpful error message
                     if 'foreign key' in error_str_retry or 'constraint' in error_str_retry:
@@ -6073,19 +6296,19 @@ def delete_task(task_id):
                 # Re-raise if it's not a foreign key issue
                 raise db_err
         
+        task_notes_buffer.discard(task_id)
+        
         # Emit socket event after successful deletion
         try:
             socketio.emit('task_deleted', {'id': task_id, 'userId': user_info['id'] if user_info else 'anonymous'})
         except Exception as socket_err:
             # Don't fail the deletion if socket emit fails
-            print(f"Warning: Could not emit task_deleted event: {socket_err}")
+            tasks_log.error(f"Could not emit task_deleted event: {socket_err}")
         
         return jsonify({'success': True})
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error deleting task: {e}")
-        import traceback
-        traceback.print_exc()
+        tasks_log.exception(f"Error deleting task: {e}")
         
         # Return more specific error messages
         error_str = str(e).lower()
@@ -6161,67 +6384,170 @@ def link_tasks_to_user():
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error linking tasks to user: {e}")
-        import traceback
-        traceback.print_exc()
+        tasks_log.exception(f"Error linking tasks to user: {e}")
         return jsonify({'error': 'Failed to link tasks', 'message': str(e)}), 500
 
 # Track active/logged-in users via Socket.io connections
 active_users = {}  # user_id -> { name, email, last_seen, socket_id }
 
+# User directory for assignee pickers - compact tuples cached in memory, reloaded after
+# commits that touch users (or after the TTL, for writes made with raw SQL)
+DirectoryEntry = namedtuple('DirectoryEntry', 'db_id workspace_id name email is_employee is_admin')
+# name_keys / email_keys: sorted (lowercase key, position in entries) pairs for prefix search
+DirectoryIndex = namedtuple('DirectoryIndex', 'entries name_keys email_keys by_workspace_id')
+
+USER_DIRECTORY_TTL = float(os.getenv('USER_DIRECTORY_TTL', '300'))
+USER_DIRECTORY_MAX_LIMIT = 500
+
+
+class UserDirectory:
+    """Cached list of users sorted by name, with prefix search on name and email"""
+
+    def __init__(self):
+        self._index = DirectoryIndex([], [], [], {})
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._expires = 0.0
+
+    def _load(self):
+        columns = get_table_columns('users') or frozenset()
+        query = db.session.query(
+            User.id, User.patreon_id, User.username, User.email,
+            User.is_employee if 'is_employee' in columns else db.literal(True),
+            User.is_admin if 'is_admin' in columns else db.literal(False)
+        )
+        entries = [
+            DirectoryEntry(
+                db_id=user_id,
+                workspace_id=patreon_id or username or str(user_id),
+                name=username or email or 'Unknown',
+                email=email,
+                is_employee=bool(is_employee),
+                is_admin=bool(is_admin)
+            )
+            for user_id, patreon_id, username, email, is_employee, is_admin in query
+        ]
+        entries.sort(key=lambda e: e.name.lower())
+        return DirectoryIndex(
+            entries=entries,
+            name_keys=[(e.name.lower(), i) for i, e in enumerate(entries)],
+            email_keys=sorted((e.email.lower(), i) for i, e in enumerate(entries) if e.email),
+            by_workspace_id={e.workspace_id: e for e in entries}
+        )
+
+    def _snapshot(self):
+        """Current index (reloads when invalidated or expired); swapped as a whole, so readers never mix two loads"""
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._expires:
+                self._index = self._load()
+                self._expires = now + USER_DIRECTORY_TTL
+            return self._index
+
+    def entries(self):
+        """All entries sorted by name"""
+        return self._snapshot().entries
+
+    def get(self, workspace_id):
+        return self._snapshot().by_workspace_id.get(workspace_id)
+
+    def search(self, prefix):
+        """Entries whose name or email starts with prefix, sorted by name"""
+        index = self._snapshot()
+        if not prefix:
+            return index.entries
+        prefix = prefix.lower()
+        matched = set()
+        for keys in (index.name_keys, index.email_keys):
+            for key, position in keys[bisect_left(keys, (prefix, -1)):]:
+                if not key.startswith(prefix):
+                    break
+                matched.add(position)
+        return [index.entries[i] for i in sorted(matched)]
+
+user_directory = UserDirectory()
+
+if DB_AVAILABLE:
+    from sqlalchemy import event
+
+    @event.listens_for(db.session, 'after_flush')
+    def note_user_directory_changes(session, flush_context):
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, User):
+                session.info['user_directory_dirty'] = True
+                return
+
+    @event.listens_for(db.session, 'after_commit')
+    def invalidate_user_directory_on_commit(session):
+        if session.info.pop('user_directory_dirty', False):
+            user_directory.invalidate()
+
+    @event.listens_for(db.session, 'after_rollback')
+    def reset_user_directory_flag(session):
+        session.info.pop('user_directory_dirty', None)
+
+
+def directory_limit():
+    """?limit= for picker endpoints (None when not given)"""
+    limit = request.args.get('limit', type=int)
+    return max(1, min(limit, USER_DIRECTORY_MAX_LIMIT)) if limit else None
+
+
 @app.route('/api/users/workspace', methods=['GET'])
 @jwt_required()
 def get_workspace_users():
-    """Get list of logged-in/active users for task assignment and co-drawing"""
+    """
+    Get users for task assignment and co-drawing, currently connected users first
+    
+    Query params: q (name/email prefix), limit
+    """
     if not DB_AVAILABLE:
         return jsonify({'error': 'Database not available'}), 503
     
     try:
-        # Get all users from database (not just active, since we track active via Socket.io)
-        users = User.query.all()
+        prefix = (request.args.get('q') or '').strip().lower()
+        limit = directory_limit()
+        entries = user_directory.search(prefix)
         
-        # Also include currently active users from Socket.io
+        # Active users (connected via Socket.io) come first, including anonymous ones not in the database
         users_data = []
-        user_ids_seen = set()
-        
-        # First, add all database users
-        for user in users:
-            user_id = user.patreon_id or user.username or str(user.id)
-            username = user.username or user.email or 'Unknown'
-            
-            # Check if user is currently active (connected via Socket.io)
-            is_active = user_id in active_users
-            
+        active_ids = set()
+        for user_id, user_data in sorted(active_users.items(), key=lambda item: item[1]['name'].lower()):
+            entry = user_directory.get(user_id)
+            name = entry.name if entry else user_data['name']
+            email = entry.email if entry else user_data.get('email')
+            if prefix and not (name.lower().startswith(prefix) or (email or '').lower().startswith(prefix)):
+                continue
             users_data.append({
                 'id': user_id,
-                'name': username,
-                'email': user.email if hasattr(user, 'email') else None,
-                'isActive': is_active,
-                'lastSeen': active_users[user_id]['last_seen'].isoformat() if is_active else None
+                'name': name,
+                'email': email,
+                'isActive': True,
+                'lastSeen': user_data['last_seen'].isoformat()
             })
-            user_ids_seen.add(user_id)
-        
-        # Add any active users not in database (anonymous or not yet in DB)
-        for user_id, user_data in active_users.items():
-            if user_id not in user_ids_seen:
-                users_data.append({
-                    'id': user_id,
-                    'name': user_data['name'],
-                    'email': user_data.get('email'),
-                    'isActive': True,
-                    'lastSeen': user_data['last_seen'].isoformat()
-                })
+            active_ids.add(user_id)
         
-        # Sort by active status first, then by name
-        users_data.sort(key=lambda u: (not u.get('isActive', False), u['name'].lower()))
+        for entry in entries:
+            if limit and len(users_data) >= limit:
+                break
+            if entry.workspace_id in active_ids:
+                continue
+            users_data.append({
+                'id': entry.workspace_id,
+                'name': entry.name,
+                'email': entry.email,
+                'isActive': False,
+                'lastSeen': None
+            })
         
-        return jsonify(users_data), 200
+        return jsonify(users_data[:limit] if limit else users_data), 200
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching workspace users: {e}")
-        import traceback
-        traceback.print_exc()
+        creative_log.exception(f"Error fetching workspace users: {e}")
         return jsonify({'error': 'Failed to fetch users', 'message': str(e)}), 500
 
 
@@ -6341,58 +6667,163 @@ def handle_drawing_assign_user(data):
         'assignedBy': request.sid
     })
 
+# Collaborative task notes - viewers join a per-task room, edits travel as splice
+# patches stamped with versions, and a write-behind buffer batches database writes
+from collab_notes import NotesBuffer, NotesConflict
+
+TASK_NOTES_FLUSH_IDLE_MS = int(os.getenv('TASK_NOTES_FLUSH_IDLE_MS', '1500'))
+TASK_NOTES_FLUSH_MAX_DELAY_MS = int(os.getenv('TASK_NOTES_FLUSH_MAX_DELAY_MS', '5000'))
+
+
+def load_task_notes(task_id):
+    with app.app_context():
+        task = Task.query.get(task_id)
+        return (task.notes or '') if task else None
+
+
+def save_task_notes(task_id, notes):
+    with app.app_context():
+        try:
+            task = Task.query.get(task_id)
+            if task:
+                task.notes = notes
+                task.updated_at = datetime.utcnow()
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+task_notes_buffer = NotesBuffer(
+    load_task_notes,
+    save_task_notes,
+    idle_ms=TASK_NOTES_FLUSH_IDLE_MS,
+    max_delay_ms=TASK_NOTES_FLUSH_MAX_DELAY_MS
+)
+_task_notes_flusher_started = False
+_task_notes_flusher_lock = threading.Lock()
+
+
+def task_notes_flush_loop():
+    """Background task: flush buffered notes whose idle/max-delay deadline has passed"""
+    interval = min(TASK_NOTES_FLUSH_IDLE_MS, TASK_NOTES_FLUSH_MAX_DELAY_MS) / 1000.0 / 2
+    while True:
+        socketio.sleep(interval)
+        task_notes_buffer.flush_due()
+
+
+def ensure_task_notes_flusher():
+    global _task_notes_flusher_started
+    with _task_notes_flusher_lock:
+        if not _task_notes_flusher_started:
+            socketio.start_background_task(task_notes_flush_loop)
+            _task_notes_flusher_started = True
+
+
+@atexit.register
+def flush_task_notes_on_exit():
+    if DB_AVAILABLE:
+        task_notes_buffer.flush_due(force=True)
+
+
+def with_buffered_notes(tasks):
+    """Overlay notes still in the write-behind buffer onto serialized tasks, so reads never lag live edits"""
+    unsaved = task_notes_buffer.unsaved()
+    if unsaved:
+        for task in tasks:
+            if task['id'] in unsaved:
+                task['notes'] = unsaved[task['id']]
+    return tasks
+
+
+def task_notes_room(task_id):
+    return f'task_notes_{task_id}'
+
+
+@socketio.on('task_notes_join')
+def handle_task_notes_join(data):
+    """Join a task's notes room and receive the current notes and version"""
+    task_id = (data or {}).get('task_id')
+    if not task_id:
+        emit('error', {'message': 'Task ID required'})
+        return
+    if not DB_AVAILABLE:
+        emit('error', {'message': 'Database not available'})
+        return
+    try:
+        snapshot = task_notes_buffer.snapshot(task_id)
+    except Exception as e:
+        tasks_log.error(f"Error loading task notes: {e}")
+        emit('error', {'message': str(e)})
+        return
+    if snapshot is None:
+        emit('error', {'message': 'Task not found'})
+        return
+    join_room(task_notes_room(task_id))
+    notes, version = snapshot
+    emit('task_notes_state', {'task_id': task_id, 'notes': notes, 'version': version})
+
+
+@socketio.on('task_notes_leave')
+def handle_task_notes_leave(data):
+    task_id = (data or {}).get('task_id')
+    if task_id:
+        leave_room(task_notes_room(task_id))
+
+
 # Socket.io handler for real-time task notes updates
 @socketio.on('task_notes_update')
 def handle_task_notes_update(data):
-    """Handle real-time task notes updates"""
+    """
+    Apply a notes edit and relay it to the task's room
+    
+    Payload: {task_id, version, patch: [[position, delete_count, insert_text], ...]}.
+    Clients that still send {task_id, notes} get last-writer-wins; the server diffs
+    the text so the room receives a patch. Only sockets in the task's room hear
+    about the edit.
+    """
     try:
         task_id = data.get('task_id')
-        notes = data.get('notes', '')
         
         if not task_id:
             emit('error', {'message': 'Task ID required'})
             return
         
-        # Update task in database
-        if DB_AVAILABLE:
-            task = Task.query.get(task_id)
-            if task:
-                task.notes = notes
-                task.updated_at = datetime.utcnow()
-                db.session.commit()
-                
-                # Broadcast to all connected clients
-                socketio.emit('task_notes_updated', {
-                    'task_id': task_id,
-                    'notes': notes,
-                    'updated_at': task.updated_at.isoformat() if task.updated_at else None
-                })
-                
-                print(f"Task notes updated: {task_id}")
-            else:
-                emit('error', {'message': 'Task not found'})
-        else:
+        if not DB_AVAILABLE:
             emit('error', {'message': 'Database not available'})
-            
-    except Exception as e:
+            return
+        
+        ensure_task_notes_flusher()
+        if 'patch' in data:
+            result = task_notes_buffer.apply(task_id, data.get('version'), patch=data['patch'])
+        else:
+            result = task_notes_buffer.apply(task_id, None, text=data.get('notes', ''))
+        
+        if result is None:
+            emit('error', {'message': 'Task not found'})
+            return
+        
+        base_version, version, patch = result
+        emit('task_notes_ack', {'task_id': task_id, 'version': version})
+        if patch:
+            socketio.emit('task_notes_patch', {
+                'task_id': task_id,
+                'baseVersion': base_version,
+                'version': version,
+                'patch': patch
+            }, room=task_notes_room(task_id), skip_sid=request.sid)
+            # The edit is only in the buffer, so GET /api/tasks must not answer 304 from the table counter
+            response_optimizer.counters.bump(['task'])
+    except NotesConflict as conflict:
+        # Client rebases its pending edits onto the current text
+        emit('task_notes_conflict', {'task_id': data.get('task_id'), 'notes': conflict.text, 'version': conflict.version})
+    except ValueError as e:
+        emit('error', {'message': f'Invalid notes patch: {e}'})
+    except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error updating task notes: {e}")
-        import traceback
-        traceback.print_exc()
+        tasks_log.exception(f"Error updating task notes: {e}")
         emit('error', {'message': str(e)})
 
-    except (ValueError, AttributeError):
-        db.session.rollback()  # Rollback failed transaction
-        try:
-            # Try date-only format (YYYY-MM-DD) and add time
-            if 'T' not in date_string:
-                return datetime.fromisoformat(date_string + 'T00:00:00')
-            raise
-        except Exception as e:
-            db.session.rollback()  # Rollback failed transaction
-            print(f"Error parsing date '{date_string}': {e}")
-            return None
-
 def get_or_create_user_profile():
     """Get or create user profile from JWT authentication"""
     try:
@@ -6403,7 +6834,7 @@ def get_or_create_user_profile():
         except Exception as verify_err:
             db.session.rollback()  # Rollback failed transaction
             # JWT verification failed - return auth error
-            print(f"JWT verification failed in get_or_create_user_profile: {verify_err}")
+            auth_log.warning(f"JWT verification failed in get_or_create_user_profile: {verify_err}")
             return None, jsonify({
                 'error': 'Authentication required', 
                 'message': 'Invalid or missing authentication token. Please log in again.'
@@ -6415,7 +6846,7 @@ def get_or_create_user_profile():
         db.session.rollback()  # Rollback failed transaction
         # JWT context not available - this means @jwt_required() didn't run or JWT is invalid
         error_msg = str(e)
-        print(f"Error getting JWT identity: {error_msg}")
+        auth_log.error(f"Error getting JWT identity: {error_msg}")
         return None, jsonify({
             'error': 'Authentication required', 
             'message': 'JWT token not verified. Please ensure you are logged in.'
@@ -6468,7 +6899,7 @@ def get_or_create_user_profile():
         )
         db.session.add(profile)
         db.session.commit()
-        print(f"✓ Created new user profile: {profile_id}")
+        auth_log.info(f"✓ Created new user profile: {profile_id}")
     else:
         # Update profile with latest User data if Patreon info is missing
         if not profile.patreon_id and user.patreon_id:
@@ -6519,9 +6950,7 @@ def get_aura_progress():
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching aura progress: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error fetching aura progress: {e}")
         return jsonify({'error': 'Failed to fetch aura progress'}), 500
 
 @app.route('/api/wellness/aura', methods=['PUT'])
@@ -6577,9 +7006,7 @@ def update_aura_progress():
         })
     except Exception as e:
         db.session.rollback()
-        print(f"Error updating aura progress: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error updating aura progress: {e}")
         return jsonify({'error': 'Failed to update aura progress'}), 500
 
 # Activities Endpoints
@@ -6610,9 +7037,7 @@ def get_activities():
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching activities: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error fetching activities: {e}")
         return jsonify({'error': 'Failed to fetch activities'}), 500
 
 @app.route('/api/wellness/activities', methods=['POST'])
@@ -6666,9 +7091,7 @@ def create_activity():
         }), 201
     except Exception as e:
         db.session.rollback()
-        print(f"Error creating activity: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error creating activity: {e}")
         return jsonify({'error': 'Failed to create activity'}), 500
 
 # Goals Endpoints
@@ -6696,9 +7119,7 @@ def get_goals():
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching goals: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error fetching goals: {e}")
         return jsonify({'error': 'Failed to fetch goals'}), 500
 
 @app.route('/api/wellness/goals', methods=['POST'])
@@ -6735,9 +7156,7 @@ def create_goal():
         }), 201
     except Exception as e:
         db.session.rollback()
-        print(f"Error creating goal: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error creating goal: {e}")
         return jsonify({'error': 'Failed to create goal'}), 500
 
 @app.route('/api/wellness/goals/<goal_id>', methods=['PUT'])
@@ -6779,9 +7198,7 @@ def update_goal(goal_id):
         })
     except Exception as e:
         db.session.rollback()
-        print(f"Error updating goal: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error updating goal: {e}")
         return jsonify({'error': 'Failed to update goal'}), 500
 
 @app.route('/api/wellness/goals/<goal_id>', methods=['DELETE'])
@@ -6803,9 +7220,7 @@ def delete_goal(goal_id):
         return jsonify({'success': True})
     except Exception as e:
         db.session.rollback()
-        print(f"Error deleting goal: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error deleting goal: {e}")
         return jsonify({'error': 'Failed to delete goal'}), 500
 
 # Achievements Endpoints
@@ -6827,9 +7242,7 @@ def get_achievements():
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching achievements: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error fetching achievements: {e}")
         return jsonify({'error': 'Failed to fetch achievements'}), 500
 
 @app.route('/api/wellness/achievements/<achievement_key>', methods=['POST'])
@@ -6873,9 +7286,7 @@ def unlock_achievement(achievement_key):
         }), 201
     except Exception as e:
         db.session.rollback()
-        print(f"Error unlocking achievement: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error unlocking achievement: {e}")
         return jsonify({'error': 'Failed to unlock achievement'}), 500
 
 @app.route('/api/wellness/achievements/available', methods=['GET'])
@@ -6900,7 +7311,7 @@ def get_available_achievements():
 def admin_update():
     """Post an admin update that will be broadcast to all connected clients"""
     # Debug: Log the request
-    print(f"Admin update endpoint hit: method={request.method}, path={request.path}")
+    admin_log.info(f"Admin update endpoint hit: method={request.method}, path={request.path}")
     
     # Handle CORS preflight
     if request.method == 'OPTIONS':
@@ -6955,7 +7366,7 @@ def admin_update():
             'timestamp': datetime.now().isoformat(),
         })
         
-        print(f"Admin update posted by {author}: {message}")
+        admin_log.info(f"Admin update posted by {author}: {message}")
         
         return jsonify({
             'success': True,
@@ -6964,9 +7375,7 @@ def admin_update():
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error posting admin update: {e}")
-        import traceback
-        traceback.print_exc()
+        admin_log.exception(f"Error posting admin update: {e}")
         return jsonify({'error': 'Failed to post update', 'message': str(e)}), 500
 
 @app.route('/api/twitch/goals', methods=['GET'])
@@ -6983,7 +7392,7 @@ def twitch_goals():
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching Twitch goals: {e}")
+        integrations_log.error(f"Error fetching Twitch goals: {e}")
         return jsonify({
             'followerGoal': 1000,
             'currentFollowers': 0,
@@ -7066,7 +7475,7 @@ def twitch_status():
                         })
                     else:
                         # API error - return 200 with isLive: false so frontend doesn't break
-                        print(f"Twitch streams API error: {response.status_code} - {response.text[:200]}")
+                        integrations_log.error(f"Twitch streams API error: {response.status_code} - {response.text[:200]}")
                         return jsonify({
                             'isLive': False,
                             'error': f'Twitch API error: {response.status_code}',
@@ -7075,7 +7484,7 @@ def twitch_status():
                         }), 200
                 else:
                     # User not found - return 200 with isLive: false
-                    print(f"Twitch user not found: {twitch_username}")
+                    integrations_log.warning(f"Twitch user not found: {twitch_username}")
                     return jsonify({
                         'isLive': False,
                         'error': 'Twitch user not found',
@@ -7084,7 +7493,7 @@ def twitch_status():
                     }), 200
             else:
                 # User lookup failed - return 200 with isLive: false
-                print(f"Twitch user lookup failed: {user_response.status_code} - {user_response.text[:200]}")
+                integrations_log.error(f"Twitch user lookup failed: {user_response.status_code} - {user_response.text[:200]}")
                 return jsonify({
                     'isLive': False,
                     'error': f'Twitch API error: {user_response.status_code}',
@@ -7101,7 +7510,7 @@ def twitch_status():
                 'message': 'Twitch API not configured'
             }), 200
     except requests.exceptions.Timeout:
-        print("Twitch API request timeout")
+        integrations_log.warning("Twitch API request timeout")
         return jsonify({
             'isLive': False,
             'error': 'Request timeout',
@@ -7110,9 +7519,7 @@ def twitch_status():
         }), 200  # Return 200 so frontend doesn't break
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error checking Twitch status: {e}")
-        import traceback
-        traceback.print_exc()
+        integrations_log.exception(f"Error checking Twitch status: {e}")
         return jsonify({
             'isLive': False,
             'error': str(e),
@@ -7187,15 +7594,15 @@ def gemini_chat():
             if response.status_code == 404:
                 # Try fallback to the other model if the requested one doesn't exist
                 fallback_model = 'gemini-2.5-pro' if model_name == 'gemini-3-pro-preview' else 'gemini-3-pro-preview'
-                print(f"Model {model_name} not found, trying {fallback_model}...")
+                integrations_log.warning(f"Model {model_name} not found, trying {fallback_model}...")
                 model_name = fallback_model
                 url = f'https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={GOOGLE_AI_API_KEY}'
                 response = requests.post(url, json=payload, headers=headers, timeout=30)
             
             if response.status_code != 200:
                 error_text = response.text[:500] if response.text else 'No error details'
-                print(f"Gemini API error: {response.status_code} - {error_text}")
-                print(f"Request URL: {url.split('?')[0]}")  # Don't log the API key
+                integrations_log.error(f"Gemini API error: {response.status_code} - {error_text}")
+                integrations_log.error(f"Request URL: {url.split('?')[0]}")  # Don't log the API key
                 
                 # Return a user-friendly error
                 error_msg = f'Gemini API error ({response.status_code})'
@@ -7225,7 +7632,7 @@ def gemini_chat():
                 text = data.get('text', 'No response')
             
             if not text or text == 'No response':
-                print(f"Unexpected Gemini response format: {json.dumps(data, indent=2)}")
+                integrations_log.warning(f"Unexpected Gemini response format: {json.dumps(data, indent=2)}")
                 return jsonify({
                     'error': 'Unexpected response format from Gemini API',
                     'text': 'Sorry, I received an unexpected response from the AI service.'
@@ -7236,13 +7643,13 @@ def gemini_chat():
             })
             
         except requests.exceptions.Timeout:
-            print("Gemini API request timeout")
+            integrations_log.warning("Gemini API request timeout")
             return jsonify({
                 'error': 'Request timeout',
                 'text': 'The AI service took too long to respond. Please try again.'
             }), 504
         except requests.exceptions.RequestException as e:
-            print(f"Gemini API request exception: {e}")
+            integrations_log.error(f"Gemini API request exception: {e}")
             return jsonify({
                 'error': 'Network error',
                 'text': 'Failed to connect to the AI service. Please check your connection.'
@@ -7250,15 +7657,13 @@ def gemini_chat():
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error in Gemini chat: {e}")
-        import traceback
-        traceback.print_exc()
+        integrations_log.exception(f"Error in Gemini chat: {e}")
         return jsonify({'error': 'Internal server error', 'message': str(e)}), 500
 
 @socketio.on('connect')
 def handle_connect():
     """Track user when they connect (for notifications and user list)"""
-    print('Client connected')
+    socket_log.info('Client connected')
     try:
         # Try to get user info from JWT if available
         user_id = None
@@ -7294,25 +7699,25 @@ def handle_connect():
                 'last_seen': datetime.utcnow(),
                 'socket_id': request.sid
             }
-            print(f"User {user_id} ({user_name}) connected and tracked")
+            socket_log.info(f"User {user_id} ({user_name}) connected and tracked")
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error tracking user connection: {e}")
+        socket_log.error(f"Error tracking user connection: {e}")
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Remove user when they disconnect"""
-    print('Client disconnected')
+    socket_log.info('Client disconnected')
     try:
         # Find and remove user by socket ID
         for user_id, user_data in list(active_users.items()):
             if user_data.get('socket_id') == request.sid:
                 del active_users[user_id]
-                print(f"User {user_id} disconnected and removed from active users")
+                socket_log.info(f"User {user_id} disconnected and removed from active users")
                 break
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error tracking user disconnection: {e}")
+        socket_log.error(f"Error tracking user disconnection: {e}")
 
 @socketio.on('join_notifications')
 def handle_join_notifications(data):
@@ -7321,7 +7726,309 @@ def handle_join_notifications(data):
     if user_id:
         room = f'user_{user_id}'
         join_room(room)
-        print(f'User {user_id} joined notification room: {room}')
+        socket_log.info(f'User {user_id} joined notification room: {room}')
+
+# Dashboard search - clients and support requests (ventures)
+# PostgreSQL uses the pg_trgm/tsvector expression indexes from migration 50; other
+# databases (SQLite test runs) fall back to an in-memory inverted index
+from search_index import InvertedIndex, build_prefix_tsquery
+
+SEARCH_MAX_PER_PAGE = 100
+
+# These expressions must match the index definitions in 50_add_search_indexes.py exactly
+CLIENT_SEARCH_DOCUMENT = "coalesce(clients.name, '') || ' ' || coalesce(clients.email, '') || ' ' || coalesce(clients.company, '')"
+SUPPORT_REQUEST_SEARCH_DOCUMENT = "coalesce(support_requests.subject, '') || ' ' || coalesce(support_requests.description, '')"
+
+
+class DashboardSearch:
+    """
+    Ranked prefix search for clients and ventures
+
+    search() narrows a caller's ORM query (with its status/employee filters
+    already applied) to the matches and returns them best first. PostgreSQL
+    matches and ranks in SQL; other databases rank with an in-memory index and
+    select the matching ids in chunks, so a broad query never binds more
+    parameters than the database allows.
+    """
+
+    FIELD_WEIGHTS = {
+        'clients': {'name': 3.0, 'company': 2.0, 'email': 1.0},
+        'support_requests': {'subject': 3.0, 'client': 2.0, 'description': 1.0},
+    }
+    # Ids bound per IN (...) on the in-memory path; below SQLite's historical 999-variable limit
+    ID_CHUNK = 500
+
+    def __init__(self):
+        self._indexes = {}
+        self._dirty = set(self.FIELD_WEIGHTS)
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, *kinds):
+        with self._lock:
+            self._dirty.update(kinds)
+
+    def _pg_match(self, document, q, tsq):
+        """tsvector prefix match OR trigram-indexed substring match on a document expression"""
+        from sqlalchemy import text
+        if tsq:
+            return text(
+                f"(to_tsvector('simple', {document}) @@ to_tsquery('simple', :tsq) OR {document} ILIKE :pattern)"
+            ).bindparams(tsq=tsq, pattern=f"%{q}%")
+        return text(f"{document} ILIKE :pattern").bindparams(pattern=f"%{q}%")
+
+    def _pg_rank(self, document, q, tsq):
+        from sqlalchemy import text
+        if tsq:
+            return text(
+                f"(ts_rank(to_tsvector('simple', {document}), to_tsquery('simple', :tsq)) + word_similarity(:q, {document})) DESC"
+            ).bindparams(tsq=tsq, q=q)
+        return text(f"word_similarity(:q, {document}) DESC").bindparams(q=q)
+
+    def _index(self, kind):
+        """Return the in-memory index for kind, rebuilding it if rows changed since the last build"""
+        with self._lock:
+            if kind not in self._dirty and kind in self._indexes:
+                return self._indexes[kind]
+            self._dirty.discard(kind)
+
+        index = InvertedIndex(self.FIELD_WEIGHTS[kind])
+        if kind == 'clients':
+            rows = db.session.query(Client.id, Client.name, Client.email, Client.company).order_by(Client.created_at)
+            for row in rows:
+                index.add(row.id, {'name': row.name, 'email': row.email, 'company': row.company})
+        else:
+            rows = db.session.query(
+                SupportRequest.id, SupportRequest.subject, SupportRequest.description, Client.name, Client.email, Client.company
+            ).outerjoin(Client, SupportRequest.client_id == Client.id).order_by(SupportRequest.created_at)
+            for row in rows:
+                client = ' '.join(filter(None, (row.name, row.email, row.company)))
+                index.add(row.id, {'subject': row.subject, 'description': row.description, 'client': client})
+
+        with self._lock:
+            self._indexes[kind] = index
+        return index
+
+    def _memory_search(self, query, model, kind, q, page, per_page):
+        ranked, _ = self._index(kind).search(q)
+        ids = [doc_id for doc_id, _ in ranked]
+        # Keep the matches the caller's filters allow, in rank order
+        allowed = set()
+        for i in range(0, len(ids), self.ID_CHUNK):
+            chunk = query.filter(model.id.in_(ids[i:i + self.ID_CHUNK])).with_entities(model.id).order_by(None)
+            allowed.update(row_id for (row_id,) in chunk)
+        matched = [doc_id for doc_id in ids if doc_id in allowed]
+        total = len(matched)
+        if page is not None:
+            matched = matched[(page - 1) * per_page:page * per_page]
+
+        rows = {}
+        for i in range(0, len(matched), self.ID_CHUNK):
+            rows.update((row.id, row) for row in query.filter(model.id.in_(matched[i:i + self.ID_CHUNK])).order_by(None))
+        return [rows[doc_id] for doc_id in matched if doc_id in rows], total
+
+    def _pg_clause(self, kind, q):
+        """(filter clause, order_by clause) matching q, best match first"""
+        tsq = build_prefix_tsquery(q)
+        if kind == 'clients':
+            return self._pg_match(CLIENT_SEARCH_DOCUMENT, q, tsq), self._pg_rank(CLIENT_SEARCH_DOCUMENT, q, tsq)
+
+        # Two index-backed lookups instead of an OR across the join, which would force a scan
+        matching_clients = db.session.query(Client.id).filter(self._pg_match(CLIENT_SEARCH_DOCUMENT, q, tsq))
+        match = db.or_(
+            self._pg_match(SUPPORT_REQUEST_SEARCH_DOCUMENT, q, tsq),
+            SupportRequest.client_id.in_(matching_clients.scalar_subquery())
+        )
+        return match, self._pg_rank(SUPPORT_REQUEST_SEARCH_DOCUMENT, q, tsq)
+
+    def search(self, query, kind, q, page=None, per_page=None):
+        """
+        Run a search within query
+
+        Args:
+            query: ORM query over Client or SupportRequest, with any other filters applied
+            kind: 'clients' or 'support_requests' (ventures; also matches the linked client's name/email/company)
+            q: Raw search text
+            page: 1-based page to return, or None for every match
+            per_page: Page size when page is given
+
+        Returns:
+            Tuple of (rows best match first, total matches)
+        """
+        model = Client if kind == 'clients' else SupportRequest
+        if db.engine.dialect.name != 'postgresql':
+            return self._memory_search(query, model, kind, q, page, per_page)
+
+        match, rank = self._pg_clause(kind, q)
+        query = query.filter(match)
+        total = query.order_by(None).count()
+        query = query.order_by(rank, model.created_at.desc())
+        if page is not None:
+            query = query.offset((page - 1) * per_page).limit(per_page)
+        return query.all(), total
+
+dashboard_search = DashboardSearch()
+
+if DB_AVAILABLE:
+    from sqlalchemy import event
+
+    @event.listens_for(db.session, 'after_flush')
+    def mark_search_indexes_dirty(session, flush_context):
+        """Invalidate the in-memory search indexes when clients or support requests change"""
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, Client):
+                dashboard_search.mark_dirty('clients', 'support_requests')  # Ventures also match on client fields
+            elif isinstance(obj, SupportRequest):
+                dashboard_search.mark_dirty('support_requests')
+
+
+def search_page_params(default_per_page=50):
+    """Read page/perPage query params, clamped to SEARCH_MAX_PER_PAGE"""
+    page = max(1, request.args.get('page', 1, type=int) or 1)
+    per_page = request.args.get('perPage', default_per_page, type=int) or default_per_page
+    return page, max(1, min(per_page, SEARCH_MAX_PER_PAGE))
+
+# Keyset pagination helpers - cursors are opaque base64 of "<created_at iso>|<id>"
+
+# Below this many estimated rows an exact COUNT(*) is cheap enough to run
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def encode_cursor(created_at, item_id):
+    """Encode the (created_at, id) of the last row on a page as an opaque cursor"""
+    import base64
+    raw = f"{created_at.isoformat()}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor into a (created_at, id) tuple, or None if missing/invalid"""
+    if not cursor:
+        return None
+    import base64
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, item_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), item_id
+    except (ValueError, UnicodeError):
+        return None
+
+
+def estimate_count(query):
+    """
+    Count the rows a query would return, using the planner's estimate on PostgreSQL
+    
+    Args:
+        query: ORM query (ordering is ignored)
+    
+    Returns:
+        Tuple of (count, is_estimate). Falls back to an exact COUNT(*) on other
+        databases or when the estimate is small enough that counting is cheap.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy import text
+        try:
+            statement = query.order_by(None).statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+            plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate >= EXACT_COUNT_THRESHOLD:
+                return estimate, True
+        except Exception as e:
+            db.session.rollback()
+            db_log.error(f"Error estimating row count, falling back to COUNT(*): {e}")
+    return query.order_by(None).count(), False
+
+
+# Delta sync - list endpoints accept ?since=<syncCursor> and return only rows whose
+# updated_at moved past the cursor plus tombstones from deletion_log. Cursors reuse the
+# keyset format: "<server time>|<last deletion_log id>"
+# Deltas are unscoped: filters (status, assignee, linked entity, employee) only apply to
+# full listings, since a row that moves out of a filter has no tombstone and a scoped
+# delta could never tell the replica to drop it. Replicas filter changed rows locally.
+
+# Re-send rows updated this close to the cursor so transactions that committed late aren't missed
+DELTA_SYNC_OVERLAP_SECONDS = 5
+DELETION_LOG_RETENTION_DAYS = 30
+
+
+def record_deletion(entity_type, entity_id):
+    """Add a tombstone to the current transaction (commit it together with the delete)"""
+    db.session.add(DeletionLog(entity_type=entity_type, entity_id=str(entity_id)))
+    cutoff = datetime.utcnow() - timedelta(days=DELETION_LOG_RETENTION_DAYS)
+    DeletionLog.query.filter(DeletionLog.deleted_at < cutoff).delete(synchronize_session=False)
+
+
+def snapshot_sync_cursor():
+    """Cursor for a response, taken before reading rows so nothing committed meanwhile is skipped"""
+    try:
+        last_seq = db.session.query(db.func.max(DeletionLog.id)).scalar() or 0
+    except Exception as e:
+        db.session.rollback()  # deletion_log missing until its migration runs
+        db_log.error(f"Error reading deletion log: {e}")
+        return None
+    return encode_cursor(datetime.utcnow(), last_seq)
+
+
+def read_delta_since(entity_type, since):
+    """
+    Resolve a ?since= cursor for an entity
+    
+    Args:
+        entity_type: deletion_log entity type (task, client, support_request)
+        since: Cursor from a previous response's syncCursor
+    
+    Returns:
+        Tuple of (changed_after, deleted ids), or None if the cursor is invalid or older
+        than the deletion log retention (the client must do a full fetch)
+    """
+    cursor = decode_cursor(since)
+    if not cursor:
+        return None
+    synced_at, last_seq = cursor
+    if synced_at < datetime.utcnow() - timedelta(days=DELETION_LOG_RETENTION_DAYS):
+        return None
+    try:
+        last_seq = int(last_seq)
+    except ValueError:
+        return None
+    deleted = [
+        entity_id for (entity_id,) in db.session.query(DeletionLog.entity_id).filter(
+            DeletionLog.entity_type == entity_type,
+            DeletionLog.id > last_seq
+        ).order_by(DeletionLog.id)
+    ]
+    return synced_at - timedelta(seconds=DELTA_SYNC_OVERLAP_SECONDS), deleted
+
+
+def delta_sync_expired_response(key):
+    return jsonify({key: [], 'error': 'Sync cursor expired or invalid', 'resync': True}), 410
+
+
+_table_columns = {}
+
+
+def get_table_columns(table_name):
+    """Column names of a table, or None if it doesn't exist yet (cached once found, migrations run before serving)"""
+    columns = _table_columns.get(table_name)
+    if columns is None:
+        from sqlalchemy import inspect
+        try:
+            inspector = inspect(db.engine)
+            if table_name in inspector.get_table_names():
+                columns = _table_columns[table_name] = frozenset(col['name'] for col in inspector.get_columns(table_name))
+        except Exception:
+            db.session.rollback()
+    return columns
+
+
+def parse_client_include(value):
+    """Parse ?include=notes,tags,marketingBudget (or 'all') into a set of Client.DETAIL_FIELDS keys"""
+    if not value:
+        return set()
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    if 'all' in requested:
+        return set(Client.DETAIL_FIELDS)
+    return requested & set(Client.DETAIL_FIELDS)
 
 # Creative Dashboard - Client Management API Endpoints
 
@@ -7346,19 +8053,9 @@ def get_clients():
     try:
         # No authentication required - anyone can view clients
         
-        # Check if clients table exists first
-        from sqlalchemy import inspect
-        inspector = inspect(db.engine)
-        table_exists = False
-        try:
-            tables = inspector.get_table_names()
-            table_exists = 'clients' in tables
-        except Exception:
-            db.session.rollback()
-            pass
-        
         # If table doesn't exist, return empty array instead of error
-        if not table_exists:
+        client_columns = get_table_columns('clients')
+        if client_columns is None:
             return jsonify({
                 'clients': [],
                 'message': 'Clients table not yet initialized. No clients available.'
@@ -7367,74 +8064,85 @@ def get_clients():
         # Get query parameters
         status = request.args.get('status', 'all')
         employee_id = request.args.get('employee_id', None)
-        search = request.args.get('search', '')
+        search = request.args.get('search', '').strip()
+        include = parse_client_include(request.args.get('include'))
+        
+        # Only load the columns the response needs: skip detail columns that weren't
+        # requested and budget/deadline if their migration hasn't run yet
+        from sqlalchemy.orm import load_only, selectinload
+        columns_to_load = [
+            Client.id, Client.name, Client.email, Client.company, Client.phone,
+            Client.status, Client.tier, Client.google_analytics_property_key,
+            Client.user_id, Client.created_at, Client.updated_at
+        ]
+        columns_to_load += [getattr(Client, Client.DETAIL_FIELDS[field]) for field in include]
+        columns_to_load += [getattr(Client, column) for column in ('budget', 'deadline') if column in client_columns]
+        query = db.session.query(Client).options(
+            load_only(*columns_to_load),
+            selectinload(Client.employee_assignments),
+            selectinload(Client.dashboard_connections)
+        )
         
-        # Check if budget and deadline columns exist before using ORM
-        # This prevents errors if migration hasn't run yet
-        from sqlalchemy import inspect
-        inspector = inspect(db.engine)
-        has_budget_column = False
-        has_deadline_column = False
-        try:
-            if 'clients' in inspector.get_table_names():
-                columns = [col['name'] for col in inspector.get_columns('clients')]
-                has_budget_column = 'budget' in columns
-                has_deadline_column = 'deadline' in columns
-        except Exception:
-            pass
+        def serialize(clients):
+            return [client.to_dict(include=include) for client in clients]
         
-        # Build query - use load_only to exclude columns that don't exist yet
-        if has_budget_column and has_deadline_column:
-            # All columns exist, use normal query
-            query = Client.query
-        else:
-            # Some columns missing, use load_only to exclude them
-            from sqlalchemy.orm import load_only
-            columns_to_load = [
-                Client.id, Client.name, Client.email, Client.company, Client.phone,
-                Client.status, Client.tier, Client.notes, Client.tags,
-                Client.marketing_budget, Client.google_analytics_property_key,
-                Client.user_id, Client.created_at, Client.updated_at
-            ]
-            if has_budget_column:
-                columns_to_load.append(Client.budget)
-            if has_deadline_column:
-                columns_to_load.append(Client.deadline)
-            query = db.session.query(Client).options(load_only(*columns_to_load))
+        since = request.args.get('since')
+        sync_cursor = snapshot_sync_cursor()
+        if since:
+            delta = read_delta_since('client', since)
+            if delta is None:
+                return delta_sync_expired_response('clients')
+            changed_after, deleted = delta
+            clients = query.filter(Client.updated_at > changed_after).order_by(Client.updated_at).all()
+            return jsonify({'clients': serialize(clients), 'deleted': deleted, 'syncCursor': sync_cursor}), 200
         
+        # Filters apply after the delta branch, so a client leaving the filter still reaches a replica
         if status != 'all':
             query = query.filter(Client.status == status)
-        
-        if search:
-            query = query.filter(
-                db.or_(
-                    Client.name.ilike(f'%{search}%'),
-                    Client.email.ilike(f'%{search}%'),
-                    Client.company.ilike(f'%{search}%')
-                )
-            )
-        
-        clients = query.order_by(Client.created_at.desc()).all()
-        
-        # No user filtering - show all clients
-        # Optional employee filter if specified
         if employee_id:
             try:
                 emp_id_int = int(employee_id)
-                clients = [c for c in clients if c.employee_assignments and 
-                          any(a.employee_id == emp_id_int for a in c.employee_assignments)]
+                # Semi-join so a client assigned twice to the same employee is still returned once
+                assigned = db.session.query(ClientEmployeeAssignment.client_id).filter(ClientEmployeeAssignment.employee_id == emp_id_int)
+                query = query.filter(Client.id.in_(assigned.scalar_subquery()))
             except (ValueError, TypeError):
-                db.session.rollback()  # Rollback failed transaction
                 pass  # Invalid employee_id, ignore filter
         
+        if search:
+            # Ranked results can't be keyset paginated, so search pages by offset
+            if 'page' in request.args or 'perPage' in request.args:
+                page, per_page = search_page_params()
+                clients, total = dashboard_search.search(query, 'clients', search, page, per_page)
+                return jsonify({'clients': serialize(clients), 'total': total, 'page': page, 'perPage': per_page}), 200
+            clients, _ = dashboard_search.search(query, 'clients', search)
+            return jsonify({'clients': serialize(clients)}), 200
+        
+        # Keyset pagination is opt-in (limit or cursor) so existing callers still receive the full list
+        if 'limit' in request.args or 'cursor' in request.args:
+            limit = max(1, min(request.args.get('limit', 50, type=int) or 50, SEARCH_MAX_PER_PAGE))
+            total, total_is_estimate = estimate_count(query)
+            cursor = decode_cursor(request.args.get('cursor'))
+            if cursor:
+                query = query.filter(db.tuple_(Client.created_at, Client.id) < cursor)
+            clients = query.order_by(Client.created_at.desc(), Client.id.desc()).limit(limit + 1).all()
+            next_cursor = encode_cursor(clients[limit - 1].created_at, clients[limit - 1].id) if len(clients) > limit else None
+            return jsonify({
+                'clients': serialize(clients[:limit]),
+                'total': total,
+                'totalIsEstimate': total_is_estimate,
+                'nextCursor': next_cursor,
+                'syncCursor': sync_cursor
+            }), 200
+        
+        clients = query.order_by(Client.created_at.desc(), Client.id.desc()).all()
+        
         return jsonify({
-            'clients': [client.to_dict() for client in clients]
+            'clients': serialize(clients),
+            'syncCursor': sync_cursor
         }), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching clients: {e}")
-        import traceback
-        traceback.print_exc()
+        creative_log.exception(f"Error fetching clients: {e}")
         
         error_msg = str(e).lower()
         
@@ -7492,7 +8200,7 @@ def create_demo_lead():
         db.session.add(client)
         db.session.commit()
         
-        print(f"✓ Created prospect from demo form: {client.email} ({client.id})")
+        creative_log.info(f"✓ Created prospect from demo form: {client.email} ({client.id})")
         
         return jsonify({
             'message': 'Demo request submitted successfully',
@@ -7500,9 +8208,7 @@ def create_demo_lead():
         }), 201
         
     except Exception as e:
-        print(f"Error creating demo lead: {e}")
-        import traceback
-        traceback.print_exc()
+        creative_log.exception(f"Error creating demo lead: {e}")
         db.session.rollback()
         return jsonify({'error': f'Failed to submit demo request: {str(e)}'}), 500
 
@@ -7520,8 +8226,8 @@ def send_password_reset_email(email, name, reset_token):
         smtp_from = os.environ.get('SMTP_FROM', smtp_user or 'noreply@ventures.isharehow.app')
         
         if not smtp_user or not smtp_password:
-            print("⚠ SMTP credentials not configured. Password reset email not sent.")
-            print(f"   Reset URL for {email}: {reset_url}")
+            auth_log.warning("⚠ SMTP credentials not configured. Password reset email not sent.")
+            auth_log.info(f"Reset URL for {email}: {reset_url}")
             return False
         
         # Create email message
@@ -7576,13 +8282,11 @@ iShareHow Ventures Team
             server.login(smtp_user, smtp_password)
             server.send_message(msg)
         
-        print(f"✓ Password reset email sent to {email}")
+        auth_log.info(f"✓ Password reset email sent to {email}")
         return True
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"⚠ Error sending password reset email to {email}: {e}")
-        import traceback
-        traceback.print_exc()
+        auth_log.exception(f"⚠ Error sending password reset email to {email}: {e}")
         return False
 
 @app.route('/api/creative/clients', methods=['POST'])
@@ -7608,7 +8312,7 @@ def create_client():
         if existing_user:
             # User exists, link it to the client
             user = existing_user
-            print(f"✓ Linking existing user account to new client: {user.email}")
+            creative_log.info(f"✓ Linking existing user account to new client: {user.email}")
         else:
             # Create new user account for the client
             # Generate username from email (before @)
@@ -7632,7 +8336,7 @@ def create_client():
             db.session.add(user)
             db.session.flush()  # Get user.id without committing
             
-            print(f"✓ Created user account for client: {user.email} (ID: {user.id})")
+            creative_log.info(f"✓ Created user account for client: {user.email} (ID: {user.id})")
         
         # Create client and link to user account
         client = Client(
@@ -7684,9 +8388,7 @@ def create_client():
         return jsonify(client.to_dict()), 201
     except Exception as e:
         db.session.rollback()
-        print(f"Error creating client: {e}")
-        import traceback
-        traceback.print_exc()
+        creative_log.exception(f"Error creating client: {e}")
         return jsonify({'error': 'Failed to create client'}), 500
 
 @app.route('/api/auth/reset-password', methods=['POST'])
@@ -7718,7 +8420,7 @@ def reset_password():
             return jsonify({'error': 'Invalid token'}), 400
         except Exception as e:
             db.session.rollback()  # Rollback failed transaction
-            print(f"Token verification error: {e}")
+            auth_log.warning(f"Token verification error: {e}")
             return jsonify({'error': 'Invalid or expired token'}), 400
         
         # Find user
@@ -7738,13 +8440,11 @@ def reset_password():
         user.set_password(new_password)
         db.session.commit()
         
-        print(f"✓ Password reset successful for user: {user.email}")
+        auth_log.info(f"✓ Password reset successful for user: {user.email}")
         return jsonify({'message': 'Password reset successfully'}), 200
     except Exception as e:
         db.session.rollback()
-        print(f"Error resetting password: {e}")
-        import traceback
-        traceback.print_exc()
+        auth_log.exception(f"Error resetting password: {e}")
         return jsonify({'error': 'Failed to reset password'}), 500
 
 @app.route('/api/creative/clients/<client_id>', methods=['GET'])
@@ -7770,7 +8470,7 @@ def get_client(client_id):
         return jsonify(client.to_dict()), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching client: {e}")
+        creative_log.error(f"Error fetching client: {e}")
         return jsonify({'error': 'Failed to fetch client'}), 500
 
 @app.route('/api/creative/clients/<client_id>', methods=['PUT'])
@@ -7816,7 +8516,7 @@ def update_client(client_id):
         return jsonify(client.to_dict()), 200
     except Exception as e:
         db.session.rollback()
-        print(f"Error updating client: {e}")
+        creative_log.error(f"Error updating client: {e}")
         return jsonify({'error': 'Failed to update client'}), 500
 
 @app.route('/api/creative/clients/<client_id>', methods=['DELETE'])
@@ -7831,12 +8531,13 @@ def delete_client(client_id):
             return jsonify({'error': 'Client not found'}), 404
         
         db.session.delete(client)
+        record_deletion('client', client_id)
         db.session.commit()
         
         return jsonify({'message': 'Client deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
-        print(f"Error deleting client: {e}")
+        creative_log.error(f"Error deleting client: {e}")
         return jsonify({'error': 'Failed to delete client'}), 500
 
 @app.route('/api/creative/clients/<client_id>/employees', methods=['GET'])
@@ -7871,16 +8572,14 @@ def get_client_employees(client_id):
                         employee_data['email'] = user.email or ''
                         employee_data['role'] = assignment.employee_name or 'Team Member'
                 except Exception as e:
-                    print(f"Error fetching user details for employee_id {assignment.employee_id}: {e}")
+                    creative_log.error(f"Error fetching user details for employee_id {assignment.employee_id}: {e}")
             
             employees.append(employee_data)
         
         return jsonify({'employees': employees}), 200
     except Exception as e:
         db.session.rollback()
-        print(f"Error fetching client employees: {e}")
-        import traceback
-        traceback.print_exc()
+        creative_log.exception(f"Error fetching client employees: {e}")
         return jsonify({'employees': [], 'error': 'Failed to fetch employees'}), 500
 
 @app.route('/api/creative/clients/<client_id>/assign-employee', methods=['POST'])
@@ -7929,6 +8628,7 @@ def assign_employee(client_id):
         
         # Remove existing assignments
         ClientEmployeeAssignment.query.filter_by(client_id=client_id).delete()
+        client.updated_at = datetime.utcnow()  # Assignments are part of the client row for delta sync
         
         # Create new assignment if provided
         if employee_id or employee_name:
@@ -7944,7 +8644,7 @@ def assign_employee(client_id):
         return jsonify(client.to_dict()), 200
     except Exception as e:
         db.session.rollback()
-        print(f"Error assigning employee: {e}")
+        creative_log.error(f"Error assigning employee: {e}")
         return jsonify({'error': 'Failed to assign employee'}), 500
 
 @app.route('/api/creative/clients/<client_id>/dashboard-connections', methods=['GET'])
@@ -7969,7 +8669,7 @@ def get_client_dashboard_connections(client_id):
         }), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching dashboard connections: {e}")
+        creative_log.error(f"Error fetching dashboard connections: {e}")
         return jsonify({'error': 'Failed to fetch connections'}), 500
 
 @app.route('/api/creative/clients/<client_id>/dashboard-connections', methods=['POST'])
@@ -8008,12 +8708,13 @@ def update_dashboard_connections(client_id):
             if dashboard_type not in dashboard_types:
                 connection.enabled = False
         
+        client.updated_at = datetime.utcnow()  # Connections are part of the client row for delta sync
         db.session.commit()
         
         return jsonify(client.to_dict()), 200
     except Exception as e:
         db.session.rollback()
-        print(f"Error updating dashboard connections: {e}")
+        creative_log.error(f"Error updating dashboard connections: {e}")
         return jsonify({'error': 'Failed to update connections'}), 500
 
 @app.route('/api/creative/employees', methods=['GET'])
@@ -8040,47 +8741,32 @@ def get_employees():
         if not user:
             return jsonify({'error': 'Authentication required'}), 401
         
-        # Check if is_employee column exists
-        column_exists = check_is_employee_column_exists()
+        # Without the is_employee column every directory entry counts as an employee
+        prefix = (request.args.get('q') or '').strip()
+        limit = directory_limit()
+        directory = user_directory.entries()
+        has_employees = any(entry.is_employee for entry in directory)
         
         employees = []
-        if column_exists:
-            # Get all users with is_employee flag set to True
-            try:
-                users = User.query.filter_by(is_employee=True).all()
-            except Exception as e:
-                db.session.rollback()  # Rollback failed transaction
-                error_str = str(e).lower()
-                if 'is_employee' in error_str and 'column' in error_str:
-                    # Column doesn't exist, fallback to all users
-                    users = User.query.all()
-                else:
-                    raise
-        else:
-            # Column doesn't exist, get all users
-            users = User.query.all()
-        
-        # If no employees found and column exists, include all users (for backward compatibility)
-        if not users and column_exists:
-            users = User.query.all()
-        
-        for user in users:
-            # Safely check if user is employee
-            is_emp = safe_get_is_employee(user) if column_exists else True
+        for entry in user_directory.search(prefix):
+            # If there are no employees at all, include all users (for backward compatibility)
+            if has_employees and not entry.is_employee:
+                continue
             employees.append({
-                'id': user.id,
-                'name': user.username or user.email or f'User {user.id}',
-                'email': user.email or '',
-                'is_admin': getattr(user, 'is_admin', False),
-                'is_employee': is_emp
+                'id': entry.db_id,
+                'name': entry.name if entry.name != 'Unknown' else f'User {entry.db_id}',
+                'email': entry.email or '',
+                'is_admin': entry.is_admin,
+                'is_employee': entry.is_employee,
+                'isActive': entry.workspace_id in active_users
             })
+            if limit and len(employees) >= limit:
+                break
         
         return jsonify({'employees': employees}), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching employees: {e}")
-        import traceback
-        traceback.print_exc()
+        creative_log.exception(f"Error fetching employees: {e}")
         
         # Check if it's a database connection error
         error_info = get_database_error_message(e)
@@ -8089,6 +8775,90 @@ def get_employees():
 
 # Creative Dashboard - Metrics API Endpoint
 
+# Creative metrics are polled by every open dashboard, so results are cached per
+# employee for a few seconds and dropped whenever clients, assignments or support
+# requests are committed
+CREATIVE_METRICS_CACHE_TTL = float(os.getenv('CREATIVE_METRICS_CACHE_TTL', '5'))
+_creative_metrics_cache = {}
+_creative_metrics_lock = threading.Lock()
+
+
+def invalidate_creative_metrics():
+    with _creative_metrics_lock:
+        _creative_metrics_cache.clear()
+
+
+if DB_AVAILABLE:
+    from sqlalchemy import event
+
+    @event.listens_for(db.session, 'after_flush')
+    def note_creative_metrics_changes(session, flush_context):
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, (Client, ClientEmployeeAssignment, SupportRequest)):
+                session.info['creative_metrics_dirty'] = True
+                return
+
+    @event.listens_for(db.session, 'after_commit')
+    def invalidate_creative_metrics_on_commit(session):
+        if session.info.pop('creative_metrics_dirty', False):
+            invalidate_creative_metrics()
+
+    @event.listens_for(db.session, 'after_rollback')
+    def reset_creative_metrics_flag(session):
+        session.info.pop('creative_metrics_dirty', None)
+
+
+def compute_creative_metrics(employee_db_id):
+    """
+    All Creative Dashboard counts for one employee in a single statement
+    
+    Two one-row CTEs (client counts and support request counts over the employee's
+    assigned clients) use FILTER (WHERE ...) aggregates and are cross joined.
+    """
+    from sqlalchemy import select, func, and_, true
+    now = datetime.utcnow()
+    first_day_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    assigned = select(ClientEmployeeAssignment.client_id).where(
+        ClientEmployeeAssignment.employee_id == employee_db_id
+    ).distinct().cte('assigned_clients')
+    
+    client_counts = select(
+        func.count().label('total_clients'),
+        func.count().filter(Client.status == 'active').label('active_clients'),
+        func.count().filter(Client.created_at >= first_day_of_month).label('clients_this_month')
+    ).where(Client.id.in_(select(assigned.c.client_id))).cte('client_counts')
+    
+    request_counts = select(
+        func.count().filter(SupportRequest.status.in_(['open', 'in-progress'])).label('open_requests'),
+        func.count().filter(and_(
+            SupportRequest.status == 'resolved',
+            SupportRequest.updated_at >= today_start
+        )).label('resolved_today')
+    ).select_from(SupportRequest)
+    # Older databases without support_requests.client_id count every request, as before
+    if 'client_id' in (get_table_columns('support_requests') or ()):
+        request_counts = request_counts.where(SupportRequest.client_id.in_(select(assigned.c.client_id)))
+    request_counts = request_counts.cte('request_counts')
+    
+    # Explicit ON TRUE join: both sides are one row, and it keeps SQLAlchemy's cartesian product linter quiet
+    row = db.session.execute(
+        select(client_counts, request_counts).select_from(client_counts.join(request_counts, true()))
+    ).one()
+    
+    # Progress: percentage of active clients out of total
+    progress = int((row.active_clients / row.total_clients) * 100) if row.total_clients else 0
+    return {
+        'clients': row.active_clients,
+        'clientsThisMonth': row.clients_this_month,
+        'projects': row.open_requests,  # Using open support requests as "projects in progress"
+        'tasks': row.resolved_today,  # Support requests resolved today
+        'completion': progress,
+        'totalClients': row.total_clients
+    }
+
+
 @app.route('/api/creative/metrics', methods=['GET'])
 @require_employee
 def get_creative_metrics():
@@ -8097,154 +8867,24 @@ def get_creative_metrics():
         return jsonify({'error': 'Database not available'}), 500
     
     try:
-        # Get current user (employee)
-        user_id = get_jwt_identity()
-        if not user_id:
-            return jsonify({'error': 'Authentication required'}), 401
-        
-        # Find user
-        user = None
-        if user_id.isdigit():
-            user = User.query.get(int(user_id))
-        if not user:
-            user = User.query.filter_by(username=user_id).first()
-        if not user:
-            user = User.query.filter_by(patreon_id=user_id).first()
-        if not user:
-            user = User.query.filter_by(ens_name=user_id).first()
-        
+        # require_employee already resolved the user
+        user = g.get('current_user') or get_current_user()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Get employee's database ID
-        employee_db_id = user.id
-        
-        # Count active clients assigned to this employee
-        # Active = status = 'active' and assigned to this employee
-        try:
-            active_clients_query = db.session.query(Client).join(
-                ClientEmployeeAssignment,
-                Client.id == ClientEmployeeAssignment.client_id
-            ).filter(
-                ClientEmployeeAssignment.employee_id == employee_db_id,
-                Client.status == 'active'
-            )
-            active_clients_count = active_clients_query.count()
-        except Exception as e:
-            db.session.rollback()  # Rollback failed transaction
-            app.logger.warning(f"Error counting active clients: {e}")
-            active_clients_count = 0
+        now = time.monotonic()
+        with _creative_metrics_lock:
+            cached = _creative_metrics_cache.get(user.id)
+        if cached and cached[0] > now:
+            return jsonify(cached[1])
         
-        # Count clients created this month (assigned to employee)
-        try:
-            first_day_of_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            clients_this_month = db.session.query(Client).join(
-                ClientEmployeeAssignment,
-                Client.id == ClientEmployeeAssignment.client_id
-            ).filter(
-                ClientEmployeeAssignment.employee_id == employee_db_id,
-                Client.created_at >= first_day_of_month
-            ).count()
-        except Exception as e:
-            db.session.rollback()  # Rollback failed transaction
-            app.logger.warning(f"Error counting clients this month: {e}")
-            clients_this_month = 0
-        
-        # Count support requests with status 'open' or 'in-progress' (assigned to employee's clients)
-        # Handle case where client_id column might not exist in support_requests table
-        try:
-            # Try to use client_id join if column exists
-            open_support_requests = db.session.query(SupportRequest).join(
-                ClientEmployeeAssignment,
-                SupportRequest.client_id == ClientEmployeeAssignment.client_id
-            ).filter(
-                ClientEmployeeAssignment.employee_id == employee_db_id,
-                SupportRequest.status.in_(['open', 'in-progress'])
-            ).count()
-        except Exception as e:
-            db.session.rollback()  # Rollback failed transaction
-            # Check if it's a column error
-            error_str = str(e).lower()
-            if 'client_id' in error_str or 'column' in error_str or 'undefinedcolumn' in error_str:
-                app.logger.info("client_id column not found in support_requests, using fallback")
-            else:
-                app.logger.warning(f"Error counting support requests: {e}")
-            # Fallback: count all open/in-progress support requests if client_id column doesn't exist
-            try:
-                open_support_requests = db.session.query(SupportRequest).filter(
-                    SupportRequest.status.in_(['open', 'in-progress'])
-                ).count()
-            except Exception as e2:
-                db.session.rollback()  # Rollback failed transaction
-                app.logger.warning(f"Error in fallback support request count: {e2}")
-                open_support_requests = 0
-        
-        # Count total clients assigned to employee (for progress calculation)
-        try:
-            total_clients = db.session.query(Client).join(
-                ClientEmployeeAssignment,
-                Client.id == ClientEmployeeAssignment.client_id
-            ).filter(
-                ClientEmployeeAssignment.employee_id == employee_db_id
-            ).count()
-        except Exception as e:
-            db.session.rollback()  # Rollback failed transaction
-            app.logger.warning(f"Error counting total clients: {e}")
-            total_clients = 0
-        
-        # Calculate progress: percentage of active clients out of total
-        # Or use a different metric - for now, use active/total * 100
-        progress = 0
-        if total_clients > 0:
-            progress = int((active_clients_count / total_clients) * 100)
-        
-        # Count tasks completed today (from support requests resolved today)
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        try:
-            # Try to use client_id join if column exists
-            tasks_completed_today = db.session.query(SupportRequest).join(
-                ClientEmployeeAssignment,
-                SupportRequest.client_id == ClientEmployeeAssignment.client_id
-            ).filter(
-                ClientEmployeeAssignment.employee_id == employee_db_id,
-                SupportRequest.status == 'resolved',
-                SupportRequest.updated_at >= today_start
-            ).count()
-        except Exception as e:
-            db.session.rollback()  # Rollback failed transaction
-            # Check if it's a column error
-            error_str = str(e).lower()
-            if 'client_id' in error_str or 'column' in error_str or 'undefinedcolumn' in error_str:
-                app.logger.info("client_id column not found in support_requests, using fallback for tasks")
-            else:
-                app.logger.warning(f"Error counting tasks completed today: {e}")
-            # Fallback: count all resolved support requests from today if client_id column doesn't exist
-            try:
-                tasks_completed_today = db.session.query(SupportRequest).filter(
-                    SupportRequest.status == 'resolved',
-                    SupportRequest.updated_at >= today_start
-                ).count()
-            except Exception as e2:
-                db.session.rollback()  # Rollback failed transaction
-                app.logger.warning(f"Error in fallback task count: {e2}")
-                tasks_completed_today = 0
-        
-        return jsonify({
-            'clients': active_clients_count,
-            'clientsThisMonth': clients_this_month,
-            'projects': open_support_requests,  # Using open support requests as "projects in progress"
-            'tasks': tasks_completed_today,
-            'completion': progress,
-            'totalClients': total_clients
-        })
+        metrics = compute_creative_metrics(user.id)
+        with _creative_metrics_lock:
+            _creative_metrics_cache[user.id] = (now + CREATIVE_METRICS_CACHE_TTL, metrics)
+        return jsonify(metrics)
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"Error fetching creative metrics: {e}")
-        print(f"Traceback: {error_trace}")
-        app.logger.error(f"Error fetching creative metrics: {e}")
-        app.logger.error(f"Traceback: {error_trace}")
+        creative_log.exception(f"Error fetching creative metrics: {e}")
         
         # Check if it's a database connection error
         error_info = get_database_error_message(e)
@@ -8280,6 +8920,8 @@ def get_support_requests():
         status = request.args.get('status', 'all')
         client_id = request.args.get('client_id', None)
         priority = request.args.get('priority', None)
+        since = request.args.get('since')
+        sync_cursor = snapshot_sync_cursor()
         
         # Check if client_id column exists before using ORM
         has_client_id_column = False
@@ -8293,7 +8935,8 @@ def get_support_requests():
         
         # If client_id column doesn't exist, use raw SQL
         if not has_client_id_column:
-            print("⚠ client_id column not found in support_requests table, using raw SQL query")
+            creative_log.warning("⚠ client_id column not found in support_requests table, using raw SQL query")
+            sync_cursor = None  # This path ignores ?since=, so it must not hand out a delta cursor
             sql = "SELECT id, client_name, subject, description, priority, status, assigned_to, created_at, updated_at FROM support_requests"
             conditions = []
             params = {}
@@ -8348,26 +8991,39 @@ def get_support_requests():
                          SupportRequest.assigned_to, SupportRequest.created_at, SupportRequest.updated_at)
             )
             
-            if status != 'all':
-                query = query.filter(SupportRequest.status == status)
+            # Delta sync is unscoped: client/status/priority filters are left to the replica so
+            # a request moving out of them still arrives
+            if since:
+                delta = read_delta_since('support_request', since)
+                if delta is None:
+                    return delta_sync_expired_response('requests')
+                changed_after, deleted = delta
+                requests = query.filter(SupportRequest.updated_at > changed_after).order_by(SupportRequest.updated_at).all()
+                return jsonify({
+                    'requests': [req.to_dict() for req in requests],
+                    'deleted': deleted,
+                    'syncCursor': sync_cursor
+                }), 200
             
             if client_id:
                 query = query.filter(SupportRequest.client_id == client_id)
             
+            if status != 'all':
+                query = query.filter(SupportRequest.status == status)
+            
             if priority:
                 query = query.filter(SupportRequest.priority == priority)
             
             requests = query.order_by(SupportRequest.created_at.desc()).all()
         
         # Return all requests
-        return jsonify({
-            'requests': [req.to_dict() for req in requests]
-        }), 200
+        response = {'requests': [req.to_dict() for req in requests]}
+        if sync_cursor:
+            response['syncCursor'] = sync_cursor
+        return jsonify(response), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching support requests: {e}")
-        import traceback
-        traceback.print_exc()
+        creative_log.exception(f"Error fetching support requests: {e}")
         error_msg = str(e).lower()
         
         # If table doesn't exist, return empty array instead of error
@@ -8482,7 +9138,7 @@ def create_support_request():
         # If payment was required and provided, record it
         if requires_payment and payment_status == 'paid':
             # TODO: Create payment record in database
-            print(f"✓ Payment recorded for request {request_obj.id}: ${CREATIVE_REQUEST_PRICE}")
+            creative_log.info(f"✓ Payment recorded for request {request_obj.id}: ${CREATIVE_REQUEST_PRICE}")
         
         # Send notification to assigned employee if one exists
         if assigned_employee:
@@ -8514,21 +9170,19 @@ def create_support_request():
                     db.session.rollback()  # Rollback failed transaction
                     app.logger.warning(f"Failed to send push notification: {push_error}")
                 
-                print(f"✓ Sent notification to employee {assigned_employee.id} for support request {request_obj.id}")
+                creative_log.info(f"✓ Sent notification to employee {assigned_employee.id} for support request {request_obj.id}")
             except Exception as notif_error:
                 db.session.rollback()  # Rollback failed transaction
                 app.logger.error(f"Failed to send notification: {notif_error}")
                 # Don't fail the request creation if notification fails
         
         client_name = request_obj.client_name or (client.name if client else None)
-        print(f"✓ Created support request: {request_obj.id} for client {client_name or request_obj.client_id}")
+        creative_log.info(f"✓ Created support request: {request_obj.id} for client {client_name or request_obj.client_id}")
         return jsonify(request_obj.to_dict()), 201
     except Exception as e:
         db.session.rollback()
         error_msg = str(e)
-        print(f"Error creating support request: {e}")
-        import traceback
-        traceback.print_exc()
+        creative_log.exception(f"Error creating support request: {e}")
         
         # Check if it's a table doesn't exist error
         if 'support_requests' in error_msg.lower() or 'does not exist' in error_msg.lower():
@@ -8608,7 +9262,7 @@ def update_support_request(request_id):
         return jsonify(request_obj.to_dict()), 200
     except Exception as e:
         db.session.rollback()
-        print(f"Error updating support request: {e}")
+        creative_log.error(f"Error updating support request: {e}")
         return jsonify({'error': 'Failed to update support request'}), 500
 
 @app.route('/api/creative/support-requests/<request_id>/tasks', methods=['GET'])
@@ -8706,9 +9360,7 @@ def create_subscription():
         }), 201
     except Exception as e:
         db.session.rollback()
-        print(f"Error creating subscription: {e}")
-        import traceback
-        traceback.print_exc()
+        billing_log.exception(f"Error creating subscription: {e}")
         return jsonify({'error': 'Failed to create subscription'}), 500
 
 @jwt_required(optional=True)
@@ -8740,7 +9392,7 @@ def get_current_subscription():
         }), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching subscription: {e}")
+        billing_log.error(f"Error fetching subscription: {e}")
         return jsonify({'error': 'Failed to fetch subscription'}), 500
 
 # Run new scripts automatically at startup
@@ -8748,7 +9400,7 @@ def get_current_subscription():
 def seed_rise_journey_levels():
     """Seed the 7 journey levels if they don't exist - uses raw SQL to avoid model access issues"""
     if not DB_AVAILABLE or not db:
-        print("⚠ Database not available, skipping Rise Journey levels seeding")
+        db_log.warning("⚠ Database not available, skipping Rise Journey levels seeding")
         return
     
     try:
@@ -8759,10 +9411,10 @@ def seed_rise_journey_levels():
             result = conn.execute(text("SELECT COUNT(*) FROM rise_journey_levels"))
             existing_count = result.scalar()
             if existing_count > 0:
-                print(f"✓ Rise Journey levels already exist ({existing_count} levels)")
+                db_log.info(f"✓ Rise Journey levels already exist ({existing_count} levels)")
                 return
             
-            print("🌱 Seeding Rise Journey levels...")
+            db_log.info("🌱 Seeding Rise Journey levels...")
             
             # Define the 7 journey levels
             levels_data = [
@@ -8845,12 +9497,10 @@ def seed_rise_journey_levels():
                 )
             
             conn.commit()
-            print(f"✓ Successfully seeded {len(levels_data)} Rise Journey levels")
+            db_log.info(f"✓ Successfully seeded {len(levels_data)} Rise Journey levels")
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"✗ Error seeding Rise Journey levels: {e}")
-        import traceback
-        traceback.print_exc()
+        db_log.exception(f"✗ Error seeding Rise Journey levels: {e}")
         try:
             if db:
                 db.session.rollback()
@@ -8862,34 +9512,30 @@ run_new_scripts_at_startup()
 def run_database_upgrade():
     """Run database migrations automatically at startup"""
     if not DB_AVAILABLE or not db:
-        print("⚠ Database not available, skipping database upgrade")
+        db_log.warning("⚠ Database not available, skipping database upgrade")
         return
     
     try:
-        print("\n" + "="*80)
-        print("DATABASE MIGRATION - Running automatic upgrade...")
-        print("="*80)
+        db_log.info("Database migration: running automatic upgrade")
         
         with app.app_context():
             from flask_migrate import upgrade
             try:
                 # Try to upgrade to head - this will handle multiple heads by upgrading to all
                 upgrade()
-                print("✓ Database upgrade completed successfully")
+                db_log.info("✓ Database upgrade completed successfully")
             except Exception as upgrade_error:
                 error_str = str(upgrade_error).lower()
                 if 'multiple head' in error_str or 'heads' in error_str:
-                    print("⚠ Multiple migration heads detected, upgrading to all heads...")
+                    db_log.warning("⚠ Multiple migration heads detected, upgrading to all heads...")
                     try:
                         # Upgrade to all heads explicitly
                         upgrade(revision='heads')
-                        print("✓ Database upgrade to all heads completed successfully")
+                        db_log.info("✓ Database upgrade to all heads completed successfully")
                     except Exception as heads_error:
-                        print(f"⚠ Error upgrading to heads: {heads_error}")
-                        print("⚠ Continuing with application startup - migrations may need manual resolution")
+                        db_log.error(f"⚠ Error upgrading to heads: {heads_error}. Continuing with application startup - migrations may need manual resolution")
                 else:
-                    print(f"⚠ Migration error: {upgrade_error}")
-                    print("⚠ Continuing with application startup - migrations may need manual resolution")
+                    db_log.error(f"⚠ Migration error: {upgrade_error}. Continuing with application startup - migrations may need manual resolution")
             
             # After migration, ensure all required columns exist
             # This is a safety check in case migrations didn't run properly
@@ -8908,8 +9554,8 @@ def run_database_upgrade():
                     
                     missing = required_columns - existing_columns
                     if missing:
-                        print(f"⚠ Warning: Missing columns detected: {missing}")
-                        print("  Attempting to add missing columns...")
+                        db_log.warning(f"⚠ Warning: Missing columns detected: {missing}")
+                        db_log.warning("Attempting to add missing columns...")
                         
                         added_count = 0
                         with db.engine.connect() as conn:
@@ -8934,40 +9580,33 @@ def run_database_upgrade():
                                                 pass  # Index might already exist
                                         elif col_name == 'auth_provider':
                                             conn.execute(db.text(f"ALTER TABLE users ADD COLUMN {col_name} VARCHAR(20) NOT NULL DEFAULT 'email'"))
-                                        print(f"  ✓ Added column: {col_name}")
+                                        db_log.info(f"✓ Added column: {col_name}")
                                         added_count += 1
                                     except Exception as col_error:
                                         db.session.rollback()  # Rollback failed transaction
                                         error_str = str(col_error).lower()
                                         if 'already exists' in error_str or 'duplicate' in error_str:
-                                            print(f"  ✓ Column {col_name} already exists (ignoring)")
+                                            db_log.info(f"✓ Column {col_name} already exists (ignoring)")
                                         else:
-                                            print(f"  ✗ Could not add {col_name}: {col_error}")
-                                            import traceback
-                                            traceback.print_exc()
+                                            db_log.exception(f"✗ Could not add {col_name}: {col_error}")
                         
                         if added_count > 0:
-                            print(f"✓ Successfully added {added_count} missing column(s)")
-                        print("✓ Missing columns check complete")
+                            db_log.info(f"✓ Successfully added {added_count} missing column(s)")
+                        db_log.info("✓ Missing columns check complete")
                     else:
-                        print("✓ All required columns verified")
+                        db_log.info("✓ All required columns verified")
             except Exception as verify_error:
                 db.session.rollback()  # Rollback failed transaction
-                print(f"⚠ Could not verify columns (non-critical): {verify_error}")
-                import traceback
-                traceback.print_exc()
+                db_log.exception(f"⚠ Could not verify columns (non-critical): {verify_error}")
                 
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"⚠ Could not run database upgrade: {e}")
-        import traceback
-        traceback.print_exc()
+        db_log.exception(f"⚠ Could not run database upgrade: {e}")
         # Don't fail startup if upgrade fails - might be a connection issue
 
 # Run database upgrade at startup (works for both 'python app.py' and 'flask run')
 # Use a flag and lock to ensure it only runs once
 _db_upgrade_run = False
-import threading
 _db_upgrade_lock = threading.Lock()
 
 def ensure_database_upgrade():
@@ -8987,9 +9626,7 @@ def ensure_database_upgrade():
                 seed_rise_journey_levels()
         except Exception as e:
             db.session.rollback()  # Rollback failed transaction
-            print(f"⚠ Could not seed Rise Journey levels at startup: {e}")
-            import traceback
-            traceback.print_exc()
+            db_log.exception(f"⚠ Could not seed Rise Journey levels at startup: {e}")
 
 # Register to run on first request (works with 'flask run')
 # The flag ensures it only runs once, so it's efficient
@@ -8998,14 +9635,6 @@ def initialize_on_first_request():
     """Initialize database and seed data on first request"""
     ensure_database_upgrade()
 
-if __name__ == '__main__':
-    # Run database upgrade at startup (for 'python app.py')
-    ensure_database_upgrade()
-    
-    port = int(os.environ.get('PORT', 5000))
-    # Allow Werkzeug for development/production (or use gunicorn for true production)
-    socketio.run(app, host='0.0.0.0', port=port, allow_unsafe_werkzeug=True)
-
 
 # --- Shopify & Bold Subscriptions Integration ---
 # Bold Subscriptions Admin: https://sub.boldapps.net/admin
@@ -9055,13 +9684,13 @@ def shopify_webhook():
         data = request.get_data(as_text=True)
         
         if not verify_shopify_webhook(data, hmac_header):
-            print("⚠ Invalid Shopify webhook signature")
+            billing_log.warning("⚠ Invalid Shopify webhook signature")
             return jsonify({'error': 'Invalid signature'}), 401
         
         webhook_data = request.get_json()
         topic = request.headers.get('X-Shopify-Topic', '')
         
-        print(f"📦 Shopify webhook received: {topic}")
+        billing_log.info(f"📦 Shopify webhook received: {topic}")
         
         # Handle different webhook topics
         if topic == 'orders/create' or topic == 'orders/paid':
@@ -9117,7 +9746,7 @@ def shopify_webhook():
                             user.last_checked = datetime.utcnow()
                             
                             db.session.commit()
-                            print(f"✓ Subscription updated for {customer_email}")
+                            billing_log.info(f"✓ Subscription updated for {customer_email}")
         
         elif topic == 'orders/cancelled':
             # Handle subscription cancellation
@@ -9142,13 +9771,11 @@ def shopify_webhook():
                     user.last_checked = datetime.utcnow()
                     
                     db.session.commit()
-                    print(f"✓ Subscription cancelled for {customer_email}")
+                    billing_log.info(f"✓ Subscription cancelled for {customer_email}")
         
         return jsonify({'status': 'ok'}), 200
     except Exception as e:
-        print(f"Error handling Shopify webhook: {e}")
-        import traceback
-        traceback.print_exc()
+        billing_log.exception(f"Error handling Shopify webhook: {e}")
         db.session.rollback()
         return jsonify({'error': 'Webhook processing failed'}), 500
 
@@ -9163,7 +9790,7 @@ def bold_subscriptions_webhook():
         event_type = webhook_data.get('event_type', '')
         subscription_data = webhook_data.get('subscription', {})
         
-        print(f"📦 Bold Subscriptions webhook received: {event_type}")
+        billing_log.info(f"📦 Bold Subscriptions webhook received: {event_type}")
         
         customer_email = subscription_data.get('customer', {}).get('email')
         bold_subscription_id = subscription_data.get('id')
@@ -9222,13 +9849,11 @@ def bold_subscriptions_webhook():
                         subscription.cancelled_at = datetime.utcnow()
                 
                 db.session.commit()
-                print(f"✓ Bold subscription updated for {customer_email}: {event_type}")
+                billing_log.info(f"✓ Bold subscription updated for {customer_email}: {event_type}")
         
         return jsonify({'status': 'ok'}), 200
     except Exception as e:
-        print(f"Error handling Bold Subscriptions webhook: {e}")
-        import traceback
-        traceback.print_exc()
+        billing_log.exception(f"Error handling Bold Subscriptions webhook: {e}")
         db.session.rollback()
         return jsonify({'error': 'Webhook processing failed'}), 500
 
@@ -9267,7 +9892,7 @@ def shopify_checkout():
         }), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error creating Shopify checkout: {e}")
+        billing_log.error(f"Error creating Shopify checkout: {e}")
         return jsonify({'error': 'Failed to create checkout'}), 500
 
 # --- REMOVED: Patreon OAuth2 Integration ---
@@ -9286,11 +9911,11 @@ def shopify_checkout():
         client_secret = os.environ.get('PATREON_CLIENT_SECRET')
         redirect_uri = os.environ.get('PATREON_REDIRECT_URI')
         if not client_id or not client_secret or not redirect_uri:
-            print("Patreon OAuth error: Missing environment variables")
+            auth_log.error("Patreon OAuth error: Missing environment variables")
             return redirect(f'{get_frontend_url()}/?auth=error&message=missing_config')
     except KeyError as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Patreon OAuth error: Missing environment variable: {e}")
+        auth_log.error(f"Patreon OAuth error: Missing environment variable: {e}")
         return redirect(f'{get_frontend_url()}/?auth=error&message=missing_config')
 
     token_url = "https://www.patreon.com/api/oauth2/token"
@@ -9312,7 +9937,7 @@ def shopify_checkout():
         token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
         if not access_token:
             error_msg = token_data.get('error', 'Unknown error')
-            print(f"Patreon OAuth error: No access token. Response: {token_data}")
+            auth_log.error(f"Patreon OAuth error: No access token. Response: {token_data}")
             return redirect(f'{get_frontend_url()}/?auth=error&message=token_error')
 
         # Fetch user identity with memberships and campaign relationships, including all membership data
@@ -9333,7 +9958,7 @@ def shopify_checkout():
 
         # Parse user data from Patreon API response
         if 'data' not in user_data:
-            print(f"Error: No 'data' field in Patreon response: {user_data}")
+            auth_log.error(f"Error: No 'data' field in Patreon response: {user_data}")
             return redirect(f'{get_frontend_url()}/?auth=error&message=invalid_response')
         
         data = user_data.get('data', {})
@@ -9343,7 +9968,7 @@ def shopify_checkout():
         # Extract user info with fallbacks
         user_id = data.get('id', '')
         if not user_id:
-            print(f"Error: No user ID in Patreon response: {data}")
+            auth_log.error(f"Error: No user ID in Patreon response: {data}")
             return redirect(f'{get_frontend_url()}/?auth=error&message=no_user_id')
         
         user_name = attributes.get('full_name') or attributes.get('first_name') or 'Patreon User'
@@ -9417,7 +10042,7 @@ def shopify_checkout():
             is_paid_member = False
             membership_tier = None
             membership_amount = 0
-            print(f"✓ Creator {user_id} - overriding paid membership status to False")
+            auth_log.info(f"✓ Creator {user_id} - overriding paid membership status to False")
         
         # Store/update user in database (User model for authentication)
         # Check if there's a logged-in user to link Patreon account to
@@ -9450,7 +10075,7 @@ def shopify_checkout():
                             content_hash=ens_data.get('content_hash')
                         )
                         db.session.add(user)
-                        print(f"✓ Created new user in database: {user_id}")
+                        auth_log.info(f"✓ Created new user in database: {user_id}")
                     else:
                         # Link Patreon to existing user account
                         user.patreon_id = user_id
@@ -9466,7 +10091,7 @@ def shopify_checkout():
                             user.ens_name = ens_data.get('ens_name')
                             user.crypto_address = ens_data.get('crypto_address')
                             user.content_hash = ens_data.get('content_hash')
-                        print(f"✓ Linked Patreon account to existing user: {user.username or user.email}")
+                        auth_log.info(f"✓ Linked Patreon account to existing user: {user.username or user.email}")
                 else:
                     # Update existing Patreon-linked user
                     user.email = user_email or user.email
@@ -9482,12 +10107,12 @@ def shopify_checkout():
                         user.ens_name = ens_data.get('ens_name')
                         user.crypto_address = ens_data.get('crypto_address')
                         user.content_hash = ens_data.get('content_hash')
-                    print(f"✓ Updated existing user in database: {user_id}")
+                    auth_log.info(f"✓ Updated existing user in database: {user_id}")
                 
                 db.session.commit()
                 linked_user = user
             except Exception as db_error:
-                print(f"Warning: Failed to store user in database: {db_error}")
+                auth_log.error(f"Failed to store user in database: {db_error}")
                 db.session.rollback()
                 # Continue even if database storage fails
         
@@ -9525,7 +10150,7 @@ def shopify_checkout():
                         content_hash=ens_data.get('content_hash')
                     )
                     db.session.add(profile)
-                    print(f"✓ Created new user profile in database: {profile_id}")
+                    auth_log.info(f"✓ Created new user profile in database: {profile_id}")
                 else:
                     # Update existing profile
                     profile.email = user_email or profile.email
@@ -9544,11 +10169,11 @@ def shopify_checkout():
                         profile.crypto_address = ens_data.get('crypto_address')
                         profile.content_hash = ens_data.get('content_hash')
                     profile.updated_at = datetime.utcnow()
-                    print(f"✓ Updated existing user profile in database: {profile_id}")
+                    auth_log.info(f"✓ Updated existing user profile in database: {profile_id}")
                 
                 db.session.commit()
             except Exception as db_error:
-                print(f"Warning: Failed to sync user profile to database: {db_error}")
+                auth_log.error(f"Failed to sync user profile to database: {db_error}")
                 db.session.rollback()
                 # Continue even if database sync fails
 
@@ -9576,147 +10201,317 @@ def shopify_checkout():
         return redirect(f'{get_frontend_url()}/?auth=error&message=network_error')
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        app.logger.error(f"Patreon OAuth error: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        app.logger.exception(f"Patreon OAuth error: {type(e).__name__}: {e}")
         error_message = str(e)
         error_message = error_message.replace(' ', '_').replace(':', '').replace('\n', '')[:50]
         return redirect(f'{get_frontend_url()}/?auth=error&message=user_fetch_failed&detail={error_message}')
 
 # --- Learning Hub Content Management ---
+if DB_AVAILABLE:
+    class LearningCourse(db.Model):
+        __tablename__ = 'learning_courses'
+        
+        id = db.Column(db.String(36), primary_key=True)
+        title = db.Column(db.String(255), nullable=False)
+        description = db.Column(db.Text)
+        instructor = db.Column(db.String(200))
+        duration = db.Column(db.String(50))
+        level = db.Column(db.String(50), default='Beginner', index=True)
+        lessons = db.Column(db.Integer, default=0)
+        thumbnail = db.Column(db.Text)
+        category = db.Column(db.String(100), default='General', index=True)
+        video_url = db.Column(db.Text)
+        pdf_resources = db.Column(db.JSON)
+        created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+        
+        # API field name -> column name, used for create/update payloads
+        FIELDS = {
+            'title': 'title', 'description': 'description', 'instructor': 'instructor',
+            'duration': 'duration', 'level': 'level', 'lessons': 'lessons',
+            'thumbnail': 'thumbnail', 'category': 'category', 'videoUrl': 'video_url',
+            'pdfResources': 'pdf_resources',
+        }
+        SEARCH_COLUMNS = ('title', 'description', 'instructor')
+        
+        def to_dict(self):
+            return {
+                'id': self.id,
+                'title': self.title or '',
+                'description': self.description or '',
+                'instructor': self.instructor or '',
+                'duration': self.duration or '',
+                'level': self.level,
+                'lessons': self.lessons or 0,
+                'thumbnail': self.thumbnail,
+                'category': self.category,
+                'videoUrl': self.video_url,
+                'pdfResources': self.pdf_resources or [],
+                'createdAt': self.created_at.isoformat() if self.created_at else None,
+                'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+            }
+    
+    class LearningPdf(db.Model):
+        __tablename__ = 'learning_pdfs'
+        
+        id = db.Column(db.String(36), primary_key=True)
+        title = db.Column(db.String(255), nullable=False)
+        description = db.Column(db.Text)
+        category = db.Column(db.String(100), default='General', index=True)
+        url = db.Column(db.Text)
+        file_size = db.Column(db.String(50))
+        pages = db.Column(db.Integer)
+        thumbnail = db.Column(db.Text)
+        upload_date = db.Column(db.String(50))  # As supplied by the uploader (ISO string)
+        created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+        
+        FIELDS = {
+            'title': 'title', 'description': 'description', 'category': 'category',
+            'url': 'url', 'fileSize': 'file_size', 'pages': 'pages',
+            'thumbnail': 'thumbnail', 'uploadDate': 'upload_date',
+        }
+        SEARCH_COLUMNS = ('title', 'description')
+        
+        def to_dict(self):
+            return {
+                'id': self.id,
+                'title': self.title or '',
+                'description': self.description or '',
+                'category': self.category,
+                'url': self.url or '',
+                'fileSize': self.file_size or '',
+                'pages': self.pages,
+                'thumbnail': self.thumbnail,
+                'uploadDate': self.upload_date,
+                'createdAt': self.created_at.isoformat() if self.created_at else None,
+                'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+            }
+    
+    class LearningVideo(db.Model):
+        __tablename__ = 'learning_videos'
+        
+        id = db.Column(db.String(36), primary_key=True)
+        title = db.Column(db.String(255), nullable=False)
+        description = db.Column(db.Text)
+        instructor = db.Column(db.String(200))
+        duration = db.Column(db.String(50))
+        level = db.Column(db.String(50), default='Beginner', index=True)
+        category = db.Column(db.String(100), default='General', index=True)
+        video_url = db.Column(db.Text)
+        thumbnail = db.Column(db.Text)
+        upload_date = db.Column(db.String(50))
+        created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+        
+        FIELDS = {
+            'title': 'title', 'description': 'description', 'instructor': 'instructor',
+            'duration': 'duration', 'level': 'level', 'category': 'category',
+            'videoUrl': 'video_url', 'thumbnail': 'thumbnail', 'uploadDate': 'upload_date',
+        }
+        SEARCH_COLUMNS = ('title', 'description', 'instructor')
+        
+        def to_dict(self):
+            return {
+                'id': self.id,
+                'title': self.title or '',
+                'description': self.description or '',
+                'instructor': self.instructor or '',
+                'duration': self.duration or '',
+                'level': self.level,
+                'category': self.category,
+                'videoUrl': self.video_url or '',
+                'thumbnail': self.thumbnail,
+                'uploadDate': self.upload_date,
+                'createdAt': self.created_at.isoformat() if self.created_at else None,
+                'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+            }
+
+
 class LearningContentStore:
+    """
+    Database-backed learning hub content with an in-process read-through cache.
+    
+    Reads are cached per (content type, filters, page) for CACHE_TTL_SECONDS,
+    keeping at most CACHE_MAX_ENTRIES (least recently used go first, since
+    search terms make the key space unbounded). Writes through this store
+    clear the local cache immediately; other workers see the change once
+    their entries expire.
+    """
+    CACHE_TTL_SECONDS = 60
+    CACHE_MAX_ENTRIES = 512
+    MAX_PER_PAGE = 200
+    
     def __init__(self):
-        self.courses = {}
-        self.pdfs = {}
-        self.videos = {}
+        self._cache = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+    
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+    
+    def _read_through(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > now:
+                self._cache.move_to_end(key)
+                return cached[1]
+        value = loader()
+        with self._lock:
+            for expired in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                del self._cache[expired]
+            self._cache[key] = (now + self.CACHE_TTL_SECONDS, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+        return value
+    
+    def _apply_fields(self, item, data):
+        for field, column in item.FIELDS.items():
+            if field in data:
+                setattr(item, column, data[field])
+    
+    def _search_filter(self, model, q):
+        """Full-text match on PostgreSQL (backed by the GIN index), substring match elsewhere"""
+        from sqlalchemy import or_, text
+        if db.engine.dialect.name == 'postgresql':
+            document = " || ' ' || ".join(f"coalesce({column}, '')" for column in model.SEARCH_COLUMNS)
+            return text(f"to_tsvector('english', {document}) @@ websearch_to_tsquery('english', :q)").bindparams(q=q)
+        pattern = f"%{q}%"
+        return or_(*[getattr(model, column).ilike(pattern) for column in model.SEARCH_COLUMNS])
+    
+    def _list(self, model, category=None, level=None, q=None, page=1, per_page=50):
+        page = max(1, page)
+        per_page = max(1, min(per_page, self.MAX_PER_PAGE))
+        
+        def load():
+            query = model.query
+            if category:
+                query = query.filter(model.category == category)
+            if level and hasattr(model, 'level'):
+                query = query.filter(model.level == level)
+            if q:
+                query = query.filter(self._search_filter(model, q))
+            total = query.order_by(None).count()
+            items = query.order_by(model.created_at.desc(), model.id).offset((page - 1) * per_page).limit(per_page).all()
+            return {
+                'items': [item.to_dict() for item in items],
+                'total': total,
+                'page': page,
+                'perPage': per_page
+            }
+        
+        return self._read_through((model.__tablename__, category, level, q, page, per_page), load)
+    
+    def _get(self, model, item_id):
+        def load():
+            item = model.query.get(item_id)
+            return item.to_dict() if item else None
+        return self._read_through((model.__tablename__, 'id', item_id), load)
+    
+    def _add(self, model, data, defaults):
+        item = model(id=data.get('id') or str(uuid.uuid4()), **defaults)
+        self._apply_fields(item, data)
+        db.session.add(item)
+        db.session.commit()
+        self.invalidate()
+        return item.to_dict()
+    
+    def _update(self, model, item_id, data):
+        item = model.query.get(item_id)
+        if not item:
+            return None
+        self._apply_fields(item, data or {})
+        item.updated_at = datetime.utcnow()
+        db.session.commit()
+        self.invalidate()
+        return item.to_dict()
+    
+    def _delete(self, model, item_id):
+        item = model.query.get(item_id)
+        if not item:
+            return False
+        db.session.delete(item)
+        db.session.commit()
+        self.invalidate()
+        return True
     
     def add_course(self, course_data):
-        course_id = course_data.get('id') or str(uuid.uuid4())
-        course = {
-            'id': course_id,
-            'title': course_data.get('title', ''),
-            'description': course_data.get('description', ''),
-            'instructor': course_data.get('instructor', ''),
-            'duration': course_data.get('duration', ''),
-            'level': course_data.get('level', 'Beginner'),
-            'lessons': course_data.get('lessons', 0),
-            'thumbnail': course_data.get('thumbnail'),
-            'category': course_data.get('category', 'General'),
-            'videoUrl': course_data.get('videoUrl'),
-            'pdfResources': course_data.get('pdfResources', []),
-            'createdAt': datetime.utcnow().isoformat(),
-            'updatedAt': datetime.utcnow().isoformat(),
-        }
-        self.courses[course_id] = course
-        return course
+        return self._add(LearningCourse, course_data, {'level': 'Beginner', 'category': 'General', 'lessons': 0, 'pdf_resources': []})
     
-    def get_courses(self):
-        return list(self.courses.values())
+    def get_courses(self, **filters):
+        return self._list(LearningCourse, **filters)
     
     def get_course(self, course_id):
-        return self.courses.get(course_id)
+        return self._get(LearningCourse, course_id)
     
     def update_course(self, course_id, course_data):
-        if course_id not in self.courses:
-            return None
-        course = self.courses[course_id]
-        course.update(course_data)
-        course['updatedAt'] = datetime.utcnow().isoformat()
-        return course
+        return self._update(LearningCourse, course_id, course_data)
     
     def delete_course(self, course_id):
-        if course_id in self.courses:
-            del self.courses[course_id]
-            return True
-        return False
+        return self._delete(LearningCourse, course_id)
     
     def add_pdf(self, pdf_data):
-        pdf_id = pdf_data.get('id') or str(uuid.uuid4())
-        pdf = {
-            'id': pdf_id,
-            'title': pdf_data.get('title', ''),
-            'description': pdf_data.get('description', ''),
-            'category': pdf_data.get('category', 'General'),
-            'url': pdf_data.get('url', ''),
-            'fileSize': pdf_data.get('fileSize', ''),
-            'pages': pdf_data.get('pages'),
-            'thumbnail': pdf_data.get('thumbnail'),
-            'uploadDate': pdf_data.get('uploadDate', datetime.utcnow().isoformat()),
-            'createdAt': datetime.utcnow().isoformat(),
-            'updatedAt': datetime.utcnow().isoformat(),
-        }
-        self.pdfs[pdf_id] = pdf
-        return pdf
+        return self._add(LearningPdf, pdf_data, {'category': 'General', 'upload_date': datetime.utcnow().isoformat()})
     
-    def get_pdfs(self):
-        return list(self.pdfs.values())
+    def get_pdfs(self, **filters):
+        return self._list(LearningPdf, **filters)
     
     def get_pdf(self, pdf_id):
-        return self.pdfs.get(pdf_id)
+        return self._get(LearningPdf, pdf_id)
     
     def update_pdf(self, pdf_id, pdf_data):
-        if pdf_id not in self.pdfs:
-            return None
-        pdf = self.pdfs[pdf_id]
-        pdf.update(pdf_data)
-        pdf['updatedAt'] = datetime.utcnow().isoformat()
-        return pdf
+        return self._update(LearningPdf, pdf_id, pdf_data)
     
     def delete_pdf(self, pdf_id):
-        if pdf_id in self.pdfs:
-            del self.pdfs[pdf_id]
-            return True
-        return False
+        return self._delete(LearningPdf, pdf_id)
     
     def add_video(self, video_data):
-        video_id = video_data.get('id') or str(uuid.uuid4())
-        video = {
-            'id': video_id,
-            'title': video_data.get('title', ''),
-            'description': video_data.get('description', ''),
-            'instructor': video_data.get('instructor', ''),
-            'duration': video_data.get('duration', ''),
-            'level': video_data.get('level', 'Beginner'),
-            'category': video_data.get('category', 'General'),
-            'videoUrl': video_data.get('videoUrl', ''),
-            'thumbnail': video_data.get('thumbnail'),
-            'uploadDate': video_data.get('uploadDate', datetime.utcnow().isoformat()),
-            'createdAt': datetime.utcnow().isoformat(),
-            'updatedAt': datetime.utcnow().isoformat(),
-        }
-        self.videos[video_id] = video
-        return video
+        return self._add(LearningVideo, video_data, {'level': 'Beginner', 'category': 'General', 'upload_date': datetime.utcnow().isoformat()})
     
-    def get_videos(self):
-        return list(self.videos.values())
+    def get_videos(self, **filters):
+        return self._list(LearningVideo, **filters)
     
     def get_video(self, video_id):
-        return self.videos.get(video_id)
+        return self._get(LearningVideo, video_id)
     
     def update_video(self, video_id, video_data):
-        if video_id not in self.videos:
-            return None
-        video = self.videos[video_id]
-        video.update(video_data)
-        video['updatedAt'] = datetime.utcnow().isoformat()
-        return video
+        return self._update(LearningVideo, video_id, video_data)
     
     def delete_video(self, video_id):
-        if video_id in self.videos:
-            del self.videos[video_id]
-            return True
-        return False
+        return self._delete(LearningVideo, video_id)
 
 learning_store = LearningContentStore()
 
+
+def learning_list_filters():
+    """Read category/level/search/pagination query params for the learning list endpoints"""
+    return {
+        'category': request.args.get('category') or None,
+        'level': request.args.get('level') or None,
+        'q': (request.args.get('q') or '').strip() or None,
+        'page': request.args.get('page', 1, type=int),
+        'per_page': request.args.get('perPage', 50, type=int)
+    }
+
 # Courses endpoints
 @app.route('/api/learning/courses', methods=['GET'])
 def get_courses():
-    courses = learning_store.get_courses()
-    return jsonify({'courses': courses})
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    try:
+        result = learning_store.get_courses(**learning_list_filters())
+        return jsonify({'courses': result['items'], 'total': result['total'], 'page': result['page'], 'perPage': result['perPage']})
+    except Exception as e:
+        db.session.rollback()  # Rollback failed transaction
+        content_log.error(f"Error listing courses: {e}")
+        return jsonify({'error': 'Failed to list courses', 'message': str(e)}), 500
 
 @app.route('/api/learning/courses', methods=['POST'])
 def create_course():
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     try:
         data = request.get_json()
         if not data or 'title' not in data:
@@ -9725,11 +10520,13 @@ def create_course():
         return jsonify({'course': course}), 201
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error creating course: {e}")
+        content_log.error(f"Error creating course: {e}")
         return jsonify({'error': 'Failed to create course', 'message': str(e)}), 500
 
 @app.route('/api/learning/courses/<course_id>', methods=['GET'])
 def get_course(course_id):
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     course = learning_store.get_course(course_id)
     if not course:
         return jsonify({'error': 'Course not found'}), 404
@@ -9737,6 +10534,8 @@ def get_course(course_id):
 
 @app.route('/api/learning/courses/<course_id>', methods=['PUT'])
 def update_course(course_id):
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     try:
         data = request.get_json()
         course = learning_store.update_course(course_id, data)
@@ -9745,11 +10544,13 @@ def update_course(course_id):
         return jsonify({'course': course})
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error updating course: {e}")
+        content_log.error(f"Error updating course: {e}")
         return jsonify({'error': 'Failed to update course', 'message': str(e)}), 500
 
 @app.route('/api/learning/courses/<course_id>', methods=['DELETE'])
 def delete_course(course_id):
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     success = learning_store.delete_course(course_id)
     if not success:
         return jsonify({'error': 'Course not found'}), 404
@@ -9758,11 +10559,20 @@ def delete_course(course_id):
 # PDFs endpoints
 @app.route('/api/learning/pdfs', methods=['GET'])
 def get_pdfs():
-    pdfs = learning_store.get_pdfs()
-    return jsonify({'pdfs': pdfs})
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    try:
+        result = learning_store.get_pdfs(**learning_list_filters())
+        return jsonify({'pdfs': result['items'], 'total': result['total'], 'page': result['page'], 'perPage': result['perPage']})
+    except Exception as e:
+        db.session.rollback()  # Rollback failed transaction
+        content_log.error(f"Error listing PDFs: {e}")
+        return jsonify({'error': 'Failed to list PDFs', 'message': str(e)}), 500
 
 @app.route('/api/learning/pdfs', methods=['POST'])
 def create_pdf():
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     try:
         data = request.get_json()
         if not data or 'title' not in data:
@@ -9771,11 +10581,13 @@ def create_pdf():
         return jsonify({'pdf': pdf}), 201
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error creating PDF: {e}")
+        content_log.error(f"Error creating PDF: {e}")
         return jsonify({'error': 'Failed to create PDF', 'message': str(e)}), 500
 
 @app.route('/api/learning/pdfs/<pdf_id>', methods=['GET'])
 def get_pdf(pdf_id):
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     pdf = learning_store.get_pdf(pdf_id)
     if not pdf:
         return jsonify({'error': 'PDF not found'}), 404
@@ -9783,6 +10595,8 @@ def get_pdf(pdf_id):
 
 @app.route('/api/learning/pdfs/<pdf_id>', methods=['PUT'])
 def update_pdf(pdf_id):
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     try:
         data = request.get_json()
         pdf = learning_store.update_pdf(pdf_id, data)
@@ -9791,11 +10605,13 @@ def update_pdf(pdf_id):
         return jsonify({'pdf': pdf})
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error updating PDF: {e}")
+        content_log.error(f"Error updating PDF: {e}")
         return jsonify({'error': 'Failed to update PDF', 'message': str(e)}), 500
 
 @app.route('/api/learning/pdfs/<pdf_id>', methods=['DELETE'])
 def delete_pdf(pdf_id):
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     success = learning_store.delete_pdf(pdf_id)
     if not success:
         return jsonify({'error': 'PDF not found'}), 404
@@ -9804,11 +10620,20 @@ def delete_pdf(pdf_id):
 # Videos endpoints
 @app.route('/api/learning/videos', methods=['GET'])
 def get_videos():
-    videos = learning_store.get_videos()
-    return jsonify({'videos': videos})
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    try:
+        result = learning_store.get_videos(**learning_list_filters())
+        return jsonify({'videos': result['items'], 'total': result['total'], 'page': result['page'], 'perPage': result['perPage']})
+    except Exception as e:
+        db.session.rollback()  # Rollback failed transaction
+        content_log.error(f"Error listing videos: {e}")
+        return jsonify({'error': 'Failed to list videos', 'message': str(e)}), 500
 
 @app.route('/api/learning/videos', methods=['POST'])
 def create_video():
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     try:
         data = request.get_json()
         if not data or 'title' not in data:
@@ -9817,11 +10642,13 @@ def create_video():
         return jsonify({'video': video}), 201
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error creating video: {e}")
+        content_log.error(f"Error creating video: {e}")
         return jsonify({'error': 'Failed to create video', 'message': str(e)}), 500
 
 @app.route('/api/learning/videos/<video_id>', methods=['GET'])
 def get_video(video_id):
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     video = learning_store.get_video(video_id)
     if not video:
         return jsonify({'error': 'Video not found'}), 404
@@ -9829,6 +10656,8 @@ def get_video(video_id):
 
 @app.route('/api/learning/videos/<video_id>', methods=['PUT'])
 def update_video(video_id):
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     try:
         data = request.get_json()
         video = learning_store.update_video(video_id, data)
@@ -9837,11 +10666,13 @@ def update_video(video_id):
         return jsonify({'video': video})
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error updating video: {e}")
+        content_log.error(f"Error updating video: {e}")
         return jsonify({'error': 'Failed to update video', 'message': str(e)}), 500
 
 @app.route('/api/learning/videos/<video_id>', methods=['DELETE'])
 def delete_video(video_id):
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
     success = learning_store.delete_video(video_id)
     if not success:
         return jsonify({'error': 'Video not found'}), 404
@@ -9861,7 +10692,7 @@ def get_board_snapshot(board_id):
             user_info = get_user_info()
         except Exception as auth_error:
             # If authentication fails, allow anonymous access
-            print(f"Auth optional for board snapshot: {auth_error}")
+            socket_log.debug(f"Auth optional for board snapshot: {auth_error}")
         
         # In a full implementation, this would fetch from a database
         # For now, return a minimal snapshot structure
@@ -9889,9 +10720,7 @@ def get_board_snapshot(board_id):
         return jsonify(snapshot), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting board snapshot: {e}")
-        import traceback
-        traceback.print_exc()
+        socket_log.exception(f"Error getting board snapshot: {e}")
         return jsonify({'error': 'Failed to get board snapshot'}), 500
 
 @app.route('/api/boards/<board_id>/presence', methods=['GET', 'POST'])
@@ -9905,7 +10734,7 @@ def board_presence(board_id):
             user_info = get_user_info()
         except Exception as auth_error:
             # If authentication fails, allow anonymous access
-            print(f"Auth optional for board presence: {auth_error}")
+            socket_log.debug(f"Auth optional for board presence: {auth_error}")
         
         # For POST requests, we need at least a userId
         if request.method == 'POST' and not user_info:
@@ -9943,7 +10772,7 @@ def board_presence(board_id):
             return jsonify({'success': True, 'presence': presence_data}), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error handling board presence: {e}")
+        socket_log.error(f"Error handling board presence: {e}")
         return jsonify({'error': 'Failed to handle presence'}), 500
 
 # Socket.IO event for auth restoration
@@ -10224,7 +11053,7 @@ def get_wellness_modules():
         return jsonify({'modules': result}), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching wellness modules: {e}")
+        content_log.error(f"Error fetching wellness modules: {e}")
         return jsonify({'error': 'Failed to fetch modules'}), 500
 
 @require_session
@@ -10239,7 +11068,7 @@ def get_wellness_module(module_id):
         return jsonify({'module': module.to_dict()}), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching wellness module: {e}")
+        content_log.error(f"Error fetching wellness module: {e}")
         return jsonify({'error': 'Failed to fetch module'}), 500
 
 @require_session
@@ -10304,7 +11133,7 @@ def activate_wellness_module():
         }), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error activating module: {e}")
+        content_log.error(f"Error activating module: {e}")
         return jsonify({'error': 'Failed to activate module'}), 500
 
 @require_session
@@ -10319,7 +11148,7 @@ def get_mentor_cues(module_id):
         return jsonify({'cues': [cue.to_dict() for cue in cues]}), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching mentor cues: {e}")
+        content_log.error(f"Error fetching mentor cues: {e}")
         return jsonify({'error': 'Failed to fetch cues'}), 500
 
 
@@ -10368,6 +11197,10 @@ if DB_AVAILABLE:
     # Creative Dashboard - Client Management Models
     class Client(db.Model):
         __tablename__ = 'clients'
+        __table_args__ = (db.Index('ix_clients_created_at_id', 'created_at', 'id'),)  # Keyset pagination order
+        
+        # Large columns left out of list responses unless requested (API field -> column)
+        DETAIL_FIELDS = {'notes': 'notes', 'tags': 'tags', 'marketingBudget': 'marketing_budget'}
         
         id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
         name = db.Column(db.String(200), nullable=False)
@@ -10391,43 +11224,47 @@ if DB_AVAILABLE:
         dashboard_connections = db.relationship('ClientDashboardConnection', backref='client', lazy=True, cascade='all, delete-orphan')
         user = db.relationship('User', backref='client_account')
         
-        def to_dict(self):
-            # Safely access budget and deadline - they may not exist if migration hasn't run
-            budget_value = 0
-            deadline_value = None
-            try:
-                if hasattr(self, 'budget') and self.budget is not None:
-                    budget_value = float(self.budget)
-            except (AttributeError, ValueError):
-                pass
-            
-            try:
-                if hasattr(self, 'deadline') and self.deadline is not None:
-                    deadline_value = self.deadline.isoformat()
-            except (AttributeError, ValueError):
-                pass
-            
-            return {
-                'id': self.id,
+        def to_dict(self, include=None):
+            """
+            Serialize the client
+            
+            Args:
+                include: DETAIL_FIELDS keys to include; None includes all of them
+                    (list endpoints pass only what the caller asked for)
+            """
+            # budget and deadline may be left out by load_only when the migration hasn't run;
+            # read them from __dict__ so that doesn't lazy-load. Decimal and datetime values
+            # are encoded by the app's JSON provider.
+            client_id = self.id
+            loaded = self.__dict__
+            budget_value = loaded.get('budget')
+            
+            data = {
+                'id': client_id,
                 'name': self.name,
                 'email': self.email,
                 'company': self.company,
                 'phone': self.phone,
                 'status': self.status,
                 'tier': self.tier,
-                'notes': self.notes,
-                'tags': json.loads(self.tags) if self.tags else [],
-                'marketingBudget': self.marketing_budget,
                 'googleAnalyticsPropertyKey': self.google_analytics_property_key,
-                'budget': budget_value,
-                'deadline': deadline_value,
+                'budget': budget_value if budget_value is not None else 0,
+                'deadline': loaded.get('deadline'),
                 'userId': self.user_id,
                 'hasAccount': self.user_id is not None,
-                'createdAt': self.created_at.isoformat() if self.created_at else None,
-                'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
+                'createdAt': self.created_at,
+                'updatedAt': self.updated_at,
                 'assignedEmployee': self.employee_assignments[0].employee_name if (self.employee_assignments and len(self.employee_assignments) > 0) else None,
                 'systemsConnected': [conn.dashboard_type for conn in (self.dashboard_connections or []) if conn.enabled]
             }
+            
+            if include is None or 'notes' in include:
+                data['notes'] = self.notes
+            if include is None or 'tags' in include:
+                data['tags'] = loads_list(self.tags)
+            if include is None or 'marketingBudget' in include:
+                data['marketingBudget'] = self.marketing_budget
+            return data
     
     class ClientEmployeeAssignment(db.Model):
         __tablename__ = 'client_employee_assignments'
@@ -10636,7 +11473,7 @@ def get_crypto_balance():
         }), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching crypto balance: {e}")
+        billing_log.error(f"Error fetching crypto balance: {e}")
         return jsonify({'error': 'Failed to fetch balance'}), 500
 
 @require_session
@@ -10681,7 +11518,7 @@ def award_crypto():
         }), 201
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error awarding crypto: {e}")
+        billing_log.error(f"Error awarding crypto: {e}")
         return jsonify({'error': 'Failed to award crypto'}), 500
 
 @require_session
@@ -10720,70 +11557,274 @@ def get_crypto_stats():
         }), 200
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error fetching crypto stats: {e}")
+        billing_log.error(f"Error fetching crypto stats: {e}")
         return jsonify({'error': 'Failed to fetch stats'}), 500
 
+ADMIN_USERS_PAGE_MAX = 500
+ADMIN_USERS_STREAM_BATCH = 500
+
+
+def admin_user_row(user, profile):
+    """Merge a user and its (optional) profile into the admin listing shape"""
+    try:
+        user_dict = user.to_dict()
+        if profile:
+            user_dict.update(profile.to_dict())
+        
+        # Ensure required fields exist
+        if 'id' not in user_dict:
+            user_dict['id'] = user.ens_name or user.patreon_id or user.username or str(user.id)
+        if 'username' not in user_dict:
+            user_dict['username'] = user.username or ''
+        if 'email' not in user_dict:
+            user_dict['email'] = user.email or ''
+        if 'isEmployee' not in user_dict:
+            user_dict['isEmployee'] = safe_get_is_employee(user)
+        if 'isAdmin' not in user_dict:
+            user_dict['isAdmin'] = getattr(user, 'is_admin', False)
+        return user_dict
+    except Exception as user_error:
+        admin_log.error(f"Error processing user {getattr(user, 'id', 'unknown')}: {user_error}")
+        # Add minimal user data even if to_dict() fails
+        return {
+            'id': getattr(user, 'id', 'unknown'),
+            'username': getattr(user, 'username', ''),
+            'email': getattr(user, 'email', ''),
+            'isEmployee': safe_get_is_employee(user),
+            'isAdmin': getattr(user, 'is_admin', False),
+            'error': f'Error loading user data: {str(user_error)}'
+        }
+
+
+def admin_users_query():
+    """Users outer joined to their profiles, with ?search= and ?role= applied"""
+    # Profiles are keyed by the user's ENS name, Patreon ID, username or numeric ID, in that order
+    profile_key = db.func.coalesce(User.ens_name, User.patreon_id, User.username, db.cast(User.id, db.String))
+    query = db.session.query(User, UserProfile).outerjoin(UserProfile, UserProfile.id == profile_key)
+    
+    search = (request.args.get('search') or '').strip()
+    if search:
+        pattern = f'%{search}%'
+        query = query.filter(db.or_(
+            User.username.ilike(pattern),
+            User.email.ilike(pattern),
+            User.ens_name.ilike(pattern),
+            UserProfile.name.ilike(pattern)
+        ))
+    
+    role = request.args.get('role')
+    if role == 'admin':
+        query = query.filter(User.is_admin.is_(True))
+    elif role == 'employee':
+        query = query.filter(User.is_employee.is_(True))
+    elif role == 'member':
+        query = query.filter(User.membership_paid.is_(True))
+    elif role == 'user':
+        query = query.filter(User.is_admin.is_(False), User.is_employee.is_(False))
+    
+    return query.order_by(User.id)
+
+
+def stream_admin_users(query, ndjson):
+    """Yield rows as they come off a server-side cursor, as NDJSON lines or one JSON document"""
+    rows = query.yield_per(ADMIN_USERS_STREAM_BATCH)  # Server-side cursor, fetched in batches
+    if ndjson:
+        for user, profile in rows:
+            yield fast_dumps(admin_user_row(user, profile)) + '\n'
+        return
+    yield '{"users": ['
+    first = True
+    for user, profile in rows:
+        yield ('' if first else ',') + fast_dumps(admin_user_row(user, profile))
+        first = False
+    yield ']}'
+
+
 # --- Admin Endpoints ---
 @app.route('/api/admin/users', methods=['GET'])
 @require_admin
 def admin_list_users():
-    """List all users (admin only)"""
+    """
+    List users with their profiles (admin only)
+    
+    Query params: search, role (admin/employee/member/user), limit + cursor for keyset
+    pages, and format=ndjson or stream=1 to stream every matching row.
+    """
     if not DB_AVAILABLE:
         return jsonify({'error': 'Database not available'}), 500
     
     try:
-        users = User.query.all()
-        users_data = []
-        for user in users:
-            try:
-                user_dict = user.to_dict()
-                # Also get profile data if available
-                try:
-                    profile_id = user.ens_name or user.patreon_id or user.username or str(user.id)
-                    profile = UserProfile.query.get(profile_id)
-                    if profile:
-                        profile_dict = profile.to_dict()
-                        user_dict.update(profile_dict)
-                except Exception as profile_error:
-                    db.session.rollback()  # Rollback failed transaction
-                    print(f"Error fetching profile for user {user.id}: {profile_error}")
-                    pass
-                
-                # Ensure required fields exist
-                if 'id' not in user_dict:
-                    user_dict['id'] = user.ens_name or user.patreon_id or user.username or str(user.id)
-                if 'username' not in user_dict:
-                    user_dict['username'] = user.username or ''
-                if 'email' not in user_dict:
-                    user_dict['email'] = user.email or ''
-                if 'isEmployee' not in user_dict:
-                    user_dict['isEmployee'] = safe_get_is_employee(user)
-                if 'isAdmin' not in user_dict:
-                    user_dict['isAdmin'] = getattr(user, 'is_admin', False)
-                
-                users_data.append(user_dict)
-            except Exception as user_error:
-                db.session.rollback()  # Rollback failed transaction
-                print(f"Error processing user {getattr(user, 'id', 'unknown')}: {user_error}")
-                # Add minimal user data even if to_dict() fails
-                users_data.append({
-                    'id': getattr(user, 'id', 'unknown'),
-                    'username': getattr(user, 'username', ''),
-                    'email': getattr(user, 'email', ''),
-                    'isEmployee': safe_get_is_employee(user),
-                    'isAdmin': getattr(user, 'is_admin', False),
-                    'error': f'Error loading user data: {str(user_error)}'
-                })
+        query = admin_users_query()
+        
+        if request.args.get('format') == 'ndjson' or request.args.get('stream') in ('1', 'true'):
+            from flask import Response, stream_with_context
+            ndjson = request.args.get('format') == 'ndjson'
+            return Response(
+                stream_with_context(stream_admin_users(query, ndjson)),
+                mimetype='application/x-ndjson' if ndjson else 'application/json'
+            )
+        
+        # Keyset pagination on users.id is opt-in so existing callers still receive every user
+        if 'limit' in request.args or 'cursor' in request.args:
+            limit = max(1, min(request.args.get('limit', 100, type=int) or 100, ADMIN_USERS_PAGE_MAX))
+            cursor = request.args.get('cursor', type=int)
+            if cursor:
+                query = query.filter(User.id > cursor)
+            rows = query.limit(limit + 1).all()
+            next_cursor = str(rows[limit - 1][0].id) if len(rows) > limit else None
+            return jsonify({
+                'users': [admin_user_row(user, profile) for user, profile in rows[:limit]],
+                'nextCursor': next_cursor
+            })
         
-        return jsonify({'users': users_data})
+        return jsonify({'users': [admin_user_row(user, profile) for user, profile in query.all()]})
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error listing users: {e}")
-        import traceback
-        traceback.print_exc()
+        admin_log.exception(f"Error listing users: {e}")
         app.logger.error(f"Error listing users: {e}")
         return jsonify({'error': f'Failed to list users: {str(e)}'}), 500
 
+@app.route('/api/admin/http-cache/stats', methods=['GET', 'DELETE'])
+@require_admin
+def admin_http_cache_stats():
+    """Per-route compression and 304 counters (admin only); DELETE resets them"""
+    if request.method == 'DELETE':
+        response_optimizer.reset_stats()
+    return jsonify({
+        'routes': response_optimizer.stats(),
+        'brotli': BROTLI_AVAILABLE,
+        'tableEtags': response_optimizer.table_etags,
+        'minSize': response_optimizer.min_size
+    })
+
+@app.route('/api/admin/slow-queries', methods=['GET', 'DELETE'])
+@require_admin
+def admin_slow_queries():
+    """
+    Slow statements aggregated by fingerprint (admin only); DELETE clears the log
+    
+    Query params: sort (total, count, max, mean, recent), limit
+    """
+    if request.method == 'DELETE':
+        slow_query_log.reset()
+        return jsonify({'message': 'Slow query log cleared'})
+    sort = request.args.get('sort', 'total')
+    limit = max(1, min(request.args.get('limit', 50, type=int) or 50, 500))
+    return jsonify({
+        'thresholdMs': slow_query_log.threshold_ms,
+        'explain': slow_query_log.explain,
+        'fingerprints': slow_query_log.summary(sort=sort, limit=limit),
+        'recent': slow_query_log.recent(limit)
+    })
+
+# Live-worker diagnostics. Each gunicorn worker is its own process, so these describe
+# whichever worker serves the request (the pid is in every response).
+from diagnostics import STAT_KEYS, DiagnosticsBusy, HeapSnapshots, StackSampler, store_sizes
+heap_snapshots = HeapSnapshots()
+
+def diagnostic_stores():
+    """In-process stores whose growth shows up as worker memory"""
+    stores = {
+        'game_rooms': globals().get('game_rooms'),
+        'drawing_sessions': drawing_sessions,
+        'active_users': active_users,
+        'learning_store': learning_store,
+        'mcp_server': mcp_server,
+        'task_notes_buffer': task_notes_buffer,
+    }
+    if WALLET_AUTH_HELPERS_AVAILABLE:
+        from wallet_auth_helpers import nonce_store
+        if not nonce_store.shared:  # Redis-backed nonces live outside the worker
+            stores['wallet_nonces'] = nonce_store
+    return stores
+
+@app.route('/api/admin/diagnostics/profile', methods=['GET'])
+@require_admin
+def admin_diagnostics_profile():
+    """
+    Sample every thread's stack for a few seconds (admin only)
+
+    Query params: seconds (default 10, max 60), intervalMs (default 5),
+    format (collapsed for a flamegraph.pl / speedscope file, or json for top frames)
+    """
+    seconds = request.args.get('seconds', 10, type=float) or 10
+    interval_ms = request.args.get('intervalMs', 5, type=float) or 5
+    try:
+        sampler = StackSampler(interval=interval_ms / 1000).run(seconds)
+    except DiagnosticsBusy as e:
+        return jsonify({'error': str(e)}), 409
+    if request.args.get('format', 'collapsed') == 'json':
+        return jsonify(sampler.summary(limit=max(1, min(request.args.get('limit', 30, type=int) or 30, 200))))
+    response = app.response_class(sampler.collapsed(), mimetype='text/plain')
+    response.headers['Content-Disposition'] = f'attachment; filename=profile-{os.getpid()}-{int(time.time())}.collapsed'
+    response.headers['X-Profile-Samples'] = str(sampler.samples)
+    return response
+
+@app.route('/api/admin/diagnostics/heap', methods=['GET', 'POST', 'DELETE'])
+@require_admin
+def admin_diagnostics_heap():
+    """
+    tracemalloc snapshots (admin only)
+
+    GET: tracing status, snapshot ids and the top allocation sites of the latest snapshot
+    POST {"action": "start", "frames": 10} starts tracing; {"action": "snapshot"} takes one
+    DELETE stops tracing and discards snapshots
+    """
+    if request.method == 'DELETE':
+        heap_snapshots.stop()
+        return jsonify(heap_snapshots.status())
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        action = data.get('action', 'snapshot')
+        if action == 'start':
+            try:
+                frames = int(data.get('frames', 10))
+            except (TypeError, ValueError):
+                return jsonify({'error': 'frames must be an integer'}), 400
+            heap_snapshots.start(frames=frames)
+            return jsonify(heap_snapshots.status())
+        if action != 'snapshot':
+            return jsonify({'error': 'action must be start or snapshot'}), 400
+        try:
+            snapshot_id = heap_snapshots.take()
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 409
+        return jsonify({'id': snapshot_id, **heap_snapshots.status()}), 201
+    key = request.args.get('key', 'lineno')
+    if key not in STAT_KEYS:
+        return jsonify({'error': 'key must be lineno, filename or traceback'}), 400
+    status = heap_snapshots.status()
+    if status['snapshots']:
+        status['top'] = heap_snapshots.top(key=key,
+                                           limit=max(1, min(request.args.get('limit', 30, type=int) or 30, 200)))
+    return jsonify(status)
+
+@app.route('/api/admin/diagnostics/heap/diff', methods=['GET'])
+@require_admin
+def admin_diagnostics_heap_diff():
+    """
+    Allocation growth between two snapshots (admin only)
+
+    Query params: from, to (snapshot ids; default the two latest), key (lineno, filename, traceback), limit
+    """
+    key = request.args.get('key', 'lineno')
+    if key not in STAT_KEYS:
+        return jsonify({'error': 'key must be lineno, filename or traceback'}), 400
+    try:
+        differences = heap_snapshots.compare(request.args.get('from'), request.args.get('to'), key=key,
+                                             limit=max(1, min(request.args.get('limit', 30, type=int) or 30, 200)))
+    except KeyError as e:
+        return jsonify({'error': f'Unknown snapshot: {e.args[0]}'}), 404
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify({'pid': os.getpid(), 'key': key, 'differences': differences})
+
+@app.route('/api/admin/diagnostics/stores', methods=['GET'])
+@require_admin
+def admin_diagnostics_stores():
+    """Entry counts and approximate deep sizes of in-process stores (admin only)"""
+    return jsonify({'pid': os.getpid(), 'stores': store_sizes(diagnostic_stores())})
+
 @app.route('/api/admin/users/<user_id>/admin', methods=['PUT'])
 @require_admin
 def admin_toggle_admin(user_id):
@@ -10857,7 +11898,7 @@ def admin_toggle_admin(user_id):
             'user': user.to_dict() if hasattr(user, 'to_dict') else {'id': str(user.id), 'isAdmin': is_admin}
         })
     except Exception as e:
-        print(f"Error updating admin status: {e}")
+        admin_log.error(f"Error updating admin status: {e}")
         app.logger.error(f"Error updating admin status: {e}")
         db.session.rollback()
         return jsonify({'error': f'Failed to update admin status: {str(e)}'}), 500
@@ -11083,9 +12124,7 @@ def admin_change_password(user_id):
         response.headers.add('Access-Control-Allow-Credentials', 'true')
         return response
     except Exception as e:
-        print(f"Error changing password: {e}")
-        import traceback
-        traceback.print_exc()
+        admin_log.exception(f"Error changing password: {e}")
         app.logger.error(f"Error changing password: {e}")
         db.session.rollback()
         
@@ -11194,7 +12233,7 @@ def update_or_delete_user(user_id):
             }), 200
         except Exception as e:
             db.session.rollback()
-            print(f"Error updating user: {e}")
+            admin_log.error(f"Error updating user: {e}")
             return jsonify({'error': f'Failed to update user: {str(e)}'}), 500
     
     # Handle DELETE request - delete user
@@ -11259,7 +12298,13 @@ def update_or_delete_user(user_id):
                                 "delete user_profiles"
                             )
                         
-                        # Delete client assignments
+                        # Delete client assignments, marking those clients changed for delta sync
+                        execute_with_savepoint(
+                            text("UPDATE clients SET updated_at = :now WHERE id IN "
+                                 "(SELECT client_id FROM client_employee_assignments WHERE employee_id = :user_id)"),
+                            {'now': datetime.utcnow(), 'user_id': user_id_to_delete},
+                            "touch assigned clients"
+                        )
                         execute_with_savepoint(
                             text("DELETE FROM client_employee_assignments WHERE employee_id = :user_id"),
                             {'user_id': user_id_to_delete},
@@ -11268,8 +12313,8 @@ def update_or_delete_user(user_id):
                         
                         # Update support requests assigned_to
                         execute_with_savepoint(
-                            text("UPDATE support_requests SET assigned_to = NULL WHERE assigned_to = :user_id"),
-                            {'user_id': user_id_str},
+                            text("UPDATE support_requests SET assigned_to = NULL, updated_at = :now WHERE assigned_to = :user_id"),
+                            {'now': datetime.utcnow(), 'user_id': user_id_str},
                             "update support_requests"
                         )
                         
@@ -11309,15 +12354,11 @@ def update_or_delete_user(user_id):
                 return jsonify({'message': 'User deleted successfully'}), 200
             except Exception as delete_error:
                 db.session.rollback()
-                app.logger.error(f"Error deleting user: {delete_error}")
-                import traceback
-                traceback.print_exc()
+                app.logger.exception(f"Error deleting user: {delete_error}")
                 return jsonify({'error': 'Failed to delete user', 'details': str(delete_error)}), 500
         except Exception as e:
             db.session.rollback()
-            app.logger.error(f"Error in delete operation: {e}")
-            import traceback
-            traceback.print_exc()
+            app.logger.exception(f"Error in delete operation: {e}")
             return jsonify({'error': 'Failed to delete user', 'details': str(e)}), 500
 
 @app.route('/api/admin/users/<user_id>/employee', methods=['PUT'])
@@ -11368,7 +12409,7 @@ def admin_toggle_employee(user_id):
             'user': user.to_dict()
         })
     except Exception as e:
-        print(f"Error updating employee status: {e}")
+        admin_log.error(f"Error updating employee status: {e}")
         app.logger.error(f"Error updating employee status: {e}")
         db.session.rollback()
         return jsonify({'error': 'Failed to update employee status'}), 500
@@ -11389,13 +12430,15 @@ from datetime import datetime
 import random
 import string
 import hashlib
-import time
 from datetime import datetime
 from flask_socketio import emit, join_room, leave_room
 from flask import request
 
 # Game room storage (in-memory for now, Redis later)
 game_rooms = {}
+# Guards the guessing game's guess/vote tallies: handlers run concurrently (threads or greenlets),
+# so the check that the last guess/vote is in and the phase change after it must be one step
+guessing_lock = threading.Lock()
 
 # Maximum players per room
 MAX_PLAYERS = 16
@@ -11424,18 +12467,17 @@ def load_game_content():
         words_path = os.path.join(os.path.dirname(__file__), 'game_content', 'drawing_words.json')
         with open(words_path, 'r') as f:
             DRAWING_WORDS = json.load(f)
-        print(f'[LookUp.Cafe] Loaded {sum(len(words) for words in DRAWING_WORDS.values())} drawing words')
+        games_log.info(f'Loaded {sum(len(words) for words in DRAWING_WORDS.values())} drawing words')
         
         # Load puzzles
         puzzles_path = os.path.join(os.path.dirname(__file__), 'game_content', 'puzzles.json')
         with open(puzzles_path, 'r') as f:
             PUZZLES = json.load(f)
-        print(f'[LookUp.Cafe] Loaded {len(PUZZLES)} puzzles')
+        games_log.info(f'Loaded {len(PUZZLES)} puzzles')
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Warning: Could not load game content: {e}')
-        print('[LookUp.Cafe] Using fallback content')
+        games_log.warning(f'Could not load game content: {e}. Using fallback content')
         # Fallback to simple lists
         DRAWING_WORDS = {
             'easy': ['cat', 'dog', 'house', 'tree', 'car', 'sun', 'moon', 'star']
@@ -11546,14 +12588,14 @@ def handle_create_room(data):
         }
         join_room(room_code)
         
-        print(f'[LookUp.Cafe] Room created: {room_code} by {player_name}')
+        games_log.info(f'Room created: {room_code} by {player_name}')
         emit('game:room-created', {'room': game_rooms[room_code]})
         # Broadcast room list update
         socketio.emit('game:rooms-updated')
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error creating room: {e}')
+        games_log.error(f'Error creating room: {e}')
         emit('game:error', {'message': f'Failed to create room: {str(e)}'})
 
 
@@ -11600,7 +12642,7 @@ def handle_join_room(data):
         # Join socket.io room
         join_room(room_code)
         
-        print(f'[LookUp.Cafe] Player {player_name} joined room {room_code}')
+        games_log.info(f'Player {player_name} joined room {room_code}')
         
         # Emit to the joining player
         emit('game:room-joined', {'room': room})
@@ -11613,7 +12655,7 @@ def handle_join_room(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error joining room: {e}')
+        games_log.error(f'Error joining room: {e}')
         emit('game:error', {'message': f'Failed to join room: {str(e)}'})
 
 
@@ -11642,16 +12684,16 @@ def handle_leave_room(data):
         # If room is empty, delete it
         if not room['players']:
             del game_rooms[room_code]
-            print(f'[LookUp.Cafe] Room {room_code} deleted (empty)')
+            games_log.info(f'Room {room_code} deleted (empty)')
             return
         
         # If host left, assign new host
         if room['hostId'] == player_id and room['players']:
             room['players'][0]['isHost'] = True
             room['hostId'] = room['players'][0]['id']
-            print(f'[LookUp.Cafe] New host assigned in room {room_code}: {room["players"][0]["name"]}')
+            games_log.info(f'New host assigned in room {room_code}: {room["players"][0]["name"]}')
         
-        print(f'[LookUp.Cafe] Player {player_name} left room {room_code}')
+        games_log.info(f'Player {player_name} left room {room_code}')
         
         # Notify others
         emit('game:player-left', {
@@ -11662,7 +12704,7 @@ def handle_leave_room(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error leaving room: {e}')
+        games_log.error(f'Error leaving room: {e}')
 
 
 @socketio.on('game:start-game')
@@ -11713,7 +12755,7 @@ def handle_start_game(data):
             room['roundPhase'] = None  # Host needs to set words first
             room['currentDrawerId'] = room['players'][0]['id']  # Reuse as clue giver
         
-        print(f'[LookUp.Cafe] Game started in room {room_code}: {game_type}')
+        games_log.info(f'Game started in room {room_code}: {game_type}')
         
         # Notify all players
         emit('game:started', {'room': room}, room=room_code)
@@ -11750,7 +12792,7 @@ def handle_start_game(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error starting game: {e}')
+        games_log.error(f'Error starting game: {e}')
         emit('game:error', {'message': f'Failed to start game: {str(e)}'})
 
 
@@ -11783,7 +12825,7 @@ def handle_submit_answer(data):
                 points = 100
                 player['score'] += points
                 
-                print(f'[LookUp.Cafe] Correct answer in room {room_code}: {player["name"]} guessed {answer}')
+                games_log.info(f'Correct answer in room {room_code}: {player["name"]} guessed {answer}')
                 
                 # Notify all players
                 emit('game:correct-answer', {
@@ -11802,7 +12844,7 @@ def handle_submit_answer(data):
                 for p in room['players']:
                     p['score'] += points
                 
-                print(f'[LookUp.Cafe] Puzzle solved in room {room_code} by {player["name"]}')
+                games_log.info(f'Puzzle solved in room {room_code} by {player["name"]}')
                 
                 # Notify all players
                 emit('game:puzzle-solved', {
@@ -11822,7 +12864,7 @@ def handle_submit_answer(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error submitting answer: {e}')
+        games_log.error(f'Error submitting answer: {e}')
 
 
 @socketio.on('game:draw')
@@ -11846,7 +12888,7 @@ def handle_draw(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error handling draw: {e}')
+        games_log.error(f'Error handling draw: {e}')
 
 
 @socketio.on('game:clear-canvas')
@@ -11869,7 +12911,7 @@ def handle_clear_canvas(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error clearing canvas: {e}')
+        games_log.error(f'Error clearing canvas: {e}')
 
 
 @socketio.on('game:next-round')
@@ -11915,7 +12957,7 @@ def handle_next_round(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error starting next round: {e}')
+        games_log.error(f'Error starting next round: {e}')
 
 
 @socketio.on('game:chat')
@@ -11945,7 +12987,7 @@ def handle_chat(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error handling chat: {e}')
+        games_log.error(f'Error handling chat: {e}')
 
 
 @socketio.on('disconnect')
@@ -11963,7 +13005,7 @@ def handle_disconnect():
                 # Mark as inactive instead of removing immediately (allow reconnection)
                 player['isActive'] = False
                 
-                print(f'[LookUp.Cafe] Player {player_name} disconnected from room {room_code}')
+                games_log.info(f'Player {player_name} disconnected from room {room_code}')
                 
                 # Notify others
                 emit('game:player-disconnected', {
@@ -11977,7 +13019,7 @@ def handle_disconnect():
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error handling disconnect: {e}')
+        games_log.error(f'Error handling disconnect: {e}')
 
 
 
@@ -12004,7 +13046,7 @@ def get_api_keys():
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting API keys: {e}")
+        integrations_log.error(f"Error getting API keys: {e}")
         return jsonify({'error': 'Failed to get API keys'}), 500
 
 
@@ -12062,9 +13104,7 @@ def save_api_key():
         })
     except Exception as e:
         db.session.rollback()
-        print(f"Error saving API key: {e}")
-        import traceback
-        traceback.print_exc()
+        integrations_log.exception(f"Error saving API key: {e}")
         return jsonify({'error': 'Failed to save API key'}), 500
 
 
@@ -12093,13 +13133,61 @@ def delete_api_key(service_name):
         return jsonify({'success': True})
     except Exception as e:
         db.session.rollback()
-        print(f"Error deleting API key: {e}")
+        integrations_log.error(f"Error deleting API key: {e}")
         return jsonify({'error': 'Failed to delete API key'}), 500
 
 
+# Re-fetch this many days before the stored watermark on incremental syncs,
+# since recent wellness entries and activity RPE/feel are often edited after the fact
+INTERVALS_SYNC_OVERLAP_DAYS = 3
+UPSERT_BATCH_SIZE = 500
+
+
+def bulk_upsert(model, rows, conflict_columns, update_columns, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Write rows with INSERT ... ON CONFLICT DO UPDATE, in batches.
+    
+    Uses the dialect-specific insert construct so the same call works on
+    PostgreSQL (Render) and SQLite (local). Rows sharing a conflict key are
+    collapsed (last one wins) because PostgreSQL rejects a statement that
+    touches the same row twice. With no update_columns, conflicts are ignored.
+    
+    Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+    
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise ValueError(f"bulk_upsert is not supported for dialect '{dialect}'")
+    
+    deduped = {}
+    for row in rows:
+        deduped[tuple(row[col] for col in conflict_columns)] = row
+    rows = list(deduped.values())
+    
+    table = model.__table__
+    for i in range(0, len(rows), batch_size):
+        stmt = dialect_insert(table).values(rows[i:i + batch_size])
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={col: stmt.excluded[col] for col in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+        db.session.execute(stmt)
+    
+    return len(rows)
+
+
 @app.route('/api/wellness/intervals/sync', methods=['POST'])
 def sync_intervals_data():
-    """Sync data from Intervals.icu"""
+    """Sync data from Intervals.icu (incremental from the per-user watermark unless fullSync is set)"""
     if not DB_AVAILABLE:
         return jsonify({'error': 'Database not available'}), 503
     
@@ -12126,95 +13214,116 @@ def sync_intervals_data():
         # Get date range from request
         data = request.json or {}
         days_back = data.get('daysBack', 30)
+        full_sync = bool(data.get('fullSync', False))
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
         
-        # Fetch and store activities
-        activities = client.get_activities(start_date, end_date)
-        activity_count = 0
+        # Only pull days at or after the watermark (minus a small overlap) on repeat syncs
+        sync_state = IntervalsSyncState.query.get(profile.id)
+        incremental = False
+        if sync_state and sync_state.last_synced_date and not full_sync:
+            watermark_start = datetime.combine(
+                sync_state.last_synced_date - timedelta(days=INTERVALS_SYNC_OVERLAP_DAYS),
+                datetime.min.time()
+            )
+            if watermark_start > start_date:
+                start_date = watermark_start
+                incremental = True
         
-        for activity_data in activities:
-            existing = IntervalsActivityData.query.filter_by(
-                user_id=profile.id,
-                activity_id=activity_data['activity_id']
-            ).first()
-            
-            if existing:
-                # Update existing
-                for key, value in activity_data.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                existing.synced_at = datetime.utcnow()
-            else:
-                # Create new
-                new_activity = IntervalsActivityData(
-                    id=str(uuid.uuid4()),
-                    user_id=profile.id,
-                    **activity_data,
-                    synced_at=datetime.utcnow()
-                )
-                db.session.add(new_activity)
-            activity_count += 1
+        # The watermark below only advances when both fetches succeeded, so a failed window is retried
+        try:
+            activities, wellness_data = client.get_activities_and_wellness(start_date, end_date)
+        except requests.RequestException as e:
+            integrations_log.warning(f"Intervals.icu fetch failed, sync watermark left unchanged: {e}")
+            return jsonify({'error': 'Failed to fetch data from Intervals.icu'}), 502
+        synced_at = datetime.utcnow()
         
-        # Fetch and store wellness data
-        wellness_data = client.get_wellness_data(start_date, end_date)
-        wellness_count = 0
+        activity_rows = []
+        for activity_data in activities:
+            if not activity_data.get('activity_date'):
+                continue
+            activity_rows.append({
+                **activity_data,
+                'id': str(uuid.uuid4()),
+                'user_id': profile.id,
+                'activity_date': date.fromisoformat(activity_data['activity_date']),
+                'synced_at': synced_at
+            })
         
+        wellness_rows = []
+        menstrual_rows = []
         for wellness_entry in wellness_data:
             metric_date = wellness_entry.pop('metric_date')
             menstruation = wellness_entry.pop('menstruation', False)
-            
-            existing = IntervalsWellnessMetrics.query.filter_by(
-                user_id=profile.id,
-                metric_date=metric_date
-            ).first()
-            
-            if existing:
-                for key, value in wellness_entry.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                existing.synced_at = datetime.utcnow()
-            else:
-                new_metric = IntervalsWellnessMetrics(
-                    id=str(uuid.uuid4()),
-                    user_id=profile.id,
-                    metric_date=metric_date,
-                    **wellness_entry,
-                    synced_at=datetime.utcnow()
-                )
-                db.session.add(new_metric)
-            wellness_count += 1
+            if not metric_date:
+                continue
+            metric_date = date.fromisoformat(metric_date)
+            
+            wellness_rows.append({
+                **wellness_entry,
+                'id': str(uuid.uuid4()),
+                'user_id': profile.id,
+                'metric_date': metric_date,
+                'synced_at': synced_at
+            })
             
             # Handle menstrual data if present and opted in
             if menstruation:
-                existing_menstrual = IntervalsMenstrualData.query.filter_by(
-                    user_id=profile.id,
-                    cycle_date=metric_date
-                ).first()
-                
-                if not existing_menstrual:
-                    new_menstrual = IntervalsMenstrualData(
-                        id=str(uuid.uuid4()),
-                        user_id=profile.id,
-                        cycle_date=metric_date,
-                        phase='menstruation',
-                        opt_in=True,
-                        synced_at=datetime.utcnow()
-                    )
-                    db.session.add(new_menstrual)
+                menstrual_rows.append({
+                    'id': str(uuid.uuid4()),
+                    'user_id': profile.id,
+                    'cycle_date': metric_date,
+                    'phase': 'menstruation',
+                    'opt_in': True,
+                    'synced_at': synced_at
+                })
+        
+        activity_count = bulk_upsert(
+            IntervalsActivityData, activity_rows,
+            conflict_columns=['user_id', 'activity_id'],
+            update_columns=['activity_date', 'activity_name', 'activity_type', 'rpe', 'feel',
+                            'duration', 'distance', 'power_data', 'hr_data', 'synced_at']
+        )
+        wellness_count = bulk_upsert(
+            IntervalsWellnessMetrics, wellness_rows,
+            conflict_columns=['user_id', 'metric_date'],
+            update_columns=['hrv', 'resting_hr', 'weight', 'sleep_seconds', 'sleep_quality',
+                            'fatigue', 'mood', 'stress', 'soreness', 'synced_at']
+        )
+        # Keep any phase/symptoms already recorded for the day; only refresh the sync time
+        bulk_upsert(
+            IntervalsMenstrualData, menstrual_rows,
+            conflict_columns=['user_id', 'cycle_date'],
+            update_columns=['synced_at']
+        )
+        
+        if not sync_state:
+            sync_state = IntervalsSyncState(user_id=profile.id)
+            db.session.add(sync_state)
+        sync_state.last_synced_date = end_date.date()
+        sync_state.last_synced_at = synced_at
         
         db.session.commit()
         
+        # Trend rollups are derived data; a failure here should not fail the sync
+        try:
+            update_wellness_rollups(profile.id, start_date.date(), end_date.date())
+            db.session.commit()
+        except Exception as rollup_error:
+            db.session.rollback()
+            integrations_log.error(f"Error updating wellness rollups: {rollup_error}")
+        
         return jsonify({
             'success': True,
             'activitiesSynced': activity_count,
-            'wellnessMetricsSynced': wellness_count
+            'wellnessMetricsSynced': wellness_count,
+            'syncedFrom': start_date.date().isoformat(),
+            'syncedTo': end_date.date().isoformat(),
+            'incremental': incremental
         })
     except Exception as e:
         db.session.rollback()
-        print(f"Error syncing Intervals.icu data: {e}")
-        import traceback
-        traceback.print_exc()
+        integrations_log.exception(f"Error syncing Intervals.icu data: {e}")
         return jsonify({'error': 'Failed to sync data'}), 500
 
 
@@ -12242,7 +13351,7 @@ def get_intervals_activities():
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting activities: {e}")
+        integrations_log.error(f"Error getting activities: {e}")
         return jsonify({'error': 'Failed to get activities'}), 500
 
 
@@ -12270,10 +13379,236 @@ def get_intervals_wellness():
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting wellness metrics: {e}")
+        integrations_log.error(f"Error getting wellness metrics: {e}")
         return jsonify({'error': 'Failed to get wellness metrics'}), 500
 
 
+@app.route('/api/wellness/intervals/activities/<activity_id>/streams', methods=['GET'])
+def get_intervals_activity_streams(activity_id):
+    """Get downsampled activity streams, ingesting them from Intervals.icu on first request"""
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    
+    profile, error_response, error_code = get_or_create_user_profile()
+    if error_response:
+        return error_response, error_code
+    
+    try:
+        from activity_streams import encode_streams, decode_streams, downsample_streams, compute_derived_metrics
+        
+        points = request.args.get('points', 500, type=int)
+        channel = request.args.get('channel')
+        
+        stream = IntervalsActivityStream.query.filter_by(
+            user_id=profile.id,
+            activity_id=activity_id
+        ).first()
+        
+        if not stream:
+            from intervals_icu import decrypt_api_key, IntervalsICUClient
+            
+            api_key_record = UserAPIKey.query.filter_by(
+                user_id=profile.id,
+                service_name='intervals_icu'
+            ).first()
+            if not api_key_record:
+                return jsonify({'error': 'Intervals.icu API key not configured'}), 400
+            
+            client = IntervalsICUClient(decrypt_api_key(api_key_record.api_key_encrypted))
+            raw_streams = client.get_activity_streams(activity_id)
+            raw_streams = {name: values for name, values in raw_streams.items() if values}
+            if not raw_streams:
+                return jsonify({'error': 'No stream data available for this activity'}), 404
+            
+            # Zone bounds use the athlete's highest recorded max HR across synced activities
+            max_hr = None
+            for hr_data, in db.session.query(IntervalsActivityData.hr_data).filter_by(user_id=profile.id):
+                activity_max_hr = (hr_data or {}).get('max_hr')
+                if activity_max_hr and (max_hr is None or activity_max_hr > max_hr):
+                    max_hr = activity_max_hr
+            
+            data = encode_streams(raw_streams)
+            decoded = decode_streams(data)
+            stream = IntervalsActivityStream(
+                id=str(uuid.uuid4()),
+                user_id=profile.id,
+                activity_id=activity_id,
+                channels=','.join(decoded.keys()),
+                point_count=max(values.size for values in decoded.values()),
+                data=data,
+                raw_size=len(json.dumps(raw_streams)),
+                derived_metrics=compute_derived_metrics(decoded, max_hr=max_hr)
+            )
+            db.session.add(stream)
+            db.session.commit()
+        else:
+            decoded = decode_streams(stream.data)
+        
+        return jsonify({
+            **stream.to_dict(),
+            'streams': downsample_streams(decoded, points, key_channel=channel)
+        })
+    except Exception as e:
+        db.session.rollback()  # Rollback failed transaction
+        integrations_log.error(f"Error getting activity streams: {e}")
+        return jsonify({'error': 'Failed to get activity streams'}), 500
+
+
+def update_wellness_rollups(user_id, from_date, to_date):
+    """
+    Recompute wellness_daily_rollups for user_id from from_date through to_date.
+    
+    ATL/CTL are chained from the latest stored rollup before from_date, so if
+    there is a gap the range is widened back to that row; with no stored
+    rollups the range starts at the user's earliest synced day. Raw data for
+    the baseline window before the range is loaded so rolling values are
+    complete on the first recomputed day. The caller commits.
+    
+    Returns the number of rollup rows written.
+    """
+    import numpy as np
+    from sqlalchemy import func
+    from wellness_trends import LOOKBACK_DAYS, date_range, compute_daily_trends, to_rows
+    
+    seed_row = WellnessDailyRollup.query.filter(
+        WellnessDailyRollup.user_id == user_id,
+        WellnessDailyRollup.day < from_date
+    ).order_by(WellnessDailyRollup.day.desc()).first()
+    
+    if seed_row:
+        from_date = min(from_date, seed_row.day + timedelta(days=1))
+        atl_seed, ctl_seed = seed_row.atl or 0.0, seed_row.ctl or 0.0
+    else:
+        earliest = [
+            db.session.query(func.min(IntervalsWellnessMetrics.metric_date)).filter_by(user_id=user_id).scalar(),
+            db.session.query(func.min(IntervalsActivityData.activity_date)).filter_by(user_id=user_id).scalar()
+        ]
+        earliest = [d for d in earliest if d]
+        if not earliest:
+            return 0
+        from_date = min(from_date, min(earliest))
+        atl_seed = ctl_seed = 0.0
+    
+    window_start = from_date - timedelta(days=LOOKBACK_DAYS)
+    days = date_range(window_start, to_date)
+    hrv = np.full(len(days), np.nan)
+    resting_hr = np.full(len(days), np.nan)
+    sleep_hours = np.full(len(days), np.nan)
+    load = np.zeros(len(days))
+    
+    metrics = db.session.query(
+        IntervalsWellnessMetrics.metric_date,
+        IntervalsWellnessMetrics.hrv,
+        IntervalsWellnessMetrics.resting_hr,
+        IntervalsWellnessMetrics.sleep_seconds
+    ).filter(
+        IntervalsWellnessMetrics.user_id == user_id,
+        IntervalsWellnessMetrics.metric_date >= window_start,
+        IntervalsWellnessMetrics.metric_date <= to_date
+    ).all()
+    if metrics:
+        idx = np.array([(m.metric_date - window_start).days for m in metrics])
+        hrv[idx] = np.array([m.hrv for m in metrics], dtype=np.float64)
+        resting_hr[idx] = np.array([m.resting_hr for m in metrics], dtype=np.float64)
+        sleep_hours[idx] = np.array([m.sleep_seconds for m in metrics], dtype=np.float64) / 3600.0
+    
+    daily_load = db.session.query(
+        IntervalsActivityData.activity_date,
+        func.sum(IntervalsActivityData.duration * IntervalsActivityData.rpe) / 60.0
+    ).filter(
+        IntervalsActivityData.user_id == user_id,
+        IntervalsActivityData.activity_date >= window_start,
+        IntervalsActivityData.activity_date <= to_date
+    ).group_by(IntervalsActivityData.activity_date).all()
+    if daily_load:
+        idx = np.array([(day - window_start).days for day, _ in daily_load])
+        load[idx] = np.array([value or 0.0 for _, value in daily_load], dtype=np.float64)
+    
+    trends = compute_daily_trends(
+        days, hrv, resting_hr, sleep_hours, load,
+        atl_seed=atl_seed, ctl_seed=ctl_seed, load_start=LOOKBACK_DAYS
+    )
+    rows = to_rows(days, trends, first_day=from_date)
+    now = datetime.utcnow()
+    for row in rows:
+        row.update({'id': str(uuid.uuid4()), 'user_id': user_id, 'updated_at': now})
+    
+    return bulk_upsert(
+        WellnessDailyRollup, rows,
+        conflict_columns=['user_id', 'day'],
+        update_columns=list(trends) + ['updated_at']
+    )
+
+
+# Rollup column -> payload key for /api/wellness/trends
+WELLNESS_TREND_FIELDS = {
+    'hrv': 'hrv', 'hrv_7d': 'hrv7d', 'hrv_baseline': 'hrvBaseline', 'hrv_z': 'hrvZ',
+    'resting_hr': 'restingHr', 'resting_hr_7d': 'restingHr7d',
+    'resting_hr_baseline': 'restingHrBaseline', 'resting_hr_z': 'restingHrZ',
+    'sleep_hours': 'sleepHours', 'sleep_hours_7d': 'sleepHours7d',
+    'sleep_hours_baseline': 'sleepHoursBaseline', 'sleep_hours_z': 'sleepHoursZ',
+    'load': 'load', 'atl': 'atl', 'ctl': 'ctl', 'tsb': 'tsb',
+}
+
+
+@app.route('/api/wellness/trends', methods=['GET'])
+def get_wellness_trends():
+    """Get precomputed wellness trends as a columnar time series"""
+    if not DB_AVAILABLE:
+        return jsonify({'error': 'Database not available'}), 503
+    
+    profile, error_response, error_code = get_or_create_user_profile()
+    if error_response:
+        return error_response, error_code
+    
+    try:
+        end = request.args.get('end')
+        end_date = datetime.strptime(end, '%Y-%m-%d').date() if end else datetime.now().date()
+        start = request.args.get('start')
+        if start:
+            start_date = datetime.strptime(start, '%Y-%m-%d').date()
+        else:
+            start_date = end_date - timedelta(days=request.args.get('daysBack', 90, type=int))
+    except (ValueError, OverflowError):
+        return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+    
+    try:
+        requested = request.args.get('fields')
+        if requested:
+            payload_to_column = {key: column for column, key in WELLNESS_TREND_FIELDS.items()}
+            columns = [payload_to_column[f] for f in requested.split(',') if f in payload_to_column]
+        else:
+            columns = list(WELLNESS_TREND_FIELDS)
+        
+        # Backfill users whose data was synced before rollups existed
+        if not db.session.query(WellnessDailyRollup.id).filter_by(user_id=profile.id).first():
+            if update_wellness_rollups(profile.id, start_date, end_date):
+                db.session.commit()
+        
+        rows = db.session.query(
+            WellnessDailyRollup.day,
+            *[getattr(WellnessDailyRollup, column) for column in columns]
+        ).filter(
+            WellnessDailyRollup.user_id == profile.id,
+            WellnessDailyRollup.day >= start_date,
+            WellnessDailyRollup.day <= end_date
+        ).order_by(WellnessDailyRollup.day).all()
+        
+        return jsonify({
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'dates': [row[0].isoformat() for row in rows],
+            'series': {
+                WELLNESS_TREND_FIELDS[column]: [row[i + 1] for row in rows]
+                for i, column in enumerate(columns)
+            }
+        })
+    except Exception as e:
+        db.session.rollback()  # Rollback failed transaction
+        integrations_log.error(f"Error getting wellness trends: {e}")
+        return jsonify({'error': 'Failed to get wellness trends'}), 500
+
+
 # ============================================
 # Rise Journey API Endpoints
 # ============================================
@@ -12362,15 +13697,11 @@ def submit_rise_journey_quiz():
         })
     except KeyError as e:
         db.session.rollback()
-        print(f"Error submitting quiz - missing key: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error submitting quiz - missing key: {e}")
         return jsonify({'error': f'Missing required data: {str(e)}'}), 400
     except AttributeError as e:
         db.session.rollback()
-        print(f"Error submitting quiz - attribute error: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error submitting quiz - attribute error: {e}")
         error_msg = str(e)
         if 'RiseJourneyQuiz' in error_msg or 'RiseJourneyTrial' in error_msg:
             return jsonify({
@@ -12382,9 +13713,7 @@ def submit_rise_journey_quiz():
     except Exception as e:
         db.session.rollback()
         error_msg = str(e)
-        print(f"Error submitting quiz: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error submitting quiz: {e}")
         
         # Check for common database errors
         if 'relation' in error_msg.lower() and 'does not exist' in error_msg.lower():
@@ -12423,7 +13752,7 @@ def get_rise_journey_quiz():
         return jsonify({'quiz': None})
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting quiz: {e}")
+        content_log.error(f"Error getting quiz: {e}")
         return jsonify({'error': 'Failed to get quiz'}), 500
 
 @require_session
@@ -12448,7 +13777,7 @@ def get_rise_journey_trial():
         return jsonify({'trial': None})
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting trial: {e}")
+        content_log.error(f"Error getting trial: {e}")
         return jsonify({'error': 'Failed to get trial'}), 500
 
 @require_session
@@ -12552,9 +13881,7 @@ def check_rise_journey_access():
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error checking Rise Journey access: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error checking Rise Journey access: {e}")
         return jsonify({'error': 'Failed to check access'}), 500
 
 @require_session
@@ -12573,18 +13900,16 @@ def get_rise_journey_levels():
         
         # If no levels exist, try to seed them
         if len(levels) == 0:
-            print("⚠ No levels found, attempting to seed...")
+            content_log.warning("⚠ No levels found, attempting to seed...")
             try:
                 with app.app_context():
                     seed_rise_journey_levels()
                 # Query again after seeding
                 levels = RiseJourneyLevel.query.order_by(RiseJourneyLevel.order).all()
-                print(f"✓ After seeding, found {len(levels)} levels")
+                content_log.info(f"✓ After seeding, found {len(levels)} levels")
             except Exception as seed_error:
                 db.session.rollback()  # Rollback failed transaction
-                print(f"⚠ Failed to seed levels: {seed_error}")
-                import traceback
-                traceback.print_exc()
+                content_log.exception(f"⚠ Failed to seed levels: {seed_error}")
         
         progress_records = {p.level_id: p for p in RiseJourneyProgress.query.filter_by(user_id=profile.id).all()}
         
@@ -12598,9 +13923,7 @@ def get_rise_journey_levels():
         return jsonify({'levels': result})
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting levels: {e}")
-        import traceback
-        traceback.print_exc()
+        content_log.exception(f"Error getting levels: {e}")
         return jsonify({'error': 'Failed to get levels'}), 500
 
 @require_session
@@ -12628,7 +13951,7 @@ def get_rise_journey_lessons(level_id):
         return jsonify({'lessons': result})
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting lessons: {e}")
+        content_log.error(f"Error getting lessons: {e}")
         return jsonify({'error': 'Failed to get lessons'}), 500
 
 @require_session
@@ -12659,7 +13982,7 @@ def get_rise_journey_notes(lesson_id):
         })
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f"Error getting notes: {e}")
+        content_log.error(f"Error getting notes: {e}")
         return jsonify({'error': 'Failed to get notes'}), 500
 
 @require_session
@@ -12698,7 +14021,7 @@ def save_rise_journey_note(lesson_id):
         return jsonify({'note': note.to_dict()})
     except Exception as e:
         db.session.rollback()
-        print(f"Error saving note: {e}")
+        content_log.error(f"Error saving note: {e}")
         return jsonify({'error': 'Failed to save note'}), 500
 
 @require_session
@@ -12761,7 +14084,7 @@ def complete_rise_journey_lesson(lesson_id):
         return jsonify({'success': True, 'progress': progress.to_dict()})
     except Exception as e:
         db.session.rollback()
-        print(f"Error completing lesson: {e}")
+        content_log.error(f"Error completing lesson: {e}")
         return jsonify({'error': 'Failed to complete lesson'}), 500
 
 @require_session
@@ -12796,13 +14119,40 @@ def start_rise_journey_level(level_id):
         return jsonify({'progress': progress.to_dict()})
     except Exception as e:
         db.session.rollback()
-        print(f"Error starting level: {e}")
+        content_log.error(f"Error starting level: {e}")
         return jsonify({'error': 'Failed to start level'}), 500
 
 # ============================================
 # Intervals.icu Proxy Routes (CORS Bypass)
 # ============================================
 
+# Shared by the proxy routes below: per-key hashed cache, request coalescing and one pooled session
+from intervals_icu import IntervalsProxyCache
+intervals_proxy_cache = IntervalsProxyCache(ttl_seconds=int(os.environ.get('INTERVALS_PROXY_CACHE_TTL', 30)))
+
+
+def intervals_proxy_response(upstream, cache_status):
+    """Build the browser response for a successful proxied call, answering If-None-Match with 304"""
+    from flask import Response
+    from werkzeug.http import unquote_etag
+    
+    if not upstream.is_json:
+        app.logger.error("Failed to parse JSON response from Intervals.icu")
+        return jsonify({'error': 'Invalid JSON response from Intervals.icu'}), 502
+    
+    etag, weak = unquote_etag(upstream.etag)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(upstream.content, status=200, mimetype='application/json')
+    response.set_etag(etag, weak=weak)
+    response.headers['Cache-Control'] = f'private, max-age={intervals_proxy_cache.ttl_seconds}'
+    # The body depends on the caller's API key, so a cached copy must not be reused for another key
+    response.vary.add('X-Intervals-API-Key')
+    response.headers['X-Cache'] = cache_status
+    return response
+
+
 @app.route('/api/intervals-proxy/activities', methods=['GET', 'OPTIONS'])
 def intervals_proxy_activities():
     """Proxy endpoint to bypass CORS for Intervals.icu activities"""
@@ -12820,18 +14170,8 @@ def intervals_proxy_activities():
             app.logger.warning(f"Missing required param: oldest={oldest}")
             return jsonify({'error': 'oldest parameter is required'}), 400
         
-        # Intervals.icu uses basic auth with username "API_KEY" and password as the API key
         # Use "0" for athlete_id to use the athlete associated with the API key
-        import base64
-        auth_string = f"API_KEY:{api_key}"
-        auth_header = f"Basic {base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')}"
-        
-        response = requests.get(
-            f'https://intervals.icu/api/v1/athlete/0/activities',
-            headers={'Authorization': auth_header},
-            params={'oldest': oldest},
-            timeout=(5, 30)
-        )
+        response, cache_status = intervals_proxy_cache.get(api_key, '/athlete/0/activities', {'oldest': oldest})
         
         # Check if response is successful
         if response.status_code >= 400:
@@ -12850,14 +14190,7 @@ def intervals_proxy_activities():
                     'statusCode': response.status_code
                 }), response.status_code
         
-        # Try to parse as JSON to validate
-        try:
-            data = response.json()
-            return jsonify(data), 200
-        except ValueError as e:
-            db.session.rollback()  # Rollback failed transaction
-            app.logger.error(f"Failed to parse JSON response: {e}")
-            return jsonify({'error': 'Invalid JSON response from Intervals.icu'}), 502
+        return intervals_proxy_response(response, cache_status)
         
     except requests.RequestException as e:
         app.logger.error(f"Request exception in intervals_proxy_activities: {e}")
@@ -12884,18 +14217,8 @@ def intervals_proxy_wellness():
             app.logger.warning(f"Missing required param: oldest={oldest}")
             return jsonify({'error': 'oldest parameter is required'}), 400
         
-        # Intervals.icu uses basic auth with username "API_KEY" and password as the API key
         # Use "0" for athlete_id to use the athlete associated with the API key
-        import base64
-        auth_string = f"API_KEY:{api_key}"
-        auth_header = f"Basic {base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')}"
-        
-        response = requests.get(
-            f'https://intervals.icu/api/v1/athlete/0/wellness',
-            headers={'Authorization': auth_header},
-            params={'oldest': oldest},
-            timeout=(5, 30)
-        )
+        response, cache_status = intervals_proxy_cache.get(api_key, '/athlete/0/wellness', {'oldest': oldest})
         
         # Check if response is successful
         if response.status_code >= 400:
@@ -12906,14 +14229,7 @@ def intervals_proxy_wellness():
             except:
                 return jsonify({'error': 'Intervals.icu API error', 'detail': response.text[:200]}), response.status_code
         
-        # Try to parse as JSON to validate
-        try:
-            data = response.json()
-            return jsonify(data), 200
-        except ValueError as e:
-            db.session.rollback()  # Rollback failed transaction
-            app.logger.error(f"Failed to parse JSON response: {e}")
-            return jsonify({'error': 'Invalid JSON response from Intervals.icu'}), 502
+        return intervals_proxy_response(response, cache_status)
         
     except requests.RequestException as e:
         app.logger.error(f"Request exception in intervals_proxy_wellness: {e}")
@@ -12941,17 +14257,8 @@ def intervals_proxy_athlete():
             app.logger.warning(f"Missing API key in intervals_proxy_athlete")
             return jsonify({'error': 'Missing X-Intervals-API-Key header', 'detail': {'error': 'Unauthorized', 'status': 401}}), 401
         
-        # Intervals.icu uses basic auth with username "API_KEY" and password as the API key
         # Use "0" for athlete_id to use the athlete associated with the API key
-        import base64
-        auth_string = f"API_KEY:{api_key}"
-        auth_header = f"Basic {base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')}"
-        
-        response = requests.get(
-            f'https://intervals.icu/api/v1/athlete/0',
-            headers={'Authorization': auth_header},
-            timeout=(5, 30)
-        )
+        response, cache_status = intervals_proxy_cache.get(api_key, '/athlete/0')
         
         # Check if response is successful
         if response.status_code >= 400:
@@ -12972,14 +14279,7 @@ def intervals_proxy_athlete():
                     'statusCode': response.status_code
                 }), response.status_code
         
-        # Try to parse as JSON to validate
-        try:
-            data = response.json()
-            return jsonify(data), 200
-        except ValueError as e:
-            db.session.rollback()  # Rollback failed transaction
-            app.logger.error(f"Failed to parse JSON response: {e}")
-            return jsonify({'error': 'Invalid JSON response from Intervals.icu'}), 502
+        return intervals_proxy_response(response, cache_status)
         
     except requests.RequestException as e:
         app.logger.error(f"Request exception in intervals_proxy_athlete: {e}")
@@ -13017,14 +14317,14 @@ def handle_set_game_type(data):
         # Set game type
         room['gameType'] = game_type
         
-        print(f'[LookUp.Cafe] Game type set to {game_type} in room {room_code}')
+        games_log.info(f'Game type set to {game_type} in room {room_code}')
         
         # Notify all players in room
         emit('game:type-set', {'room': room}, room=room_code)
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error setting game type: {e}')
+        games_log.error(f'Error setting game type: {e}')
         emit('game:error', {'message': f'Failed to set game type: {str(e)}'})
 
 
@@ -13083,7 +14383,7 @@ def handle_set_words(data):
         room['currentRound'] = 1
         room['roundStartTime'] = time.time()
         
-        print(f'[LookUp.Cafe] Words set for room {room_code}: {len(cleaned_words)} words')
+        games_log.info(f'Words set for room {room_code}: {len(cleaned_words)} words')
         
         # Notify all players words are set and game is starting
         emit('guessing:words-set', {
@@ -13094,7 +14394,7 @@ def handle_set_words(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error setting words: {e}')
+        games_log.error(f'Error setting words: {e}')
         emit('game:error', {'message': f'Failed to set words: {str(e)}'})
 
 
@@ -13128,51 +14428,55 @@ def handle_submit_guess(data):
             emit('game:error', {'message': 'Game is not in progress'})
             return
         
-        if room.get('roundPhase') != 'guessing':
-            emit('game:error', {'message': 'Not in guessing phase'})
-            return
-        
         # Validate guess
         if not guess:
             emit('game:error', {'message': 'Guess cannot be empty'})
             return
         
-        # Store guess
-        if 'guesses' not in room:
-            room['guesses'] = {}
-        
-        room['guesses'][player_id] = {
-            'guess': guess.lower(),
-            'playerName': player['name'],
-            'timestamp': time.time()
-        }
+        with guessing_lock:
+            if room.get('roundPhase') != 'guessing':
+                emit('game:error', {'message': 'Not in guessing phase'})
+                return
+            
+            # Store guess
+            if 'guesses' not in room:
+                room['guesses'] = {}
+            
+            room['guesses'][player_id] = {
+                'guess': guess.lower(),
+                'playerName': player['name'],
+                'timestamp': time.time()
+            }
+            total_guesses = len(room['guesses'])
+            
+            active_non_host_players = [p for p in room['players'] if p['isActive'] and p['id'] != room['hostId']]
+            guesses_for_voting = None
+            if total_guesses >= len(active_non_host_players):
+                # Move to voting phase
+                room['roundPhase'] = 'voting'
+                room['votes'] = {}
+                
+                # Send all guesses for voting (still anonymized until results)
+                guesses_for_voting = [
+                    {
+                        'id': pid,
+                        'guess': g['guess'],
+                        'canVote': pid != player_id  # Can't vote for yourself
+                    }
+                    for pid, g in room['guesses'].items()
+                ]
         
-        print(f'[LookUp.Cafe] Player {player["name"]} submitted guess in room {room_code}')
+        games_log.info(f'Player {player["name"]} submitted guess in room {room_code}')
         
         # Notify all players (anonymized - don't show which player guessed what yet)
         emit('guessing:guess-submitted', {
-            'totalGuesses': len(room['guesses']),
-            'totalPlayers': len([p for p in room['players'] if p['isActive'] and p['id'] != room['hostId']]),
+            'totalGuesses': total_guesses,
+            'totalPlayers': len(active_non_host_players),
             'playerId': player_id  # Only send to that player so they know it was received
         }, room=room_code)
         
-        active_non_host_players = [p for p in room['players'] if p['isActive'] and p['id'] != room['hostId']]
-        if len(room['guesses']) >= len(active_non_host_players):
-            # Move to voting phase
-            room['roundPhase'] = 'voting'
-            room['votes'] = {}
-            
-            print(f'[LookUp.Cafe] Moving to voting phase in room {room_code}')
-            
-            # Send all guesses for voting (still anonymized until results)
-            guesses_for_voting = [
-                {
-                    'id': pid,
-                    'guess': g['guess'],
-                    'canVote': pid != player_id  # Can't vote for yourself
-                }
-                for pid, g in room['guesses'].items()
-            ]
+        if guesses_for_voting is not None:
+            games_log.info(f'Moving to voting phase in room {room_code}')
             
             emit('guessing:phase-changed', {
                 'roundPhase': 'voting',
@@ -13182,7 +14486,7 @@ def handle_submit_guess(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error submitting guess: {e}')
+        games_log.error(f'Error submitting guess: {e}')
         emit('game:error', {'message': f'Failed to submit guess: {str(e)}'})
 
 
@@ -13206,86 +14510,91 @@ def handle_vote(data):
             emit('game:error', {'message': 'You are not in this room'})
             return
         
-        # Check phase
-        if room.get('roundPhase') != 'voting':
-            emit('game:error', {'message': 'Not in voting phase'})
-        
         # Prevent host from voting
         if player_id == room['hostId']:
             emit('game:error', {'message': 'Host cannot vote'})
             return
-            return
         
         # Can't vote for yourself
         if voted_for_player_id == player_id:
             emit('game:error', {'message': 'Cannot vote for your own guess'})
             return
         
-        # Validate the voted player exists and has a guess
-        if voted_for_player_id not in room.get('guesses', {}):
-            emit('game:error', {'message': 'Invalid vote target'})
-            return
-        
-        # Store vote
-        if 'votes' not in room:
-            room['votes'] = {}
-        
-        room['votes'][player_id] = voted_for_player_id
+        results = None
+        with guessing_lock:
+            # Checked under the lock: once the last vote closes the round, late votes must not tally it again
+            if room.get('roundPhase') != 'voting':
+                emit('game:error', {'message': 'Not in voting phase'})
+                return
+            
+            # Validate the voted player exists and has a guess
+            if voted_for_player_id not in room.get('guesses', {}):
+                emit('game:error', {'message': 'Invalid vote target'})
+                return
+            
+            # Store vote
+            if 'votes' not in room:
+                room['votes'] = {}
+            
+            room['votes'][player_id] = voted_for_player_id
+            total_votes = len(room['votes'])
+            total_voters = len([p for p in room['players'] if p['isActive'] and p['id'] in room['guesses']])
+            
+            # Check if all players who guessed have voted (can't vote if you didn't guess)
+            players_who_guessed = list(room['guesses'].keys())
+            if total_votes >= len(players_who_guessed):
+                # Calculate results
+                vote_counts = {}
+                for voted_for in room['votes'].values():
+                    vote_counts[voted_for] = vote_counts.get(voted_for, 0) + 1
+                
+                # Find winner (most votes)
+                if vote_counts:
+                    winner_id = max(vote_counts.items(), key=lambda x: x[1])[0]
+                    winner_guess = room['guesses'][winner_id]
+                    winner_player = next((p for p in room['players'] if p['id'] == winner_id), None)
+                    
+                    # Award points
+                    if winner_player:
+                        winner_player['score'] += 10
+                    
+                    # Prepare results
+                    results = {
+                        'winnerId': winner_id,
+                        'winnerName': winner_player['name'] if winner_player else 'Unknown',
+                        'winnerGuess': winner_guess['guess'],
+                        'voteCount': vote_counts[winner_id],
+                        'secretWord': room['currentWord'],
+                        'allGuesses': [
+                            {
+                                'playerId': pid,
+                                'playerName': room['guesses'][pid]['playerName'],
+                                'guess': room['guesses'][pid]['guess'],
+                                'votes': vote_counts.get(pid, 0)
+                            }
+                            for pid in room['guesses'].keys()
+                        ],
+                        'updatedPlayers': room['players']
+                    }
+                    
+                    room['roundPhase'] = 'results'
         
-        print(f'[LookUp.Cafe] Player {player["name"]} voted in room {room_code}')
+        games_log.info(f'Player {player["name"]} voted in room {room_code}')
         
         # Notify vote received
         emit('guessing:vote-received', {
-            'totalVotes': len(room['votes']),
-            'totalPlayers': len([p for p in room['players'] if p['isActive'] and p['id'] in room['guesses']])
+            'totalVotes': total_votes,
+            'totalPlayers': total_voters
         }, room=room_code)
         
-        # Check if all players who guessed have voted (can't vote if you didn't guess)
-        players_who_guessed = list(room['guesses'].keys())
-        if len(room['votes']) >= len(players_who_guessed):
-            # Calculate results
-            vote_counts = {}
-            for voted_for in room['votes'].values():
-                vote_counts[voted_for] = vote_counts.get(voted_for, 0) + 1
-            
-            # Find winner (most votes)
-            if vote_counts:
-                winner_id = max(vote_counts.items(), key=lambda x: x[1])[0]
-                winner_guess = room['guesses'][winner_id]
-                winner_player = next((p for p in room['players'] if p['id'] == winner_id), None)
-                
-                # Award points
-                if winner_player:
-                    winner_player['score'] += 10
-                
-                # Prepare results
-                results = {
-                    'winnerId': winner_id,
-                    'winnerName': winner_player['name'] if winner_player else 'Unknown',
-                    'winnerGuess': winner_guess['guess'],
-                    'voteCount': vote_counts[winner_id],
-                    'secretWord': room['currentWord'],
-                    'allGuesses': [
-                        {
-                            'playerId': pid,
-                            'playerName': room['guesses'][pid]['playerName'],
-                            'guess': room['guesses'][pid]['guess'],
-                            'votes': vote_counts.get(pid, 0)
-                        }
-                        for pid in room['guesses'].keys()
-                    ],
-                    'updatedPlayers': room['players']
-                }
-                
-                room['roundPhase'] = 'results'
-                
-                print(f'[LookUp.Cafe] Voting complete in room {room_code}, winner: {winner_player["name"] if winner_player else "Unknown"}')
-                
-                emit('guessing:voting-complete', results, room=room_code)
+        if results is not None:
+            games_log.info(f'Voting complete in room {room_code}, winner: {results["winnerName"]}')
+            
+            emit('guessing:voting-complete', results, room=room_code)
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error processing vote: {e}')
+        games_log.error(f'Error processing vote: {e}')
         emit('game:error', {'message': f'Failed to process vote: {str(e)}'})
 
 
@@ -13320,7 +14629,7 @@ def handle_next_guessing_round(data):
                 'players': sorted_players,
                 'message': f"Game Over! {sorted_players[0]['name']} wins!" if sorted_players else "Game Over!"
             }, room=room_code)
-            print(f'[LookUp.Cafe] Game finished in room {room_code}')
+            games_log.info(f'Game finished in room {room_code}')
             
             return
         
@@ -13332,7 +14641,7 @@ def handle_next_guessing_round(data):
         room['roundPhase'] = 'guessing'
         room['roundStartTime'] = time.time()
         
-        print(f'[LookUp.Cafe] Starting round {room["currentRound"]} in room {room_code}')
+        games_log.info(f'Starting round {room["currentRound"]} in room {room_code}')
         
         emit('guessing:round-started', {
             'room': room,
@@ -13344,7 +14653,7 @@ def handle_next_guessing_round(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error starting next round: {e}')
+        games_log.error(f'Error starting next round: {e}')
         emit('game:error', {'message': f'Failed to start next round: {str(e)}'})
 
 
@@ -13352,8 +14661,6 @@ def handle_next_guessing_round(data):
 # Room Management & Cleanup
 # ============================================================================
 
-import threading
-
 def cleanup_inactive_rooms():
     """Background task to clean up rooms with all inactive players for >60 seconds"""
     while True:
@@ -13382,7 +14689,7 @@ def cleanup_inactive_rooms():
             # Delete inactive rooms
             for room_code in rooms_to_delete:
                 if room_code in game_rooms:
-                    print(f'[LookUp.Cafe] Auto-deleting inactive room: {room_code}')
+                    games_log.info(f'Auto-deleting inactive room: {room_code}')
                     # Notify any remaining connected players
                     socketio.emit('game:room-closed', {
                         'roomCode': room_code,
@@ -13392,12 +14699,12 @@ def cleanup_inactive_rooms():
         
         except Exception as e:
             db.session.rollback()  # Rollback failed transaction
-            print(f'[LookUp.Cafe] Error in cleanup task: {e}')
+            games_log.error(f'Error in cleanup task: {e}')
 
 # Start cleanup thread
 cleanup_thread = threading.Thread(target=cleanup_inactive_rooms, daemon=True)
 cleanup_thread.start()
-print('[LookUp.Cafe] Room cleanup task started')
+games_log.info('Room cleanup task started')
 
 
 @socketio.on('game:rejoin-room')
@@ -13441,7 +14748,7 @@ def handle_rejoin_room(data):
         # Join socket.io room
         join_room(room_code)
         
-        print(f'[LookUp.Cafe] Host {player_name} rejoined room {room_code}')
+        games_log.info(f'Host {player_name} rejoined room {room_code}')
         
         # Send room state to rejoining host
         emit('game:room-joined', {'room': room})
@@ -13454,7 +14761,7 @@ def handle_rejoin_room(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error rejoining room: {e}')
+        games_log.error(f'Error rejoining room: {e}')
         emit('game:error', {'message': f'Failed to rejoin room: {str(e)}'})
 
 
@@ -13476,7 +14783,7 @@ def handle_delete_room(data):
             emit('game:error', {'message': 'Only the host can delete the room'})
             return
         
-        print(f'[LookUp.Cafe] Host manually deleted room {room_code}')
+        games_log.info(f'Host manually deleted room {room_code}')
         
         # Notify all players before deletion
         emit('game:room-closed', {
@@ -13489,7 +14796,7 @@ def handle_delete_room(data):
         
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error deleting room: {e}')
+        games_log.error(f'Error deleting room: {e}')
         emit('game:error', {'message': f'Failed to delete room: {str(e)}'})
 
 
@@ -13509,7 +14816,7 @@ def handle_disconnect():
                     player['disconnectTime'] = current_time
                     room['lastActivityTime'] = current_time
                     
-                    print(f'[LookUp.Cafe] Player {player["name"]} disconnected from room {room_code}')
+                    games_log.info(f'Player {player["name"]} disconnected from room {room_code}')
                     
                     # Notify other players
                     socketio.emit('game:player-disconnected', {
@@ -13522,7 +14829,7 @@ def handle_disconnect():
     
     except Exception as e:
         db.session.rollback()  # Rollback failed transaction
-        print(f'[LookUp.Cafe] Error handling disconnect: {e}')
+        games_log.error(f'Error handling disconnect: {e}')
 
 
 # ============================================================================
@@ -13559,7 +14866,7 @@ def get_active_rooms():
         return jsonify({'rooms': active_rooms})
     
     except Exception as e:
-        print(f'[LookUp.Cafe] Error fetching active rooms: {e}')
+        games_log.error(f'Error fetching active rooms: {e}')
         return jsonify({'error': str(e)}), 500
 
 
@@ -13620,7 +14927,7 @@ def get_user_clients(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error getting user clients: {str(e)}")
+        creative_log.error(f"Error getting user clients: {str(e)}")
         db.session.rollback()
         return jsonify({'error': f'Failed to get clients: {str(e)}'}), 500
 
@@ -13673,7 +14980,7 @@ def unassign_client_from_user(user_id, client_id):
         }), 200
         
     except Exception as e:
-        print(f"Error unassigning client: {str(e)}")
+        creative_log.error(f"Error unassigning client: {str(e)}")
         db.session.rollback()
         return jsonify({'error': f'Failed to unassign client: {str(e)}'}), 500
 
@@ -13746,7 +15053,7 @@ def get_user_tasks(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error getting user tasks: {str(e)}")
+        tasks_log.error(f"Error getting user tasks: {str(e)}")
         db.session.rollback()
         return jsonify({'error': f'Failed to get tasks: {str(e)}'}), 500
 
@@ -13820,7 +15127,7 @@ def get_user_support_requests(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error getting support requests: {str(e)}")
+        creative_log.error(f"Error getting support requests: {str(e)}")
         db.session.rollback()
         return jsonify({'error': f'Failed to get support requests: {str(e)}'}), 500
 
@@ -13883,7 +15190,7 @@ def assign_client_to_user(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error assigning client: {str(e)}")
+        creative_log.error(f"Error assigning client: {str(e)}")
         db.session.rollback()
         return jsonify({'error': f'Failed to assign client: {str(e)}'}), 500
 
@@ -13901,7 +15208,7 @@ def get_analytics_data():
         time_range = data.get('timeRange', '7d')
         
         # Debug: Log the property_id to help diagnose issues
-        print(f"DEBUG: Received property_id: '{property_id}' (type: {type(property_id)}, length: {len(property_id) if property_id else 0})")
+        analytics_log.debug(f"Received property_id: '{property_id}' (type: {type(property_id)}, length: {len(property_id) if property_id else 0})")
         
         if not property_id:
             return jsonify({'error': 'Google Analytics Property ID is required'}), 400
@@ -13959,7 +15266,7 @@ def get_analytics_data():
                         raise ValueError("Service account credentials missing client_email field")
                     client = BetaAnalyticsDataClient(credentials=credentials)
                 except (ValueError, KeyError, FileNotFoundError, json.JSONDecodeError) as cred_error:
-                    print(f"Error loading Google Analytics credentials: {cred_error}")
+                    analytics_log.error(f"Error loading Google Analytics credentials: {cred_error}")
                     return jsonify({
                         'error': f'Service account info was not in the expected format, missing fields client_email, token_uri. Error: {str(cred_error)}',
                         'message': 'Please ensure your service account JSON file contains all required fields: client_email, token_uri, private_key, etc. See Google Analytics API documentation for proper service account setup.',
@@ -13985,7 +15292,7 @@ def get_analytics_data():
                 try:
                     client = BetaAnalyticsDataClient()
                 except Exception as e:
-                    print(f"Google Analytics API not configured: {e}")
+                    analytics_log.warning(f"Google Analytics API not configured: {e}")
                     # Return error indicating API needs to be configured
                     return jsonify({
                         'error': 'Google Analytics API not configured. Please set GOOGLE_APPLICATION_CREDENTIALS environment variable with path to your service account JSON file.',
@@ -14020,7 +15327,7 @@ def get_analytics_data():
                 numeric_part = property_id_clean_check.upper().lstrip('G-').lstrip('G').strip()
                 if numeric_part.isdigit():
                     # User provided G-prefixed ID, extract the numeric part
-                    print(f"INFO: Extracted numeric Property ID '{numeric_part}' from '{property_id_clean_check}'")
+                    analytics_log.info(f"Extracted numeric Property ID '{numeric_part}' from '{property_id_clean_check}'")
                     property_id_clean = f"properties/{numeric_part}"
                 else:
                     # Return helpful error explaining the difference
@@ -14051,7 +15358,7 @@ def get_analytics_data():
                 numeric_part = property_id_clean_check.upper().lstrip('A-').lstrip('A').strip()
                 if numeric_part.isdigit():
                     # User provided A-prefixed ID, extract the numeric part
-                    print(f"INFO: Extracted numeric Property ID '{numeric_part}' from '{property_id_clean_check}'")
+                    analytics_log.info(f"Extracted numeric Property ID '{numeric_part}' from '{property_id_clean_check}'")
                     property_id_clean = f"properties/{numeric_part}"
                 else:
                     return jsonify({
@@ -14261,7 +15568,7 @@ def get_analytics_data():
                         'activeUsers': active_users,
                     })
             except Exception as e:
-                print(f"Error fetching active users by first user source/medium: {e}")
+                analytics_log.error(f"Error fetching active users by first user source/medium: {e}")
                 # Continue without this data
             
             # Fetch sessions by session source/medium
@@ -14293,7 +15600,7 @@ def get_analytics_data():
                         'bounceRate': round(bounce_rate, 2),
                     })
             except Exception as e:
-                print(f"Error fetching sessions by session source/medium: {e}")
+                analytics_log.error(f"Error fetching sessions by session source/medium: {e}")
                 # Continue without this data
             
             # Fetch traffic acquisition URLs
@@ -14326,7 +15633,7 @@ def get_analytics_data():
                         'pageViews': page_views,
                     })
             except Exception as e:
-                print(f"Error fetching traffic acquisition URLs: {e}")
+                analytics_log.error(f"Error fetching traffic acquisition URLs: {e}")
                 # Continue without this data
             
             # Fetch user acquisition by platform
@@ -14361,7 +15668,7 @@ def get_analytics_data():
                         'conversionRate': round(conversion_rate, 2),
                     })
             except Exception as e:
-                print(f"Error fetching user acquisition by platform: {e}")
+                analytics_log.error(f"Error fetching user acquisition by platform: {e}")
                 # Continue without this data
             
             return jsonify({
@@ -14405,9 +15712,7 @@ def get_analytics_data():
                 'userAcquisitionByPlatform': [],
             }), 200
         except Exception as ga_error:
-            print(f"Error fetching Google Analytics data: {str(ga_error)}")
-            import traceback
-            traceback.print_exc()
+            analytics_log.exception(f"Error fetching Google Analytics data: {str(ga_error)}")
             # Return error but don't fail completely - let frontend handle it
             return jsonify({
                 'error': f'Failed to fetch Google Analytics data: {str(ga_error)}',
@@ -14430,9 +15735,7 @@ def get_analytics_data():
             }), 200
         
     except Exception as e:
-        print(f"Error fetching analytics data: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        analytics_log.exception(f"Error fetching analytics data: {str(e)}")
         return jsonify({'error': f'Failed to fetch analytics data: {str(e)}'}), 500
 
 @app.route('/api/billing/payment-methods', methods=['GET'])
@@ -14451,9 +15754,7 @@ def get_payment_methods():
         }), 200
         
     except Exception as e:
-        print(f"Error fetching payment methods: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        billing_log.exception(f"Error fetching payment methods: {str(e)}")
         return jsonify({'error': f'Failed to fetch payment methods: {str(e)}'}), 500
 
 @app.route('/api/billing/invoices', methods=['GET'])
@@ -14472,9 +15773,7 @@ def get_invoices():
         }), 200
         
     except Exception as e:
-        print(f"Error fetching invoices: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        billing_log.exception(f"Error fetching invoices: {str(e)}")
         return jsonify({'error': f'Failed to fetch invoices: {str(e)}'}), 500
 
 @app.route('/api/subscriptions/cancel', methods=['POST'])
@@ -14494,9 +15793,7 @@ def cancel_subscription():
         }), 200
         
     except Exception as e:
-        print(f"Error canceling subscription: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        billing_log.exception(f"Error canceling subscription: {str(e)}")
         return jsonify({'error': f'Failed to cancel subscription: {str(e)}'}), 500
 
 @app.route('/api/subscriptions/resume', methods=['POST'])
@@ -14516,9 +15813,7 @@ def resume_subscription():
         }), 200
         
     except Exception as e:
-        print(f"Error resuming subscription: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        billing_log.exception(f"Error resuming subscription: {str(e)}")
         return jsonify({'error': f'Failed to resume subscription: {str(e)}'}), 500
 
 
@@ -14574,7 +15869,7 @@ def get_ventures():
                                     'avatar': None
                                 })
                     except Exception as e:
-                        print(f"Error fetching team for venture {sr.id}: {e}")
+                        creative_log.error(f"Error fetching team for venture {sr.id}: {e}")
                 
                 # Format tasks
                 formatted_tasks = []
@@ -14648,18 +15943,14 @@ def get_ventures():
                 }
                 ventures.append(venture)
             except Exception as e:
-                print(f"Error processing venture {sr.id if sr else 'unknown'}: {e}")
-                import traceback
-                traceback.print_exc()
+                creative_log.exception(f"Error processing venture {sr.id if sr else 'unknown'}: {e}")
                 continue
         
         return jsonify(ventures), 200
     
     except Exception as e:
         db.session.rollback()
-        print(f"Error fetching ventures: {e}")
-        import traceback
-        traceback.print_exc()
+        creative_log.exception(f"Error fetching ventures: {e}")
         return jsonify({'error': 'Failed to fetch ventures', 'message': str(e), 'ventures': []}), 200
 
 
@@ -14747,7 +16038,7 @@ def get_venture(venture_id):
         return jsonify(venture), 200
     
     except Exception as e:
-        print(f"Error fetching venture: {e}")
+        creative_log.error(f"Error fetching venture: {e}")
         return jsonify({'error': str(e)}), 500
 
 
@@ -14781,7 +16072,7 @@ def create_venture():
     
     except Exception as e:
         db.session.rollback()
-        print(f"Error creating venture: {e}")
+        creative_log.error(f"Error creating venture: {e}")
         return jsonify({'error': str(e)}), 500
 
 
@@ -14827,7 +16118,7 @@ def update_venture(venture_id):
     
     except Exception as e:
         db.session.rollback()
-        print(f"Error updating venture: {e}")
+        creative_log.error(f"Error updating venture: {e}")
         return jsonify({'error': str(e)}), 500
 
 
@@ -14841,13 +16132,14 @@ def delete_venture(venture_id):
             return jsonify({'error': 'Venture not found'}), 404
         
         db.session.delete(sr)
+        record_deletion('support_request', venture_id)
         db.session.commit()
         
         return jsonify({'message': 'Venture deleted'}), 200
     
     except Exception as e:
         db.session.rollback()
-        print(f"Error deleting venture: {e}")
+        creative_log.error(f"Error deleting venture: {e}")
         return jsonify({'error': str(e)}), 500
 
 
@@ -14889,9 +16181,7 @@ def get_ventures_metrics():
     
     except Exception as e:
         db.session.rollback()
-        print(f"Error fetching metrics: {e}")
-        import traceback
-        traceback.print_exc()
+        creative_log.exception(f"Error fetching metrics: {e}")
         return jsonify({
             'error': 'Failed to fetch metrics',
             'message': str(e),
@@ -14908,19 +16198,14 @@ def get_ventures_metrics():
 def search_ventures():
     """Search ventures"""
     try:
-        query = request.args.get('q', '')
+        query = request.args.get('q', '').strip()
         
         if not query:
             return jsonify([]), 200
         
-        # Search in subject, description, and client name
-        results = SupportRequest.query.join(Client, SupportRequest.client_id == Client.id, isouter=True).filter(
-            db.or_(
-                SupportRequest.subject.ilike(f'%{query}%'),
-                SupportRequest.description.ilike(f'%{query}%'),
-                Client.name.ilike(f'%{query}%')
-            )
-        ).all()
+        # Ranked search in subject, description, and client name
+        page, per_page = search_page_params()
+        results, total = dashboard_search.search(SupportRequest.query, 'support_requests', query, page, per_page)
         
         ventures = []
         for sr in results:
@@ -14977,9 +16262,21 @@ def search_ventures():
             }
             ventures.append(venture)
         
-        return jsonify(ventures), 200
+        response = jsonify(ventures)
+        response.headers['X-Total-Count'] = str(total)
+        return response, 200
     
     except Exception as e:
-        print(f"Error searching ventures: {e}")
+        db.session.rollback()
+        creative_log.error(f"Error searching ventures: {e}")
         return jsonify({'error': str(e)}), 500
 
+
+# Keep this block last: anything defined below it would not be registered until after the server exits.
+# Production runs this threaded server (render.yaml); gunicorn.conf.py is the opt-in gevent alternative.
+if __name__ == '__main__':
+    # Run database upgrade at startup (for 'python app.py')
+    ensure_database_upgrade()
+    
+    port = int(os.environ.get('PORT', 5000))
+    socketio.run(app, host='0.0.0.0', port=port, allow_unsafe_werkzeug=True)
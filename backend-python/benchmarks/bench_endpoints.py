@@ -0,0 +1,363 @@
+"""
+Endpoint Benchmark Suite
+Seeds a synthetic dataset and measures latency percentiles and SQL query counts for the hottest API routes
+
+Seeds users (with profiles), clients with employee assignments, support
+requests, tasks, notifications and Intervals activity/wellness data, then
+calls each route through Flask's test client (no network) and records
+latency percentiles, queries per request, status codes and response size.
+Results are written as JSON tagged with the git commit so runs can be
+compared across commits.
+
+Databases:
+    SQLite (default, for CI): a scratch file, schema from db.create_all()
+    PostgreSQL: BENCH_DATABASE_URL=postgresql://... (use a throwaway database;
+    the schema comes from the Alembic migrations, then create_all for the rest)
+
+Usage:
+    python benchmarks/bench_endpoints.py --output before.json
+    python benchmarks/bench_endpoints.py --tasks 50000 --requests 100 --output after.json
+    python benchmarks/bench_endpoints.py --compare before.json after.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUTES = [
+    '/api/auth/me',
+    '/api/tasks',
+    '/api/tasks?limit=100',
+    '/api/ventures',
+    '/api/creative/clients',
+    '/api/creative/clients?limit=50',
+    '/api/notifications',
+    '/api/creative/metrics',
+]
+
+BATCH = 2000
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0
+
+
+def git_revision():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BACKEND_DIR, text=True).strip())
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_app(database_url, migrate):
+    """Import app.py against the benchmark database and prepare its schema"""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('FLASK_SECRET_KEY', 'bench-secret')
+    os.environ.setdefault('SLOW_QUERY_EXPLAIN', 'false')
+    os.environ.setdefault('SERVER_TIMING', 'false')
+    os.environ['DISABLE_AUTO_SCRIPT_RUN'] = 'true'  # Never run the one-off deploy scripts against bench data
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(BACKEND_DIR)
+
+    # app.py calls db.create_all() at import time, before every model is
+    # defined; on an empty database that fails on a foreign key to a later
+    # table and disables the models. Skip it and create the schema below.
+    from flask_sqlalchemy import SQLAlchemy
+    create_all = SQLAlchemy.create_all
+    SQLAlchemy.create_all = lambda self, *args, **kwargs: None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app as app_module
+    finally:
+        SQLAlchemy.create_all = create_all
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with app_module.app.app_context():
+            if migrate:
+                app_module.run_database_upgrade()
+            app_module.db.create_all()
+    # Schema is handled above; keep the first timed request from running migrations
+    app_module._db_upgrade_run = True
+    # The information_schema column checks warn on every request under SQLite
+    app_module.app.logger.setLevel(logging.ERROR)
+    return app_module
+
+
+def insert_rows(db, model, rows):
+    for start in range(0, len(rows), BATCH):
+        db.session.execute(model.__table__.insert(), rows[start:start + BATCH])
+    db.session.commit()
+
+
+def seed(A, volumes, rng):
+    """Insert the synthetic dataset; returns the id of the admin/employee user requests run as"""
+    db = A.db
+    now = datetime.utcnow()
+    password_hash = A.bcrypt.hashpw(b'benchmark', A.bcrypt.gensalt(4)).decode()
+
+    def when(days=365):
+        return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+    users, profiles = [], []
+    for i in range(volumes['users']):
+        username = f'bench-user-{i}'
+        users.append({
+            'id': i + 1, 'username': username, 'email': f'{username}@bench.test', 'password_hash': password_hash,
+            'patreon_connected': False, 'has_subscription_update': False, 'subscription_update_active': False,
+            'membership_paid': i % 3 == 0, 'is_employee': i == 0 or i % 10 == 0, 'is_admin': i == 0,
+            'auth_provider': 'email', 'eth_payment_verified': False,
+            'created_at': when(), 'updated_at': now,
+        })
+        profiles.append({
+            'id': username, 'email': f'{username}@bench.test', 'name': f'Bench User {i}',
+            'is_paid_member': i % 3 == 0, 'is_employee': i == 0 or i % 10 == 0, 'created_at': now, 'updated_at': now,
+        })
+    insert_rows(db, A.User, users)
+    insert_rows(db, A.UserProfile, profiles)
+    employees = [u for u in users if u['is_employee']]
+
+    clients, assignments = [], []
+    for i in range(volumes['clients']):
+        created = when()
+        client_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        clients.append({
+            'id': client_id, 'name': f'Client {i}', 'email': f'client-{i}@bench.test', 'company': f'Company {i % 300}',
+            'phone': '+1 555 0100', 'status': rng.choice(['active', 'pending', 'prospect', 'inactive']),
+            'tier': rng.choice(['starter', 'professional', 'enterprise']), 'notes': 'Onboarding notes. ' * 10,
+            'tags': json.dumps(rng.sample(['retail', 'b2b', 'saas', 'priority', 'agency'], 2)),
+            'budget': rng.randint(1000, 50000), 'created_at': created, 'updated_at': created,
+        })
+        employee = rng.choice(employees)
+        assignments.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))), 'client_id': client_id, 'employee_id': employee['id'],
+            'employee_name': employee['username'], 'assigned_at': created, 'created_at': created,
+        })
+    insert_rows(db, A.Client, clients)
+    insert_rows(db, A.ClientEmployeeAssignment, assignments)
+
+    support_requests = []
+    for i in range(volumes['support_requests']):
+        created = when()
+        support_requests.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))), 'user_id': rng.choice(users)['id'],
+            'client_id': rng.choice(clients)['id'], 'subject': f'Support request {i}',
+            'description': 'Please help with the campaign launch. ' * 5,
+            'priority': rng.choice(['low', 'medium', 'high', 'urgent']),
+            'status': rng.choice(['open', 'in-progress', 'resolved', 'closed']),
+            'progress': 0, 'budget': 0, 'spent': 0, 'created_at': created, 'updated_at': created,
+        })
+    insert_rows(db, A.SupportRequest, support_requests)
+
+    tasks = []
+    for i in range(volumes['tasks']):
+        created = when()
+        link = rng.random()
+        assignee = rng.choice(employees)
+        tasks.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))), 'title': f'Task {i}',
+            'description': 'Draft, review and publish. ' * 4,
+            'hyperlinks': json.dumps([f'https://bench.test/doc/{i}']),
+            'status': rng.choice(['pending', 'in_progress', 'completed']),
+            'category': rng.choice(['work', 'creative', 'wellness', 'rise']),
+            'support_request_id': rng.choice(support_requests)['id'] if link < 0.3 else None,
+            'linked_entity_type': 'client' if 0.3 <= link < 0.6 else None,
+            'linked_entity_id': rng.choice(clients)['id'] if 0.3 <= link < 0.6 else None,
+            'created_by': str(users[0]['id']), 'created_by_name': users[0]['username'],
+            'assigned_to': str(assignee['id']), 'assigned_to_name': assignee['username'],
+            'notes': 'Meeting notes. ' * rng.randint(0, 30), 'created_at': created, 'updated_at': created,
+        })
+    insert_rows(db, A.Task, tasks)
+
+    notifications = []
+    for i in range(volumes['notifications']):
+        created = when(90)
+        # A quarter of notifications belong to the benchmark user so its inbox is realistic
+        owner = users[0] if i % 4 == 0 else rng.choice(users)
+        notifications.append({
+            'user_id': owner['id'], 'type': rng.choice(['system', 'board', 'admin', 'support-request']),
+            'title': f'Notification {i}', 'message': 'Something changed on your dashboard.',
+            'read': rng.random() < 0.6, 'notification_metadata': json.dumps({'link': '/creative'}),
+            'created_at': created, 'updated_at': created,
+        })
+    insert_rows(db, A.Notification, notifications)
+
+    activities, metrics = [], []
+    for profile in profiles[:volumes['intervals_users']]:
+        for day in range(volumes['intervals_days']):
+            activity_date = date.today() - timedelta(days=day)
+            activities.append({
+                'id': str(uuid.UUID(int=rng.getrandbits(128))), 'user_id': profile['id'],
+                'activity_id': f"{profile['id']}-{day}", 'activity_date': activity_date,
+                'activity_name': 'Morning ride', 'activity_type': rng.choice(['Ride', 'Run', 'Swim']),
+                'rpe': rng.randint(1, 10), 'feel': rng.randint(1, 5), 'duration': rng.randint(1200, 7200),
+                'distance': rng.uniform(5, 80), 'synced_at': now,
+            })
+            metrics.append({
+                'id': str(uuid.UUID(int=rng.getrandbits(128))), 'user_id': profile['id'], 'metric_date': activity_date,
+                'hrv': rng.uniform(30, 120), 'resting_hr': rng.randint(40, 70), 'weight': rng.uniform(55, 95),
+                'sleep_seconds': rng.randint(18000, 32400), 'sleep_quality': rng.randint(1, 4),
+                'fatigue': rng.randint(1, 4), 'mood': rng.randint(1, 4), 'stress': rng.randint(1, 4),
+                'soreness': rng.randint(1, 4), 'synced_at': now,
+            })
+    insert_rows(db, A.IntervalsActivityData, activities)
+    insert_rows(db, A.IntervalsWellnessMetrics, metrics)
+    return users[0]['id']
+
+
+def measure(A, routes, user_id, requests, warmup):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    with A.app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+    query_count = [0]
+
+    def count_query(*args):
+        query_count[0] += 1
+
+    event.listen(Engine, 'after_cursor_execute', count_query)
+    client = A.app.test_client()
+    results = {}
+    try:
+        for route in routes:
+            latencies, queries, statuses, sizes = [], [], {}, []
+            for i in range(warmup + requests):
+                query_count[0] = 0
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    response = client.get(route, headers=headers)
+                    body = response.get_data()
+                elapsed = (time.perf_counter() - start) * 1000
+                if i < warmup:
+                    continue
+                latencies.append(elapsed)
+                queries.append(query_count[0])
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+                sizes.append(len(body))
+            results[route] = {
+                'requests': requests,
+                'latencyMs': {
+                    'p50': round(percentile(latencies, 0.50), 2),
+                    'p90': round(percentile(latencies, 0.90), 2),
+                    'p99': round(percentile(latencies, 0.99), 2),
+                    'mean': round(sum(latencies) / len(latencies), 2),
+                    'max': round(max(latencies), 2),
+                },
+                'queries': {'p50': percentile(queries, 0.50), 'max': max(queries)},
+                'statuses': statuses,
+                'responseBytes': percentile(sizes, 0.50),
+            }
+            r = results[route]
+            print(f"{route:<34}{r['latencyMs']['p50']:>9.1f}{r['latencyMs']['p90']:>9.1f}{r['latencyMs']['p99']:>9.1f}"
+                  f"{r['queries']['p50']:>9}{r['responseBytes']:>12,}  {statuses}")
+    finally:
+        event.remove(Engine, 'after_cursor_execute', count_query)
+    return results
+
+
+def compare(paths):
+    runs = []
+    for path in paths:
+        with open(path) as f:
+            runs.append(json.load(f))
+    base = runs[0]
+    print('runs: ' + ', '.join(f"{run['meta'].get('commit') or '?'} ({run['meta']['database']})" for run in runs))
+    print(f"{'route':<34}" + ''.join(f"{'p50 ms':>10}{'queries':>9}" for _ in runs) + f"{'p50 change':>12}")
+    for route, base_result in base['results'].items():
+        line = f"{route:<34}"
+        for run in runs:
+            result = run['results'].get(route)
+            line += f"{result['latencyMs']['p50']:>10.1f}{result['queries']['p50']:>9}" if result else f"{'-':>10}{'-':>9}"
+        last = runs[-1]['results'].get(route)
+        if last and base_result['latencyMs']['p50']:
+            change = (last['latencyMs']['p50'] - base_result['latencyMs']['p50']) / base_result['latencyMs']['p50'] * 100
+            line += f"{change:>+11.0f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--support-requests', type=int, default=500)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--notifications', type=int, default=5000)
+    parser.add_argument('--intervals-users', type=int, default=20)
+    parser.add_argument('--intervals-days', type=int, default=365)
+    parser.add_argument('--requests', type=int, default=30, help='Timed requests per route')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--route', action='append', help='Route to measure (repeatable); default: the hot routes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--compare', nargs='+', metavar='RESULT', help='Print a comparison of earlier --output files')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+    output = os.path.abspath(args.output) if args.output else None  # load_app changes directory
+
+    database_url = os.getenv('BENCH_DATABASE_URL')
+    scratch = None
+    if not database_url:
+        scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        scratch.close()
+        database_url = f'sqlite:///{scratch.name}'
+    database = database_url.split(':', 1)[0]
+
+    volumes = {
+        'users': args.users, 'clients': args.clients, 'support_requests': args.support_requests,
+        'tasks': args.tasks, 'notifications': args.notifications,
+        'intervals_users': min(args.intervals_users, args.users), 'intervals_days': args.intervals_days,
+    }
+
+    try:
+        print(f"Loading app against {database}...")
+        A = load_app(database_url, migrate=database.startswith('postgres'))
+        start = time.perf_counter()
+        with A.app.app_context():
+            user_id = seed(A, volumes, random.Random(args.seed))
+        print(f"Seeded {volumes} in {time.perf_counter() - start:.1f}s")
+
+        print(f"\n{'route':<34}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'queries':>9}{'bytes':>12}")
+        results = measure(A, args.route or ROUTES, user_id, args.requests, args.warmup)
+    finally:
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({
+                'meta': {
+                    'commit': git_revision(),
+                    'timestamp': datetime.utcnow().isoformat() + 'Z',
+                    'database': database,
+                    'python': platform.python_version(),
+                    'volumes': volumes,
+                    'requestsPerRoute': args.requests,
+                },
+                'results': results,
+            }, f, indent=2)
+        print(f"\nWrote {output}")
+
+
+if __name__ == '__main__':
+    main()
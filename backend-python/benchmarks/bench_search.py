@@ -0,0 +1,155 @@
+"""
+Dashboard Search Benchmark
+Compares leading-wildcard substring scans with the search subsystem over 100k synthetic clients
+
+Always benchmarks the in-memory inverted index (the SQLite fallback) against a
+linear substring scan. When BENCH_DATABASE_URL points at a PostgreSQL database
+it also loads the clients into a scratch table and times the old
+ILIKE '%q%' query against the pg_trgm/tsvector indexed query.
+
+Usage:
+    python benchmarks/bench_search.py [--clients 100000] [--repeat 20]
+    BENCH_DATABASE_URL=postgresql://... python benchmarks/bench_search.py
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import InvertedIndex, build_prefix_tsquery  # noqa: E402
+
+FIRST_NAMES = ['james', 'maria', 'wei', 'aisha', 'carlos', 'olga', 'kenji', 'fatima', 'liam', 'priya',
+               'noah', 'sofia', 'omar', 'emma', 'lucas', 'yuki', 'amara', 'ivan', 'chloe', 'diego']
+LAST_NAMES = ['smith', 'garcia', 'chen', 'okafor', 'silva', 'petrov', 'tanaka', 'haddad', 'murphy', 'patel',
+              'johnson', 'rossi', 'nguyen', 'kowalski', 'andersen', 'moreau', 'kim', 'mensah', 'lopez', 'cohen']
+COMPANY_WORDS = ['acme', 'globex', 'initech', 'umbrella', 'stark', 'wayne', 'hooli', 'vandelay', 'wonka',
+                 'cyberdyne', 'soylent', 'tyrell', 'massive', 'dynamic', 'north', 'blue', 'summit', 'pixel']
+COMPANY_SUFFIXES = ['labs', 'media', 'studio', 'group', 'partners', 'digital', 'ventures', 'co']
+
+# Simulates typing into the dashboard search box, plus a couple of multi-term queries
+QUERIES = ['a', 'ac', 'acm', 'acme', 'gar', 'garcia', 'priya pat', 'hooli media', 'zzz', 'kow']
+
+
+def synthetic_clients(count, seed=42):
+    rng = random.Random(seed)
+    clients = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        company = f"{rng.choice(COMPANY_WORDS).title()} {rng.choice(COMPANY_SUFFIXES).title()}"
+        suffix = ''.join(rng.choices(string.digits, k=3))
+        clients.append({
+            'id': f'client-{i:06d}',
+            'name': f'{first.title()} {last.title()}',
+            'email': f'{first}.{last}{suffix}@{company.split()[0].lower()}.com',
+            'company': company,
+        })
+    return clients
+
+
+def timed(fn, repeat):
+    """Median wall time of fn() in milliseconds, plus its last result"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], result
+
+
+def bench_memory(clients, repeat, per_page):
+    print(f"\n== In-memory inverted index ({len(clients):,} clients) ==")
+    start = time.perf_counter()
+    index = InvertedIndex({'name': 3.0, 'company': 2.0, 'email': 1.0})
+    for c in clients:
+        index.add(c['id'], {'name': c['name'], 'email': c['email'], 'company': c['company']})
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def linear_scan(q):
+        needle = q.lower()
+        return [c['id'] for c in clients
+                if needle in c['name'].lower() or needle in c['email'].lower() or needle in c['company'].lower()]
+
+    print(f"{'query':<14}{'scan ms':>10}{'scan hits':>11}{'index ms':>10}{'index hits':>12}")
+    for q in QUERIES:
+        scan_ms, scan_hits = timed(lambda: linear_scan(q), repeat)
+        index_ms, (_, total) = timed(lambda: index.search(q, limit=per_page), repeat)
+        print(f"{q!r:<14}{scan_ms:>10.2f}{len(scan_hits):>11,}{index_ms:>10.2f}{total:>12,}")
+
+
+def bench_postgres(url, clients, repeat, per_page):
+    from sqlalchemy import create_engine, text
+
+    print(f"\n== PostgreSQL ({len(clients):,} clients) ==")
+    engine = create_engine(url)
+    document = "coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(company, '')"
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text("DROP TABLE IF EXISTS bench_clients"))
+        conn.execute(text(
+            "CREATE TABLE bench_clients (id varchar(36) PRIMARY KEY, name varchar(200), "
+            "email varchar(200), company varchar(200), created_at timestamp DEFAULT now())"
+        ))
+        conn.execute(text("INSERT INTO bench_clients (id, name, email, company) VALUES (:id, :name, :email, :company)"), clients)
+        start = time.perf_counter()
+        conn.execute(text(f"CREATE INDEX ON bench_clients USING gin (({document}) gin_trgm_ops)"))
+        conn.execute(text(f"CREATE INDEX ON bench_clients USING gin (to_tsvector('simple', {document}))"))
+        conn.execute(text("ANALYZE bench_clients"))
+        print(f"Index build: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    old_sql = text(
+        "SELECT id FROM bench_clients WHERE name ILIKE :pattern OR email ILIKE :pattern OR company ILIKE :pattern "
+        "ORDER BY created_at DESC"
+    )
+    new_sql = text(
+        f"SELECT id FROM bench_clients "
+        f"WHERE (to_tsvector('simple', {document}) @@ to_tsquery('simple', :tsq) OR {document} ILIKE :pattern) "
+        f"ORDER BY ts_rank(to_tsvector('simple', {document}), to_tsquery('simple', :tsq)) "
+        f"+ word_similarity(:q, {document}) DESC LIMIT :limit"
+    )
+
+    print(f"{'query':<14}{'ILIKE ms':>10}{'hits':>9}{'indexed ms':>12}{'page':>6}")
+    with engine.connect() as conn:
+        for q in QUERIES:
+            params = {'pattern': f'%{q}%', 'tsq': build_prefix_tsquery(q), 'q': q, 'limit': per_page}
+            old_ms, old_rows = timed(lambda: conn.execute(old_sql, params).fetchall(), repeat)
+            new_ms, new_rows = timed(lambda: conn.execute(new_sql, params).fetchall(), repeat)
+            print(f"{q!r:<14}{old_ms:>10.2f}{len(old_rows):>9,}{new_ms:>12.2f}{len(new_rows):>6}")
+
+        plan = conn.execute(text(f"EXPLAIN {new_sql.text}"), {
+            'pattern': '%acme%', 'tsq': build_prefix_tsquery('acme'), 'q': 'acme', 'limit': per_page
+        }).fetchall()
+        print("\nPlan for 'acme':")
+        for row in plan:
+            print(f"  {row[0]}")
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS bench_clients"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--per-page', type=int, default=50)
+    args = parser.parse_args()
+
+    clients = synthetic_clients(args.clients)
+    bench_memory(clients, args.repeat, args.per_page)
+
+    url = os.getenv('BENCH_DATABASE_URL')
+    if url and url.startswith('postgres'):
+        bench_postgres(url, clients, max(1, args.repeat // 4), args.per_page)
+    else:
+        print("\nSet BENCH_DATABASE_URL to a PostgreSQL database to benchmark the pg_trgm/tsvector indexes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""
+List Serialization Benchmark
+Compares ORM to_dict() + stdlib json with row serializers + the orjson provider over 10k tasks and clients
+
+Loads synthetic tasks and clients into an in-memory SQLite database using
+stand-in models with the same columns as app.py, then times each stage of a
+list response: fetching, building dicts, and encoding.
+
+    legacy    ORM instances, to_dict() with sqlalchemy.inspect/isoformat/float/json.loads per row, stdlib json
+    to_dict   ORM instances, current to_dict() (native values), fast encoder
+    rows      Column rows through a RowSerializer, fast encoder
+
+Usage:
+    python benchmarks/bench_serializers.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Column, DateTime, Integer, Numeric, String, Text, create_engine, inspect as sa_inspect, select  # noqa: E402
+from sqlalchemy.orm import Session, declarative_base  # noqa: E402
+
+from json_provider import ORJSON_AVAILABLE, RowSerializer, dumps_bytes, loads_list  # noqa: E402
+
+Base = declarative_base()
+
+
+class Task(Base):
+    __tablename__ = 'task'
+    id = Column(String(36), primary_key=True)
+    title = Column(String(200))
+    description = Column(Text)
+    hyperlinks = Column(Text)
+    status = Column(String(20))
+    category = Column(String(50))
+    support_request_id = Column(String(36))
+    linked_entity_type = Column(String(50))
+    linked_entity_id = Column(String(100))
+    created_by = Column(String(100))
+    created_by_name = Column(String(200))
+    assigned_to = Column(String(100))
+    assigned_to_name = Column(String(200))
+    notes = Column(Text)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+    def legacy_to_dict(self):
+        """The per-row work Task.to_dict() did before the fast provider"""
+        state = sa_inspect(self, raiseerr=False)
+        unloaded, attrs = state.unloaded, state.attrs
+        category = 'work' if 'category' in unloaded or 'category' not in attrs else (self.category or 'work')
+        linked_type = None if 'linked_entity_type' in unloaded else self.linked_entity_type
+        linked_id = None if 'linked_entity_id' in unloaded else self.linked_entity_id
+        if not linked_type and not linked_id and self.support_request_id:
+            linked_type, linked_id = 'support_request', self.support_request_id
+        return {
+            'id': self.id, 'title': self.title, 'description': self.description,
+            'hyperlinks': json.loads(self.hyperlinks) if self.hyperlinks else [],
+            'status': self.status, 'category': category, 'supportRequestId': self.support_request_id,
+            'linkedEntityType': linked_type, 'linkedEntityId': linked_id,
+            'createdBy': self.created_by, 'createdByName': self.created_by_name,
+            'assignedTo': self.assigned_to, 'assignedToName': self.assigned_to_name,
+            'notes': self.notes or '',
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def to_dict(self):
+        loaded = self.__dict__
+        linked_type, linked_id = loaded.get('linked_entity_type'), loaded.get('linked_entity_id')
+        if not linked_type and not linked_id and self.support_request_id:
+            linked_type, linked_id = 'support_request', self.support_request_id
+        return {
+            'id': self.id, 'title': self.title, 'description': self.description,
+            'hyperlinks': loads_list(self.hyperlinks), 'status': self.status,
+            'category': loaded.get('category') or 'work', 'supportRequestId': self.support_request_id,
+            'linkedEntityType': linked_type, 'linkedEntityId': linked_id,
+            'createdBy': self.created_by, 'createdByName': self.created_by_name,
+            'assignedTo': self.assigned_to, 'assignedToName': self.assigned_to_name,
+            'notes': self.notes or '', 'createdAt': self.created_at, 'updatedAt': self.updated_at,
+        }
+
+
+class Client(Base):
+    __tablename__ = 'clients'
+    id = Column(String(36), primary_key=True)
+    name = Column(String(200))
+    email = Column(String(255))
+    company = Column(String(200))
+    phone = Column(String(50))
+    status = Column(String(20))
+    tier = Column(String(50))
+    tags = Column(Text)
+    budget = Column(Numeric(10, 2))
+    deadline = Column(DateTime)
+    user_id = Column(Integer)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+    def legacy_to_dict(self):
+        return {
+            'id': self.id, 'name': self.name, 'email': self.email, 'company': self.company,
+            'phone': self.phone, 'status': self.status, 'tier': self.tier,
+            'budget': float(self.budget) if self.budget is not None else 0,
+            'deadline': self.deadline.isoformat() if self.deadline else None,
+            'userId': self.user_id, 'hasAccount': self.user_id is not None,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
+            'tags': json.loads(self.tags) if self.tags else [],
+        }
+
+    def to_dict(self):
+        loaded = self.__dict__
+        budget = loaded.get('budget')
+        return {
+            'id': self.id, 'name': self.name, 'email': self.email, 'company': self.company,
+            'phone': self.phone, 'status': self.status, 'tier': self.tier,
+            'budget': budget if budget is not None else 0, 'deadline': loaded.get('deadline'),
+            'userId': self.user_id, 'hasAccount': self.user_id is not None,
+            'createdAt': self.created_at, 'updatedAt': self.updated_at, 'tags': loads_list(self.tags),
+        }
+
+
+TASK_SERIALIZER = RowSerializer(
+    ['id', 'title', 'description', 'hyperlinks', 'status', 'category', 'support_request_id',
+     'linked_entity_type', 'linked_entity_id', 'created_by', 'created_by_name', 'assigned_to',
+     'assigned_to_name', 'notes', 'created_at', 'updated_at'],
+    [
+        ('id', 'id'), ('title', 'title'), ('description', 'description'),
+        ('hyperlinks', lambda row: loads_list(row.hyperlinks)), ('status', 'status'),
+        ('category', lambda row: row.category or 'work'), ('supportRequestId', 'support_request_id'),
+        ('linkedEntityType', lambda row: row.linked_entity_type if (row.linked_entity_type or row.linked_entity_id)
+         else ('support_request' if row.support_request_id else None)),
+        ('linkedEntityId', lambda row: row.linked_entity_id if (row.linked_entity_type or row.linked_entity_id)
+         else row.support_request_id),
+        ('createdBy', 'created_by'), ('createdByName', 'created_by_name'),
+        ('assignedTo', 'assigned_to'), ('assignedToName', 'assigned_to_name'),
+        ('notes', lambda row: row.notes or ''), ('createdAt', 'created_at'), ('updatedAt', 'updated_at'),
+    ],
+)
+
+CLIENT_SERIALIZER = RowSerializer(
+    ['id', 'name', 'email', 'company', 'phone', 'status', 'tier', 'budget', 'deadline',
+     'user_id', 'created_at', 'updated_at', 'tags'],
+    [
+        ('id', 'id'), ('name', 'name'), ('email', 'email'), ('company', 'company'), ('phone', 'phone'),
+        ('status', 'status'), ('tier', 'tier'), ('budget', lambda row: row.budget if row.budget is not None else 0),
+        ('deadline', 'deadline'), ('userId', 'user_id'), ('hasAccount', lambda row: row.user_id is not None),
+        ('createdAt', 'created_at'), ('updatedAt', 'updated_at'), ('tags', lambda row: loads_list(row.tags)),
+    ],
+)
+
+
+def seed(session, count, rng):
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        created = start + timedelta(minutes=i)
+        session.add(Task(
+            id=str(uuid.UUID(int=rng.getrandbits(128))), title=f'Task {i}: follow up on proposal',
+            description='Review the draft and send notes to the client. ' * 3,
+            hyperlinks=json.dumps([f'https://example.com/doc/{i}', f'https://example.com/sheet/{i}']),
+            status=rng.choice(['pending', 'in_progress', 'completed']), category=rng.choice(['work', 'creative', None]),
+            support_request_id=str(i) if i % 5 == 0 else None,
+            linked_entity_type='client' if i % 3 == 0 else None, linked_entity_id=f'client-{i % 500}' if i % 3 == 0 else None,
+            created_by='42', created_by_name='Jordan Smith', assigned_to=str(i % 20), assigned_to_name=f'Employee {i % 20}',
+            notes='Call notes. ' * rng.randint(0, 20), created_at=created, updated_at=created,
+        ))
+        session.add(Client(
+            id=str(uuid.UUID(int=rng.getrandbits(128))), name=f'Client {i}', email=f'client{i}@example.com',
+            company=f'Company {i % 700}', phone='+1 555 0100', status=rng.choice(['active', 'pending', 'prospect']),
+            tier=rng.choice(['starter', 'professional', 'enterprise']),
+            tags=json.dumps(rng.sample(['retail', 'b2b', 'saas', 'priority', 'agency', 'ecommerce'], 3)),
+            budget=Decimal(rng.randint(1000, 100000)) / 100, deadline=created + timedelta(days=30),
+            user_id=i if i % 4 == 0 else None, created_at=created, updated_at=created,
+        ))
+    session.commit()
+
+
+def timed(fn, repeat):
+    """Median wall time of fn() in milliseconds, plus its last result"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], result
+
+
+def bench(engine, model, serializer, repeat):
+    columns = [getattr(model, name) for name in serializer.columns]
+
+    def legacy():
+        with Session(engine) as session:
+            objects = session.scalars(select(model)).all()
+            return json.dumps({'items': [o.legacy_to_dict() for o in objects]}, sort_keys=True).encode()
+
+    def to_dict():
+        with Session(engine) as session:
+            objects = session.scalars(select(model)).all()
+            return dumps_bytes({'items': [o.to_dict() for o in objects]}, sort_keys=True)
+
+    def rows():
+        with Session(engine) as session:
+            result = session.execute(select(*columns)).all()
+            return dumps_bytes({'items': serializer.many(result)}, sort_keys=True)
+
+    print(f"\n== {model.__tablename__} ==")
+    print(f"{'path':<10}{'total ms':>10}{'bytes':>12}")
+    baseline = None
+    for name, fn in (('legacy', legacy), ('to_dict', to_dict), ('rows', rows)):
+        ms, body = timed(fn, repeat)
+        if baseline is None:
+            baseline = json.loads(body)
+        elif json.loads(body) != baseline:
+            print(f"  ! {name} output differs from legacy")
+        print(f"{name:<10}{ms:>10.1f}{len(body):>12,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Encoder: {'orjson' if ORJSON_AVAILABLE else 'stdlib json (orjson not installed)'}")
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, args.rows, random.Random(42))
+
+    bench(engine, Task, TASK_SERIALIZER, args.repeat)
+    bench(engine, Client, CLIENT_SERIALIZER, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+Server Mode Load Test
+Measures HTTP requests/sec and concurrent Socket.IO capacity of a running backend, to compare serving modes
+
+Run it once per mode against the same database and compare the results:
+
+    # single Werkzeug process with threads (the production server)
+    python app.py &
+    python benchmarks/load_test.py --label threading-werkzeug --output /tmp/werkzeug.json
+
+    # gunicorn + gevent
+    gunicorn -c gunicorn.conf.py wsgi:app &
+    python benchmarks/load_test.py --label gunicorn-gevent --output /tmp/gevent.json
+
+    python benchmarks/load_test.py --compare /tmp/werkzeug.json /tmp/gevent.json
+
+The HTTP phase keeps --concurrency requests in flight for --duration seconds.
+The socket phase opens connections in batches of --socket-batch until
+--sockets are connected or a batch fails more than 10% of its connects, then
+checks how many are still alive after --hold seconds.
+
+Results (benchmarks/results/load_test_*.json): one 1-CPU container, SQLite
+with 200 tasks, --concurrency 50 --duration 20 --hold 10, one gunicorn worker
+with the default GUNICORN_CONNECTIONS=1000:
+
+    mode                     req/s    p50 ms    p95 ms  errors   sockets   alive
+    --sockets 500
+    threading-werkzeug       214.6     219.3     310.0       0       500     500
+    gunicorn-gevent          221.5       5.2    1168.0       0       500     500
+    --sockets 3000 (load_test_capacity_*.json)
+    threading-werkzeug       207.4     227.3     317.5       0      3000    3000
+    gunicorn-gevent          257.8       3.9    1079.4       0      1000    1000
+
+On one CPU the gevent worker serves about the same requests/sec (the
+endpoint is CPU bound) and connects sockets faster, but its tail latency is
+far worse because greenlets are not scheduled fairly. The threaded server
+held all 3000 sockets; the gevent worker stopped at its 1000-connection
+limit. Production therefore stays on the threaded server.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import aiohttp
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def http_phase(base_url, paths, concurrency, duration, headers):
+    latencies = []
+    statuses = {}
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(session, offset):
+        nonlocal errors
+        i = offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                async with session.get(base_url + path, headers=headers) as response:
+                    await response.read()
+                    statuses[response.status] = statuses.get(response.status, 0) + 1
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=30)
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await asyncio.gather(*(worker(session, n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 2),
+        'requests': len(latencies),
+        'errors': errors,
+        'statuses': {str(k): v for k, v in sorted(statuses.items())},
+        'requestsPerSecond': round(len(latencies) / elapsed, 1),
+        'latencyMs': {
+            'p50': round(percentile(latencies, 0.50) or 0, 1),
+            'p95': round(percentile(latencies, 0.95) or 0, 1),
+            'p99': round(percentile(latencies, 0.99) or 0, 1),
+        },
+    }
+
+
+async def socket_phase(base_url, target, batch_size, hold, transports):
+    import socketio  # python-socketio's asyncio client (uses aiohttp)
+
+    clients = []
+    connect_ms = []
+    failed = 0
+
+    async def connect_one():
+        client = socketio.AsyncClient(reconnection=False)
+        start = time.perf_counter()
+        try:
+            await client.connect(base_url, transports=transports, wait_timeout=10)
+        except Exception:
+            return None
+        connect_ms.append((time.perf_counter() - start) * 1000)
+        return client
+
+    while len(clients) < target:
+        size = min(batch_size, target - len(clients))
+        results = await asyncio.gather(*(connect_one() for _ in range(size)))
+        connected = [c for c in results if c is not None]
+        clients.extend(connected)
+        failed += size - len(connected)
+        print(f"  sockets connected: {len(clients)}")
+        if size - len(connected) > size * 0.1:
+            break
+
+    await asyncio.sleep(hold)
+    alive = sum(1 for c in clients if c.connected)
+    await asyncio.gather(*(c.disconnect() for c in clients), return_exceptions=True)
+
+    return {
+        'target': target,
+        'connected': len(clients),
+        'failedConnects': failed,
+        'aliveAfterHold': alive,
+        'holdSeconds': hold,
+        'connectMs': {
+            'p50': round(percentile(connect_ms, 0.50) or 0, 1),
+            'p95': round(percentile(connect_ms, 0.95) or 0, 1),
+        },
+    }
+
+
+def compare(paths):
+    runs = []
+    for path in paths:
+        with open(path) as f:
+            runs.append(json.load(f))
+    print(f"{'mode':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}{'sockets':>10}{'alive':>8}")
+    for run in runs:
+        http, sockets = run.get('http', {}), run.get('sockets') or {}
+        print(f"{run['label']:<20}{http.get('requestsPerSecond', 0):>10}{http.get('latencyMs', {}).get('p50', 0):>10}"
+              f"{http.get('latencyMs', {}).get('p95', 0):>10}{http.get('errors', 0):>8}"
+              f"{sockets.get('connected', '-'):>10}{sockets.get('aliveAfterHold', '-'):>8}")
+
+
+async def run(args):
+    headers = {'Authorization': f'Bearer {args.token}'} if args.token else {}
+    result = {'label': args.label, 'url': args.url, 'paths': args.path}
+    print(f"HTTP: {args.concurrency} concurrent for {args.duration}s over {', '.join(args.path)}")
+    result['http'] = await http_phase(args.url, args.path, args.concurrency, args.duration, headers)
+    print(json.dumps(result['http'], indent=2))
+    if args.sockets:
+        print(f"Sockets: up to {args.sockets} connections")
+        transports = ['websocket'] if args.websocket_only else ['polling', 'websocket']
+        result['sockets'] = await socket_phase(args.url, args.sockets, args.socket_batch, args.hold, transports)
+        print(json.dumps(result['sockets'], indent=2))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--label', default='server')
+    parser.add_argument('--path', action='append', help='Path to request (repeatable); default /api/tasks?limit=50')
+    parser.add_argument('--token', help='JWT for authenticated endpoints')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--sockets', type=int, default=1000, help='Socket.IO connections to attempt (0 to skip)')
+    parser.add_argument('--socket-batch', type=int, default=100)
+    parser.add_argument('--hold', type=float, default=30)
+    parser.add_argument('--websocket-only', action='store_true')
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--compare', nargs='+', metavar='RESULT', help='Print a table of earlier --output files')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    args.path = args.path or ['/api/tasks?limit=50']
+    result = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
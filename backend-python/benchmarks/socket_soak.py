@@ -0,0 +1,925 @@
+"""
+Socket.IO Load and Soak Harness
+Drives simulated clients through the realtime features of a running backend and reports event latency, dropped events and server resource use
+
+Scenarios, run in this order each cycle (cycles repeat until --soak seconds have passed):
+
+    rooms          game:create-room / join-room, a drawing game with game:draw bursts, game:chat, game:leave-room
+    drawing        drawing:join, drawing:stroke bursts from a few clients, drawing:clear, drawing:leave
+    guessing       guessing:set-words, then guess / vote / next-round rounds in every room
+    notes          task_notes_join, a few typists sending task_notes_update patches (needs --task-id)
+    notifications  join_notifications subscribers, notifications created over HTTP (needs --token and --user-id)
+    storm          clients sitting in game rooms disconnect at once, then reconnect
+
+Every tracked event carries a marker, so each expected delivery is matched to
+the client that should receive it; deliveries still missing --settle seconds
+after a scenario's last send count as dropped. With --server-pid (or
+--server-cmd to start the server) the server's RSS and CPU time, including
+gunicorn workers, are sampled throughout; CPU is reported per client event and
+per delivery, and the RSS at the end of each cycle is compared across the soak
+to flag memory growth.
+
+    python app.py &
+    python benchmarks/socket_soak.py --server-pid $! --clients 200 --output /tmp/soak.json
+
+    # one hour soak against gunicorn with every scenario
+    python benchmarks/socket_soak.py --server-cmd "gunicorn -c gunicorn.conf.py wsgi:app" \\
+        --soak 3600 --task-id 42 --token "$JWT" --user-id 1 --output /tmp/soak.json
+
+The notes scenario edits the given tasks' notes and restores the original
+text afterwards; the notifications scenario creates notifications for
+--user-id and deletes them again. Point both at scratch data. Latencies are
+measured on the harness's own event loop, so check harnessCpuSeconds in the
+report: if it approaches the scenario's wall time the harness, not the
+server, is the bottleneck.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import shlex
+import subprocess
+import time
+import urllib.request
+from collections import Counter, defaultdict
+
+import aiohttp
+import socketio  # python-socketio's asyncio client (uses aiohttp)
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ('rooms', 'drawing', 'guessing', 'notes', 'notifications', 'storm')
+MARKER = re.compile(r'\[\[(\w+)\]\]')
+WORDS = ['apple', 'river', 'rocket', 'garden', 'piano', 'castle', 'window', 'planet', 'forest', 'candle']
+COLORS = ['#000000', '#e53935', '#1e88e5', '#43a047', '#fdd835']
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def latency_summary(samples):
+    return {
+        'p50': round(percentile(samples, 0.50) or 0, 1),
+        'p95': round(percentile(samples, 0.95) or 0, 1),
+        'p99': round(percentile(samples, 0.99) or 0, 1),
+        'max': round(max(samples) if samples else 0, 1),
+    }
+
+
+def apply_splices(text, patch):
+    for position, delete_count, insert in patch:
+        text = text[:position] + insert + text[position + delete_count:]
+    return text
+
+
+class ServerProcess:
+    """RSS and CPU time of a server process plus its descendants (gunicorn workers)"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self._clock_ticks = os.sysconf('SC_CLK_TCK')
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+
+    def _tree(self):
+        children = defaultdict(list)
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except OSError:
+                continue
+            children[int(fields[1])].append(int(entry))
+        pids, stack = [], [self.pid]
+        while stack:
+            pid = stack.pop()
+            pids.append(pid)
+            stack.extend(children.get(pid, ()))
+        return pids
+
+    def sample(self):
+        """(rss_mb, cpu_seconds) summed over the process tree, or None once the server has gone"""
+        if psutil is not None:
+            try:
+                root = psutil.Process(self.pid)
+                processes = [root] + root.children(recursive=True)
+                rss = sum(p.memory_info().rss for p in processes)
+                cpu = sum(p.cpu_times().user + p.cpu_times().system for p in processes)
+                return rss / 1048576, cpu
+            except psutil.Error:
+                return None
+
+        rss = cpu = 0
+        found = False
+        for pid in self._tree():
+            try:
+                with open(f'/proc/{pid}/stat') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except OSError:
+                continue
+            found = True
+            cpu += (int(fields[11]) + int(fields[12])) / self._clock_ticks
+            rss += int(fields[21]) * self._page_size
+        return (rss / 1048576, cpu) if found else None
+
+
+class Tracker:
+    """Matches expected deliveries (marker, receiving client) against the events that arrive"""
+
+    def __init__(self):
+        self.pending = {}  # marker -> [event, sent_at, ids of clients still waiting]
+        self.sent = Counter()
+        self.expected = Counter()
+        self.delivered = Counter()
+        self.dropped = Counter()
+        self.latency = defaultdict(list)
+        self.errors = Counter()
+        self.conflicts = 0
+
+    def expect(self, event, marker, receivers, sent_at=None):
+        receivers = {client.id for client in receivers}
+        if receivers:
+            self.pending[marker] = [event, sent_at or time.perf_counter(), receivers]
+            self.expected[event] += len(receivers)
+
+    def deliver(self, marker, client):
+        entry = self.pending.get(marker)
+        if entry is None or client.id not in entry[2]:
+            return
+        event, sent_at, waiting = entry
+        waiting.discard(client.id)
+        self.delivered[event] += 1
+        self.latency[event].append((time.perf_counter() - sent_at) * 1000)
+        if not waiting:
+            del self.pending[marker]
+
+    def restart(self, marker):
+        """Time a marker from now, for replies triggered by the last of several sends"""
+        entry = self.pending.get(marker)
+        if entry is not None:
+            entry[1] = time.perf_counter()
+
+    def cancel(self, marker):
+        entry = self.pending.pop(marker, None)
+        if entry is not None:
+            self.expected[entry[0]] -= len(entry[2])
+
+    async def wait(self, markers, timeout):
+        """Wait until every marker has been delivered everywhere; False on timeout"""
+        deadline = time.perf_counter() + timeout
+        while any(marker in self.pending for marker in markers):
+            if time.perf_counter() > deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    def finish(self):
+        for event, _, waiting in self.pending.values():
+            self.dropped[event] += len(waiting)
+        self.pending.clear()
+
+    def report(self):
+        return {
+            event: {
+                'expected': self.expected[event],
+                'delivered': self.delivered[event],
+                'dropped': self.dropped[event],
+                'latencyMs': latency_summary(self.latency[event]),
+            }
+            for event in sorted(self.expected)
+        }
+
+
+class Room:
+    def __init__(self, code, host):
+        self.code = code
+        self.host = host
+        self.members = [host]
+        self.round = 0
+        self.guesses = []
+
+
+class SimClient:
+    """One Socket.IO connection; handlers turn incoming events into Tracker deliveries"""
+
+    def __init__(self, harness, client_id):
+        self.harness = harness
+        self.id = client_id
+        self.sio = None
+        self.sid = None
+        self.room = None
+        self.room_code = None
+        self.notes = {}  # task_id -> [text, version]
+        self.pending_note = {}  # task_id -> (marker or None, patch) awaiting ack
+
+    @property
+    def name(self):
+        return f'soak-{self.id}'
+
+    async def connect(self):
+        self.sio = socketio.AsyncClient(reconnection=False)
+        for event, handler in self._handlers().items():
+            self.sio.on(event, handler)
+        args = self.harness.args
+        headers = {'Authorization': f'Bearer {args.token}'} if args.token else {}
+        transports = ['websocket'] if args.websocket_only else ['polling', 'websocket']
+        start = time.perf_counter()
+        await self.sio.connect(args.url, headers=headers, transports=transports, wait_timeout=10)
+        self.sid = self.sio.get_sid()
+        self.room = self.room_code = None
+        self.notes.clear()
+        self.pending_note.clear()
+        return (time.perf_counter() - start) * 1000
+
+    @property
+    def connected(self):
+        return self.sio is not None and self.sio.connected
+
+    def _deliver(self, marker):
+        self.harness.tracker.deliver(marker, self)
+
+    def _room_marker(self, prefix, *parts):
+        return ':'.join([prefix, self.room.code if self.room else '', *map(str, parts)])
+
+    def _handlers(self):
+        def on_error(data):
+            self.harness.tracker.errors[str((data or {}).get('message', data))[:120]] += 1
+
+        def on_room_created(data):
+            self.room_code = data['room']['roomCode']
+            self._deliver(f'create:{self.id}')
+
+        def on_chat(data):
+            for marker in MARKER.findall(data.get('message', '')):
+                self._deliver(marker)
+
+        def on_phase_changed(data):
+            if self.room is not None and data.get('roundPhase') == 'voting':
+                self.room.guesses = [g['id'] for g in data.get('guesses', [])]
+            self._deliver(self._room_marker('voting', self.room.round if self.room else 0))
+
+        def on_notes_state(data):
+            self.notes[data['task_id']] = [data.get('notes') or '', data['version']]
+            self._deliver(f"notesjoin:{data['task_id']}:{self.id}")
+
+        def on_notes_patch(data):
+            state = self.notes.get(data['task_id'])
+            if state is not None:
+                try:
+                    state[0] = apply_splices(state[0], data['patch'])
+                except (TypeError, ValueError):
+                    pass  # Out of sync; the next edit conflicts and resyncs
+                state[1] = data['version']
+            for _, _, insert in data['patch']:
+                for marker in MARKER.findall(insert):
+                    self._deliver(marker)
+
+        def on_notes_ack(data):
+            marker, patch = self.pending_note.pop(data['task_id'], (None, []))
+            state = self.notes.get(data['task_id'])
+            if state is not None:
+                state[0] = apply_splices(state[0], patch)
+                state[1] = data['version']
+            if marker:
+                self._deliver(f'{marker}:ack')
+
+        def on_notes_conflict(data):
+            marker, _ = self.pending_note.pop(data['task_id'], (None, []))
+            self.notes[data['task_id']] = [data.get('notes') or '', data['version']]
+            self.harness.tracker.conflicts += 1
+            if marker:
+                # The keystroke is rebased by a real client; here it is simply not retried
+                self.harness.tracker.cancel(marker)
+                self.harness.tracker.cancel(f'{marker}:ack')
+
+        def on_notification(data):
+            for marker in MARKER.findall(data.get('message') or ''):
+                self._deliver(marker)
+
+        return {
+            'error': on_error,
+            'game:error': on_error,
+            'drawing:state': lambda data: self._deliver(f'state:{self.id}'),
+            'drawing:stroke': lambda data: self._deliver((data.get('stroke') or {}).get('mark')),
+            'drawing:clear': lambda *args: self._deliver(self.harness.clear_marker),
+            'game:room-created': on_room_created,
+            'game:room-joined': lambda data: self._deliver(f'join:{self.id}'),
+            'game:started': lambda data: self._deliver(f"started:{data['room']['roomCode']}"),
+            'game:drawing-update': lambda data: self._deliver(data.get('mark')),
+            'game:chat-message': on_chat,
+            'game:player-disconnected': lambda data: self._deliver(self._room_marker('gone', data['playerId'])),
+            'guessing:words-set': lambda data: self._deliver(f"words:{data['room']['roomCode']}"),
+            'guessing:guess-submitted': lambda data: self._deliver(
+                self._room_marker('guess', self.room.round if self.room else 0, data['playerId'])),
+            'guessing:phase-changed': on_phase_changed,
+            'guessing:vote-received': lambda data: self._deliver(
+                self._room_marker('vote', self.room.round if self.room else 0, data['totalVotes'])),
+            'guessing:voting-complete': lambda data: self._deliver(
+                self._room_marker('results', self.room.round if self.room else 0)),
+            'guessing:round-started': lambda data: self._deliver(self._room_marker('round', data['currentRound'])),
+            'task_notes_state': on_notes_state,
+            'task_notes_patch': on_notes_patch,
+            'task_notes_ack': on_notes_ack,
+            'task_notes_conflict': on_notes_conflict,
+            'notification:new': on_notification,
+        }
+
+
+class Harness:
+    def __init__(self, args, server):
+        self.args = args
+        self.server = server
+        self.clients = [SimClient(self, n) for n in range(args.clients)]
+        self.trackers = {}
+        self.tracker = Tracker()
+        self.scenario_stats = defaultdict(lambda: {'runs': 0, 'seconds': 0.0, 'serverCpuSeconds': 0.0,
+                                                   'harnessCpuSeconds': 0.0, 'unexpectedDisconnects': 0})
+        self.connect_ms = []
+        self.failed_connects = 0
+        self.clear_marker = None
+        self._markers = itertools.count()
+
+    def marker(self, prefix):
+        return f'{prefix}{next(self._markers)}'
+
+    async def send(self, client, event, data=None):
+        self.tracker.sent[event] += 1
+        if data is None:
+            await client.sio.emit(event)
+        else:
+            await client.sio.emit(event, data)
+
+    async def connect(self, clients):
+        for start in range(0, len(clients), self.args.connect_batch):
+            batch = clients[start:start + self.args.connect_batch]
+            results = await asyncio.gather(*(c.connect() for c in batch), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    self.failed_connects += 1
+                else:
+                    self.connect_ms.append(result)
+
+    def connected(self):
+        return [c for c in self.clients if c.connected]
+
+    def groups(self, size):
+        clients = self.connected()
+        return [clients[i:i + size] for i in range(0, len(clients) - size + 1, size)]
+
+    async def settle(self, markers):
+        await self.tracker.wait(markers, self.args.settle)
+
+    # -- rooms ---------------------------------------------------------------
+
+    async def create_room(self, host):
+        marker = f'create:{host.id}'
+        self.tracker.expect('game:room-created', marker, [host])
+        await self.send(host, 'game:create-room', {'playerName': host.name, 'userId': host.name})
+        if not await self.tracker.wait([marker], self.args.settle) or not host.room_code:
+            return None
+        host.room = Room(host.room_code, host)
+        return host.room
+
+    async def join_room(self, client, room):
+        marker = f'join:{client.id}'
+        self.tracker.expect('game:room-joined', marker, [client])
+        await self.send(client, 'game:join-room', {'roomCode': room.code, 'playerName': client.name, 'userId': client.name})
+        if await self.tracker.wait([marker], self.args.settle):
+            client.room = room
+            room.members.append(client)
+
+    async def open_room(self, group):
+        room = await self.create_room(group[0])
+        if room is not None:
+            await asyncio.gather(*(self.join_room(c, room) for c in group[1:]))
+        return room
+
+    async def leave_room(self, room):
+        for client in room.members:
+            if client.connected:
+                await self.send(client, 'game:leave-room', {'roomCode': room.code})
+            client.room = None
+
+    async def play_drawing_room(self, group):
+        args = self.args
+        room = await self.open_room(group)
+        if room is None or len(room.members) < 2:
+            return
+        started = f'started:{room.code}'
+        self.tracker.expect('game:started', started, room.members)
+        await self.send(room.host, 'game:start-game', {'roomCode': room.code, 'gameType': 'drawing', 'maxRounds': 3})
+        await self.settle([started])
+
+        markers = []
+        others = room.members[1:]
+        for _ in range(args.strokes):
+            marker = self.marker('draw')
+            markers.append(marker)
+            self.tracker.expect('game:drawing-update', marker, others)
+            await self.send(room.host, 'game:draw', {
+                'roomCode': room.code,
+                'playerId': room.host.sid,
+                'mark': marker,
+                'points': [[random.randint(0, 800), random.randint(0, 600)] for _ in range(8)],
+                'color': random.choice(COLORS),
+                'width': 3,
+            })
+            await asyncio.sleep(1 / args.stroke_hz)
+
+        async def chat(client):
+            for _ in range(args.chat_messages):
+                await asyncio.sleep(random.uniform(0.05, 0.5))
+                marker = self.marker('chat')
+                markers.append(marker)
+                self.tracker.expect('game:chat-message', marker, room.members)
+                await self.send(client, 'game:chat', {'roomCode': room.code, 'message': f'hello [[{marker}]]'})
+
+        await asyncio.gather(*(chat(c) for c in room.members))
+        await self.settle(markers)
+        await self.leave_room(room)
+
+    async def scenario_rooms(self):
+        await asyncio.gather(*(self.play_drawing_room(g) for g in self.groups(self.args.room_size)))
+
+    # -- drawing pad ---------------------------------------------------------
+
+    async def scenario_drawing(self):
+        args = self.args
+        clients = self.connected()
+        joins = []
+        for client in clients:
+            joins.append(f'state:{client.id}')
+            self.tracker.expect('drawing:state', joins[-1], [client])
+        await asyncio.gather(*(self.send(c, 'drawing:join') for c in clients))
+        await self.settle(joins)
+
+        markers = []
+
+        async def burst(drawer):
+            # drawing:stroke is broadcast to every connected socket, not just the drawing session
+            others = [c for c in clients if c is not drawer]
+            for _ in range(args.strokes):
+                marker = self.marker('stroke')
+                markers.append(marker)
+                self.tracker.expect('drawing:stroke', marker, others)
+                await self.send(drawer, 'drawing:stroke', {
+                    'stroke': {
+                        'mark': marker,
+                        'points': [[random.randint(0, 800), random.randint(0, 600)] for _ in range(8)],
+                        'color': random.choice(COLORS),
+                        'width': 3,
+                    },
+                    'userId': drawer.name,
+                    'userName': drawer.name,
+                })
+                await asyncio.sleep(1 / args.stroke_hz)
+
+        await asyncio.gather(*(burst(c) for c in clients[:args.drawers]))
+        await self.settle(markers)
+
+        if clients:
+            self.clear_marker = self.marker('clear')
+            self.tracker.expect('drawing:clear', self.clear_marker, clients[1:])
+            await self.send(clients[0], 'drawing:clear')
+            await self.settle([self.clear_marker])
+        await asyncio.gather(*(self.send(c, 'drawing:leave') for c in clients))
+
+    # -- guessing game -------------------------------------------------------
+
+    async def play_guessing_room(self, group):
+        room = await self.open_room(group)
+        if room is None or len(room.members) < 3:
+            if room is not None:
+                await self.leave_room(room)
+            return
+        words_set = f'words:{room.code}'
+        self.tracker.expect('guessing:words-set', words_set, room.members)
+        await self.send(room.host, 'guessing:set-words', {'roomCode': room.code, 'words': random.sample(WORDS, 5)})
+        if not await self.tracker.wait([words_set], self.args.settle):
+            await self.leave_room(room)
+            return
+
+        guessers = room.members[1:]
+        for round_number in range(1, min(self.args.rounds, 5) + 1):
+            room.round = round_number
+            prefix = f'{room.code}:{round_number}'
+            voting = f'voting:{prefix}'
+            self.tracker.expect('guessing:phase-changed', voting, room.members)
+
+            async def guess(client):
+                await asyncio.sleep(random.uniform(0.1, 1.0))  # Thinking time
+                self.tracker.expect('guessing:guess-submitted', f'guess:{prefix}:{client.sid}', room.members)
+                self.tracker.restart(voting)
+                await self.send(client, 'guessing:submit-guess', {'roomCode': room.code, 'guess': random.choice(WORDS)})
+
+            await asyncio.gather(*(guess(c) for c in guessers))
+            if not await self.tracker.wait([voting], self.args.settle):
+                break
+
+            results = f'results:{prefix}'
+            self.tracker.expect('guessing:voting-complete', results, room.members)
+            votes = itertools.count(1)
+
+            async def vote(client):
+                await asyncio.sleep(random.uniform(0.1, 1.0))
+                choices = [sid for sid in room.guesses if sid != client.sid]
+                if choices:
+                    # vote-received carries only the running total, so votes are matched in send order
+                    self.tracker.expect('guessing:vote-received', f'vote:{prefix}:{next(votes)}', room.members)
+                    self.tracker.restart(results)
+                    await self.send(client, 'guessing:vote', {'roomCode': room.code, 'votedForPlayerId': random.choice(choices)})
+
+            await asyncio.gather(*(vote(c) for c in guessers))
+            if not await self.tracker.wait([results], self.args.settle):
+                break
+
+            if round_number < min(self.args.rounds, 5):
+                next_round = f'round:{room.code}:{round_number + 1}'
+                self.tracker.expect('guessing:round-started', next_round, room.members)
+                await self.send(room.host, 'guessing:next-round', {'roomCode': room.code})
+                if not await self.tracker.wait([next_round], self.args.settle):
+                    break
+        await self.leave_room(room)
+
+    async def scenario_guessing(self):
+        await asyncio.gather(*(self.play_guessing_room(g) for g in self.groups(self.args.room_size)))
+
+    # -- task notes ----------------------------------------------------------
+
+    async def edit_notes(self, client, task_id, patch, marker=None):
+        """Send one patch and wait for its ack or conflict"""
+        client.pending_note[task_id] = (marker, patch)
+        await self.send(client, 'task_notes_update', {'task_id': task_id, 'version': client.notes[task_id][1], 'patch': patch})
+        deadline = time.perf_counter() + self.args.settle
+        while task_id in client.pending_note and time.perf_counter() < deadline:
+            await asyncio.sleep(0.005)
+        return task_id not in client.pending_note
+
+    async def type_notes(self, task_id, viewers):
+        args = self.args
+        joins = [f'notesjoin:{task_id}:{c.id}' for c in viewers]
+        for client, marker in zip(viewers, joins):
+            self.tracker.expect('task_notes_state', marker, [client])
+        await asyncio.gather(*(self.send(c, 'task_notes_join', {'task_id': task_id}) for c in viewers))
+        await self.settle(joins)
+        viewers = [c for c in viewers if task_id in c.notes]
+        if not viewers:
+            return
+        original = viewers[0].notes[task_id][0]
+
+        markers = []
+
+        async def typist(client):
+            others = [c for c in viewers if c is not client]
+            for _ in range(args.keystrokes):
+                await asyncio.sleep(random.expovariate(args.typing_hz))
+                marker = self.marker('note')
+                text = client.notes[task_id][0]
+                patch = [[len(text), 0, f'[[{marker}]] ']]
+                self.tracker.expect('task_notes_patch', marker, others)
+                self.tracker.expect('task_notes_ack', f'{marker}:ack', [client])
+                markers.extend([marker, f'{marker}:ack'])
+                await self.edit_notes(client, task_id, patch, marker)
+
+        await asyncio.gather(*(typist(c) for c in viewers[:args.typists]))
+        await self.settle(markers)
+
+        # Put the original text back, rebasing over any conflict
+        restorer = viewers[0]
+        for _ in range(5):
+            text = restorer.notes[task_id][0]
+            if text == original:
+                break
+            if await self.edit_notes(restorer, task_id, [[0, len(text), original]]) and restorer.notes[task_id][0] == original:
+                break
+        await asyncio.gather(*(self.send(c, 'task_notes_leave', {'task_id': task_id}) for c in viewers))
+
+    async def scenario_notes(self):
+        clients = self.connected()
+        tasks = self.args.task_id
+        await asyncio.gather(*(
+            self.type_notes(task_id, clients[i::len(tasks)][:self.args.notes_viewers])
+            for i, task_id in enumerate(tasks)
+        ))
+
+    # -- notifications -------------------------------------------------------
+
+    async def scenario_notifications(self):
+        args = self.args
+        subscribers = self.connected()[:args.subscribers]
+        await asyncio.gather(*(self.send(c, 'join_notifications', {'userId': args.user_id}) for c in subscribers))
+        await asyncio.sleep(0.5)  # join_notifications has no ack
+
+        headers = {'Authorization': f'Bearer {args.token}'}
+        created, markers = [], []
+        async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as session:
+            for _ in range(args.notifications):
+                marker = self.marker('notify')
+                markers.append(marker)
+                # Latency includes the HTTP request and the database write that precede the emit
+                self.tracker.expect('notification:new', marker, subscribers)
+                self.tracker.sent['POST /api/notifications'] += 1
+                async with session.post(f'{args.url}/api/notifications', json={
+                    'type': 'system', 'title': 'Soak test', 'message': f'soak [[{marker}]]'
+                }) as response:
+                    if response.status == 201:
+                        created.append((await response.json())['id'])
+                    else:
+                        self.tracker.errors[f'POST /api/notifications {response.status}'] += 1
+                        self.tracker.cancel(marker)
+                await asyncio.sleep(1 / args.notification_hz)
+            await self.settle(markers)
+            for notification_id in created:
+                async with session.delete(f'{args.url}/api/notifications/{notification_id}') as response:
+                    await response.read()
+
+    # -- disconnect storm ----------------------------------------------------
+
+    async def scenario_storm(self):
+        rooms = [r for r in await asyncio.gather(*(self.open_room(g) for g in self.groups(self.args.room_size))) if r]
+        in_rooms = [c for room in rooms for c in room.members]
+        victims = set(random.sample(in_rooms, int(len(in_rooms) * self.args.storm_fraction)))
+
+        markers = []
+        for room in rooms:
+            survivors = [c for c in room.members if c not in victims]
+            for client in room.members:
+                if client in victims:
+                    markers.append(f'gone:{room.code}:{client.sid}')
+                    self.tracker.expect('game:player-disconnected', markers[-1], survivors)
+        await asyncio.gather(*(c.sio.disconnect() for c in victims), return_exceptions=True)
+        await self.settle(markers)
+
+        start = time.perf_counter()
+        failed_before = self.failed_connects
+        await self.connect(list(victims))
+        stats = self.scenario_stats['storm']
+        stats['reconnectSeconds'] = stats.get('reconnectSeconds', 0) + round(time.perf_counter() - start, 2)
+        stats['failedReconnects'] = stats.get('failedReconnects', 0) + self.failed_connects - failed_before
+        stats['disconnected'] = stats.get('disconnected', 0) + len(victims)
+
+        # Survivors leave normally; the victims' players stay behind marked inactive
+        for room in rooms:
+            room.members = [c for c in room.members if c not in victims]
+            await self.leave_room(room)
+
+    # -- driver --------------------------------------------------------------
+
+    async def run_scenario(self, name):
+        tracker = self.trackers.setdefault(name, Tracker())
+        self.tracker = tracker
+        stats = self.scenario_stats[name]
+
+        dropped = [c for c in self.clients if not c.connected]
+        if dropped and self.connect_ms:
+            stats['unexpectedDisconnects'] += len(dropped)
+            await self.connect(dropped)
+
+        before = self.server.sample() if self.server else None
+        harness_cpu = time.process_time()
+        start = time.perf_counter()
+        await getattr(self, f'scenario_{name}')()
+        tracker.finish()
+        stats['runs'] += 1
+        stats['seconds'] += time.perf_counter() - start
+        stats['harnessCpuSeconds'] += time.process_time() - harness_cpu
+        after = self.server.sample() if self.server else None
+        if before and after:
+            stats['serverCpuSeconds'] += after[1] - before[1]
+
+    def scenario_report(self, name):
+        tracker = self.trackers[name]
+        stats = dict(self.scenario_stats[name])
+        sent = sum(tracker.sent.values())
+        delivered = sum(tracker.delivered.values())
+        cpu_ms = stats['serverCpuSeconds'] * 1000
+        stats.update({
+            'seconds': round(stats['seconds'], 1),
+            'serverCpuSeconds': round(stats['serverCpuSeconds'], 2),
+            'harnessCpuSeconds': round(stats['harnessCpuSeconds'], 2),
+            'clientEvents': sent,
+            'deliveries': delivered,
+            'serverCpuMsPerEvent': round(cpu_ms / sent, 3) if sent and self.server else None,
+            'serverCpuMsPerDelivery': round(cpu_ms / delivered, 3) if delivered and self.server else None,
+            'sent': dict(tracker.sent),
+            'events': tracker.report(),
+            'errors': dict(tracker.errors.most_common(20)),
+        })
+        if name == 'notes':
+            stats['conflicts'] = tracker.conflicts
+        return stats
+
+
+async def sample_server(server, interval, series, started):
+    while True:
+        sample = server.sample()
+        if sample is not None:
+            series.append([round(time.perf_counter() - started, 1), round(sample[0], 1), round(sample[1], 2)])
+        await asyncio.sleep(interval)
+
+
+def memory_growth(cycle_rss, max_growth_mb):
+    """
+    Compare RSS at the end of each cycle after the first (warm-up) one
+
+    Flags growth when the last cycle ends more than max_growth_mb above the
+    second and the least-squares trend over those cycles is still rising.
+    """
+    points = cycle_rss[1:]
+    if len(points) < 3:
+        return {'verdict': 'insufficient data (run at least 4 cycles, see --soak)', 'flagged': None}
+    xs = [p['seconds'] for p in points]
+    ys = [p['rssMb'] for p in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread else 0.0
+    growth = ys[-1] - ys[0]
+    flagged = growth > max_growth_mb and slope > 0
+    return {
+        'baselineMb': ys[0],
+        'finalMb': ys[-1],
+        'growthMb': round(growth, 1),
+        'trendMbPerHour': round(slope * 3600, 1),
+        'flagged': flagged,
+        'verdict': f'RSS grew {growth:.1f} MB over the soak' if flagged else 'no sustained growth',
+    }
+
+
+def start_server(command, url, log_path):
+    log = open(log_path, 'ab')
+    process = subprocess.Popen(shlex.split(command), cwd=BACKEND_DIR, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 90
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'Server exited with status {process.returncode}; see {log_path}')
+        try:
+            urllib.request.urlopen(f'{url}/socket.io/?EIO=4&transport=polling', timeout=2)
+            return process
+        except OSError as e:
+            if getattr(e, 'code', None):  # Any HTTP response means it is serving
+                return process
+            time.sleep(0.5)
+    process.terminate()
+    raise SystemExit(f'Server did not answer on {url} within 90s; see {log_path}')
+
+
+def print_report(result):
+    print(f"\n{'scenario / event':<44}{'expected':>10}{'dropped':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, scenario in result['scenarios'].items():
+        cpu = scenario['serverCpuMsPerEvent']
+        print(f"{name} ({scenario['runs']} runs, {scenario['clientEvents']} client events, "
+              f"{scenario['deliveries']} deliveries, server CPU/event {cpu if cpu is not None else '-'} ms)")
+        for event, stats in scenario['events'].items():
+            latency = stats['latencyMs']
+            print(f"  {event:<42}{stats['expected']:>10}{stats['dropped']:>9}"
+                  f"{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}")
+        for message, count in scenario['errors'].items():
+            print(f"  ! {count}x {message}")
+    server = result.get('server')
+    if server:
+        growth = server['memoryGrowth']
+        marker = '⚠ ' if growth['flagged'] else ''
+        print(f"\nServer RSS by cycle (MB): {[c['rssMb'] for c in server['cycleRss']]}")
+        print(f"{marker}Memory: {growth['verdict']}")
+
+
+async def run(args):
+    process = None
+    if args.server_cmd:
+        process = start_server(args.server_cmd, args.url, args.server_log)
+        args.server_pid = process.pid
+    server = ServerProcess(args.server_pid) if args.server_pid else None
+    harness = Harness(args, server)
+
+    scenarios = list(args.scenario or SCENARIOS)
+    if 'notes' in scenarios and not args.task_id:
+        print('Skipping notes: pass --task-id')
+        scenarios.remove('notes')
+    if 'notifications' in scenarios and not (args.token and args.user_id):
+        print('Skipping notifications: pass --token and --user-id')
+        scenarios.remove('notifications')
+
+    started = time.perf_counter()
+    series, cycle_rss = [], []
+    sampler = asyncio.ensure_future(sample_server(server, args.sample_interval, series, started)) if server else None
+    try:
+        print(f"Connecting {args.clients} clients to {args.url}")
+        await harness.connect(harness.clients)
+        print(f"  connected {len(harness.connected())}, failed {harness.failed_connects}")
+
+        cycle = 0
+        while True:
+            cycle += 1
+            for name in scenarios:
+                await harness.run_scenario(name)
+            elapsed = time.perf_counter() - started
+            sample = server.sample() if server else None
+            if sample:
+                cycle_rss.append({'cycle': cycle, 'seconds': round(elapsed, 1), 'rssMb': round(sample[0], 1)})
+            print(f"  cycle {cycle} done at {elapsed:.0f}s" + (f", server RSS {sample[0]:.1f} MB" if sample else ''))
+            if elapsed >= args.soak:
+                break
+
+        await asyncio.gather(*(c.sio.disconnect() for c in harness.connected()), return_exceptions=True)
+    finally:
+        if sampler:
+            sampler.cancel()
+        if process:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    result = {
+        'label': args.label,
+        'url': args.url,
+        'clients': args.clients,
+        'cycles': cycle,
+        'seconds': round(time.perf_counter() - started, 1),
+        'connect': {
+            'connected': len(harness.connect_ms),
+            'failed': harness.failed_connects,
+            'connectMs': latency_summary(harness.connect_ms),
+        },
+        'scenarios': {name: harness.scenario_report(name) for name in scenarios},
+    }
+    if server:
+        result['server'] = {
+            'pid': args.server_pid,
+            'cycleRss': cycle_rss,
+            'memoryGrowth': memory_growth(cycle_rss, args.max_growth_mb),
+            'rssSeries': series,  # [seconds, rss_mb, cpu_seconds]
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--label', default='soak')
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--connect-batch', type=int, default=50)
+    parser.add_argument('--websocket-only', action='store_true')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='Scenario to run (repeatable); default all')
+    parser.add_argument('--soak', type=float, default=0, help='Repeat the scenarios until this many seconds have passed')
+    parser.add_argument('--settle', type=float, default=5, help='Seconds to wait for outstanding deliveries')
+    parser.add_argument('--seed', type=int)
+
+    parser.add_argument('--room-size', type=int, default=6)
+    parser.add_argument('--strokes', type=int, default=40, help='Strokes per drawing burst')
+    parser.add_argument('--stroke-hz', type=float, default=30)
+    parser.add_argument('--drawers', type=int, default=3, help='Clients drawing at once on the shared drawing pad')
+    parser.add_argument('--chat-messages', type=int, default=3, help='Chat messages per player')
+    parser.add_argument('--rounds', type=int, default=3, help='Guessing rounds per room (at most 5)')
+    parser.add_argument('--task-id', action='append', help='Task whose notes are edited (repeatable)')
+    parser.add_argument('--notes-viewers', type=int, default=10)
+    parser.add_argument('--typists', type=int, default=2)
+    parser.add_argument('--keystrokes', type=int, default=30)
+    parser.add_argument('--typing-hz', type=float, default=5)
+    parser.add_argument('--token', help='JWT for the notifications scenario (and to connect as a user)')
+    parser.add_argument('--user-id', help='Database id of the --token user')
+    parser.add_argument('--subscribers', type=int, default=20)
+    parser.add_argument('--notifications', type=int, default=20)
+    parser.add_argument('--notification-hz', type=float, default=5)
+    parser.add_argument('--storm-fraction', type=float, default=0.5)
+
+    parser.add_argument('--server-pid', type=int, help='Sample RSS/CPU of this server process and its children')
+    parser.add_argument('--server-cmd', help='Start the server with this command (run from the backend directory)')
+    parser.add_argument('--server-log', default=os.devnull)
+    parser.add_argument('--sample-interval', type=float, default=1)
+    parser.add_argument('--max-growth-mb', type=float, default=32, help='RSS growth across the soak that is flagged')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.server_pid and psutil is None and not os.path.isdir('/proc'):
+        parser.error('--server-pid needs /proc or psutil')
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote {args.output}")
+    if result.get('server', {}).get('memoryGrowth', {}).get('flagged'):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Collaborative Task Notes
+Text splice patches and a versioned write-behind buffer for real-time task notes editing
+"""
+
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+from structured_logging import get_logger
+
+logger = get_logger('tasks')
+
+# A patch is a list of splices [position, delete_count, insert_text] applied in order
+Patch = List[List[Any]]
+
+# Versions come from one process-wide counter seeded with the clock, so a task
+# reloaded after eviction never reuses a version a client might still hold
+_version_counter = itertools.count(int(time.time() * 1000))
+
+
+class NotesConflict(Exception):
+    """Raised when an edit is based on a version other than the current one"""
+
+    def __init__(self, text: str, version: int):
+        super().__init__(f'Notes changed (current version {version})')
+        self.text = text
+        self.version = version
+
+
+def make_patch(old: str, new: str) -> Patch:
+    """
+    Diff two texts into a single splice
+
+    Keystroke-sized edits touch one region, so trimming the common prefix and
+    suffix gives the minimal patch without a full diff.
+
+    Returns:
+        [] when the texts are equal, otherwise [[position, delete_count, insert_text]]
+    """
+    if old == new:
+        return []
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    return [[start, len(old) - start - end, new[start:len(new) - end]]]
+
+
+def apply_patch(text: str, patch: Patch) -> str:
+    """
+    Apply splices from make_patch (or a client) to text
+
+    Raises:
+        ValueError: If a splice is malformed or out of range
+    """
+    for splice in patch:
+        if not isinstance(splice, (list, tuple)) or len(splice) != 3:
+            raise ValueError('Each splice must be [position, delete_count, insert_text]')
+        position, delete_count, insert = splice
+        if (not isinstance(position, int) or not isinstance(delete_count, int) or not isinstance(insert, str)
+                or position < 0 or delete_count < 0 or position + delete_count > len(text)):
+            raise ValueError(f'Splice {splice!r} out of range for text of length {len(text)}')
+        text = text[:position] + insert + text[position + delete_count:]
+    return text
+
+
+class _Entry:
+    __slots__ = ('text', 'version', 'dirty_since', 'last_edit', 'last_used')
+
+    def __init__(self, text: str):
+        now = time.monotonic()
+        self.text = text
+        self.version = next(_version_counter)
+        self.dirty_since: Optional[float] = None
+        self.last_edit = now
+        self.last_used = now
+
+
+class NotesBuffer:
+    """
+    Write-behind buffer for task notes
+
+    Edits are applied in memory and stamped with a new version; the database
+    is written by flush_due() once a task has been idle for idle_ms, or at the
+    latest max_delay_ms after its first unsaved edit. Clean entries unused for
+    evict_after seconds are dropped.
+
+    The buffer is per process: run a single Socket.IO worker (or sticky
+    sessions per task) so every editor of a task hits the same buffer.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Optional[str]],
+        saver: Callable[[str, str], None],
+        idle_ms: int = 1500,
+        max_delay_ms: int = 5000,
+        evict_after: float = 600.0,
+    ):
+        """
+        Args:
+            loader: Returns the stored notes for a task id, or None if the task doesn't exist
+            saver: Persists (task_id, text)
+            idle_ms: Flush after this long without edits
+            max_delay_ms: Flush at least this often while edits keep coming
+            evict_after: Seconds before an unused, saved entry is dropped
+        """
+        self._loader = loader
+        self._saver = saver
+        self.idle = idle_ms / 1000.0
+        self.max_delay = max_delay_ms / 1000.0
+        self.evict_after = evict_after
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, task_id: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(task_id)
+        if entry is None:
+            text = self._loader(task_id)
+            if text is None:
+                return None
+            with self._lock:
+                entry = self._entries.setdefault(task_id, _Entry(text))
+        entry.last_used = time.monotonic()
+        return entry
+
+    def snapshot(self, task_id: str) -> Optional[Tuple[str, int]]:
+        """Current (text, version) for a task, or None if it doesn't exist"""
+        entry = self._entry(task_id)
+        if entry is None:
+            return None
+        with self._lock:
+            return entry.text, entry.version
+
+    def apply(self, task_id: str, base_version: Optional[int], patch: Optional[Patch] = None,
+              text: Optional[str] = None) -> Optional[Tuple[int, int, Patch]]:
+        """
+        Apply an edit
+
+        Args:
+            task_id: Task being edited
+            base_version: Version the edit was made against; None accepts the
+                edit against whatever is current (full-text legacy clients)
+            patch: Splices to apply
+            text: Full replacement text, used when no patch is given
+
+        Returns:
+            (previous version, new version, effective patch), or None if the task doesn't exist
+
+        Raises:
+            NotesConflict: base_version is stale; carries the current text and version
+            ValueError: The patch does not apply
+        """
+        entry = self._entry(task_id)
+        if entry is None:
+            return None
+        with self._lock:
+            if base_version is not None and base_version != entry.version:
+                raise NotesConflict(entry.text, entry.version)
+            if patch is not None:
+                new_text = apply_patch(entry.text, patch)
+            else:
+                new_text = text or ''
+                patch = make_patch(entry.text, new_text)
+
+            previous = entry.version
+            if not patch:
+                return previous, previous, patch
+
+            now = time.monotonic()
+            entry.text = new_text
+            entry.version = next(_version_counter)
+            entry.last_edit = now
+            if entry.dirty_since is None:
+                entry.dirty_since = now
+            return previous, entry.version, patch
+
+    def discard(self, task_id: str) -> None:
+        """Forget a task (after it is deleted or its notes are written elsewhere)"""
+        with self._lock:
+            self._entries.pop(task_id, None)
+
+    def unsaved(self) -> Dict[str, str]:
+        """Current text of every task with edits not yet written to the database"""
+        with self._lock:
+            return {task_id: entry.text for task_id, entry in self._entries.items() if entry.dirty_since is not None}
+
+    def flush_due(self, force: bool = False) -> int:
+        """
+        Save entries whose flush is due and evict stale clean ones
+
+        Args:
+            force: Save every dirty entry regardless of timing (shutdown)
+
+        Returns:
+            Number of tasks saved
+        """
+        now = time.monotonic()
+        to_save = []
+        with self._lock:
+            for task_id, entry in list(self._entries.items()):
+                if entry.dirty_since is not None:
+                    if force or now - entry.last_edit >= self.idle or now - entry.dirty_since >= self.max_delay:
+                        to_save.append((task_id, entry.text, entry.version))
+                elif now - entry.last_used >= self.evict_after:
+                    del self._entries[task_id]
+
+        saved = 0
+        for task_id, text, version in to_save:
+            try:
+                self._saver(task_id, text)
+            except Exception as e:
+                logger.error(f"Error flushing notes for task {task_id}: {e}")
+                continue
+            saved += 1
+            with self._lock:
+                entry = self._entries.get(task_id)
+                # Only mark clean if nothing was typed while saving
+                if entry is not None and entry.version == version:
+                    entry.dirty_since = None
+        return saved
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,308 @@
+"""
+Diagnostics
+Stack sampling profiler, tracemalloc snapshots and in-process store sizes for inspecting a live worker
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MAX_PROFILE_SECONDS = 60
+DEFAULT_INTERVAL = 0.005
+MAX_STACK_DEPTH = 128
+MAX_SNAPSHOTS = 5
+STAT_KEYS = ('lineno', 'filename', 'traceback')  # tracemalloc groupings accepted by top() and compare()
+# Objects visited per store when estimating its size, so one huge store cannot stall the worker
+SIZE_WALK_LIMIT = 200000
+
+_IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>',
+                  '<unknown>')
+
+
+class DiagnosticsBusy(Exception):
+    """Raised when a profile is requested while another one is running in this process"""
+
+
+def _native_thread_tools() -> Tuple[Callable, Callable, Callable]:
+    """
+    start_new_thread, get_ident and sleep that are real OS primitives even under gevent
+
+    A monkey-patched sampler would be a greenlet: it would only run when the
+    busy code yields, which is exactly when there is nothing to see.
+    """
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            return (monkey.get_original('_thread', 'start_new_thread'), monkey.get_original('_thread', 'get_ident'),
+                    monkey.get_original('time', 'sleep'))
+    except ImportError:
+        pass
+    import _thread
+    return _thread.start_new_thread, _thread.get_ident, time.sleep
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler over every thread of the process
+
+    A native thread reads sys._current_frames() every interval seconds and
+    counts each stack in collapsed form ("thread;outer (file:line);inner ..."),
+    the input format of flamegraph.pl and speedscope. Idle threads are
+    included, so waits on I/O and locks show up as well as CPU time. Under
+    gevent every greenlet shares the main thread, which shows whichever
+    greenlet is running at each sample.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = max(0.001, interval)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[datetime] = None
+        self.elapsed = 0.0
+        self._finished = False
+
+    def run(self, seconds: float) -> 'StackSampler':
+        """Sample for seconds (capped at MAX_PROFILE_SECONDS) and return self once done"""
+        seconds = max(0.1, min(seconds, MAX_PROFILE_SECONDS))
+        if not StackSampler._lock.acquire(blocking=False):
+            raise DiagnosticsBusy('A profile is already running in this worker')
+        try:
+            start_new_thread, _, _ = _native_thread_tools()
+            self.started_at = datetime.utcnow()
+            start_new_thread(self._sample, (seconds,))
+            # Plain time.sleep here, so a gevent worker keeps serving while we wait
+            while not self._finished:
+                time.sleep(0.05)
+        finally:
+            StackSampler._lock.release()
+        return self
+
+    def _sample(self, seconds: float) -> None:
+        _, get_ident, native_sleep = _native_thread_tools()
+        own_id = get_ident()
+        names = {}
+        began = time.perf_counter()
+        deadline = began + seconds
+        try:
+            while time.perf_counter() < deadline:
+                if len(names) != threading.active_count():
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    labels = []
+                    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                        labels.append(_frame_label(frame))
+                        frame = frame.f_back
+                    labels.append(names.get(thread_id, f'thread-{thread_id}'))
+                    self.stacks[';'.join(reversed(labels))] += 1
+                self.samples += 1
+                native_sleep(self.interval)
+        finally:
+            self.elapsed = time.perf_counter() - began
+            self._finished = True
+
+    def collapsed(self) -> str:
+        """One "stack count" line per distinct stack, most frequent first"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def summary(self, limit: int = 30) -> dict:
+        """Sample counts plus the functions most often on top of a stack (self) or anywhere in it (total)"""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')[1:]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        return {
+            'pid': os.getpid(),
+            'startedAt': self.started_at.isoformat() if self.started_at else None,
+            'seconds': round(self.elapsed, 3),
+            'intervalMs': self.interval * 1000,
+            'samples': self.samples,
+            'distinctStacks': len(self.stacks),
+            'topSelf': [{'frame': label, 'samples': count} for label, count in own.most_common(limit)],
+            'topTotal': [{'frame': label, 'samples': count} for label, count in total.most_common(limit)],
+        }
+
+
+class HeapSnapshots:
+    """
+    tracemalloc control plus a few named snapshots to diff by allocation site
+
+    Tracing costs memory and CPU on every allocation, so it is off until
+    start() is called and should be stopped once the leak is found.
+    """
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._snapshots: 'OrderedDict[str, Tuple[datetime, tracemalloc.Snapshot]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def start(self, frames: int = 10) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(1, min(frames, 50)))
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            snapshots = [{'id': snapshot_id, 'takenAt': taken_at.isoformat()}
+                         for snapshot_id, (taken_at, _) in self._snapshots.items()]
+        return {
+            'pid': os.getpid(),
+            'tracing': tracemalloc.is_tracing(),
+            'frames': tracemalloc.get_traceback_limit(),
+            'tracedMb': round(current / 1048576, 2),
+            'peakMb': round(peak / 1048576, 2),
+            'overheadMb': round(tracemalloc.get_tracemalloc_memory() / 1048576, 2),
+            'snapshots': snapshots,
+        }
+
+    def take(self) -> str:
+        """Snapshot current allocations; the oldest snapshot is dropped past max_snapshots"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError('tracemalloc is not tracing; start it first')
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES])
+        with self._lock:
+            self._counter += 1
+            snapshot_id = f's{self._counter}'
+            self._snapshots[snapshot_id] = (datetime.utcnow(), snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def _get(self, snapshot_id: str) -> tracemalloc.Snapshot:
+        with self._lock:
+            if snapshot_id not in self._snapshots:
+                raise KeyError(snapshot_id)
+            return self._snapshots[snapshot_id][1]
+
+    def top(self, snapshot_id: Optional[str] = None, key: str = 'lineno', limit: int = 30) -> List[dict]:
+        """Largest allocation sites in one snapshot (the latest by default)"""
+        with self._lock:
+            if snapshot_id is None and self._snapshots:
+                snapshot_id = next(reversed(self._snapshots))
+        snapshot = self._get(snapshot_id)
+        return [_stat_dict(stat, key) for stat in snapshot.statistics(key)[:limit]]
+
+    def compare(self, old_id: Optional[str] = None, new_id: Optional[str] = None,
+                key: str = 'lineno', limit: int = 30) -> List[dict]:
+        """
+        Allocation sites ordered by growth between two snapshots
+
+        Defaults to the two most recent snapshots. key is lineno, filename
+        or traceback (groups by the full allocation stack).
+        """
+        with self._lock:
+            ids = list(self._snapshots)
+        if old_id is None or new_id is None:
+            if len(ids) < 2:
+                raise RuntimeError('two snapshots are needed to compare')
+            old_id, new_id = old_id or ids[-2], new_id or ids[-1]
+        differences = self._get(new_id).compare_to(self._get(old_id), key)
+        return [_stat_dict(stat, key) for stat in differences[:limit]]
+
+
+def _stat_dict(stat, key: str) -> dict:
+    frames = stat.traceback.format() if key == 'traceback' else None
+    first = stat.traceback[0]
+    entry = {
+        'site': f'{first.filename}:{first.lineno}' if key != 'filename' else first.filename,
+        'sizeKb': round(stat.size / 1024, 1),
+        'count': stat.count,
+    }
+    if hasattr(stat, 'size_diff'):
+        entry['sizeDiffKb'] = round(stat.size_diff / 1024, 1)
+        entry['countDiff'] = stat.count_diff
+    if frames:
+        entry['traceback'] = frames
+    return entry
+
+
+_NOT_FOLLOWED = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+
+
+def deep_sizeof(obj: Any, limit: int = SIZE_WALK_LIMIT) -> Tuple[int, bool]:
+    """
+    Approximate bytes held by obj and everything it references
+
+    Walks containers and instance attributes, counting each object once.
+    Modules, classes and functions are not followed. Returns (bytes,
+    complete); complete is False when the walk stopped at limit objects.
+    """
+    seen = set()
+    pending = [obj]
+    size = 0
+    while pending:
+        if len(seen) >= limit:
+            return size, False
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _NOT_FOLLOWED):
+            continue
+        seen.add(id(current))
+        try:
+            size += sys.getsizeof(current)
+        except TypeError:
+            continue
+        try:
+            if isinstance(current, dict):
+                for item_key, value in list(current.items()):
+                    pending.append(item_key)
+                    pending.append(value)
+            elif isinstance(current, (list, tuple, set, frozenset)):
+                pending.extend(list(current))
+            elif hasattr(current, '__dict__'):
+                pending.append(vars(current))
+            elif hasattr(current, '__slots__'):
+                pending.extend(getattr(current, slot) for slot in current.__slots__ if hasattr(current, slot))
+        except RuntimeError:
+            continue  # Changed size while copying; the estimate misses that container's contents
+    return size, True
+
+
+def _entry_count(store: Any) -> Optional[int]:
+    if hasattr(store, '__len__'):
+        return len(store)
+    mappings = [value for value in vars(store).values() if isinstance(value, dict)] if hasattr(store, '__dict__') else []
+    return sum(len(mapping) for mapping in mappings) if mappings else None
+
+
+def store_sizes(stores: Dict[str, Any]) -> List[dict]:
+    """Entry count and approximate deep size of each named in-process store, largest first"""
+    result = []
+    for name, store in stores.items():
+        if store is None:
+            continue
+        size, complete = deep_sizeof(store)
+        result.append({
+            'name': name,
+            'type': type(store).__name__,
+            'entries': _entry_count(store),
+            'sizeKb': round(size / 1024, 1),
+            'complete': complete,
+        })
+    result.sort(key=lambda entry: entry['sizeKb'], reverse=True)
+    return result
@@ -0,0 +1,36 @@
+"""
+Gunicorn Configuration
+Opt-in gevent deployment: gunicorn -c gunicorn.conf.py wsgi:app
+
+Production runs the threaded server (python app.py). In the load tests in
+benchmarks/load_test.py one gevent worker served about the same requests/sec
+with a much worse p95, and held no more sockets (it stops at
+GUNICORN_CONNECTIONS), so switch only with a measurement that favours it.
+
+Environment:
+    PORT                    Port to bind (default 5000)
+    WEB_CONCURRENCY         Worker processes (default 1). Socket.IO polling needs sticky
+                            sessions, which gunicorn does not provide, so run more than one
+                            worker only with SOCKETIO_MESSAGE_QUEUE set and websocket-only clients
+    GUNICORN_WORKER_CLASS   Override the worker (e.g. eventlet)
+    GUNICORN_CONNECTIONS    Concurrent greenlets per worker (default 1000)
+    GUNICORN_TIMEOUT        Seconds before a silent worker is restarted (default 120)
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+# gevent-websocket's worker serves the websocket transport as well as plain HTTP
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'geventwebsocket.gunicorn.workers.GeventWebSocketWorker')
+worker_connections = int(os.environ.get('GUNICORN_CONNECTIONS', '1000'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+# Load the app in each worker after gevent has monkey-patched it, not in the master
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
@@ -0,0 +1,319 @@
+"""
+HTTP Response Cache Helpers
+Negotiated gzip/brotli compression, strong ETags and If-None-Match handling for large JSON responses
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, Optional
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Responses smaller than this are sent as-is; the headers would eat the saving
+DEFAULT_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+# Brotli 4-5 compresses better than gzip -6 at similar speed; 11 is for static assets
+BROTLI_QUALITY = 5
+
+# Tables written by INSERT/UPDATE/DELETE, whether issued by the ORM or raw text()
+WRITE_STATEMENT = re.compile(r'^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)"?', re.IGNORECASE)
+
+ENCODING_SUFFIXES = ('-br', '-gzip')
+
+
+def negotiate_encoding(accept_encodings) -> Optional[str]:
+    """
+    Pick a content coding from a parsed Accept-Encoding header
+
+    Args:
+        accept_encodings: werkzeug's request.accept_encodings
+
+    Returns:
+        'br', 'gzip' or None for identity
+    """
+    br = accept_encodings.quality('br') if BROTLI_AVAILABLE else 0
+    gz = accept_encodings.quality('gzip')
+    if br and br >= gz:
+        return 'br'
+    if gz:
+        return 'gzip'
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag (unquoted) derived from the response body"""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def _normalize_tag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an unquoted ETag
+
+    Encoding suffixes are ignored so a tag received with a gzip body still
+    matches when the client next asks for brotli (or identity).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(_normalize_tag(tag) == etag for tag in if_none_match.split(','))
+
+
+class TableChangeCounters:
+    """
+    Per-table write generations for the current process
+
+    Listens to every engine: tables touched by INSERT/UPDATE/DELETE are
+    collected per connection and their counters bumped when the connection
+    commits (rolled-back writes are dropped). A route's data version is then
+    the tuple of counters for the tables it reads, which is known before the
+    handler runs.
+
+    Counters only see writes made by this process, so they are only a valid
+    cache validator with a single worker.
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._installed = False
+
+    def install(self) -> None:
+        if self._installed:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.listen(Engine, 'before_cursor_execute', self._on_execute)
+        event.listen(Engine, 'commit', self._on_commit)
+        event.listen(Engine, 'rollback', self._on_rollback)
+        self._installed = True
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        match = WRITE_STATEMENT.match(statement)
+        if match:
+            conn.info.setdefault('written_tables', set()).add(match.group(1).lower())
+
+    def _on_commit(self, conn):
+        tables = conn.info.pop('written_tables', None)
+        if tables:
+            self.bump(tables)
+
+    def _on_rollback(self, conn):
+        conn.info.pop('written_tables', None)
+
+    def bump(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            for table in tables:
+                self._counters[table] += 1
+
+    def version(self, tables: Iterable[str]) -> tuple:
+        with self._lock:
+            return tuple(self._counters[table] for table in tables)
+
+
+class RouteStats:
+    """Per-route response and byte counters"""
+
+    __slots__ = ('responses', 'compressed', 'not_modified', 'bytes_in', 'bytes_out', 'bytes_saved')
+
+    def __init__(self):
+        self.responses = 0
+        self.compressed = 0
+        self.not_modified = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.bytes_saved = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'responses': self.responses,
+            'compressed': self.compressed,
+            'notModified': self.not_modified,
+            'bytesIn': self.bytes_in,
+            'bytesOut': self.bytes_out,
+            'bytesSaved': self.bytes_saved,
+        }
+
+
+class ResponseOptimizer:
+    """
+    Flask middleware that compresses JSON responses and answers conditional GETs
+
+    Every JSON response of at least min_size bytes is compressed with the
+    best coding the client accepts. GET responses from the configured routes
+    also get a strong ETag, and a matching If-None-Match is answered with 304.
+
+    Routes mapped to a list of tables use those tables' change counters: the
+    ETag is known before the view runs, so a 304 skips the query and the
+    serialization entirely. Routes mapped to None (or any route when table
+    ETags are disabled) fall back to hashing the rendered body, which saves
+    bandwidth but not server work.
+    """
+
+    def __init__(self, routes: Dict[str, Optional[list]], min_size: int = DEFAULT_MIN_SIZE,
+                 table_etags: bool = True, max_tracked_etags: int = 1024):
+        """
+        Args:
+            routes: URL rule -> tables the response is built from (None to hash the body)
+            min_size: Smallest body, in bytes, worth compressing
+            table_etags: Use change counters for routes that list tables
+            max_tracked_etags: Body sizes remembered to report bytes saved by counter 304s
+        """
+        self.routes = routes
+        self.min_size = min_size
+        self.table_etags = table_etags
+        self.counters = TableChangeCounters()
+        self._stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+        self._sizes: 'OrderedDict[str, int]' = OrderedDict()
+        self._max_tracked = max_tracked_etags
+        self._lock = threading.Lock()
+        # Distinguishes counter tags from an earlier run whose counters started at zero too
+        self._boot = os.urandom(4).hex()
+
+    def init_app(self, app) -> None:
+        if self.table_etags:
+            self.counters.install()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _tables_for(self, rule: Optional[str]) -> Optional[list]:
+        if not self.table_etags or rule is None:
+            return None
+        return self.routes.get(rule)
+
+    def _table_etag(self, request, tables: list, version: tuple) -> str:
+        # Responses differ per caller and per query string, so both go into the tag
+        key = '|'.join([
+            self._boot, request.full_path,
+            request.headers.get('Authorization', ''), request.headers.get('Cookie', ''),
+            ','.join(tables), ','.join(str(v) for v in version),
+        ])
+        return 't' + hashlib.sha256(key.encode()).hexdigest()[:31]
+
+    def _before_request(self):
+        from flask import request, g
+
+        if request.method != 'GET' or request.url_rule is None:
+            return None
+        tables = self._tables_for(request.url_rule.rule)
+        if not tables:
+            return None
+
+        version = self.counters.version(tables)
+        etag = self._table_etag(request, tables, version)
+        g.http_cache_version = (tables, version, etag)
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return self._not_modified(request.url_rule.rule, etag, self._sizes.get(etag, 0))
+        return None
+
+    def _not_modified(self, rule: str, etag: str, saved: int):
+        from flask import Response
+
+        response = Response(status=304)
+        response.headers['ETag'] = f'"{etag}"'
+        response.headers['Vary'] = 'Accept-Encoding, Authorization, Cookie'
+        response.http_cache_done = True
+        with self._lock:
+            stats = self._stats[rule]
+            stats.responses += 1
+            stats.not_modified += 1
+            stats.bytes_saved += saved
+        return response
+
+    def _remember_size(self, etag: str, size: int) -> None:
+        with self._lock:
+            self._sizes[etag] = size
+            self._sizes.move_to_end(etag)
+            while len(self._sizes) > self._max_tracked:
+                self._sizes.popitem(last=False)
+
+    def _after_request(self, response):
+        from flask import request, g
+
+        if getattr(response, 'http_cache_done', False):
+            return response
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+            return response
+
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        cached_route = request.method == 'GET' and rule in self.routes
+        body = response.get_data()
+        encoding = negotiate_encoding(request.accept_encodings) if len(body) >= self.min_size else None
+        if not cached_route and encoding is None:
+            return response
+
+        etag = None
+        if cached_route and 'ETag' not in response.headers:
+            pending = getattr(g, 'http_cache_version', None)
+            # Only trust the counter tag if nothing was committed while the view ran
+            if pending is not None and self.counters.version(pending[0]) == pending[1]:
+                etag = pending[2]
+            else:
+                etag = content_etag(body)
+            self._remember_size(etag, len(body))
+            if etag_matches(request.headers.get('If-None-Match'), etag):
+                return self._not_modified(rule, etag, len(body))
+
+        sent = body
+        if encoding is not None:
+            sent = compress(body, encoding)
+            if len(sent) < len(body):
+                response.set_data(sent)
+                response.headers['Content-Encoding'] = encoding
+            else:
+                sent = body
+                encoding = None
+        response.vary.add('Accept-Encoding')
+
+        if etag is not None:
+            suffix = f'-{encoding}' if encoding else ''
+            response.headers['ETag'] = f'"{etag}{suffix}"'
+            response.vary.update(('Authorization', 'Cookie'))
+
+        if rule is not None:
+            with self._lock:
+                stats = self._stats[rule]
+                stats.responses += 1
+                stats.bytes_in += len(body)
+                stats.bytes_out += len(sent)
+                stats.bytes_saved += len(body) - len(sent)
+                if encoding is not None:
+                    stats.compressed += 1
+        return response
+
+    def stats(self) -> dict:
+        """Counters per URL rule, busiest savings first"""
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1].bytes_saved, reverse=True)
+            return {rule: stats.to_dict() for rule, stats in items}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
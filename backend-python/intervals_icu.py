@@ -4,8 +4,16 @@ Handles communication with Intervals.icu API for fetching wellness and activity
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -59,13 +67,14 @@ class IntervalsICUClient:
             logger.error(f"Failed to get athlete info: {e}")
             return None
     
-    def get_activities(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+    def get_activities(self, start_date: datetime, end_date: datetime, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Fetch activities with RPE and Feel data
         
         Args:
             start_date: Start date for activities
             end_date: End date for activities
+            raise_errors: Raise a failed request instead of logging it and returning []
             
         Returns:
             List of activity dictionaries
@@ -114,16 +123,19 @@ class IntervalsICUClient:
             
             return result
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Failed to get activities: {e}")
             return []
     
-    def get_wellness_data(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+    def get_wellness_data(self, start_date: datetime, end_date: datetime, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Fetch wellness metrics (HRV, weight, sleep, etc.)
         
         Args:
             start_date: Start date for wellness data
             end_date: End date for wellness data
+            raise_errors: Raise a failed request instead of logging it and returning []
             
         Returns:
             List of wellness metric dictionaries
@@ -164,9 +176,35 @@ class IntervalsICUClient:
             
             return result
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Failed to get wellness data: {e}")
             return []
     
+    def get_activities_and_wellness(self, start_date: datetime, end_date: datetime) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Fetch activities and wellness metrics for the same window concurrently
+        
+        The two endpoints are independent, so issuing them in parallel roughly
+        halves the upstream wait of a sync. A failed request is raised, not
+        returned as an empty list, so a caller never mistakes an outage for
+        "no new data".
+        
+        Args:
+            start_date: Start date for both requests
+            end_date: End date for both requests
+            
+        Returns:
+            Tuple of (activities, wellness_data)
+            
+        Raises:
+            requests.RequestException: Either request failed
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            activities_future = executor.submit(self.get_activities, start_date, end_date, True)
+            wellness_future = executor.submit(self.get_wellness_data, start_date, end_date, True)
+            return activities_future.result(), wellness_future.result()
+    
     def get_activity_streams(self, activity_id: str) -> Dict[str, Any]:
         """
         Fetch detailed activity streams (power, HR, cadence, etc.)
@@ -198,6 +236,145 @@ class IntervalsICUClient:
             return {}
 
 
+class ProxyResponse:
+    """Upstream response as held by IntervalsProxyCache"""
+    
+    def __init__(self, status_code: int, content: bytes, etag: str, upstream_etag: Optional[str] = None):
+        self.status_code = status_code
+        self.content = content
+        self.etag = etag  # Quoted ETag served to the browser
+        self.upstream_etag = upstream_etag  # ETag from intervals.icu, used for revalidation
+        try:
+            json.loads(content)
+            self.is_json = True
+        except ValueError:
+            self.is_json = False
+    
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+    
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class _InFlight:
+    """An upstream request other callers for the same key can wait on"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.response: Optional[ProxyResponse] = None
+        self.error: Optional[Exception] = None
+
+
+class IntervalsProxyCache:
+    """
+    Short-TTL response cache for the browser-facing Intervals.icu proxy
+    
+    Entries are keyed by a SHA-256 of the caller's API key plus the upstream
+    path and params, so keys never sit in memory in plain text and one user
+    can never read another's cached data. Concurrent identical requests are
+    coalesced into a single upstream call, stale entries are revalidated with
+    If-None-Match when intervals.icu supplied an ETag, and every request goes
+    through one pooled session.
+    """
+    
+    def __init__(self, ttl_seconds: int = 30, max_entries: int = 512, pool_size: int = 20, timeout=(5, 30)):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.timeout = timeout
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        
+        self._entries: 'OrderedDict[str, Tuple[float, ProxyResponse]]' = OrderedDict()
+        self._inflight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _cache_key(api_key: str, path: str, params: Optional[Dict[str, Any]]) -> str:
+        key_hash = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+        query = '&'.join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        return f"{key_hash}:{path}?{query}"
+    
+    def get(self, api_key: str, path: str, params: Optional[Dict[str, Any]] = None) -> Tuple[ProxyResponse, str]:
+        """
+        Fetch an Intervals.icu API path, serving from cache when fresh
+        
+        Args:
+            api_key: Caller's Intervals.icu API key
+            path: Path below BASE_URL, e.g. "/athlete/0/wellness"
+            params: Query parameters
+            
+        Returns:
+            Tuple of (response, cache status: HIT, MISS, REVALIDATED or COALESCED)
+        """
+        key = self._cache_key(api_key, path, params)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                return entry[1], 'HIT'
+            
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+            if leader:
+                inflight = _InFlight()
+                self._inflight[key] = inflight
+        
+        if not leader:
+            inflight.event.wait(self.timeout[0] + self.timeout[1])
+            if inflight.response is not None:
+                return inflight.response, 'COALESCED'
+            raise inflight.error or requests.RequestException('Coalesced upstream request did not complete')
+        
+        try:
+            stale = entry[1] if entry else None
+            response, status = self._fetch(api_key, path, params, stale)
+            inflight.response = response
+            if 200 <= response.status_code < 300:
+                with self._lock:
+                    self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return response, status
+        except Exception as e:
+            inflight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.event.set()
+    
+    def _fetch(self, api_key: str, path: str, params: Optional[Dict[str, Any]], stale: Optional[ProxyResponse]) -> Tuple[ProxyResponse, str]:
+        auth_string = f"API_KEY:{api_key}"
+        headers = {'Authorization': f"Basic {base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')}"}
+        if stale and stale.upstream_etag:
+            headers['If-None-Match'] = stale.upstream_etag
+        
+        upstream = self.session.get(
+            f"{IntervalsICUClient.BASE_URL}{path}",
+            headers=headers,
+            params=params,
+            timeout=self.timeout
+        )
+        
+        if upstream.status_code == 304 and stale:
+            return stale, 'REVALIDATED'
+        
+        upstream_etag = upstream.headers.get('ETag')
+        etag = upstream_etag or f'"{hashlib.sha1(upstream.content).hexdigest()}"'
+        return ProxyResponse(upstream.status_code, upstream.content, etag, upstream_etag), 'MISS'
+    
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+
+
 def decrypt_api_key(encrypted_key: str) -> str:
     """
     Decrypt an encrypted API key
@@ -0,0 +1,166 @@
+"""
+Fast JSON Encoding
+orjson-backed Flask JSON provider (stdlib fallback) and precompiled row serializers for hot list endpoints
+"""
+
+import dataclasses
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Iterable, List, Sequence, Tuple, Union
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """Types neither encoder handles natively (orjson covers datetime and UUID itself)"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    if hasattr(obj, 'tolist'):  # numpy arrays and scalars
+        return obj.tolist()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+if ORJSON_AVAILABLE:
+    _BASE_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """
+    Encode obj as UTF-8 JSON
+
+    datetime/date come out as ISO 8601 (matching .isoformat()), Decimal as a
+    number and UUID as a string, so callers can pass column values through
+    untouched.
+    """
+    if ORJSON_AVAILABLE:
+        option = _BASE_OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits, which the stdlib encoder handles
+    return json.dumps(
+        obj, default=_default, sort_keys=sort_keys, ensure_ascii=False,
+        indent=2 if indent else None, separators=None if indent else (',', ':')
+    ).encode('utf-8')
+
+
+def dumps(obj: Any) -> str:
+    return dumps_bytes(obj).decode('utf-8')
+
+
+def loads(data: Union[str, bytes, None]) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def loads_list(data: Union[str, bytes, None]) -> list:
+    """Decode a JSON-array text column, treating NULL/empty as []"""
+    return loads(data) if data else []
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider using orjson when installed
+
+    Honors sort_keys and compact like the default provider. Calls that pass
+    stdlib-specific keyword arguments (cls=, indent=, ...) go to the stdlib
+    encoder with the same type handling.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if not kwargs:
+            return dumps_bytes(obj, sort_keys=self.sort_keys).decode('utf-8')
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if not kwargs:
+            return loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class SocketJSON:
+    """json module stand-in for Flask-SocketIO, so emitted payloads get the same type handling"""
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        return dumps(obj)
+
+    @staticmethod
+    def loads(s: Union[str, bytes], **kwargs: Any) -> Any:
+        return loads(s)
+
+
+Field = Tuple[str, Union[str, Callable[[Any], Any]]]
+
+
+class RowSerializer:
+    """
+    Turns result rows (tuples of column values) into response dicts
+
+    Built once per column layout: the field mapping is compiled into a single
+    dict-literal function, so serializing a row is one call with positional
+    lookups - no ORM instance, attribute inspection or per-field formatting.
+    Values such as datetimes are left for the JSON provider to encode.
+    """
+
+    def __init__(self, columns: Sequence[str], fields: Sequence[Field]):
+        """
+        Args:
+            columns: Names of the selected columns, in select order
+            fields: (output key, source) pairs; source is a column name, or a
+                callable taking the row for derived values
+        """
+        self.columns = tuple(columns)
+        positions = {name: index for index, name in enumerate(self.columns)}
+        namespace = {}
+        parts = []
+        for position, (key, source) in enumerate(fields):
+            if callable(source):
+                name = f'_f{position}'
+                namespace[name] = source
+                parts.append(f'{key!r}: {name}(row)')
+            else:
+                if source not in positions:
+                    raise ValueError(f'Field {key!r} reads unselected column {source!r}')
+                parts.append(f'{key!r}: row[{positions[source]}]')
+        code = f"def serialize(row):\n    return {{{', '.join(parts)}}}\n"
+        exec(compile(code, f'<RowSerializer {",".join(self.columns)}>', 'exec'), namespace)
+        self._serialize = namespace['serialize']
+
+    def __call__(self, row: Sequence[Any]) -> dict:
+        return self._serialize(row)
+
+    def many(self, rows: Iterable[Sequence[Any]]) -> List[dict]:
+        serialize = self._serialize
+        return [serialize(row) for row in rows]
@@ -0,0 +1,91 @@
+"""Add Intervals.icu sync watermark table and upsert unique constraints
+
+Revision ID: 46_add_intervals_sync_state
+Revises: 45_add_polymorphic_tasks
+Create Date: 2025-12-13 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '46_add_intervals_sync_state'
+down_revision = '45_add_polymorphic_tasks'
+branch_labels = None
+depends_on = None
+
+
+# (table, constraint name, columns) backing the ON CONFLICT upserts in sync_intervals_data
+UPSERT_CONSTRAINTS = [
+    ('intervals_activity_data', 'unique_user_activity', ['user_id', 'activity_id']),
+    ('intervals_wellness_metrics', 'unique_user_metric_date', ['user_id', 'metric_date']),
+    ('intervals_menstrual_data', 'unique_user_cycle_date', ['user_id', 'cycle_date']),
+]
+
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def unique_constraint_exists(table_name, columns):
+    """Check if a unique constraint or unique index covers exactly these columns"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    for constraint in inspector.get_unique_constraints(table_name):
+        if sorted(constraint['column_names']) == sorted(columns):
+            return True
+    for index in inspector.get_indexes(table_name):
+        if index.get('unique') and sorted(index['column_names']) == sorted(columns):
+            return True
+    return False
+
+
+def upgrade():
+    """Create intervals_sync_state and make sure the upsert conflict targets are unique"""
+    if not table_exists('intervals_sync_state'):
+        print("Creating 'intervals_sync_state' table...")
+        op.create_table(
+            'intervals_sync_state',
+            sa.Column('user_id', sa.String(36), sa.ForeignKey('user_profiles.id'), primary_key=True),
+            sa.Column('last_synced_date', sa.Date, nullable=True),
+            sa.Column('last_synced_at', sa.DateTime, nullable=True)
+        )
+        print("✓ Created 'intervals_sync_state' table")
+    else:
+        print("Table 'intervals_sync_state' already exists, skipping creation")
+
+    for table_name, constraint_name, columns in UPSERT_CONSTRAINTS:
+        if not table_exists(table_name):
+            print(f"Table '{table_name}' does not exist, skipping constraint")
+            continue
+        if unique_constraint_exists(table_name, columns):
+            print(f"Unique constraint on {table_name}({', '.join(columns)}) already exists")
+            continue
+
+        # Remove duplicates left by the old query-then-insert sync, keeping the newest row
+        key_match = ' AND '.join(f"newer.{col} = older.{col}" for col in columns)
+        print(f"Removing duplicate rows from {table_name}...")
+        op.execute(f"""
+            DELETE FROM {table_name} AS older
+            WHERE EXISTS (
+                SELECT 1 FROM {table_name} AS newer
+                WHERE {key_match}
+                AND (newer.synced_at > older.synced_at
+                     OR (newer.synced_at = older.synced_at AND newer.id > older.id))
+            )
+        """)
+
+        print(f"Adding unique constraint '{constraint_name}' to {table_name}...")
+        op.create_unique_constraint(constraint_name, table_name, columns)
+        print(f"✓ Added unique constraint '{constraint_name}'")
+
+
+def downgrade():
+    """Drop intervals_sync_state (the unique constraints predate this revision and are kept)"""
+    if table_exists('intervals_sync_state'):
+        op.drop_table('intervals_sync_state')
@@ -0,0 +1,52 @@
+"""Add compact Intervals.icu activity stream storage
+
+Revision ID: 47_add_activity_streams
+Revises: 46_add_intervals_sync_state
+Create Date: 2025-12-13 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '47_add_activity_streams'
+down_revision = '46_add_intervals_sync_state'
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    """Create intervals_activity_streams table"""
+    if not table_exists('intervals_activity_streams'):
+        print("Creating 'intervals_activity_streams' table...")
+        op.create_table(
+            'intervals_activity_streams',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('user_id', sa.String(36), sa.ForeignKey('user_profiles.id'), nullable=False),
+            sa.Column('activity_id', sa.String(100), nullable=False),
+            sa.Column('channels', sa.String(200)),
+            sa.Column('point_count', sa.Integer),
+            sa.Column('data', sa.LargeBinary, nullable=False),  # Delta-encoded, zlib-compressed columns
+            sa.Column('raw_size', sa.Integer),
+            sa.Column('derived_metrics', sa.JSON),
+            sa.Column('created_at', sa.DateTime, default=sa.func.now()),
+            sa.UniqueConstraint('user_id', 'activity_id', name='unique_user_activity_stream')
+        )
+        print("✓ Created 'intervals_activity_streams' table")
+    else:
+        print("Table 'intervals_activity_streams' already exists, skipping creation")
+
+
+def downgrade():
+    """Drop intervals_activity_streams table"""
+    if table_exists('intervals_activity_streams'):
+        op.drop_table('intervals_activity_streams')
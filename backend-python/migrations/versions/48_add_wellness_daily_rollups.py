@@ -0,0 +1,63 @@
+"""Add precomputed wellness trend rollups
+
+Revision ID: 48_add_wellness_rollups
+Revises: 47_add_activity_streams
+Create Date: 2025-12-13 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '48_add_wellness_rollups'
+down_revision = '47_add_activity_streams'
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    """Create wellness_daily_rollups table (filled after each Intervals.icu sync)"""
+    if not table_exists('wellness_daily_rollups'):
+        print("Creating 'wellness_daily_rollups' table...")
+        op.create_table(
+            'wellness_daily_rollups',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('user_id', sa.String(36), sa.ForeignKey('user_profiles.id'), nullable=False),
+            sa.Column('day', sa.Date, nullable=False),
+            sa.Column('hrv', sa.Float),
+            sa.Column('hrv_7d', sa.Float),
+            sa.Column('hrv_baseline', sa.Float),
+            sa.Column('hrv_z', sa.Float),
+            sa.Column('resting_hr', sa.Float),
+            sa.Column('resting_hr_7d', sa.Float),
+            sa.Column('resting_hr_baseline', sa.Float),
+            sa.Column('resting_hr_z', sa.Float),
+            sa.Column('sleep_hours', sa.Float),
+            sa.Column('sleep_hours_7d', sa.Float),
+            sa.Column('sleep_hours_baseline', sa.Float),
+            sa.Column('sleep_hours_z', sa.Float),
+            sa.Column('load', sa.Float),
+            sa.Column('atl', sa.Float),
+            sa.Column('ctl', sa.Float),
+            sa.Column('tsb', sa.Float),
+            sa.Column('updated_at', sa.DateTime, default=sa.func.now()),
+            sa.UniqueConstraint('user_id', 'day', name='unique_user_rollup_day')
+        )
+        print("✓ Created 'wellness_daily_rollups' table")
+    else:
+        print("Table 'wellness_daily_rollups' already exists, skipping creation")
+
+
+def downgrade():
+    """Drop wellness_daily_rollups table"""
+    if table_exists('wellness_daily_rollups'):
+        op.drop_table('wellness_daily_rollups')
@@ -0,0 +1,127 @@
+"""Add persistent learning hub content tables
+
+Revision ID: 49_add_learning_content
+Revises: 48_add_wellness_rollups
+Create Date: 2025-12-13 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '49_add_learning_content'
+down_revision = '48_add_wellness_rollups'
+branch_labels = None
+depends_on = None
+
+
+# table -> columns included in the full-text search document (must match LearningContentStore._search_filter)
+SEARCH_COLUMNS = {
+    'learning_courses': ('title', 'description', 'instructor'),
+    'learning_pdfs': ('title', 'description'),
+    'learning_videos': ('title', 'description', 'instructor'),
+}
+
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def timestamp_columns():
+    return [
+        sa.Column('created_at', sa.DateTime, default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime, default=sa.func.now(), onupdate=sa.func.now()),
+    ]
+
+
+def upgrade():
+    """Create learning_courses, learning_pdfs and learning_videos with filter and search indexes"""
+    if not table_exists('learning_courses'):
+        print("Creating 'learning_courses' table...")
+        op.create_table(
+            'learning_courses',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('title', sa.String(255), nullable=False),
+            sa.Column('description', sa.Text),
+            sa.Column('instructor', sa.String(200)),
+            sa.Column('duration', sa.String(50)),
+            sa.Column('level', sa.String(50)),
+            sa.Column('lessons', sa.Integer),
+            sa.Column('thumbnail', sa.Text),
+            sa.Column('category', sa.String(100)),
+            sa.Column('video_url', sa.Text),
+            sa.Column('pdf_resources', sa.JSON),
+            *timestamp_columns()
+        )
+        op.create_index('ix_learning_courses_category', 'learning_courses', ['category'])
+        op.create_index('ix_learning_courses_level', 'learning_courses', ['level'])
+        op.create_index('ix_learning_courses_created_at', 'learning_courses', ['created_at'])
+        print("✓ Created 'learning_courses' table")
+    else:
+        print("Table 'learning_courses' already exists, skipping creation")
+
+    if not table_exists('learning_pdfs'):
+        print("Creating 'learning_pdfs' table...")
+        op.create_table(
+            'learning_pdfs',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('title', sa.String(255), nullable=False),
+            sa.Column('description', sa.Text),
+            sa.Column('category', sa.String(100)),
+            sa.Column('url', sa.Text),
+            sa.Column('file_size', sa.String(50)),
+            sa.Column('pages', sa.Integer),
+            sa.Column('thumbnail', sa.Text),
+            sa.Column('upload_date', sa.String(50)),
+            *timestamp_columns()
+        )
+        op.create_index('ix_learning_pdfs_category', 'learning_pdfs', ['category'])
+        op.create_index('ix_learning_pdfs_created_at', 'learning_pdfs', ['created_at'])
+        print("✓ Created 'learning_pdfs' table")
+    else:
+        print("Table 'learning_pdfs' already exists, skipping creation")
+
+    if not table_exists('learning_videos'):
+        print("Creating 'learning_videos' table...")
+        op.create_table(
+            'learning_videos',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('title', sa.String(255), nullable=False),
+            sa.Column('description', sa.Text),
+            sa.Column('instructor', sa.String(200)),
+            sa.Column('duration', sa.String(50)),
+            sa.Column('level', sa.String(50)),
+            sa.Column('category', sa.String(100)),
+            sa.Column('video_url', sa.Text),
+            sa.Column('thumbnail', sa.Text),
+            sa.Column('upload_date', sa.String(50)),
+            *timestamp_columns()
+        )
+        op.create_index('ix_learning_videos_category', 'learning_videos', ['category'])
+        op.create_index('ix_learning_videos_level', 'learning_videos', ['level'])
+        op.create_index('ix_learning_videos_created_at', 'learning_videos', ['created_at'])
+        print("✓ Created 'learning_videos' table")
+    else:
+        print("Table 'learning_videos' already exists, skipping creation")
+
+    # Full-text search indexes (PostgreSQL only; other databases fall back to substring search)
+    if op.get_bind().dialect.name == 'postgresql':
+        for table_name, columns in SEARCH_COLUMNS.items():
+            document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search ON {table_name} "
+                f"USING GIN (to_tsvector('english', {document}))"
+            )
+            print(f"✓ Created full-text search index on {table_name}")
+
+
+def downgrade():
+    """Drop learning content tables"""
+    for table_name in ('learning_videos', 'learning_pdfs', 'learning_courses'):
+        if table_exists(table_name):
+            op.drop_table(table_name)
@@ -0,0 +1,61 @@
+"""Add pg_trgm and full-text search indexes for clients and support requests
+
+Revision ID: 50_add_search_indexes
+Revises: 49_add_learning_content
+Create Date: 2025-12-14 09:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '50_add_search_indexes'
+down_revision = '49_add_learning_content'
+branch_labels = None
+depends_on = None
+
+
+# Document expressions must match CLIENT_SEARCH_DOCUMENT / SUPPORT_REQUEST_SEARCH_DOCUMENT in app.py
+CLIENT_DOCUMENT = "(coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(company, ''))"
+SUPPORT_REQUEST_DOCUMENT = "(coalesce(subject, '') || ' ' || coalesce(description, ''))"
+
+# (index name, table, USING clause)
+SEARCH_INDEXES = [
+    ('ix_clients_search_trgm', 'clients', f"gin ({CLIENT_DOCUMENT} gin_trgm_ops)"),
+    ('ix_clients_search_tsv', 'clients', f"gin (to_tsvector('simple', {CLIENT_DOCUMENT}))"),
+    ('ix_support_requests_search_trgm', 'support_requests', f"gin ({SUPPORT_REQUEST_DOCUMENT} gin_trgm_ops)"),
+    ('ix_support_requests_search_tsv', 'support_requests', f"gin (to_tsvector('simple', {SUPPORT_REQUEST_DOCUMENT}))"),
+]
+
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    """Enable pg_trgm and create trigram + tsvector GIN indexes (PostgreSQL only)"""
+    if op.get_bind().dialect.name != 'postgresql':
+        print("Not PostgreSQL, skipping search indexes (the app uses an in-memory index instead)")
+        return
+
+    print("Enabling pg_trgm extension...")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for index_name, table_name, using in SEARCH_INDEXES:
+        if not table_exists(table_name):
+            print(f"Table '{table_name}' does not exist, skipping index '{index_name}'")
+            continue
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} USING {using}")
+        print(f"✓ Created index '{index_name}'")
+
+
+def downgrade():
+    """Drop the search indexes (pg_trgm is left installed)"""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for index_name, _, _ in SEARCH_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
@@ -0,0 +1,48 @@
+"""Add (created_at, id) index on clients for keyset pagination
+
+Revision ID: 51_add_clients_keyset_index
+Revises: 50_add_search_indexes
+Create Date: 2025-12-14 11:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '51_add_clients_keyset_index'
+down_revision = '50_add_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def index_exists(table_name, index_name):
+    """Check if an index exists on a table"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return any(index['name'] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    """Create ix_clients_created_at_id"""
+    if not table_exists('clients'):
+        print("Table 'clients' does not exist, skipping index")
+        return
+    if index_exists('clients', 'ix_clients_created_at_id'):
+        print("Index 'ix_clients_created_at_id' already exists, skipping creation")
+        return
+    op.create_index('ix_clients_created_at_id', 'clients', ['created_at', 'id'])
+    print("✓ Created index 'ix_clients_created_at_id'")
+
+
+def downgrade():
+    """Drop ix_clients_created_at_id"""
+    if table_exists('clients') and index_exists('clients', 'ix_clients_created_at_id'):
+        op.drop_index('ix_clients_created_at_id', table_name='clients')
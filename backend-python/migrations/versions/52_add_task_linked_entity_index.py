@@ -0,0 +1,48 @@
+"""Add (linked_entity_type, linked_entity_id, created_at) index on task
+
+Revision ID: 52_add_task_linked_entity_idx
+Revises: 51_add_clients_keyset_index
+Create Date: 2025-12-14 13:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '52_add_task_linked_entity_idx'
+down_revision = '51_add_clients_keyset_index'
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def index_exists(table_name, index_name):
+    """Check if an index exists on a table"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return any(index['name'] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    """Create ix_task_linked_entity_created"""
+    if not table_exists('task'):
+        print("Table 'task' does not exist, skipping index")
+        return
+    if index_exists('task', 'ix_task_linked_entity_created'):
+        print("Index 'ix_task_linked_entity_created' already exists, skipping creation")
+        return
+    op.create_index('ix_task_linked_entity_created', 'task', ['linked_entity_type', 'linked_entity_id', 'created_at'])
+    print("✓ Created index 'ix_task_linked_entity_created'")
+
+
+def downgrade():
+    """Drop ix_task_linked_entity_created"""
+    if table_exists('task') and index_exists('task', 'ix_task_linked_entity_created'):
+        op.drop_index('ix_task_linked_entity_created', table_name='task')
@@ -0,0 +1,48 @@
+"""Add deletion_log table for delta sync tombstones
+
+Revision ID: 53_add_deletion_log
+Revises: 52_add_task_linked_entity_idx
+Create Date: 2025-12-14 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '53_add_deletion_log'
+down_revision = '52_add_task_linked_entity_idx'
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    """Create deletion_log table"""
+    if not table_exists('deletion_log'):
+        print("Creating 'deletion_log' table...")
+        op.create_table(
+            'deletion_log',
+            sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column('entity_type', sa.String(50), nullable=False),
+            sa.Column('entity_id', sa.String(100), nullable=False),
+            sa.Column('deleted_at', sa.DateTime, nullable=False, server_default=sa.func.now())
+        )
+        op.create_index('ix_deletion_log_entity_seq', 'deletion_log', ['entity_type', 'id'])
+        op.create_index('ix_deletion_log_deleted_at', 'deletion_log', ['deleted_at'])
+        print("✓ Created 'deletion_log' table")
+    else:
+        print("Table 'deletion_log' already exists, skipping creation")
+
+
+def downgrade():
+    """Drop deletion_log table"""
+    if table_exists('deletion_log'):
+        op.drop_table('deletion_log')
@@ -0,0 +1,67 @@
+"""Add eth_payments and indexer_checkpoints tables for the payment indexer
+
+Revision ID: 54_add_eth_payment_index
+Revises: 53_add_deletion_log
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '54_add_eth_payment_index'
+down_revision = '53_add_deletion_log'
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    """Create eth_payments and indexer_checkpoints tables"""
+    if not table_exists('eth_payments'):
+        print("Creating 'eth_payments' table...")
+        op.create_table(
+            'eth_payments',
+            sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column('tx_hash', sa.String(66), nullable=False, unique=True),
+            sa.Column('from_address', sa.String(42), nullable=False),
+            sa.Column('to_address', sa.String(42), nullable=False),
+            sa.Column('amount_wei', sa.Numeric(38, 0), nullable=False),
+            sa.Column('amount_usd', sa.Numeric(18, 2), nullable=True),
+            sa.Column('block_number', sa.BigInteger, nullable=False),
+            sa.Column('block_time', sa.DateTime, nullable=False),
+            sa.Column('created_at', sa.DateTime, nullable=False, server_default=sa.func.now())
+        )
+        op.create_index('ix_eth_payments_from_address', 'eth_payments', ['from_address'])
+        op.create_index('ix_eth_payments_block_number', 'eth_payments', ['block_number'])
+        print("✓ Created 'eth_payments' table")
+    else:
+        print("Table 'eth_payments' already exists, skipping creation")
+
+    if not table_exists('indexer_checkpoints'):
+        print("Creating 'indexer_checkpoints' table...")
+        op.create_table(
+            'indexer_checkpoints',
+            sa.Column('name', sa.String(50), primary_key=True),
+            sa.Column('last_block', sa.BigInteger, nullable=False),
+            sa.Column('updated_at', sa.DateTime, nullable=False, server_default=sa.func.now())
+        )
+        print("✓ Created 'indexer_checkpoints' table")
+    else:
+        print("Table 'indexer_checkpoints' already exists, skipping creation")
+
+
+def downgrade():
+    """Drop eth_payments and indexer_checkpoints tables"""
+    if table_exists('indexer_checkpoints'):
+        op.drop_table('indexer_checkpoints')
+    if table_exists('eth_payments'):
+        op.drop_table('eth_payments')
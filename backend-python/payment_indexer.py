@@ -0,0 +1,222 @@
+"""
+Payment Indexer
+Incrementally scans new blocks for ETH transfers to one address and records them for indexed lookups
+"""
+
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, List, Optional
+
+from structured_logging import get_logger
+
+logger = get_logger('billing')
+
+WEI_PER_ETH = Decimal(10) ** 18
+DEFAULT_BATCH_BLOCKS = 200
+# Blocks left unindexed behind the head, so a reorg cannot un-happen a recorded payment
+DEFAULT_CONFIRMATIONS = 12
+DEFAULT_INTERVAL_SECONDS = 30
+# Payments older than this when indexed (backfills) are left unpriced: today's price says nothing about then
+PRICE_MAX_LAG_SECONDS = 3600
+
+
+class PaymentIndexer:
+    """
+    Records successful ETH transfers to recipient, resuming from a stored checkpoint
+
+    Each run reads up to batch_blocks confirmed blocks after the checkpoint
+    with full transactions, keeps value transfers sent straight to the
+    recipient (fetching the receipt only for those, to drop reverted ones),
+    and commits the new payments together with the advanced checkpoint, so
+    a crash never skips or double-counts a block. Payments are valued in
+    USD when indexed, which is minutes after they were mined. The checkpoint row is
+    locked with SKIP LOCKED on PostgreSQL: when several workers run the
+    indexer, one scans and the others skip that round.
+
+    Transfers made by contracts (internal transactions) are not seen; the
+    activation flow asks wallets for a plain transfer.
+    """
+
+    def __init__(self, w3, db, payment_model, checkpoint_model, recipient: str,
+                 name: str = 'eth_payments', batch_blocks: int = DEFAULT_BATCH_BLOCKS,
+                 confirmations: int = DEFAULT_CONFIRMATIONS, start_block: Optional[int] = None,
+                 price_usd: Optional[Callable[[], Optional[float]]] = None):
+        """
+        Args:
+            w3: Connected Web3 instance (any provider, including EthereumTesterProvider)
+            db: Flask-SQLAlchemy instance
+            payment_model: Model with tx_hash, from_address, to_address, amount_wei, amount_usd, block_number, block_time
+            checkpoint_model: Model with name and last_block
+            recipient: Address whose incoming payments are recorded
+            name: Checkpoint name, so other indexers can share the checkpoint table
+            start_block: First block for a new checkpoint (default: the head when the checkpoint is created)
+            price_usd: Returns the current ETH/USD price or None; without it payments are stored unpriced
+        """
+        self.w3 = w3
+        self.db = db
+        self.Payment = payment_model
+        self.Checkpoint = checkpoint_model
+        self.recipient = recipient.lower()
+        self.name = name
+        self.batch_blocks = max(1, batch_blocks)
+        self.confirmations = max(0, confirmations)
+        self.start_block = start_block
+        self.price_usd = price_usd
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _checkpoint(self):
+        checkpoint = self.Checkpoint.query.filter_by(name=self.name).with_for_update(skip_locked=True).first()
+        if checkpoint is not None:
+            return checkpoint
+        if self.Checkpoint.query.filter_by(name=self.name).first() is not None:
+            return None  # Exists but another worker holds the lock
+        start = self.start_block
+        if start is None:
+            # Backfilling history is opt-in (start_block); by default only new payments are indexed
+            start = self.w3.eth.block_number
+        checkpoint = self.Checkpoint(name=self.name, last_block=start - 1)
+        self.db.session.add(checkpoint)
+        return checkpoint
+
+    def _transfers_in_block(self, number: int) -> List[dict]:
+        block = self.w3.eth.get_block(number, full_transactions=True)
+        block_time = datetime.utcfromtimestamp(block['timestamp'])
+        found = []
+        for tx in block['transactions']:
+            to_address = tx.get('to')
+            if not to_address or to_address.lower() != self.recipient or not tx['value']:
+                continue
+            if self.w3.eth.get_transaction_receipt(tx['hash'])['status'] != 1:
+                continue
+            found.append({
+                'tx_hash': self.w3.to_hex(tx['hash']),
+                'from_address': tx['from'].lower(),
+                'to_address': self.recipient,
+                'amount_wei': Decimal(tx['value']),
+                'amount_usd': None,
+                'block_number': number,
+                'block_time': block_time,
+            })
+        return found
+
+    def _price(self, transfers: List[dict]) -> None:
+        if self.price_usd is None:
+            return
+        cutoff = datetime.utcnow() - timedelta(seconds=PRICE_MAX_LAG_SECONDS)
+        recent = [transfer for transfer in transfers if transfer['block_time'] >= cutoff]
+        if not recent:
+            return
+        price = self.price_usd()
+        if price is None:
+            logger.warning(f"No ETH price while indexing {len(recent)} payment(s); stored unpriced")
+            return
+        for transfer in recent:
+            transfer['amount_usd'] = (transfer['amount_wei'] / WEI_PER_ETH * Decimal(str(price))).quantize(Decimal('0.01'))
+
+    def run_once(self) -> int:
+        """Index the next batch of confirmed blocks; returns the number of blocks scanned"""
+        session = self.db.session
+        try:
+            checkpoint = self._checkpoint()
+            if checkpoint is None:
+                session.rollback()
+                return 0
+            head = self.w3.eth.block_number - self.confirmations
+            first = checkpoint.last_block + 1
+            last = min(head, first + self.batch_blocks - 1)
+            if last < first:
+                session.commit()  # Persist a newly created checkpoint and release the lock
+                return 0
+
+            transfers = []
+            for number in range(first, last + 1):
+                transfers.extend(self._transfers_in_block(number))
+            if transfers:
+                self._price(transfers)
+                known = {row.tx_hash for row in self.Payment.query.with_entities(self.Payment.tx_hash)
+                         .filter(self.Payment.tx_hash.in_([t['tx_hash'] for t in transfers]))}
+                for transfer in transfers:
+                    if transfer['tx_hash'] not in known:
+                        session.add(self.Payment(**transfer))
+            checkpoint.last_block = last
+            checkpoint.updated_at = datetime.utcnow()
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        if transfers:
+            logger.info(f"Indexed {len(transfers)} payment(s) in blocks {first}-{last}")
+        return last - first + 1
+
+    def catch_up(self, max_batches: int = 1000) -> int:
+        """Run batches until the confirmed head is reached; returns blocks scanned"""
+        total = 0
+        for _ in range(max_batches):
+            scanned = self.run_once()
+            if not scanned:
+                break
+            total += scanned
+        return total
+
+    def start(self, app, interval: float = DEFAULT_INTERVAL_SECONDS) -> None:
+        """Keep indexing in a background thread, inside app's context (idempotent)"""
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(app, interval), name=f'{self.name}-indexer',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, app, interval: float) -> None:
+        while not self._stop.is_set():
+            try:
+                with app.app_context():
+                    # A full batch means more blocks are waiting, so go again right away
+                    while self.run_once() >= self.batch_blocks and not self._stop.is_set():
+                        continue
+            except Exception as e:
+                logger.error(f"Payment indexer run failed: {e}")
+            self._stop.wait(interval)
+
+    def payments_from(self, address: str, since: Optional[datetime] = None) -> list:
+        """Recorded payments sent by address, newest first (an indexed lookup, no chain access)"""
+        query = self.Payment.query.filter_by(from_address=address.lower())
+        if since is not None:
+            query = query.filter(self.Payment.block_time >= since)
+        return query.order_by(self.Payment.block_number.desc()).all()
+
+    def recent_payments(self, address: str, lookback_days: Optional[int] = None) -> list:
+        """payments_from limited to the last lookback_days days (all of them when None)"""
+        since = datetime.utcnow() - timedelta(days=lookback_days) if lookback_days else None
+        return self.payments_from(address, since)
+
+    def total_paid_eth(self, address: str, lookback_days: Optional[int] = None) -> Decimal:
+        return sum((payment.amount_wei for payment in self.recent_payments(address, lookback_days)), Decimal(0)) / WEI_PER_ETH
+
+    def status(self) -> dict:
+        checkpoint = self.Checkpoint.query.filter_by(name=self.name).first()
+        head = None
+        try:
+            head = self.w3.eth.block_number
+        except Exception as e:
+            logger.warning(f"Could not read block number: {e}")
+        last_block = checkpoint.last_block if checkpoint else None
+        return {
+            'name': self.name,
+            'recipient': self.recipient,
+            'lastBlock': last_block,
+            'headBlock': head,
+            'lagBlocks': head - self.confirmations - last_block if head is not None and last_block is not None else None,
+            'confirmations': self.confirmations,
+            'batchBlocks': self.batch_blocks,
+            'payments': self.Payment.query.count(),
+            'running': self._thread is not None and self._thread.is_alive(),
+            'updatedAt': checkpoint.updated_at.isoformat() if checkpoint and checkpoint.updated_at else None,
+        }
@@ -0,0 +1,202 @@
+"""
+Price Feed
+ETH/USD price refreshed in the background from several exchanges, served from memory with its age
+"""
+
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import requests
+
+from structured_logging import get_logger
+
+logger = get_logger('billing')
+
+DEFAULT_REFRESH_SECONDS = 60
+MAX_BACKOFF_SECONDS = 600
+SOURCE_TIMEOUT_SECONDS = 5
+
+
+def _coingecko(session: requests.Session) -> float:
+    response = session.get('https://api.coingecko.com/api/v3/simple/price',
+                           params={'ids': 'ethereum', 'vs_currencies': 'usd'}, timeout=SOURCE_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return float(response.json()['ethereum']['usd'])
+
+
+def _coinbase(session: requests.Session) -> float:
+    response = session.get('https://api.coinbase.com/v2/prices/ETH-USD/spot', timeout=SOURCE_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return float(response.json()['data']['amount'])
+
+
+def _kraken(session: requests.Session) -> float:
+    response = session.get('https://api.kraken.com/0/public/Ticker', params={'pair': 'ETHUSD'},
+                           timeout=SOURCE_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    data = response.json()
+    if data.get('error'):
+        raise ValueError('; '.join(data['error']))
+    ticker = next(iter(data['result'].values()))
+    return float(ticker['c'][0])  # Last trade price
+
+
+ETH_USD_SOURCES: Dict[str, Callable[[requests.Session], float]] = {
+    'coingecko': _coingecko,
+    'coinbase': _coinbase,
+    'kraken': _kraken,
+}
+
+
+def select_sources(names: str, available: Dict[str, Callable[[requests.Session], float]] = ETH_USD_SOURCES
+                   ) -> Dict[str, Callable[[requests.Session], float]]:
+    """Sources named in a comma-separated list such as "coingecko, kraken"; unknown names are logged and skipped"""
+    selected = {}
+    for name in (part.strip().lower() for part in names.split(',')):
+        if not name:
+            continue
+        if name in available:
+            selected[name] = available[name]
+        else:
+            logger.error(f"Unknown price source '{name}' (known: {', '.join(available)})")
+    return selected
+
+
+class PriceQuote(NamedTuple):
+    price: float
+    fetched_at: float  # time.time() of the refresh that produced it
+    sources: Dict[str, float]  # Source name -> the price it reported
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+
+class PriceFeed:
+    """
+    Last good price, kept fresh by a background thread
+
+    Every refresh asks all sources concurrently and takes the median of the
+    ones that answered: a source that is down or rate limited is left out,
+    and with three answering one bad price cannot move the result. When every source fails
+    the previous quote is kept and retries back off up to
+    MAX_BACKOFF_SECONDS. Readers never wait on the network, except for the
+    very first read before any refresh has finished.
+    """
+
+    def __init__(self, sources: Dict[str, Callable[[requests.Session], float]],
+                 refresh_seconds: float = DEFAULT_REFRESH_SECONDS, name: str = 'price'):
+        if not sources:
+            raise ValueError(f"{name} feed needs at least one price source")
+        self.sources = sources
+        self.refresh_seconds = refresh_seconds
+        self.name = name
+        self._session = requests.Session()
+        self._quote: Optional[PriceQuote] = None
+        self._errors: Dict[str, str] = {}
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def refresh(self) -> Optional[PriceQuote]:
+        """Fetch from every source now; returns the new quote, or None if all failed"""
+        prices = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=len(self.sources)) as executor:
+            futures = {name: executor.submit(fetch, self._session) for name, fetch in self.sources.items()}
+            for name, future in futures.items():
+                try:
+                    price = future.result()
+                    if price > 0:
+                        prices[name] = price
+                    else:
+                        errors[name] = f'non-positive price {price}'
+                except Exception as e:
+                    errors[name] = f'{type(e).__name__}: {e}'
+
+        with self._lock:
+            self._errors = errors
+            if not prices:
+                self._failures += 1
+                quote = None
+            else:
+                self._failures = 0
+                quote = self._quote = PriceQuote(statistics.median(prices.values()), time.time(), prices)
+        if quote is None:
+            logger.warning(f"{self.name} refresh failed for every source: {errors}")
+        elif errors:
+            logger.info(f"{self.name} refresh used {len(prices)}/{len(self.sources)} sources: {errors}")
+        return quote
+
+    def start(self) -> None:
+        """Start the background refresh thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f'{self.name}-feed', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        if self._quote is not None:
+            self._stop.wait(self.refresh_seconds)
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.exception(f"{self.name} refresh crashed: {e}")
+            delay = min(self.refresh_seconds * (2 ** self._failures), MAX_BACKOFF_SECONDS) if self._failures \
+                else self.refresh_seconds
+            self._stop.wait(delay)
+
+    def quote(self, max_age: Optional[float] = None) -> Optional[PriceQuote]:
+        """
+        Latest quote, or None if there is none or it is older than max_age seconds
+
+        Starts the background refresh on first use; only that first call
+        fetches synchronously.
+        """
+        if self._thread is None:
+            if self._quote is None:
+                self.refresh()
+            self.start()
+        quote = self._quote
+        if quote is None or (max_age is not None and quote.age > max_age):
+            return None
+        return quote
+
+    def status(self) -> dict:
+        with self._lock:
+            quote = self._quote
+            return {
+                'name': self.name,
+                'price': quote.price if quote else None,
+                'ageSeconds': round(quote.age, 1) if quote else None,
+                'sources': dict(quote.sources) if quote else {},
+                'errors': dict(self._errors),
+                'consecutiveFailures': self._failures,
+                'refreshSeconds': self.refresh_seconds,
+                'running': self._thread is not None and self._thread.is_alive(),
+            }
+
+    def render_prometheus(self) -> str:
+        """Price and age gauges in the Prometheus text exposition format (empty before the first quote)"""
+        quote = self._quote
+        if quote is None:
+            return ''
+        lines: List[str] = [
+            f'# HELP {self.name}_price Median price across sources at the last good refresh',
+            f'# TYPE {self.name}_price gauge',
+            f'{self.name}_price {quote.price}',
+            f'# HELP {self.name}_age_seconds Seconds since the last good refresh',
+            f'# TYPE {self.name}_age_seconds gauge',
+            f'{self.name}_age_seconds {quote.age:.1f}',
+        ]
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,277 @@
+"""
+Request Metrics
+Per-route SQL query counts, DB time, N+1 detection and latency histograms, exported in Prometheus text format
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from structured_logging import get_logger
+
+logger = get_logger('db')
+
+# Prometheus' default latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Statements repeated this many times in one request are reported as N+1 patterns
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+# Distinct N+1 statements kept per route (the rest are counted under "other")
+MAX_PATTERNS_PER_ROUTE = 20
+FINGERPRINT_LABEL_LENGTH = 160
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w$])-?\d+(?:\.\d+)?\b')
+_BIND_PARAM = re.compile(r'%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a SQL statement so executions that differ only in values compare equal
+
+    Literals and bind parameters become ?, IN lists collapse to (?+) and
+    whitespace is squeezed, e.g. "SELECT * FROM task WHERE id IN (%(id_1)s, %(id_2)s)"
+    -> "SELECT * FROM task WHERE id IN (?+)".
+    """
+    text = _STRING_LITERAL.sub('?', statement)
+    text = _BIND_PARAM.sub('?', text)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _IN_LIST.sub('(?+)', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((_format_bound(bound), running))
+        result.append(('+Inf', self.count))
+        return result
+
+
+def _format_bound(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else repr(bound)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels: str) -> str:
+    return '{' + ','.join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + '}'
+
+
+class _RequestStats:
+    __slots__ = ('started', 'queries', 'db_seconds', 'statements')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+
+
+class _RouteMetrics:
+    __slots__ = ('latency', 'queries', 'db_seconds', 'statuses', 'n_plus_one')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = 0.0
+        self.statuses: Counter = Counter()
+        self.n_plus_one: Counter = Counter()  # fingerprint -> requests where it repeated
+
+
+class RequestMetrics:
+    """
+    Flask + SQLAlchemy instrumentation
+
+    Engine events time every statement executed while a request is active
+    and attribute it to that request; request hooks then fold the totals into
+    per-route histograms keyed by (URL rule, method). A statement fingerprint
+    seen n_plus_one_threshold or more times in one request is logged once per
+    route and counted.
+
+    Register it before other before_request hooks that may short-circuit the
+    request, so their responses are measured too.
+    """
+
+    def __init__(self, n_plus_one_threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD, server_timing: bool = False):
+        """
+        Args:
+            n_plus_one_threshold: Executions of one fingerprint in a request that count as N+1
+            server_timing: Add a Server-Timing header (db and app time) to every response
+        """
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.server_timing = server_timing
+        self._routes: Dict[Tuple[str, str], _RouteMetrics] = defaultdict(_RouteMetrics)
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def init_app(self, app) -> None:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.listen(Engine, 'before_cursor_execute', self._before_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_execute)
+        event.listen(Engine, 'handle_error', self._handle_error)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    @staticmethod
+    def _current() -> Optional[_RequestStats]:
+        from flask import g, has_request_context
+
+        if not has_request_context():
+            return None
+        return g.get('request_metrics')
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('metrics_query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = self._current()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            stats.statements[statement] += 1
+
+    def _handle_error(self, context) -> None:
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        starts = context.connection.info.get('metrics_query_start') if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+    def _before_request(self):
+        from flask import g
+
+        g.request_metrics = _RequestStats()
+
+    def _after_request(self, response):
+        from flask import g, request
+
+        stats = g.pop('request_metrics', None)
+        if stats is None:
+            return response
+        elapsed = time.perf_counter() - stats.started
+        rule = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+
+        repeated = [(statement, count) for statement, count in stats.statements.items()
+                    if count >= self.n_plus_one_threshold]
+        patterns = Counter()
+        for statement, count in repeated:
+            patterns[fingerprint(statement)] += count
+
+        with self._lock:
+            metrics = self._routes[(rule, request.method)]
+            metrics.latency.observe(elapsed)
+            metrics.queries.observe(stats.queries)
+            metrics.db_seconds += stats.db_seconds
+            metrics.statuses[response.status_code] += 1
+            new_patterns = []
+            for pattern in patterns:
+                if pattern not in metrics.n_plus_one and len(metrics.n_plus_one) >= MAX_PATTERNS_PER_ROUTE:
+                    pattern = 'other'
+                if pattern not in metrics.n_plus_one:
+                    new_patterns.append(pattern)
+                metrics.n_plus_one[pattern] += 1
+
+        for pattern in new_patterns:
+            logger.warning(f"N+1 query pattern in {request.method} {rule} ({patterns.get(pattern, 0)}x in one request): {pattern[:300]}",
+                           extra={'queries': patterns.get(pattern, 0)})
+
+        if self.server_timing:
+            app_ms = max(0.0, elapsed - stats.db_seconds) * 1000
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", app;dur={app_ms:.1f}'
+            )
+        return response
+
+    def render_prometheus(self) -> str:
+        """Current metrics in the Prometheus text exposition format"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                '# HELP http_request_duration_seconds Request latency by route',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (rule, method), metrics in routes:
+                for bound, count in metrics.latency.cumulative():
+                    lines.append(f'http_request_duration_seconds_bucket{_labels(route=rule, method=method, le=bound)} {count}')
+                lines.append(f'http_request_duration_seconds_sum{_labels(route=rule, method=method)} {metrics.latency.total:.6f}')
+                lines.append(f'http_request_duration_seconds_count{_labels(route=rule, method=method)} {metrics.latency.count}')
+
+            lines += [
+                '# HELP http_request_db_queries SQL statements executed per request',
+                '# TYPE http_request_db_queries histogram',
+            ]
+            for (rule, method), metrics in routes:
+                for bound, count in metrics.queries.cumulative():
+                    lines.append(f'http_request_db_queries_bucket{_labels(route=rule, method=method, le=bound)} {count}')
+                lines.append(f'http_request_db_queries_sum{_labels(route=rule, method=method)} {int(metrics.queries.total)}')
+                lines.append(f'http_request_db_queries_count{_labels(route=rule, method=method)} {metrics.queries.count}')
+
+            lines += [
+                '# HELP http_request_db_seconds_total Time spent executing SQL by route',
+                '# TYPE http_request_db_seconds_total counter',
+            ]
+            for (rule, method), metrics in routes:
+                lines.append(f'http_request_db_seconds_total{_labels(route=rule, method=method)} {metrics.db_seconds:.6f}')
+
+            lines += [
+                '# HELP http_requests_total Responses by route and status',
+                '# TYPE http_requests_total counter',
+            ]
+            for (rule, method), metrics in routes:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(f'http_requests_total{_labels(route=rule, method=method, status=status)} {count}')
+
+            lines += [
+                '# HELP http_request_n_plus_one_total Requests that repeated one statement fingerprint past the N+1 threshold',
+                '# TYPE http_request_n_plus_one_total counter',
+            ]
+            for (rule, method), metrics in routes:
+                for pattern, count in metrics.n_plus_one.most_common():
+                    label = pattern[:FINGERPRINT_LABEL_LENGTH]
+                    lines.append(f'http_request_n_plus_one_total{_labels(route=rule, method=method, statement=label)} {count}')
+
+        lines += [
+            '# HELP process_start_time_seconds Start time of the process since unix epoch',
+            '# TYPE process_start_time_seconds gauge',
+            f'process_start_time_seconds {self._started:.0f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
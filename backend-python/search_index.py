@@ -0,0 +1,161 @@
+"""
+Search Index Helpers
+Prefix tsquery building for PostgreSQL search and an in-memory inverted index used where pg_trgm/tsvector are unavailable (SQLite test runs)
+"""
+
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Score multiplier when a query term matches a whole token rather than just a prefix
+EXACT_MATCH_BONUS = 2.0
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lowercase alphanumeric tokens
+
+    Email addresses and company names break on punctuation, so
+    "jane.doe@acme.io" yields ["jane", "doe", "acme", "io"].
+    """
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def build_prefix_tsquery(query: str) -> Optional[str]:
+    """
+    Build a to_tsquery() expression that prefix-matches every term
+
+    Only alphanumeric tokens are kept, so the result is always valid
+    tsquery syntax and safe to bind as a parameter.
+
+    Args:
+        query: Raw search box input
+
+    Returns:
+        e.g. "jan:* & acm:*", or None when the input has no tokens
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+class InvertedIndex:
+    """
+    Token -> document index with prefix matching and weighted ranking
+
+    Documents are added with named fields; each field has a weight used when
+    scoring. A search matches documents containing, for every query term,
+    at least one token starting with that term (AND semantics, like the
+    PostgreSQL prefix tsquery). Results are ordered by score, ties going to
+    the most recently added document.
+    """
+
+    def __init__(self, field_weights: Dict[str, float]):
+        self.field_weights = field_weights
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)  # token -> {doc_id: weight}
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        self._doc_order: Dict[str, int] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def add(self, doc_id: str, fields: Dict[str, Optional[str]]) -> None:
+        """Index (or re-index) a document"""
+        with self._lock:
+            self.remove(doc_id)
+            tokens = set()
+            for field, text in fields.items():
+                weight = self.field_weights.get(field, 1.0)
+                for token in tokenize(text):
+                    postings = self._postings[token]
+                    postings[doc_id] = max(postings.get(doc_id, 0.0), weight)
+                    tokens.add(token)
+            self._doc_tokens[doc_id] = tokens
+            self._doc_order[doc_id] = len(self._doc_order)
+            self._vocabulary_dirty = True
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a document from the index if present"""
+        with self._lock:
+            for token in self._doc_tokens.pop(doc_id, ()):
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[token]
+                        self._vocabulary_dirty = True
+            self._doc_order.pop(doc_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_tokens.clear()
+            self._doc_order.clear()
+            self._vocabulary = []
+            self._vocabulary_dirty = False
+
+    def _expand(self, term: str) -> Iterable[str]:
+        """Vocabulary tokens starting with term"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            yield token
+
+    def search(self, query: str, limit: Optional[int] = None, offset: int = 0) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        Find documents matching every term of query
+
+        Args:
+            query: Raw search text
+            limit: Maximum results to return (None for all)
+            offset: Results to skip, for pagination
+
+        Returns:
+            Tuple of ([(doc_id, score), ...] for the requested page, total matches)
+        """
+        terms = tokenize(query)
+        if not terms:
+            return [], 0
+
+        with self._lock:
+            scores: Optional[Dict[str, float]] = None
+            for term in terms:
+                term_scores: Dict[str, float] = {}
+                for token in self._expand(term):
+                    bonus = EXACT_MATCH_BONUS if token == term else 1.0
+                    for doc_id, weight in self._postings[token].items():
+                        score = weight * bonus
+                        if score > term_scores.get(doc_id, 0.0):
+                            term_scores[doc_id] = score
+
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc_id: scores[doc_id] + s for doc_id, s in term_scores.items() if doc_id in scores}
+                if not scores:
+                    return [], 0
+
+            order = self._doc_order
+            key = lambda item: (item[1], order[item[0]])
+            if limit is None:
+                ranked = sorted(scores.items(), key=key, reverse=True)
+            else:
+                ranked = heapq.nlargest(offset + limit, scores.items(), key=key)
+
+        end = None if limit is None else offset + limit
+        return ranked[offset:end], len(scores)
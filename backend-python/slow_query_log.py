@@ -0,0 +1,278 @@
+"""
+Slow Query Log
+Records SQL statements over a time threshold with their route, call site and parameter shapes, and captures EXPLAIN plans
+"""
+
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from request_metrics import fingerprint
+from structured_logging import get_logger
+
+logger = get_logger('db')
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+
+DEFAULT_THRESHOLD_MS = 200
+RECENT_ENTRIES = 100
+MAX_FINGERPRINTS = 500
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Describe bound parameters by type and size without recording their values
+
+    e.g. {'email_1': 'str(17)', 'id_1': 'int'}; executemany batches report the
+    row count and the shape of the first row.
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        return {'rows': len(parameters), 'first': parameter_shape(parameters[0]) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    return _value_shape(parameters)
+
+
+def _value_shape(value: Any) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, (str, bytes, list, tuple)):
+        return f'{type(value).__name__}({len(value)})'
+    return type(value).__name__
+
+
+def call_origin() -> Optional[str]:
+    """Innermost frame in the application's own code (not a library), as 'file.py:line in function'"""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith('<'):
+            continue  # Code generated by exec() (SQLAlchemy, RowSerializer)
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(APP_DIR) and filename != _THIS_FILE and 'site-packages' not in filename:
+            return f'{os.path.relpath(filename, APP_DIR)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+def _is_select(statement: str) -> bool:
+    head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ''
+    return head in ('SELECT', 'WITH') and ' FOR UPDATE' not in statement.upper()
+
+
+class _Fingerprint:
+    __slots__ = ('fingerprint', 'statement', 'count', 'total_ms', 'max_ms', 'first_seen', 'last_seen',
+                 'routes', 'origins', 'parameters', 'explain', 'explain_status')
+
+    def __init__(self, fp: str, statement: str):
+        self.fingerprint = fp
+        self.statement = statement
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.first_seen = datetime.utcnow()
+        self.last_seen = self.first_seen
+        self.routes: Counter = Counter()
+        self.origins: Counter = Counter()
+        self.parameters = None
+        self.explain: Optional[List[str]] = None
+        self.explain_status: Optional[str] = None  # pending, captured, skipped, failed
+
+    def to_dict(self) -> dict:
+        return {
+            'fingerprint': self.fingerprint,
+            'statement': self.statement,
+            'count': self.count,
+            'totalMs': round(self.total_ms, 1),
+            'meanMs': round(self.total_ms / self.count, 1) if self.count else 0,
+            'maxMs': round(self.max_ms, 1),
+            'firstSeen': self.first_seen.isoformat(),
+            'lastSeen': self.last_seen.isoformat(),
+            'routes': dict(self.routes.most_common(10)),
+            'origins': dict(self.origins.most_common(10)),
+            'parameters': self.parameters,
+            'explain': self.explain,
+            'explainStatus': self.explain_status,
+        }
+
+
+class SlowQueryLog:
+    """
+    Slow statement recorder fed by SQLAlchemy cursor events
+
+    Statements taking threshold_ms or longer are logged and aggregated by
+    fingerprint. With explain enabled, the first occurrence of each SELECT
+    fingerprint gets its plan from EXPLAIN on PostgreSQL (EXPLAIN QUERY PLAN
+    on SQLite) in a background thread, on its own connection and inside a
+    transaction that is rolled back. explain_analyze switches PostgreSQL to
+    EXPLAIN (ANALYZE, BUFFERS), which runs the slow statement a second time
+    for real timings. Writes are never explained.
+    """
+
+    def __init__(self, threshold_ms: float = DEFAULT_THRESHOLD_MS, explain: bool = True,
+                 explain_analyze: bool = False, max_fingerprints: int = MAX_FINGERPRINTS):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_analyze = explain_analyze
+        self.max_fingerprints = max_fingerprints
+        self._fingerprints: Dict[str, _Fingerprint] = {}
+        self._recent: deque = deque(maxlen=RECENT_ENTRIES)
+        self._lock = threading.Lock()
+        self._explain_queue: 'queue.Queue' = queue.Queue(maxsize=100)
+        self._explain_thread: Optional[threading.Thread] = None
+        self._installed = False
+
+    def install(self) -> None:
+        if self._installed:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.listen(Engine, 'before_cursor_execute', self._before_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_execute)
+        event.listen(Engine, 'handle_error', self._handle_error)
+        self._installed = True
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('slow_query_start')
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        if elapsed_ms < self.threshold_ms or conn.info.get('slow_query_explaining'):
+            return
+        self.record(conn, statement, parameters, executemany, elapsed_ms)
+
+    def _handle_error(self, context) -> None:
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        starts = context.connection.info.get('slow_query_start') if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+    def _current_route(self) -> Optional[str]:
+        from flask import has_request_context, request
+
+        if not has_request_context():
+            return None
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        return f'{request.method} {rule}'
+
+    def record(self, conn, statement: str, parameters: Any, executemany: bool, elapsed_ms: float) -> None:
+        fp = fingerprint(statement)
+        route = self._current_route()
+        origin = call_origin()
+        shape = parameter_shape(parameters, executemany)
+
+        logger.warning(f"Slow query {elapsed_ms:.0f} ms [{route or 'no request'}] at {origin or 'unknown'}: "
+                       f"{fp[:300]} params={shape}", extra={'durationMs': round(elapsed_ms, 1)})
+
+        queue_explain = False
+        with self._lock:
+            entry = self._fingerprints.get(fp)
+            if entry is None:
+                if len(self._fingerprints) >= self.max_fingerprints:
+                    # Make room by dropping the least recently seen fingerprint
+                    oldest = min(self._fingerprints.values(), key=lambda e: e.last_seen)
+                    del self._fingerprints[oldest.fingerprint]
+                entry = self._fingerprints[fp] = _Fingerprint(fp, statement)
+                if self.explain and not executemany and _is_select(statement):
+                    entry.explain_status = 'pending'
+                    queue_explain = True
+                else:
+                    entry.explain_status = 'skipped'
+            entry.count += 1
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            entry.last_seen = datetime.utcnow()
+            entry.routes[route or 'no request'] += 1
+            if origin:
+                entry.origins[origin] += 1
+            entry.parameters = shape
+            self._recent.append({
+                'fingerprint': fp,
+                'ms': round(elapsed_ms, 1),
+                'route': route,
+                'origin': origin,
+                'parameters': shape,
+                'at': entry.last_seen.isoformat(),
+            })
+
+        if queue_explain:
+            self._queue_explain(conn.engine, fp, statement, parameters)
+
+    def _queue_explain(self, engine, fp: str, statement: str, parameters: Any) -> None:
+        try:
+            self._explain_queue.put_nowait((engine, fp, statement, parameters))
+        except queue.Full:
+            with self._lock:
+                if fp in self._fingerprints:
+                    self._fingerprints[fp].explain_status = 'skipped'
+            return
+        if self._explain_thread is None or not self._explain_thread.is_alive():
+            self._explain_thread = threading.Thread(target=self._explain_worker, name='slow-query-explain', daemon=True)
+            self._explain_thread.start()
+
+    def _explain_worker(self) -> None:
+        while True:
+            try:
+                engine, fp, statement, parameters = self._explain_queue.get(timeout=30)
+            except queue.Empty:
+                return
+            plan, status = self._run_explain(engine, statement, parameters)
+            with self._lock:
+                entry = self._fingerprints.get(fp)
+                if entry is not None:
+                    entry.explain = plan
+                    entry.explain_status = status
+
+    def _run_explain(self, engine, statement: str, parameters: Any):
+        dialect = engine.dialect.name
+        if dialect == 'postgresql':
+            prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if self.explain_analyze else 'EXPLAIN '
+        elif dialect == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN '
+        else:
+            return None, 'skipped'
+        try:
+            with engine.connect() as conn:
+                conn.info['slow_query_explaining'] = True
+                try:
+                    transaction = conn.begin()
+                    try:
+                        rows = conn.exec_driver_sql(prefix + statement, parameters or ()).fetchall()
+                    finally:
+                        transaction.rollback()
+                finally:
+                    conn.info.pop('slow_query_explaining', None)
+            return [' | '.join(str(col) for col in row) if len(row) > 1 else str(row[0]) for row in rows], 'captured'
+        except Exception as e:
+            return [f'{type(e).__name__}: {e}'], 'failed'
+
+    def summary(self, sort: str = 'total', limit: int = 50) -> List[dict]:
+        """Fingerprint aggregates ordered by total, count, max or mean time"""
+        keys = {
+            'total': lambda e: e.total_ms,
+            'count': lambda e: e.count,
+            'max': lambda e: e.max_ms,
+            'mean': lambda e: e.total_ms / e.count if e.count else 0,
+            'recent': lambda e: e.last_seen,
+        }
+        with self._lock:
+            entries = sorted(self._fingerprints.values(), key=keys.get(sort, keys['total']), reverse=True)
+            return [entry.to_dict() for entry in entries[:limit]]
+
+    def recent(self, limit: int = 50) -> List[dict]:
+        with self._lock:
+            return list(self._recent)[-limit:][::-1]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._fingerprints.clear()
+            self._recent.clear()
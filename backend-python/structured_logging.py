@@ -0,0 +1,237 @@
+"""
+Structured Logging
+Queue-backed JSON logging with per-subsystem levels and sampling for high-frequency events
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import traceback
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Optional, TextIO
+
+from json_provider import dumps
+
+# Parent of every subsystem logger; Flask's app.logger is also "app" when app.py is imported
+ROOT_LOGGER = 'app'
+DEFAULT_QUEUE_SIZE = 10000
+
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_handler: Optional['NonBlockingQueueHandler'] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_sampler: Optional['SamplingFilter'] = None
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Logger for one area of the app, e.g. get_logger('games') -> "app.games\""""
+    return logging.getLogger(f'{ROOT_LOGGER}.{subsystem}')
+
+
+def parse_settings(spec: Optional[str]) -> Dict[str, str]:
+    """Parse "app.games=WARNING,app.socket=0.1" style settings into {logger name: value}"""
+    settings = {}
+    for item in (spec or '').split(','):
+        name, sep, value = item.partition('=')
+        if sep and name.strip() and value.strip():
+            settings[name.strip()] = value.strip()
+    return settings
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a bounded queue drained by a QueueListener thread
+
+    The calling thread only builds the record and enqueues it; formatting
+    and the write to stdout happen on the listener. When the queue is full
+    the record is dropped and counted rather than blocking the request.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback now, while the arguments and the
+        # exception still describe this moment; extra fields are left as-is
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        if not hasattr(record, 'route'):
+            route = _current_route()
+            if route:
+                record.route = route
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _current_route() -> Optional[str]:
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return None
+    if not has_request_context():
+        return None
+    return f'{request.method} {request.path}'
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through a fraction of DEBUG/INFO records per logger
+
+    Rates are looked up by logger name, falling back to the nearest
+    configured parent; a record can carry its own rate with
+    extra={'sample_rate': 0.01}. Warnings and errors are never sampled.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.sampled_out: Counter = Counter()
+        self._resolved: Dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition('.')[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = getattr(record, 'sample_rate', None)
+        if rate is None:
+            rate = self.rate_for(record.name)
+        if rate >= 1 or random.random() < rate:
+            return True
+        self.sampled_out[record.name] += 1
+        return False
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, any extra fields, exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        try:
+            return dumps(entry)
+        except TypeError:
+            return json.dumps(entry, default=str)
+
+
+def configure_logging(level: str = 'INFO', levels: Optional[Dict[str, str]] = None,
+                      sample_rates: Optional[Dict[str, float]] = None, json_output: bool = True,
+                      stream: Optional[TextIO] = None, queue_size: int = DEFAULT_QUEUE_SIZE) -> NonBlockingQueueHandler:
+    """
+    Route all logging through one non-blocking queue handler on the root logger
+
+    Args:
+        level: Level for the "app" logger tree
+        levels: Per-logger overrides, e.g. {'app.games': 'WARNING', 'sqlalchemy.engine': 'INFO'}
+        sample_rates: Fraction of DEBUG/INFO records kept per logger, e.g. {'app.socket': 0.1}
+        json_output: JSON lines (production) or plain text (local development)
+        stream: Where the listener writes; defaults to stdout
+        queue_size: Records buffered before new ones are dropped
+
+    The root logger stays at WARNING so libraries (SQLAlchemy logs every
+    statement at INFO) stay quiet unless named in levels. Calling this again
+    replaces the previous configuration.
+    """
+    global _handler, _listener, _sampler
+
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+        root.removeHandler(_handler)
+        _listener = None
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JSONFormatter() if json_output else logging.Formatter(
+        '%(asctime)s %(levelname)-7s %(name)s: %(message)s'))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _sampler = SamplingFilter(sample_rates)
+    _handler = NonBlockingQueueHandler(log_queue)
+    _handler.addFilter(_sampler)
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+    root.addHandler(_handler)
+    root.setLevel(logging.WARNING)
+    logging.getLogger(ROOT_LOGGER).setLevel(level.upper())
+    for name, name_level in (levels or {}).items():
+        logging.getLogger(None if name == 'root' else name).setLevel(name_level.upper())
+    return _handler
+
+
+def logging_stats() -> dict:
+    """Queue depth, records dropped on a full queue and records removed by sampling"""
+    if _handler is None:
+        return {'configured': False}
+    return {
+        'configured': True,
+        'queued': _handler.queue.qsize(),
+        'dropped': _handler.dropped,
+        'sampledOut': dict(_sampler.sampled_out) if _sampler else {},
+    }
+
+
+def render_prometheus() -> str:
+    """Logging counters in the Prometheus text exposition format"""
+    stats = logging_stats()
+    if not stats['configured']:
+        return ''
+    lines = [
+        '# HELP log_records_dropped_total Log records dropped because the logging queue was full',
+        '# TYPE log_records_dropped_total counter',
+        f'log_records_dropped_total {stats["dropped"]}',
+        '# HELP log_queue_depth Log records waiting to be written',
+        '# TYPE log_queue_depth gauge',
+        f'log_queue_depth {stats["queued"]}',
+        '# HELP log_records_sampled_out_total DEBUG/INFO records skipped by sampling',
+        '# TYPE log_records_sampled_out_total counter',
+    ]
+    for name, count in sorted(stats['sampledOut'].items()):
+        lines.append(f'log_records_sampled_out_total{{logger="{name}"}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,9 @@
+"""
+Test configuration
+Makes the backend modules importable as top-level modules, the way app.py imports them
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
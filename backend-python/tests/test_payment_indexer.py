@@ -0,0 +1,166 @@
+"""
+Payment Indexer tests
+Runs the indexer against an in-memory chain (eth-tester) and SQLite
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from web3 import EthereumTesterProvider, Web3
+
+import wallet_auth_helpers
+from payment_indexer import PaymentIndexer
+
+ETH_PRICE = 3000.0
+
+
+@pytest.fixture
+def w3():
+    return Web3(EthereumTesterProvider())
+
+
+@pytest.fixture
+def models():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db = SQLAlchemy(app)
+
+    class EthPayment(db.Model):
+        __tablename__ = 'eth_payments'
+        id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+        tx_hash = db.Column(db.String(66), unique=True, nullable=False)
+        from_address = db.Column(db.String(42), nullable=False, index=True)
+        to_address = db.Column(db.String(42), nullable=False)
+        amount_wei = db.Column(db.Numeric(38, 0), nullable=False)
+        amount_usd = db.Column(db.Numeric(18, 2), nullable=True)
+        block_number = db.Column(db.BigInteger, nullable=False, index=True)
+        block_time = db.Column(db.DateTime, nullable=False)
+        created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    class IndexerCheckpoint(db.Model):
+        __tablename__ = 'indexer_checkpoints'
+        name = db.Column(db.String(50), primary_key=True)
+        last_block = db.Column(db.BigInteger, nullable=False)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    with app.app_context():
+        db.create_all()
+        yield db, EthPayment, IndexerCheckpoint
+
+
+def make_indexer(w3, models, **kwargs):
+    db, payment_model, checkpoint_model = models
+    options = {'batch_blocks': 3, 'confirmations': 0, 'start_block': 0, 'price_usd': lambda: ETH_PRICE}
+    options.update(kwargs)
+    return PaymentIndexer(w3, db, payment_model, checkpoint_model, w3.eth.accounts[9], **options)
+
+
+def pay(w3, sender, to, ether):
+    return w3.eth.send_transaction({'from': sender, 'to': to, 'value': w3.to_wei(ether, 'ether')})
+
+
+def test_catch_up_records_only_transfers_to_the_recipient(w3, models):
+    _, EthPayment, _ = models
+    accounts = w3.eth.accounts
+    pay(w3, accounts[1], accounts[9], 0.004)
+    pay(w3, accounts[1], accounts[3], 1)
+    pay(w3, accounts[2], accounts[9], 0.001)
+    indexer = make_indexer(w3, models)
+
+    assert indexer.catch_up() == w3.eth.block_number + 1
+    payments = EthPayment.query.order_by(EthPayment.block_number).all()
+    assert [p.from_address for p in payments] == [accounts[1].lower(), accounts[2].lower()]
+    assert indexer.total_paid_eth(accounts[1], 30) == Decimal('0.004')
+    assert payments[0].amount_usd == Decimal('12.00')
+    assert indexer.run_once() == 0
+
+
+def test_rescanning_blocks_does_not_duplicate_payments(w3, models):
+    db, EthPayment, IndexerCheckpoint = models
+    accounts = w3.eth.accounts
+    pay(w3, accounts[1], accounts[9], 0.01)
+    pay(w3, accounts[1], accounts[9], 0.02)
+    indexer = make_indexer(w3, models)
+    indexer.catch_up()
+
+    db.session.get(IndexerCheckpoint, indexer.name).last_block = -1
+    db.session.commit()
+    indexer.catch_up()
+    assert EthPayment.query.count() == 2
+
+
+def test_confirmations_hold_back_recent_blocks(w3, models):
+    db, EthPayment, IndexerCheckpoint = models
+    pay(w3, w3.eth.accounts[1], w3.eth.accounts[9], 0.01)
+    for _ in range(6):
+        pay(w3, w3.eth.accounts[2], w3.eth.accounts[3], 0.01)
+    indexer = make_indexer(w3, models, confirmations=6)
+    indexer.catch_up()
+    assert EthPayment.query.count() == 1
+    assert db.session.get(IndexerCheckpoint, indexer.name).last_block == w3.eth.block_number - 6
+
+    pay(w3, w3.eth.accounts[1], w3.eth.accounts[9], 0.01)
+    indexer.catch_up()
+    assert EthPayment.query.count() == 1
+
+
+def test_new_checkpoint_starts_at_the_head(w3, models):
+    _, EthPayment, _ = models
+    pay(w3, w3.eth.accounts[1], w3.eth.accounts[9], 0.01)
+    pay(w3, w3.eth.accounts[2], w3.eth.accounts[9], 0.01)
+    indexer = make_indexer(w3, models, start_block=None)
+    assert indexer.catch_up() == 1
+    # History before the head is only scanned when start_block asks for it
+    assert [p.from_address for p in EthPayment.query.all()] == [w3.eth.accounts[2].lower()]
+
+
+def test_payments_indexed_without_a_price_are_unpriced(w3, models):
+    _, EthPayment, _ = models
+    pay(w3, w3.eth.accounts[1], w3.eth.accounts[9], 0.01)
+    make_indexer(w3, models, price_usd=lambda: None).catch_up()
+    assert EthPayment.query.one().amount_usd is None
+
+
+def test_check_payment_uses_the_price_at_indexing_time(w3, models, monkeypatch):
+    accounts = w3.eth.accounts
+    pay(w3, accounts[1], accounts[9], 0.007)  # $21 at ETH_PRICE
+    indexer = make_indexer(w3, models)
+    indexer.catch_up()
+
+    monkeypatch.setattr(wallet_auth_helpers, 'get_eth_price_usd', lambda max_age=None: ETH_PRICE / 10)
+    has_paid, amount_usd = wallet_auth_helpers.check_eth_payment_to_isharehow(accounts[1], indexer)
+    assert has_paid
+    assert amount_usd == pytest.approx(21.0)
+    assert wallet_auth_helpers.check_eth_payment_to_isharehow(accounts[2], indexer) == (False, None)
+
+
+def test_check_payment_values_unpriced_payments_at_the_current_price(w3, models, monkeypatch):
+    accounts = w3.eth.accounts
+    pay(w3, accounts[1], accounts[9], 0.007)
+    indexer = make_indexer(w3, models, price_usd=None)
+    indexer.catch_up()
+
+    monkeypatch.setattr(wallet_auth_helpers, 'get_eth_price_usd', lambda max_age=None: ETH_PRICE)
+    assert wallet_auth_helpers.check_eth_payment_to_isharehow(accounts[1], indexer) == (True, pytest.approx(21.0))
+    monkeypatch.setattr(wallet_auth_helpers, 'get_eth_price_usd', lambda max_age=None: None)
+    assert wallet_auth_helpers.check_eth_payment_to_isharehow(accounts[1], indexer) == (None, 0.0)
+
+
+def test_check_payment_is_undecided_when_the_lookup_fails(w3, models, monkeypatch):
+    indexer = make_indexer(w3, models)
+    monkeypatch.setattr(indexer, 'recent_payments', lambda *args: 1 / 0)
+    assert wallet_auth_helpers.check_eth_payment_to_isharehow(w3.eth.accounts[1], indexer) == (None, None)
+
+
+def test_status_reports_lag(w3, models):
+    pay(w3, w3.eth.accounts[1], w3.eth.accounts[9], 0.01)
+    indexer = make_indexer(w3, models)
+    indexer.run_once()
+    status = indexer.status()
+    assert status['lastBlock'] == w3.eth.block_number
+    assert status['lagBlocks'] == 0
+    assert status['payments'] == 1
+    assert not status['running']
@@ -0,0 +1,118 @@
+"""
+TTL Store tests
+Both backends against the same contract; Redis runs on fakeredis
+"""
+
+import threading
+
+import fakeredis
+import pytest
+
+from ttl_store import MemoryTTLStore, RedisTTLStore, TTLStore, create_ttl_store
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def store(request, clock):
+    if request.param == 'memory':
+        return MemoryTTLStore(clock=clock)
+    return RedisTTLStore(client=fakeredis.FakeRedis(decode_responses=True), prefix='test:')
+
+
+def test_set_get_delete(store):
+    store.set('a', 'one', 60)
+    assert store.get('a') == 'one'
+    store.set('a', 'two', 60)
+    assert store.get('a') == 'two'
+    store.delete('a')
+    assert store.get('a') is None
+    store.delete('missing')
+
+
+def test_pop_if_consumes_only_the_expected_value(store):
+    store.set('a', 'one', 60)
+    assert not store.pop_if('a', 'other')
+    assert store.get('a') == 'one'
+    assert store.pop_if('a', 'one')
+    assert not store.pop_if('a', 'one')
+    assert store.get('a') is None
+
+
+def test_pop_if_succeeds_once_under_contention(store):
+    store.set('a', 'nonce', 60)
+    results = []
+    barrier = threading.Barrier(8)
+
+    def consume():
+        barrier.wait()
+        results.append(store.pop_if('a', 'nonce'))
+
+    threads = [threading.Thread(target=consume) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+
+
+def test_memory_store_expires_keys(clock):
+    store = MemoryTTLStore(clock=clock)
+    store.set('a', 'one', 10)
+    store.set('b', 'two', 30)
+    clock.now += 10
+    assert store.get('a') is None
+    assert not store.pop_if('a', 'one')
+    assert store.get('b') == 'two'
+    assert len(store) == 1
+    clock.now += 20
+    assert store.purge_expired() == 1
+    assert len(store) == 0
+
+
+def test_memory_store_reset_extends_expiry(clock):
+    store = MemoryTTLStore(clock=clock)
+    store.set('a', 'one', 10)
+    clock.now += 5
+    store.set('a', 'two', 10)
+    clock.now += 6
+    assert store.get('a') == 'two'  # The first entry's heap item must not expire the second
+    clock.now += 5
+    assert store.get('a') is None
+
+
+def test_memory_store_compacts_stale_heap_entries(clock):
+    store = MemoryTTLStore(clock=clock)
+    for _ in range(1000):
+        store.set('a', 'value', 60)
+    assert len(store._heap) <= 2 * len(store._entries) + 64
+
+
+def test_redis_store_uses_native_expiry():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    store = RedisTTLStore(client=client, prefix='test:')
+    store.set('a', 'one', 1.5)
+    assert 0 < client.pttl('test:a') <= 1500
+    assert store.purge_expired() == 0
+
+
+def test_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        TTLStore()
+
+
+def test_create_ttl_store_without_url_is_in_process():
+    store = create_ttl_store(None, prefix='x:')
+    assert isinstance(store, MemoryTTLStore)
+    assert not store.shared
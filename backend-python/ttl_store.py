@@ -0,0 +1,194 @@
+"""
+TTL Store
+Expiring key/value storage with an in-process heap-backed backend and a shared Redis backend
+"""
+
+import heapq
+from abc import ABC, abstractmethod
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+from structured_logging import get_logger
+
+logger = get_logger('ttl_store')
+
+
+class TTLStore(ABC):
+    """
+    Interface shared by the backends
+
+    Keys and values are strings. An expired key behaves exactly like a
+    missing one. pop_if is the only way to consume a value: it deletes the
+    key and reports success only if the stored value is the expected one,
+    as a single atomic step, so a value can be consumed at most once even
+    when several workers race for it.
+    """
+
+    shared = False
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def pop_if(self, key: str, expected: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    def purge_expired(self) -> int:
+        """Drop expired keys now; returns how many were dropped (backends that expire on their own return 0)"""
+        return 0
+
+
+class MemoryTTLStore(TTLStore):
+    """
+    Per-process store; expiry times sit in a min-heap
+
+    Each operation first pops the entries whose time has passed, so expiry
+    costs O(log n) per key instead of a scan over the whole store. Setting a
+    key again leaves its old heap entry behind; stale entries are recognised
+    by sequence number and skipped, and the heap is rebuilt once they
+    outnumber the live ones.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._entries: Dict[str, Tuple[float, int, str]] = {}  # key -> (expires, seq, value)
+        self._heap: List[Tuple[float, int, str]] = []  # (expires, seq, key)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._entries)
+
+    def _expire(self) -> int:
+        now = self._clock()
+        heap = self._heap
+        dropped = 0
+        while heap and heap[0][0] <= now:
+            _, seq, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == seq:
+                del self._entries[key]
+                dropped += 1
+        return dropped
+
+    def _compact(self) -> None:
+        self._heap = [(expires, seq, key) for key, (expires, seq, _) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._expire()
+            expires = self._clock() + ttl
+            seq = next(self._seq)
+            self._entries[key] = (expires, seq, value)
+            heapq.heappush(self._heap, (expires, seq, key))
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._compact()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            return entry[2] if entry is not None else None
+
+    def pop_if(self, key: str, expected: str) -> bool:
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is None or entry[2] != expected:
+                return False
+            del self._entries[key]
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._expire()
+
+
+class RedisTTLStore(TTLStore):
+    """
+    Store shared by every worker and instance, kept in Redis
+
+    Keys get Redis' own expiry (SET ... PX). pop_if runs GET and DEL in a
+    WATCH/MULTI/EXEC transaction rather than a Lua script, so it works
+    against anything that speaks the Redis protocol, including local
+    stand-ins such as fakeredis.
+    """
+
+    shared = True
+
+    def __init__(self, url: Optional[str] = None, prefix: str = '', client=None):
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise RuntimeError('redis package is not installed')
+            client = redis.Redis.from_url(url, decode_responses=True, socket_timeout=2, socket_connect_timeout=2)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(self._key(key), value, px=max(1, int(ttl * 1000)))
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self._key(key))
+        return value.decode() if isinstance(value, bytes) else value
+
+    def pop_if(self, key: str, expected: str) -> bool:
+        name = self._key(key)
+
+        def compare_and_delete(pipe):
+            value = pipe.get(name)
+            if isinstance(value, bytes):
+                value = value.decode()
+            if value != expected:
+                pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.delete(name)
+            return True
+
+        # transaction() retries when the key changes between WATCH and EXEC
+        return self.client.transaction(compare_and_delete, name, value_from_callable=True)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+
+def create_ttl_store(url: Optional[str] = None, prefix: str = '') -> TTLStore:
+    """
+    Redis-backed store when url is set and redis is installed, otherwise an in-process one
+
+    Falling back keeps a single-worker deployment working, but values are
+    then only visible to the worker that stored them, so it is logged.
+    """
+    if url:
+        if REDIS_AVAILABLE:
+            return RedisTTLStore(url, prefix=prefix)
+        logger.error(f"redis package not installed; using an in-process store for '{prefix}' keys")
+    return MemoryTTLStore()
@@ -4,20 +4,38 @@ Handles wallet-based login, signature verification, and ETH payment verification
 """
 import os
 import uuid
-import time
-from datetime import datetime, timedelta
 from typing import Optional, Dict, Tuple
 from eth_account.messages import encode_defunct
 from web3 import Web3
 
-# Nonce storage (in-memory - use Redis in production)
-wallet_nonces = {}  # {address: {nonce: str, expires: timestamp}}
+from structured_logging import get_logger
+from payment_indexer import WEI_PER_ETH
+from price_feed import PriceFeed, select_sources
+from ttl_store import create_ttl_store
+
+logger = get_logger('auth')
 
 # Configuration
-NONCE_EXPIRATION_SECONDS = 300  # 5 minutes
+NONCE_EXPIRATION_SECONDS = int(os.environ.get('NONCE_EXPIRATION_SECONDS', '300'))  # 5 minutes
 DASHBOARD_ACTIVATION_PRICE_USD = 17.99
 ISHAREHOW_ETH_ADDRESS = os.environ.get('ISHAREHOW_ETH_ADDRESS', '0x0000000000000000000000000000000000000000')  # Set in env
 
+# ETH/USD from the median of several exchanges, refreshed in the background so quoting
+# a price never waits on an external API; quotes older than the max age are refused
+ETH_PRICE_REFRESH_SECONDS = float(os.environ.get('ETH_PRICE_REFRESH_SECONDS', '60'))
+ETH_PRICE_MAX_AGE_SECONDS = float(os.environ.get('ETH_PRICE_MAX_AGE_SECONDS', '900'))
+eth_price_feed = PriceFeed(
+    select_sources(os.environ.get('ETH_PRICE_SOURCES', 'coingecko,coinbase,kraken')),
+    refresh_seconds=ETH_PRICE_REFRESH_SECONDS,
+    name='eth_usd',
+)
+
+# Nonce storage: Redis when REDIS_URL is set, so a nonce issued by one worker can be
+# used on another; otherwise in-process, which only works with a single worker
+nonce_store = create_ttl_store(os.environ.get('REDIS_URL'), prefix='wallet-nonce:')
+if not nonce_store.shared and int(os.environ.get('WEB_CONCURRENCY', '1')) > 1:
+    logger.warning("Wallet nonces are per process but WEB_CONCURRENCY > 1; set REDIS_URL to share them")
+
 
 def generate_nonce(address: str) -> str:
     """
@@ -29,28 +47,15 @@ def generate_nonce(address: str) -> str:
     Returns:
         Nonce string to be signed by the wallet
     """
-    # Clean up expired nonces first
-    cleanup_expired_nonces()
-    
-    # Generate unique nonce
     nonce = str(uuid.uuid4())
-    expires = time.time() + NONCE_EXPIRATION_SECONDS
-    
-    # Normalize address
-    address = address.lower()
-    
-    # Store nonce
-    wallet_nonces[address] = {
-        'nonce': nonce,
-        'expires': expires
-    }
-    
+    # Replaces any earlier nonce for this address
+    nonce_store.set(address.lower(), nonce, NONCE_EXPIRATION_SECONDS)
     return nonce
 
 
 def verify_nonce(address: str, nonce: str) -> bool:
     """
-    Verify that a nonce exists and hasn't expired.
+    Check that a nonce was issued for this address and hasn't expired, without using it up.
     
     Args:
         address: Ethereum wallet address
@@ -59,35 +64,29 @@ def verify_nonce(address: str, nonce: str) -> bool:
     Returns:
         True if nonce is valid, False otherwise
     """
-    address = address.lower()
-    
-    if address not in wallet_nonces:
-        return False
-    
-    stored = wallet_nonces[address]
-    
-    # Check expiration
-    if time.time() > stored['expires']:
-        del wallet_nonces[address]
-        return False
-    
-    # Check nonce matches
-    return stored['nonce'] == nonce
+    return nonce_store.get(address.lower()) == nonce
 
 
-def consume_nonce(address: str) -> None:
-    """Remove nonce after successful use."""
-    address = address.lower()
-    if address in wallet_nonces:
-        del wallet_nonces[address]
+def consume_nonce(address: str, nonce: Optional[str] = None) -> bool:
+    """
+    Use up a nonce after successful verification.
+    
+    With nonce given, the check and the removal are one atomic step: of two
+    requests racing with the same nonce only one gets True. Without it the
+    address's nonce is simply discarded.
+    
+    Returns:
+        True if the nonce was still valid and is now consumed
+    """
+    if nonce is None:
+        nonce_store.delete(address.lower())
+        return True
+    return nonce_store.pop_if(address.lower(), nonce)
 
 
 def cleanup_expired_nonces() -> None:
-    """Remove all expired nonces from storage."""
-    current_time = time.time()
-    expired = [addr for addr, data in wallet_nonces.items() if current_time > data['expires']]
-    for addr in expired:
-        del wallet_nonces[addr]
+    """Remove expired nonces (the store also expires them on its own)."""
+    nonce_store.purge_expired()
 
 
 def verify_wallet_signature(address: str, message: str, signature: str, w3: Web3) -> bool:
@@ -117,7 +116,7 @@ def verify_wallet_signature(address: str, message: str, signature: str, w3: Web3
         return recovered_address.lower() == address.lower()
     
     except Exception as e:
-        print(f"Signature verification error: {e}")
+        logger.warning(f"Signature verification error: {e}")
         return False
 
 
@@ -162,84 +161,75 @@ def generate_user_id_from_email(email: str, existing_usernames=None) -> str:
     return f"{username}{counter}"
 
 
-def check_eth_payment_to_isharehow(address: str, w3: Web3, lookback_days: int = 30) -> Tuple[bool, Optional[float]]:
+def check_eth_payment_to_isharehow(address: str, indexer, lookback_days: int = 30) -> Tuple[Optional[bool], Optional[float]]:
     """
-    Check if a wallet has sent ETH payment to isharehow.eth address.
+    Check if a wallet has sent enough ETH to the isharehow.eth address.
+    
+    Reads the payments recorded by the payment indexer (an indexed lookup,
+    no chain scan) and compares their USD value with
+    DASHBOARD_ACTIVATION_PRICE_USD. Each payment counts at the price it was
+    valued at when indexed; only unpriced (backfilled) payments fall back to
+    the current price. Only payments in blocks the indexer has scanned are
+    seen: history before its first checkpoint needs PAYMENT_INDEXER_START_BLOCK.
     
     Args:
         address: Wallet address to check
-        w3: Web3 instance
+        indexer: PaymentIndexer recording payments to ISHAREHOW_ETH_ADDRESS
         lookback_days: How many days to look back for transactions
     
     Returns:
-        Tuple of (has_paid: bool, amount_usd: float or None)
+        Tuple of (has_paid: bool, or None if it can't be decided right now, amount_usd: float or None).
+        has_paid is None when the lookup fails, or when priced payments fall short and
+        unpriced ones can't be valued because no fresh ETH price is available.
     """
     try:
-        # Normalize addresses
-        from_address = Web3.to_checksum_address(address)
-        to_address = Web3.to_checksum_address(ISHAREHOW_ETH_ADDRESS)
-        
-        # Get current block number
-        current_block = w3.eth.block_number
-        
-        # Estimate blocks to look back (assuming ~12 second block time)
-        blocks_per_day = (24 * 60 * 60) // 12
-        lookback_blocks = blocks_per_day * lookback_days
-        from_block = max(0, current_block - lookback_blocks)
-        
-        # Get transactions (this requires Alchemy Enhanced API or archive node)
-        # For now, we'll use a simplified approach
-        
-        # Alternative: Check balance change or use Alchemy Transfer API
-        # This is a placeholder - implement based on your Alchemy API access
-        
-        print(f"Checking ETH payments from {from_address} to {to_address}")
-        print(f"Lookback: blocks {from_block} to {current_block}")
-        
-        # TODO: Implement actual transaction history check via Alchemy API
-        # For now, return False
-        return False, None
+        payments = indexer.recent_payments(address, lookback_days)
+        if not payments:
+            return False, None
+        amount_usd = float(sum(p.amount_usd for p in payments if p.amount_usd is not None))
+        unpriced_wei = sum(p.amount_wei for p in payments if p.amount_usd is None)
+        if unpriced_wei:
+            eth_price = get_eth_price_usd()
+            if eth_price is None:
+                # Without a fresh price these payments can't be valued; callers can retry later
+                logger.warning(f"ETH price unavailable while checking payment from {address}")
+                if amount_usd < DASHBOARD_ACTIVATION_PRICE_USD:
+                    return None, amount_usd
+            else:
+                amount_usd += float(unpriced_wei / WEI_PER_ETH) * eth_price
+        return amount_usd >= DASHBOARD_ACTIVATION_PRICE_USD, amount_usd
     
     except Exception as e:
-        print(f"Error checking ETH payment: {e}")
-        return False, None
+        logger.error(f"Error checking ETH payment: {e}")
+        return None, None
 
 
-def get_eth_price_usd() -> Optional[float]:
+def get_eth_price_usd(max_age: Optional[float] = None) -> Optional[float]:
     """
-    Get current ETH price in USD.
-    Uses CoinGecko API (free tier).
+    Get current ETH price in USD from the background price feed.
+    
+    Args:
+        max_age: Refuse prices older than this many seconds (default ETH_PRICE_MAX_AGE_SECONDS)
     
     Returns:
-        ETH price in USD or None if error
+        ETH price in USD or None if no fresh enough price is available
     """
-    try:
-        import requests
-        response = requests.get(
-            'https://api.coingecko.com/api/v3/simple/price',
-            params={'ids': 'ethereum', 'vs_currencies': 'usd'},
-            timeout=5
-        )
-        if response.status_code == 200:
-            data = response.json()
-            return data.get('ethereum', {}).get('usd')
-        return None
-    except Exception as e:
-        print(f"Error fetching ETH price: {e}")
-        return None
+    quote = eth_price_feed.quote(ETH_PRICE_MAX_AGE_SECONDS if max_age is None else max_age)
+    return quote.price if quote else None
 
 
-def calculate_eth_amount_for_usd(usd_amount: float) -> Optional[float]:
+def calculate_eth_amount_for_usd(usd_amount: float, max_age: Optional[float] = None) -> Optional[float]:
     """
     Calculate how much ETH equals a USD amount.
     
     Args:
         usd_amount: USD amount (e.g., 17.99)
+        max_age: Refuse prices older than this many seconds (default ETH_PRICE_MAX_AGE_SECONDS)
     
     Returns:
-        ETH amount or None if price unavailable
+        ETH amount or None if price unavailable or stale
     """
-    eth_price = get_eth_price_usd()
+    eth_price = get_eth_price_usd(max_age)
     if eth_price:
         return usd_amount / eth_price
     return None
@@ -0,0 +1,184 @@
+"""
+Wellness Trend Engine
+Vectorized rolling averages, baselines, z-scores and training load (ATL/CTL/TSB) over per-user daily arrays
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+ROLLING_WINDOW_DAYS = 7
+BASELINE_WINDOW_DAYS = 28
+ATL_DAYS = 7    # Acute training load (fatigue) time constant
+CTL_DAYS = 42   # Chronic training load (fitness) time constant
+
+# Raw data needed before the first recomputed day so windows are fully populated
+LOOKBACK_DAYS = BASELINE_WINDOW_DAYS
+
+# Metrics that get rolling average, baseline and z-score series
+TRENDED_METRICS = ('hrv', 'resting_hr', 'sleep_hours')
+
+# Largest block for the closed-form EWMA before re-seeding, keeps decay powers well inside float64 range
+_EWMA_BLOCK = 256
+
+
+def date_range(start: date, end: date) -> List[date]:
+    """Every calendar day from start to end inclusive"""
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def rolling_mean(values: np.ndarray, window: int, shift: int = 0) -> np.ndarray:
+    """
+    NaN-aware trailing rolling mean
+
+    Args:
+        values: Daily values with NaN for missing days
+        window: Window length in days
+        shift: Exclude the most recent `shift` days (1 gives a baseline that
+            does not include the day being scored)
+
+    Returns:
+        Array of the same length; NaN where the window holds no data
+    """
+    means, _ = _rolling_moments(values, window, shift)
+    return means
+
+
+def rolling_std(values: np.ndarray, window: int, shift: int = 0) -> np.ndarray:
+    """NaN-aware trailing rolling population standard deviation (see rolling_mean)"""
+    _, stds = _rolling_moments(values, window, shift)
+    return stds
+
+
+def _rolling_moments(values: np.ndarray, window: int, shift: int):
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+
+    csum = np.concatenate(([0.0], np.cumsum(filled)))
+    csq = np.concatenate(([0.0], np.cumsum(filled * filled)))
+    ccount = np.concatenate(([0], np.cumsum(present)))
+
+    idx = np.arange(values.size)
+    end = np.clip(idx + 1 - shift, 0, None)
+    start = np.clip(end - window, 0, None)
+
+    count = ccount[end] - ccount[start]
+    total = csum[end] - csum[start]
+    total_sq = csq[end] - csq[start]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        var = np.clip(total_sq / count - mean * mean, 0, None)
+    mean[count == 0] = np.nan
+    std = np.sqrt(var)
+    std[count < 2] = np.nan
+    return mean, std
+
+
+def ewma(values: np.ndarray, time_constant: int, seed: float = 0.0) -> np.ndarray:
+    """
+    Exponentially weighted moving average as used for ATL/CTL
+
+    Computes y[t] = y[t-1] + (x[t] - y[t-1]) / time_constant with the
+    recurrence unrolled into cumulative sums, processed in blocks.
+
+    Args:
+        values: Daily load (missing days should already be 0)
+        time_constant: Days (7 for ATL, 42 for CTL)
+        seed: Value of the average on the day before values[0]
+
+    Returns:
+        Array of the same length
+    """
+    alpha = 1.0 / time_constant
+    decay = 1.0 - alpha
+    out = np.empty(values.size, dtype=np.float64)
+
+    prev = seed
+    for block_start in range(0, values.size, _EWMA_BLOCK):
+        block = values[block_start:block_start + _EWMA_BLOCK]
+        k = np.arange(1, block.size + 1)
+        powers = decay ** k
+        # y[k] = decay^k * seed + alpha * sum_{j<=k} decay^(k-j) * x[j]
+        scaled = np.cumsum(block / powers) * powers * alpha
+        out[block_start:block_start + block.size] = powers * prev + scaled
+        prev = out[block_start + block.size - 1]
+
+    return out
+
+
+def compute_daily_trends(
+    days: List[date],
+    hrv: np.ndarray,
+    resting_hr: np.ndarray,
+    sleep_hours: np.ndarray,
+    load: np.ndarray,
+    atl_seed: float = 0.0,
+    ctl_seed: float = 0.0,
+    load_start: int = 0,
+) -> Dict[str, np.ndarray]:
+    """
+    Compute every rollup series for a contiguous run of days
+
+    Args:
+        days: Consecutive calendar days
+        hrv, resting_hr, sleep_hours: Daily values, NaN where missing
+        load: Daily training load, 0 where no training
+        atl_seed, ctl_seed: ATL/CTL on the day before days[load_start]
+        load_start: Index where the ATL/CTL chain starts; earlier days are
+            lookback-only context for the rolling windows and get NaN loads
+
+    Returns:
+        Mapping of series name to array aligned with days
+    """
+    trends: Dict[str, np.ndarray] = {}
+    for name, values in zip(TRENDED_METRICS, (hrv, resting_hr, sleep_hours)):
+        baseline = rolling_mean(values, BASELINE_WINDOW_DAYS, shift=1)
+        spread = rolling_std(values, BASELINE_WINDOW_DAYS, shift=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            zscore = (values - baseline) / spread
+        zscore[~np.isfinite(zscore)] = np.nan
+
+        trends[name] = values
+        trends[f'{name}_7d'] = rolling_mean(values, ROLLING_WINDOW_DAYS)
+        trends[f'{name}_baseline'] = baseline
+        trends[f'{name}_z'] = zscore
+
+    prefix = np.full(load_start, np.nan)
+    chained = load[load_start:]
+    atl = ewma(chained, ATL_DAYS, atl_seed)
+    ctl = ewma(chained, CTL_DAYS, ctl_seed)
+    # Form is yesterday's fitness minus yesterday's fatigue
+    tsb = np.concatenate(([ctl_seed - atl_seed], (ctl - atl)[:-1]))[:chained.size]
+
+    atl = np.concatenate((prefix, atl))
+    ctl = np.concatenate((prefix, ctl))
+    tsb = np.concatenate((prefix, tsb))
+
+    trends['load'] = load
+    trends['atl'] = atl
+    trends['ctl'] = ctl
+    trends['tsb'] = tsb
+    return trends
+
+
+def to_rows(days: List[date], trends: Dict[str, np.ndarray], first_day: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Convert trend arrays to per-day row dicts (NaN becomes None)
+
+    Args:
+        days: Calendar days the arrays are aligned with
+        trends: Output of compute_daily_trends
+        first_day: Drop rows before this day (the lookback-only prefix)
+    """
+    rows = []
+    for i, day in enumerate(days):
+        if first_day and day < first_day:
+            continue
+        row = {'day': day}
+        for name, values in trends.items():
+            value = float(values[i])
+            row[name] = None if np.isnan(value) else round(value, 3)
+        rows.append(row)
+    return rows
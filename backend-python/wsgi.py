@@ -0,0 +1,15 @@
+"""
+WSGI Entry Point
+Entry for gunicorn (the opt-in gevent deployment): importing app registers every route, socket handler and hook before serving
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The database upgrade runs on the first request (see initialize_on_first_request)
+and through render.yaml's postDeployCommand, so importing here has no side
+effects beyond building the app.
+"""
+
+from app import app
+
+application = app
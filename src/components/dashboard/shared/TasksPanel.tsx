@@ -114,7 +114,7 @@ export default function TasksPanel({ height = 500 }: TasksPanelProps) {
   const theme = useTheme();
   const { user } = useAuth();
   const { users: workspaceUsers } = useWorkspaceUsers();
-  const { tasks, createTask, updateTask, deleteTask, updateTaskNotes, isLoading: tasksLoading, error: tasksErrorMsg, authRequired, refresh, isStale } = useTasks();
+  const { tasks, createTask, updateTask, deleteTask, updateTaskNotes, joinTaskNotes, leaveTaskNotes, isLoading: tasksLoading, error: tasksErrorMsg, authRequired, refresh, isStale } = useTasks();
   
   // State
   const [taskDialogOpen, setTaskDialogOpen] = useState(false);
@@ -156,6 +156,13 @@ export default function TasksPanel({ height = 500 }: TasksPanelProps) {
     return uniqueOptions;
   }, [workspaceUsers, employees]);
   
+  // Receive live notes edits while a task is open for editing
+  React.useEffect(() => {
+    if (!taskDialogOpen || editMode !== 'edit' || !currentTaskId) return;
+    joinTaskNotes(currentTaskId);
+    return () => leaveTaskNotes(currentTaskId);
+  }, [taskDialogOpen, editMode, currentTaskId, joinTaskNotes, leaveTaskNotes]);
+
   // Fetch employees from database
   React.useEffect(() => {
     const fetchEmployees = async () => {
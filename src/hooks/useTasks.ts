@@ -24,6 +24,37 @@ export interface Task {
   userRole?: string;
 }
 
+// Notes edits travel as splices [position, deleteCount, insertText], as in the backend's collab_notes
+type NotesPatch = [number, number, string][];
+
+interface NotesSync {
+  text: string; // Server text at version
+  version: number;
+  inFlight: string | null; // Text sent and not yet acknowledged
+  queued: string | null; // Latest text typed while an edit was in flight
+}
+
+const makeNotesPatch = (oldText: string, newText: string): NotesPatch => {
+  if (oldText === newText) return [];
+  const limit = Math.min(oldText.length, newText.length);
+  let start = 0;
+  while (start < limit && oldText[start] === newText[start]) start++;
+  let end = 0;
+  while (end < limit - start && oldText[oldText.length - 1 - end] === newText[newText.length - 1 - end]) end++;
+  return [[start, oldText.length - start - end, newText.slice(start, newText.length - end)]];
+};
+
+const applyNotesPatch = (text: string, patch: NotesPatch): string =>
+  patch.reduce((result, [position, deleteCount, insert]) =>
+    result.slice(0, position) + insert + result.slice(position + deleteCount), text);
+
+const sendNotesEdit = (socket: Socket, taskId: string, sync: NotesSync, notes: string) => {
+  const patch = makeNotesPatch(sync.text, notes);
+  if (!patch.length) return;
+  sync.inFlight = notes;
+  socket.emit('task_notes_update', { task_id: taskId, version: sync.version, patch });
+};
+
 // Hook for team tasks with real-time updates
 export function useTasks(onTaskAssigned?: (task: Task, assignedToUserId: string) => void) {
   const [tasks, setTasks] = useState<Task[]>([]);
@@ -36,6 +67,7 @@ export function useTasks(onTaskAssigned?: (task: Task, assignedToUserId: string)
   const [socket, setSocket] = useState<Socket | null>(null);
   const lastUpdatedRef = useRef<Date | null>(null);
   const deletingTasksRef = useRef<Set<string>>(new Set()); // Track tasks being deleted to prevent duplicates
+  const notesSyncRef = useRef<Map<string, NotesSync>>(new Map()); // Tasks whose notes room this client joined
 
   const fetchTasks = useCallback(async () => {
     try {
@@ -327,7 +359,13 @@ export function useTasks(onTaskAssigned?: (task: Task, assignedToUserId: string)
       console.log('Socket.io disconnected (tasks):', reason);
     };
 
+    // Rooms don't survive a reconnect, so rejoin every open notes room
+    const handleNotesRejoin = () => {
+      notesSyncRef.current.forEach((_, taskId) => socketInstance.emit('task_notes_join', { task_id: taskId }));
+    };
+
     socketInstance.on('connect', handleConnect);
+    socketInstance.on('connect', handleNotesRejoin);
     socketInstance.on('connect_error', handleConnectError);
     socketInstance.on('disconnect', handleDisconnect);
 
@@ -366,15 +404,63 @@ export function useTasks(onTaskAssigned?: (task: Task, assignedToUserId: string)
     });
 
 
-    socketInstance.on('task_notes_updated', (data: { task_id: string; notes: string }) => {
-      if (!isMounted) return;
+    const setTaskNotesText = (taskId: string, notes: string) => {
       const now = new Date();
-      setTasks(prev => prev.map(task => 
-        task.id === data.task_id ? { ...task, notes: data.notes } : task
+      setTasks(prev => prev.map(task =>
+        task.id === taskId ? { ...task, notes } : task
       ));
       setLastUpdated(now);
       lastUpdatedRef.current = now;
+    };
+
+    // Notes rooms: the server sends the current state on join, then splice patches from other editors
+    socketInstance.on('task_notes_state', (data: { task_id: string; notes: string; version: number }) => {
+      if (!isMounted || !notesSyncRef.current.has(data.task_id)) return;
+      notesSyncRef.current.set(data.task_id, { text: data.notes, version: data.version, inFlight: null, queued: null });
+      setTaskNotesText(data.task_id, data.notes);
+    });
+
+    socketInstance.on('task_notes_patch', (data: { task_id: string; baseVersion: number; version: number; patch: NotesPatch }) => {
+      if (!isMounted) return;
+      const sync = notesSyncRef.current.get(data.task_id);
+      if (!sync) return;
+      if (sync.version !== data.baseVersion) {
+        // Missed an edit: resync from the server's current state
+        socketInstance.emit('task_notes_join', { task_id: data.task_id });
+        return;
+      }
+      sync.text = applyNotesPatch(sync.text, data.patch);
+      sync.version = data.version;
+      setTaskNotesText(data.task_id, sync.text);
     });
+
+    socketInstance.on('task_notes_ack', (data: { task_id: string; version: number }) => {
+      const sync = notesSyncRef.current.get(data.task_id);
+      if (!sync || sync.inFlight === null) return;
+      sync.text = sync.inFlight;
+      sync.version = data.version;
+      sync.inFlight = null;
+      if (sync.queued !== null) {
+        const queued = sync.queued;
+        sync.queued = null;
+        sendNotesEdit(socketInstance, data.task_id, sync, queued);
+      }
+    });
+
+    socketInstance.on('task_notes_conflict', (data: { task_id: string; notes: string; version: number }) => {
+      const sync = notesSyncRef.current.get(data.task_id);
+      if (!sync) return;
+      // Someone else edited first: diff the latest local text against theirs and resend
+      const pending = sync.queued ?? sync.inFlight;
+      sync.text = data.notes;
+      sync.version = data.version;
+      sync.inFlight = null;
+      sync.queued = null;
+      if (pending !== null) {
+        sendNotesEdit(socketInstance, data.task_id, sync, pending);
+      }
+    });
+
     socketInstance.on('task_assigned', (data: { task: Task; assignedTo: string; assignedToName?: string }) => {
       if (!isMounted) return;
       console.log('Task assigned notification:', data);
@@ -411,13 +497,17 @@ export function useTasks(onTaskAssigned?: (task: Task, assignedToUserId: string)
       if (fetchTimeout) clearTimeout(fetchTimeout);
       // Only remove task-specific listeners, keep the socket connection alive
       socketInstance.off('connect', handleConnect);
+      socketInstance.off('connect', handleNotesRejoin);
       socketInstance.off('connect_error', handleConnectError);
       socketInstance.off('disconnect', handleDisconnect);
       socketInstance.off('task_created');
       socketInstance.off('task_updated');
       socketInstance.off('task_deleted');
       socketInstance.off('task_assigned');
-      socketInstance.off('task_notes_updated');
+      socketInstance.off('task_notes_state');
+      socketInstance.off('task_notes_patch');
+      socketInstance.off('task_notes_ack');
+      socketInstance.off('task_notes_conflict');
       socketInstance.off('auth_restored_ack');
       clearInterval(staleInterval);
     };
@@ -429,20 +519,37 @@ export function useTasks(onTaskAssigned?: (task: Task, assignedToUserId: string)
   }, [onTaskAssigned]);
 
 
+  // Start receiving live notes edits for a task (e.g. while its editor is open)
+  const joinTaskNotes = useCallback((id: string) => {
+    if (!socket || notesSyncRef.current.has(id)) return;
+    notesSyncRef.current.set(id, { text: '', version: -1, inFlight: null, queued: null });
+    socket.emit('task_notes_join', { task_id: id });
+  }, [socket]);
+
+  const leaveTaskNotes = useCallback((id: string) => {
+    if (!socket || !notesSyncRef.current.delete(id)) return;
+    socket.emit('task_notes_leave', { task_id: id });
+  }, [socket]);
+
   const updateTaskNotes = (id: string, notes: string) => {
     // Optimistic update
     setTasks(prev => prev.map(t => 
       t.id === id ? { ...t, notes } : t
     ));
     
-    // Emit socket event for real-time sync
-    if (socket) {
-      socket.emit('task_notes_update', {
-        task_id: id,
-        notes,
-        user_id: null // Will be set by backend from session
-      });
+    if (!socket) return;
+    const sync = notesSyncRef.current.get(id);
+    if (!sync || sync.version < 0) {
+      // Room not joined (or state not received yet): send the full text, last writer wins
+      socket.emit('task_notes_update', { task_id: id, notes });
+      return;
+    }
+    // One edit in flight per task; later typing is sent once it is acknowledged
+    if (sync.inFlight !== null) {
+      sync.queued = notes;
+      return;
     }
+    sendNotesEdit(socket, id, sync, notes);
   };
   return {
     tasks,
@@ -457,5 +564,7 @@ export function useTasks(onTaskAssigned?: (task: Task, assignedToUserId: string)
     updateTask,
     deleteTask,
     updateTaskNotes,
+    joinTaskNotes,
+    leaveTaskNotes,
   };
 }